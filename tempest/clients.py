@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+
 from tempest import config
 from tempest.lib import auth
 from tempest.lib import exceptions as lib_exc
@@ -22,7 +24,12 @@ CONF = config.CONF
 
 
 class Manager(clients.ServiceClients):
-    """Top level manager for OpenStack tempest clients"""
+    """Top level manager for OpenStack tempest clients
+
+    The service clients are only created when their attribute is first
+    accessed, and the clients with the same HTTP settings share one
+    connection pool.
+    """
 
     def __init__(self, credentials, scope='project'):
         """Initialization of Manager class.
@@ -31,6 +38,9 @@ class Manager(clients.ServiceClients):
         :param credentials: type Credentials or TestResources
         :param scope: default scope for tokens produced by the auth provider
         """
+        # Set before anything else, __getattr__ looks them up
+        self._client_factories = {}
+        self._http_pools = {}
         _, identity_uri = get_auth_provider_class(credentials)
         super(Manager, self).__init__(
             credentials=credentials, identity_uri=identity_uri, scope=scope,
@@ -50,101 +60,172 @@ class Manager(clients.ServiceClients):
         # never a stable interface and it's not useful anyways
         self.default_params = config.service_client_config()
 
+    def _lazy_client(self, name, factory, **kwargs):
+        """Set the attribute name to a client created on first access
+
+        :param name: the name of the attribute
+        :param factory: the service client class, or the factory from the
+            service clients registry, to call with kwargs
+        """
+        self._client_factories[name] = functools.partial(factory, **kwargs)
+
+    def __getattr__(self, name):
+        # Only called for attributes which are not set yet
+        factory = self.__dict__.get('_client_factories', {}).get(name)
+        if factory is None:
+            raise AttributeError(
+                '%r object has no attribute %r' % (type(self).__name__, name))
+        client = factory()
+        self._share_http_pool(client)
+        # Also drops the factory
+        setattr(self, name, client)
+        return client
+
+    def __setattr__(self, name, value):
+        # A client set explicitly replaces the one which was not created yet
+        self.__dict__.get('_client_factories', {}).pop(name, None)
+        super(Manager, self).__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(super(Manager, self).__dir__()) |
+                      set(self._client_factories))
+
+    def _share_http_pool(self, client):
+        try:
+            key = client.http_pool_key()
+        except AttributeError:
+            # Not a rest client
+            return
+        pool = self._http_pools.get(key)
+        if pool is None:
+            self._http_pools[key] = client.http_obj
+        else:
+            client.http_obj = pool
+
     def _set_network_clients(self):
-        self.network_agents_client = self.network.AgentsClient()
-        self.network_extensions_client = self.network.ExtensionsClient()
-        self.networks_client = self.network.NetworksClient()
-        self.subnetpools_client = self.network.SubnetpoolsClient()
-        self.subnets_client = self.network.SubnetsClient()
-        self.ports_client = self.network.PortsClient()
-        self.network_quotas_client = self.network.QuotasClient()
-        self.floating_ips_client = self.network.FloatingIPsClient()
-        self.floating_ips_port_forwarding_client =\
-            self.network.FloatingIpsPortForwardingClient()
-        self.metering_labels_client = self.network.MeteringLabelsClient()
-        self.metering_label_rules_client = (
-            self.network.MeteringLabelRulesClient())
-        self.routers_client = self.network.RoutersClient()
-        self.security_group_rules_client = (
-            self.network.SecurityGroupRulesClient())
-        self.security_groups_client = self.network.SecurityGroupsClient()
-        self.network_versions_client = self.network.NetworkVersionsClient()
-        self.service_providers_client = self.network.ServiceProvidersClient()
-        self.tags_client = self.network.TagsClient()
-        self.qos_client = self.network.QosClient()
-        self.qos_min_bw_client = self.network.QosMinimumBandwidthRulesClient()
-        self.qos_limit_bw_client = self.network.QosLimitBandwidthRulesClient()
-        self.qos_min_pps_client = (
-            self.network.QosMinimumPacketRateRulesClient())
-        self.segments_client = self.network.SegmentsClient()
-        self.trunks_client = self.network.TrunksClient()
-        self.log_resource_client = self.network.LogResourceClient()
-        self.loggable_resource_client = self.network.LoggableResourceClient()
+        self._lazy_client('network_agents_client', self.network.AgentsClient)
+        self._lazy_client('network_extensions_client',
+                          self.network.ExtensionsClient)
+        self._lazy_client('networks_client', self.network.NetworksClient)
+        self._lazy_client('subnetpools_client', self.network.SubnetpoolsClient)
+        self._lazy_client('subnets_client', self.network.SubnetsClient)
+        self._lazy_client('ports_client', self.network.PortsClient)
+        self._lazy_client('network_quotas_client', self.network.QuotasClient)
+        self._lazy_client('floating_ips_client',
+                          self.network.FloatingIPsClient)
+        self._lazy_client('floating_ips_port_forwarding_client',
+                          self.network.FloatingIpsPortForwardingClient)
+        self._lazy_client('metering_labels_client',
+                          self.network.MeteringLabelsClient)
+        self._lazy_client('metering_label_rules_client',
+                          self.network.MeteringLabelRulesClient)
+        self._lazy_client('routers_client', self.network.RoutersClient)
+        self._lazy_client('security_group_rules_client',
+                          self.network.SecurityGroupRulesClient)
+        self._lazy_client('security_groups_client',
+                          self.network.SecurityGroupsClient)
+        self._lazy_client('network_versions_client',
+                          self.network.NetworkVersionsClient)
+        self._lazy_client('service_providers_client',
+                          self.network.ServiceProvidersClient)
+        self._lazy_client('tags_client', self.network.TagsClient)
+        self._lazy_client('qos_client', self.network.QosClient)
+        self._lazy_client('qos_min_bw_client',
+                          self.network.QosMinimumBandwidthRulesClient)
+        self._lazy_client('qos_limit_bw_client',
+                          self.network.QosLimitBandwidthRulesClient)
+        self._lazy_client('qos_min_pps_client',
+                          self.network.QosMinimumPacketRateRulesClient)
+        self._lazy_client('segments_client', self.network.SegmentsClient)
+        self._lazy_client('trunks_client', self.network.TrunksClient)
+        self._lazy_client('log_resource_client',
+                          self.network.LogResourceClient)
+        self._lazy_client('loggable_resource_client',
+                          self.network.LoggableResourceClient)
 
     def _set_image_clients(self):
         if CONF.service_available.glance:
-            self.image_client = self.image_v1.ImagesClient()
-            self.image_member_client = self.image_v1.ImageMembersClient()
-            self.image_client_v2 = self.image_v2.ImagesClient()
-            self.image_member_client_v2 = self.image_v2.ImageMembersClient()
-            self.image_cache_client = self.image_v2.ImageCacheClient()
-            self.namespaces_client = self.image_v2.NamespacesClient()
-            self.resource_types_client = self.image_v2.ResourceTypesClient()
-            self.namespace_objects_client = \
-                self.image_v2.NamespaceObjectsClient()
-            self.schemas_client = self.image_v2.SchemasClient()
-            self.namespace_properties_client = \
-                self.image_v2.NamespacePropertiesClient()
-            self.namespace_tags_client = self.image_v2.NamespaceTagsClient()
-            self.image_versions_client = self.image_v2.VersionsClient()
+            self._lazy_client('image_client', self.image_v1.ImagesClient)
+            self._lazy_client('image_member_client',
+                              self.image_v1.ImageMembersClient)
+            self._lazy_client('image_client_v2', self.image_v2.ImagesClient)
+            self._lazy_client('image_member_client_v2',
+                              self.image_v2.ImageMembersClient)
+            self._lazy_client('image_cache_client',
+                              self.image_v2.ImageCacheClient)
+            self._lazy_client('namespaces_client',
+                              self.image_v2.NamespacesClient)
+            self._lazy_client('resource_types_client',
+                              self.image_v2.ResourceTypesClient)
+            self._lazy_client('namespace_objects_client',
+                              self.image_v2.NamespaceObjectsClient)
+            self._lazy_client('schemas_client', self.image_v2.SchemasClient)
+            self._lazy_client('namespace_properties_client',
+                              self.image_v2.NamespacePropertiesClient)
+            self._lazy_client('namespace_tags_client',
+                              self.image_v2.NamespaceTagsClient)
+            self._lazy_client('image_versions_client',
+                              self.image_v2.VersionsClient)
             # NOTE(danms): If no alternate endpoint is configured,
             # this client will work the same as the base self.images_client.
             # If your test needs to know if these are different, check the
             # config option to see if the alternate_image_endpoint is set.
-            self.image_client_remote = self.image_v2.ImagesClient(
-                service=CONF.image.alternate_image_endpoint,
-                endpoint_type=CONF.image.alternate_image_endpoint_type,
-                region=CONF.image.region)
+            self._lazy_client('image_client_remote',
+                              self.image_v2.ImagesClient,
+                              service=CONF.image.alternate_image_endpoint,
+                              endpoint_type=(
+                                  CONF.image.alternate_image_endpoint_type),
+                              region=CONF.image.region)
 
     def _set_compute_clients(self):
-        self.agents_client = self.compute.AgentsClient()
-        self.compute_networks_client = self.compute.NetworksClient()
-        self.migrations_client = self.compute.MigrationsClient()
-        self.security_group_default_rules_client = (
-            self.compute.SecurityGroupDefaultRulesClient())
-        self.certificates_client = self.compute.CertificatesClient()
+        self._lazy_client('agents_client', self.compute.AgentsClient)
+        self._lazy_client('compute_networks_client',
+                          self.compute.NetworksClient)
+        self._lazy_client('migrations_client', self.compute.MigrationsClient)
+        self._lazy_client('security_group_default_rules_client',
+                          self.compute.SecurityGroupDefaultRulesClient)
+        self._lazy_client('certificates_client',
+                          self.compute.CertificatesClient)
         eip = CONF.compute_feature_enabled.enable_instance_password
-        self.servers_client = self.compute.ServersClient(
-            enable_instance_password=eip)
-        self.server_groups_client = self.compute.ServerGroupsClient()
-        self.limits_client = self.compute.LimitsClient()
-        self.compute_images_client = self.compute.ImagesClient()
-        self.keypairs_client = self.compute.KeyPairsClient(
-            ssh_key_type=CONF.validation.ssh_key_type)
-        self.quotas_client = self.compute.QuotasClient()
-        self.quota_classes_client = self.compute.QuotaClassesClient()
-        self.flavors_client = self.compute.FlavorsClient()
-        self.extensions_client = self.compute.ExtensionsClient()
-        self.floating_ip_pools_client = self.compute.FloatingIPPoolsClient()
-        self.floating_ips_bulk_client = self.compute.FloatingIPsBulkClient()
-        self.compute_floating_ips_client = self.compute.FloatingIPsClient()
-        self.compute_security_group_rules_client = (
-            self.compute.SecurityGroupRulesClient())
-        self.compute_security_groups_client = (
-            self.compute.SecurityGroupsClient())
-        self.interfaces_client = self.compute.InterfacesClient()
-        self.fixed_ips_client = self.compute.FixedIPsClient()
-        self.availability_zone_client = self.compute.AvailabilityZoneClient()
-        self.aggregates_client = self.compute.AggregatesClient()
-        self.services_client = self.compute.ServicesClient()
-        self.tenant_usages_client = self.compute.TenantUsagesClient()
-        self.hosts_client = self.compute.HostsClient()
-        self.hypervisor_client = self.compute.HypervisorClient()
-        self.instance_usages_audit_log_client = (
-            self.compute.InstanceUsagesAuditLogClient())
-        self.tenant_networks_client = self.compute.TenantNetworksClient()
-        self.assisted_volume_snapshots_client = (
-            self.compute.AssistedVolumeSnapshotsClient())
+        self._lazy_client('servers_client', self.compute.ServersClient,
+                          enable_instance_password=eip)
+        self._lazy_client('server_groups_client',
+                          self.compute.ServerGroupsClient)
+        self._lazy_client('limits_client', self.compute.LimitsClient)
+        self._lazy_client('compute_images_client', self.compute.ImagesClient)
+        self._lazy_client('keypairs_client', self.compute.KeyPairsClient,
+                          ssh_key_type=CONF.validation.ssh_key_type)
+        self._lazy_client('quotas_client', self.compute.QuotasClient)
+        self._lazy_client('quota_classes_client',
+                          self.compute.QuotaClassesClient)
+        self._lazy_client('flavors_client', self.compute.FlavorsClient)
+        self._lazy_client('extensions_client', self.compute.ExtensionsClient)
+        self._lazy_client('floating_ip_pools_client',
+                          self.compute.FloatingIPPoolsClient)
+        self._lazy_client('floating_ips_bulk_client',
+                          self.compute.FloatingIPsBulkClient)
+        self._lazy_client('compute_floating_ips_client',
+                          self.compute.FloatingIPsClient)
+        self._lazy_client('compute_security_group_rules_client',
+                          self.compute.SecurityGroupRulesClient)
+        self._lazy_client('compute_security_groups_client',
+                          self.compute.SecurityGroupsClient)
+        self._lazy_client('interfaces_client', self.compute.InterfacesClient)
+        self._lazy_client('fixed_ips_client', self.compute.FixedIPsClient)
+        self._lazy_client('availability_zone_client',
+                          self.compute.AvailabilityZoneClient)
+        self._lazy_client('aggregates_client', self.compute.AggregatesClient)
+        self._lazy_client('services_client', self.compute.ServicesClient)
+        self._lazy_client('tenant_usages_client',
+                          self.compute.TenantUsagesClient)
+        self._lazy_client('hosts_client', self.compute.HostsClient)
+        self._lazy_client('hypervisor_client', self.compute.HypervisorClient)
+        self._lazy_client('instance_usages_audit_log_client',
+                          self.compute.InstanceUsagesAuditLogClient)
+        self._lazy_client('tenant_networks_client',
+                          self.compute.TenantNetworksClient)
+        self._lazy_client('assisted_volume_snapshots_client',
+                          self.compute.AssistedVolumeSnapshotsClient)
 
         # NOTE: The following client needs special timeout values because
         # the API is a proxy for the other component.
@@ -152,195 +233,233 @@ class Manager(clients.ServiceClients):
             'build_interval': CONF.volume.build_interval,
             'build_timeout': CONF.volume.build_timeout
         }
-        self.volumes_extensions_client = self.compute.VolumesClient(
-            **params_volume)
-        self.compute_versions_client = self.compute.VersionsClient(
-            **params_volume)
-        self.snapshots_extensions_client = self.compute.SnapshotsClient(
-            **params_volume)
+        self._lazy_client('volumes_extensions_client',
+                          self.compute.VolumesClient, **params_volume)
+        self._lazy_client('compute_versions_client',
+                          self.compute.VersionsClient, **params_volume)
+        self._lazy_client('snapshots_extensions_client',
+                          self.compute.SnapshotsClient, **params_volume)
 
     def _set_placement_clients(self):
-        self.placement_client = self.placement.PlacementClient()
-        self.resource_providers_client = \
-            self.placement.ResourceProvidersClient()
+        self._lazy_client('placement_client', self.placement.PlacementClient)
+        self._lazy_client('resource_providers_client',
+                          self.placement.ResourceProvidersClient)
 
     def _set_identity_clients(self):
         # Clients below use the admin endpoint type of Keystone API v2
         params_v2_admin = {
             'endpoint_type': CONF.identity.v2_admin_endpoint_type}
-        self.endpoints_client = self.identity_v2.EndpointsClient(
-            **params_v2_admin)
-        self.identity_client = self.identity_v2.IdentityClient(
-            **params_v2_admin)
-        self.tenants_client = self.identity_v2.TenantsClient(
-            **params_v2_admin)
-        self.roles_client = self.identity_v2.RolesClient(**params_v2_admin)
-        self.users_client = self.identity_v2.UsersClient(**params_v2_admin)
-        self.identity_services_client = self.identity_v2.ServicesClient(
-            **params_v2_admin)
+        self._lazy_client('endpoints_client', self.identity_v2.EndpointsClient,
+                          **params_v2_admin)
+        self._lazy_client('identity_client', self.identity_v2.IdentityClient,
+                          **params_v2_admin)
+        self._lazy_client('tenants_client', self.identity_v2.TenantsClient,
+                          **params_v2_admin)
+        self._lazy_client('roles_client', self.identity_v2.RolesClient,
+                          **params_v2_admin)
+        self._lazy_client('users_client', self.identity_v2.UsersClient,
+                          **params_v2_admin)
+        self._lazy_client('identity_services_client',
+                          self.identity_v2.ServicesClient, **params_v2_admin)
 
         # Clients below use the public endpoint type of Keystone API v2
         params_v2_public = {
             'endpoint_type': CONF.identity.v2_public_endpoint_type}
-        self.identity_public_client = self.identity_v2.IdentityClient(
-            **params_v2_public)
-        self.tenants_public_client = self.identity_v2.TenantsClient(
-            **params_v2_public)
-        self.users_public_client = self.identity_v2.UsersClient(
-            **params_v2_public)
+        self._lazy_client('identity_public_client',
+                          self.identity_v2.IdentityClient, **params_v2_public)
+        self._lazy_client('tenants_public_client',
+                          self.identity_v2.TenantsClient, **params_v2_public)
+        self._lazy_client('users_public_client', self.identity_v2.UsersClient,
+                          **params_v2_public)
 
         # Clients below use the endpoint type of Keystone API v3, which is set
         # in endpoint_type
         params_v3 = {'endpoint_type': CONF.identity.v3_endpoint_type}
-        self.domains_client = self.identity_v3.DomainsClient(**params_v3)
-        self.identity_v3_client = self.identity_v3.IdentityClient(**params_v3)
-        self.trusts_client = self.identity_v3.TrustsClient(**params_v3)
-        self.users_v3_client = self.identity_v3.UsersClient(**params_v3)
-        self.endpoints_v3_client = self.identity_v3.EndPointsClient(
-            **params_v3)
-        self.roles_v3_client = self.identity_v3.RolesClient(**params_v3)
-        self.inherited_roles_client = self.identity_v3.InheritedRolesClient(
-            **params_v3)
-        self.role_assignments_client = self.identity_v3.RoleAssignmentsClient(
-            **params_v3)
-        self.identity_services_v3_client = self.identity_v3.ServicesClient(
-            **params_v3)
-        self.policies_client = self.identity_v3.PoliciesClient(**params_v3)
-        self.projects_client = self.identity_v3.ProjectsClient(**params_v3)
-        self.regions_client = self.identity_v3.RegionsClient(**params_v3)
-        self.credentials_client = self.identity_v3.CredentialsClient(
-            **params_v3)
-        self.groups_client = self.identity_v3.GroupsClient(**params_v3)
-        self.identity_versions_v3_client = self.identity_v3.VersionsClient(
-            **params_v3)
-        self.oauth_consumers_client = self.identity_v3.OAUTHConsumerClient(
-            **params_v3)
-        self.oauth_token_client = self.identity_v3.OAUTHTokenClient(
-            **params_v3)
-        self.domain_config_client = self.identity_v3.DomainConfigurationClient(
-            **params_v3)
-        self.endpoint_filter_client = \
-            self.identity_v3.EndPointsFilterClient(**params_v3)
-        self.endpoint_groups_client = self.identity_v3.EndPointGroupsClient(
-            **params_v3)
-        self.catalog_client = self.identity_v3.CatalogClient(**params_v3)
-        self.project_tags_client = self.identity_v3.ProjectTagsClient(
-            **params_v3)
-        self.application_credentials_client = \
-            self.identity_v3.ApplicationCredentialsClient(**params_v3)
-        self.access_rules_client = \
-            self.identity_v3.AccessRulesClient(**params_v3)
-        self.identity_limits_client = \
-            self.identity_v3.LimitsClient(**params_v3)
+        self._lazy_client('domains_client', self.identity_v3.DomainsClient,
+                          **params_v3)
+        self._lazy_client('identity_v3_client',
+                          self.identity_v3.IdentityClient, **params_v3)
+        self._lazy_client('trusts_client', self.identity_v3.TrustsClient,
+                          **params_v3)
+        self._lazy_client('users_v3_client', self.identity_v3.UsersClient,
+                          **params_v3)
+        self._lazy_client('endpoints_v3_client',
+                          self.identity_v3.EndPointsClient, **params_v3)
+        self._lazy_client('roles_v3_client', self.identity_v3.RolesClient,
+                          **params_v3)
+        self._lazy_client('inherited_roles_client',
+                          self.identity_v3.InheritedRolesClient, **params_v3)
+        self._lazy_client('role_assignments_client',
+                          self.identity_v3.RoleAssignmentsClient, **params_v3)
+        self._lazy_client('identity_services_v3_client',
+                          self.identity_v3.ServicesClient, **params_v3)
+        self._lazy_client('policies_client', self.identity_v3.PoliciesClient,
+                          **params_v3)
+        self._lazy_client('projects_client', self.identity_v3.ProjectsClient,
+                          **params_v3)
+        self._lazy_client('regions_client', self.identity_v3.RegionsClient,
+                          **params_v3)
+        self._lazy_client('credentials_client',
+                          self.identity_v3.CredentialsClient, **params_v3)
+        self._lazy_client('groups_client', self.identity_v3.GroupsClient,
+                          **params_v3)
+        self._lazy_client('identity_versions_v3_client',
+                          self.identity_v3.VersionsClient, **params_v3)
+        self._lazy_client('oauth_consumers_client',
+                          self.identity_v3.OAUTHConsumerClient, **params_v3)
+        self._lazy_client('oauth_token_client',
+                          self.identity_v3.OAUTHTokenClient, **params_v3)
+        self._lazy_client('domain_config_client',
+                          self.identity_v3.DomainConfigurationClient,
+                          **params_v3)
+        self._lazy_client('endpoint_filter_client',
+                          self.identity_v3.EndPointsFilterClient, **params_v3)
+        self._lazy_client('endpoint_groups_client',
+                          self.identity_v3.EndPointGroupsClient, **params_v3)
+        self._lazy_client('catalog_client', self.identity_v3.CatalogClient,
+                          **params_v3)
+        self._lazy_client('project_tags_client',
+                          self.identity_v3.ProjectTagsClient, **params_v3)
+        self._lazy_client('application_credentials_client',
+                          self.identity_v3.ApplicationCredentialsClient,
+                          **params_v3)
+        self._lazy_client('access_rules_client',
+                          self.identity_v3.AccessRulesClient, **params_v3)
+        self._lazy_client('identity_limits_client',
+                          self.identity_v3.LimitsClient, **params_v3)
 
         # Token clients do not use the catalog. They only need default_params.
         # They read auth_url, so they should only be set if the corresponding
         # API version is marked as enabled
         if CONF.identity_feature_enabled.api_v2:
             if CONF.identity.uri:
-                self.token_client = self.identity_v2.TokenClient(
-                    auth_url=CONF.identity.uri)
+                self._lazy_client('token_client', self.identity_v2.TokenClient,
+                                  auth_url=CONF.identity.uri)
             else:
                 msg = 'Identity v2 API enabled, but no identity.uri set'
                 raise lib_exc.InvalidConfiguration(msg)
         if CONF.identity_feature_enabled.api_v3:
             if CONF.identity.uri_v3:
-                self.token_v3_client = self.identity_v3.V3TokenClient(
-                    auth_url=CONF.identity.uri_v3)
+                self._lazy_client('token_v3_client',
+                                  self.identity_v3.V3TokenClient,
+                                  auth_url=CONF.identity.uri_v3)
             else:
                 msg = 'Identity v3 API enabled, but no identity.uri_v3 set'
                 raise lib_exc.InvalidConfiguration(msg)
 
     def _set_volume_clients(self):
 
-        self.backups_client_latest = self.volume_v3.BackupsClient()
-        self.encryption_types_client_latest = \
-            self.volume_v3.EncryptionTypesClient()
-        self.snapshot_manage_client_latest = \
-            self.volume_v3.SnapshotManageClient()
-        self.snapshots_client_latest = self.volume_v3.SnapshotsClient()
-        self.volume_capabilities_client_latest = \
-            self.volume_v3.CapabilitiesClient()
-        self.volume_manage_client_latest = (
-            self.volume_v3.VolumeManageClient())
-        self.volume_qos_client_latest = self.volume_v3.QosSpecsClient()
-        self.volume_services_client_latest = (
-            self.volume_v3.ServicesClient())
-        self.volume_types_client_latest = self.volume_v3.TypesClient()
-        self.volume_hosts_client_latest = self.volume_v3.HostsClient()
-        self.volume_quotas_client_latest = self.volume_v3.QuotasClient()
-        self.volume_quota_classes_client_latest = \
-            self.volume_v3.QuotaClassesClient()
-        self.volume_scheduler_stats_client_latest = \
-            self.volume_v3.SchedulerStatsClient()
-        self.volume_transfers_client_latest = \
-            self.volume_v3.TransfersClient()
-        self.volume_transfers_mv355_client_latest = \
-            self.volume_v3.TransfersV355Client()
-        self.volume_availability_zone_client_latest = \
-            self.volume_v3.AvailabilityZoneClient()
-        self.volume_limits_client_latest = self.volume_v3.LimitsClient()
-        self.volumes_client_latest = self.volume_v3.VolumesClient()
-        self.volumes_extension_client_latest = \
-            self.volume_v3.ExtensionsClient()
-        self.group_types_client_latest = self.volume_v3.GroupTypesClient()
-        self.groups_client_latest = self.volume_v3.GroupsClient()
-        self.group_snapshots_client_latest = \
-            self.volume_v3.GroupSnapshotsClient()
-        self.volume_messages_client_latest = (
-            self.volume_v3.MessagesClient())
-        self.volume_versions_client_latest = (
-            self.volume_v3.VersionsClient())
-        self.attachments_client_latest = (
-            self.volume_v3.AttachmentsClient())
+        self._lazy_client('backups_client_latest',
+                          self.volume_v3.BackupsClient)
+        self._lazy_client('encryption_types_client_latest',
+                          self.volume_v3.EncryptionTypesClient)
+        self._lazy_client('snapshot_manage_client_latest',
+                          self.volume_v3.SnapshotManageClient)
+        self._lazy_client('snapshots_client_latest',
+                          self.volume_v3.SnapshotsClient)
+        self._lazy_client('volume_capabilities_client_latest',
+                          self.volume_v3.CapabilitiesClient)
+        self._lazy_client('volume_manage_client_latest',
+                          self.volume_v3.VolumeManageClient)
+        self._lazy_client('volume_qos_client_latest',
+                          self.volume_v3.QosSpecsClient)
+        self._lazy_client('volume_services_client_latest',
+                          self.volume_v3.ServicesClient)
+        self._lazy_client('volume_types_client_latest',
+                          self.volume_v3.TypesClient)
+        self._lazy_client('volume_hosts_client_latest',
+                          self.volume_v3.HostsClient)
+        self._lazy_client('volume_quotas_client_latest',
+                          self.volume_v3.QuotasClient)
+        self._lazy_client('volume_quota_classes_client_latest',
+                          self.volume_v3.QuotaClassesClient)
+        self._lazy_client('volume_scheduler_stats_client_latest',
+                          self.volume_v3.SchedulerStatsClient)
+        self._lazy_client('volume_transfers_client_latest',
+                          self.volume_v3.TransfersClient)
+        self._lazy_client('volume_transfers_mv355_client_latest',
+                          self.volume_v3.TransfersV355Client)
+        self._lazy_client('volume_availability_zone_client_latest',
+                          self.volume_v3.AvailabilityZoneClient)
+        self._lazy_client('volume_limits_client_latest',
+                          self.volume_v3.LimitsClient)
+        self._lazy_client('volumes_client_latest',
+                          self.volume_v3.VolumesClient)
+        self._lazy_client('volumes_extension_client_latest',
+                          self.volume_v3.ExtensionsClient)
+        self._lazy_client('group_types_client_latest',
+                          self.volume_v3.GroupTypesClient)
+        self._lazy_client('groups_client_latest', self.volume_v3.GroupsClient)
+        self._lazy_client('group_snapshots_client_latest',
+                          self.volume_v3.GroupSnapshotsClient)
+        self._lazy_client('volume_messages_client_latest',
+                          self.volume_v3.MessagesClient)
+        self._lazy_client('volume_versions_client_latest',
+                          self.volume_v3.VersionsClient)
+        self._lazy_client('attachments_client_latest',
+                          self.volume_v3.AttachmentsClient)
 
         # TODO(gmann): Below alias for service clients have been
         # deprecated and will be removed in future. Start using the alias
         # defined above with suffix _latest.
         # ****************Deprecated alias start from here***************
-        self.backups_v2_client = self.volume_v3.BackupsClient()
-        self.encryption_types_v2_client = \
-            self.volume_v3.EncryptionTypesClient()
-        self.snapshot_manage_v2_client = \
-            self.volume_v3.SnapshotManageClient()
-        self.snapshots_v2_client = self.volume_v3.SnapshotsClient()
-        self.volume_capabilities_v2_client = \
-            self.volume_v3.CapabilitiesClient()
-        self.volume_manage_v2_client = self.volume_v3.VolumeManageClient()
-        self.volume_qos_v2_client = self.volume_v3.QosSpecsClient()
-        self.volume_services_v2_client = self.volume_v3.ServicesClient()
-        self.volume_types_v2_client = self.volume_v3.TypesClient()
-        self.volume_hosts_v2_client = self.volume_v3.HostsClient()
-        self.volume_quotas_v2_client = self.volume_v3.QuotasClient()
-        self.volume_quota_classes_v2_client = \
-            self.volume_v3.QuotaClassesClient()
-        self.volume_scheduler_stats_v2_client = \
-            self.volume_v3.SchedulerStatsClient()
-        self.volume_transfers_v2_client = self.volume_v3.TransfersClient()
-        self.volume_v2_availability_zone_client = \
-            self.volume_v3.AvailabilityZoneClient()
-        self.volume_v2_limits_client = self.volume_v3.LimitsClient()
-        self.volumes_v2_client = self.volume_v3.VolumesClient()
-        self.volumes_v2_extension_client = \
-            self.volume_v3.ExtensionsClient()
-
-        self.backups_v3_client = self.volume_v3.BackupsClient()
-        self.group_types_v3_client = self.volume_v3.GroupTypesClient()
-        self.groups_v3_client = self.volume_v3.GroupsClient()
-        self.group_snapshots_v3_client = \
-            self.volume_v3.GroupSnapshotsClient()
-        self.snapshots_v3_client = self.volume_v3.SnapshotsClient()
-        self.volume_v3_messages_client = self.volume_v3.MessagesClient()
-        self.volume_v3_versions_client = self.volume_v3.VersionsClient()
-        self.volumes_v3_client = self.volume_v3.VolumesClient()
+        self._lazy_client('backups_v2_client', self.volume_v3.BackupsClient)
+        self._lazy_client('encryption_types_v2_client',
+                          self.volume_v3.EncryptionTypesClient)
+        self._lazy_client('snapshot_manage_v2_client',
+                          self.volume_v3.SnapshotManageClient)
+        self._lazy_client('snapshots_v2_client',
+                          self.volume_v3.SnapshotsClient)
+        self._lazy_client('volume_capabilities_v2_client',
+                          self.volume_v3.CapabilitiesClient)
+        self._lazy_client('volume_manage_v2_client',
+                          self.volume_v3.VolumeManageClient)
+        self._lazy_client('volume_qos_v2_client',
+                          self.volume_v3.QosSpecsClient)
+        self._lazy_client('volume_services_v2_client',
+                          self.volume_v3.ServicesClient)
+        self._lazy_client('volume_types_v2_client', self.volume_v3.TypesClient)
+        self._lazy_client('volume_hosts_v2_client', self.volume_v3.HostsClient)
+        self._lazy_client('volume_quotas_v2_client',
+                          self.volume_v3.QuotasClient)
+        self._lazy_client('volume_quota_classes_v2_client',
+                          self.volume_v3.QuotaClassesClient)
+        self._lazy_client('volume_scheduler_stats_v2_client',
+                          self.volume_v3.SchedulerStatsClient)
+        self._lazy_client('volume_transfers_v2_client',
+                          self.volume_v3.TransfersClient)
+        self._lazy_client('volume_v2_availability_zone_client',
+                          self.volume_v3.AvailabilityZoneClient)
+        self._lazy_client('volume_v2_limits_client',
+                          self.volume_v3.LimitsClient)
+        self._lazy_client('volumes_v2_client', self.volume_v3.VolumesClient)
+        self._lazy_client('volumes_v2_extension_client',
+                          self.volume_v3.ExtensionsClient)
+
+        self._lazy_client('backups_v3_client', self.volume_v3.BackupsClient)
+        self._lazy_client('group_types_v3_client',
+                          self.volume_v3.GroupTypesClient)
+        self._lazy_client('groups_v3_client', self.volume_v3.GroupsClient)
+        self._lazy_client('group_snapshots_v3_client',
+                          self.volume_v3.GroupSnapshotsClient)
+        self._lazy_client('snapshots_v3_client',
+                          self.volume_v3.SnapshotsClient)
+        self._lazy_client('volume_v3_messages_client',
+                          self.volume_v3.MessagesClient)
+        self._lazy_client('volume_v3_versions_client',
+                          self.volume_v3.VersionsClient)
+        self._lazy_client('volumes_v3_client', self.volume_v3.VolumesClient)
         # ****************Deprecated alias end here***********************
 
     def _set_object_storage_clients(self):
-        self.account_client = self.object_storage.AccountClient()
-        self.bulk_client = self.object_storage.BulkMiddlewareClient()
-        self.capabilities_client = self.object_storage.CapabilitiesClient()
-        self.container_client = self.object_storage.ContainerClient()
-        self.object_client = self.object_storage.ObjectClient()
+        self._lazy_client('account_client', self.object_storage.AccountClient)
+        self._lazy_client('bulk_client',
+                          self.object_storage.BulkMiddlewareClient)
+        self._lazy_client('capabilities_client',
+                          self.object_storage.CapabilitiesClient)
+        self._lazy_client('container_client',
+                          self.object_storage.ContainerClient)
+        self._lazy_client('object_client', self.object_storage.ObjectClient)
 
 
 def get_auth_provider_class(credentials):
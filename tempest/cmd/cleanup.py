@@ -45,7 +45,8 @@ Runtime Arguments
 * ``--init-saved-state``: Initializes the saved state of the OpenStack
   deployment and will output a ``saved_state.json`` file containing resources
   from your deployment that will be preserved from the cleanup command. This
-  should be done prior to running Tempest tests.
+  should be done prior to running Tempest tests. The file is in the JSON
+  Lines format, with one ``{"type", "id", "value"}`` record per resource.
 
 * ``--delete-tempest-conf-objects``: If option is present, then the command
   will delete the admin project in addition to the resources associated with
@@ -60,6 +61,21 @@ Runtime Arguments
   parameters), running it again with ``--dry-run`` should yield an empty
   report.
 
+* ``--workers``: Number of concurrent deletion requests, 4 by default.
+  Resources are deleted in dependency order, e.g. servers, then ports, then
+  router interfaces and routers, then subnets, then networks, and resources
+  which do not depend on each other are deleted concurrently. The number of
+  resources deleted per second is logged for each resource type.
+
+* ``--global-inventory``: List each type of resource once for all the
+  projects, with admin wide listings including the resources of all the
+  projects, and serve all the services from that inventory. Both the saved
+  state and the cleanup must be done with this option, as the saved state
+  has to include the resources of all the projects. The compute requests
+  use microversion 2.13, the first one listing the project of the server
+  groups. Keypairs belong to users rather than projects, they are still
+  listed for each project.
+
 * ``--help``: Print the help text for the command and parameters.
 
 .. [1] The ``_projects_to_clean`` dictionary in ``dry_run.json`` lists the
@@ -80,6 +96,8 @@ Runtime Arguments
     complicated logic.
 
 """
+from concurrent import futures
+import itertools
 import sys
 import traceback
 
@@ -88,18 +106,84 @@ from oslo_log import log as logging
 from oslo_serialization import jsonutils as json
 
 from tempest import clients
+from tempest.cmd import cleanup_engine
 from tempest.cmd import cleanup_service
 from tempest.common import credentials_factory as credentials
 from tempest.common import identity
 from tempest import config
 from tempest.lib import exceptions
+from tempest.lib.services.compute import base_compute_client
 
 SAVED_STATE_JSON = "saved_state.json"
 DRY_RUN_JSON = "dry_run.json"
+# Set in the saved state initialized with the global inventory
+GLOBAL_INVENTORY_KEY = "_global_inventory"
 LOG = logging.getLogger(__name__)
 CONF = config.CONF
 
 
+def _write_saved_state(path, data):
+    """Write the saved state as JSON Lines, one resource per line
+
+    Each resource is written as a ``{"type", "id", "value"}`` record as soon
+    as it is serialized. A type without resources is written as a
+    ``{"type"}`` record and a value which is not a dictionary of resources,
+    e.g. the global inventory flag, as a ``{"type", "value"}`` record.
+    """
+    with open(path, 'w+') as f:
+        for resource_type in sorted(data):
+            value = data[resource_type]
+            if not isinstance(value, dict):
+                records = [{'type': resource_type, 'value': value}]
+            elif not value:
+                records = [{'type': resource_type}]
+            else:
+                records = ({'type': resource_type, 'id': k, 'value': value[k]}
+                           for k in sorted(value))
+            for record in records:
+                f.write(json.dumps(record, sort_keys=True))
+                f.write('\n')
+
+
+def _read_saved_state(path):
+    """Read a saved state written by `_write_saved_state`
+
+    The file is parsed one record at a time, only the resulting dictionary
+    of the saved resources is held in memory, not the document. Saved states
+    written by previous versions are a single JSON object, they are loaded
+    with one parse of the whole file.
+    """
+    with open(path) as f:
+        first_line = f.readline()
+        if _is_saved_state_record(first_line):
+            data = {}
+            for line in itertools.chain((first_line,), f):
+                if line.strip():
+                    _add_saved_state_record(data, json.loads(line))
+            return data
+    with open(path, 'rb') as f:
+        return json.load(f)
+
+
+def _is_saved_state_record(line):
+    try:
+        record = json.loads(line)
+    except ValueError:
+        # e.g. the opening brace of a saved state of a previous version
+        return False
+    return isinstance(record, dict) and 'type' in record
+
+
+def _add_saved_state_record(data, record):
+    resource_type = record['type']
+    if 'id' in record:
+        data.setdefault(resource_type, {})[record['id']] = record['value']
+    elif 'value' in record:
+        data[resource_type] = record['value']
+    else:
+        data.setdefault(resource_type, {})
+
+
 class TempestCleanup(command.Command):
 
     GOT_EXCEPTIONS = []
@@ -139,6 +223,12 @@ class TempestCleanup(command.Command):
             credentials.get_configured_admin_credentials())
         self.dry_run_data = {}
         self.json_data = {}
+        self.inventory = None
+        if parsed_args.global_inventory:
+            self.inventory = cleanup_service.Inventory()
+            # Set before any service runs, the microversion is process wide
+            base_compute_client.COMPUTE_MICROVERSION = (
+                cleanup_service.INVENTORY_COMPUTE_MICROVERSION)
 
         self.admin_id = ""
         self.admin_role_id = ""
@@ -157,6 +247,12 @@ class TempestCleanup(command.Command):
             return
 
         self._load_json()
+        if self.inventory and not self.json_data.get(GLOBAL_INVENTORY_KEY):
+            msg = ("The saved state was not initialized with "
+                   "--global-inventory, it does not include the resources "
+                   "of all the projects")
+            LOG.error(msg)
+            sys.exit(msg)
 
     def _cleanup(self):
         LOG.info("Begin cleanup")
@@ -174,30 +270,45 @@ class TempestCleanup(command.Command):
                   'is_dry_run': is_dry_run,
                   'saved_state_json': self.json_data,
                   'is_preserve': False,
-                  'is_save_state': is_save_state}
+                  'is_save_state': is_save_state,
+                  'inventory': self.inventory}
         project_service = cleanup_service.ProjectService(admin_mgr, **kwargs)
         projects = project_service.list()
         LOG.info("Processing %s projects", len(projects))
 
-        # Loop through list of projects and clean them up.
-        for project in projects:
-            self._clean_project(project)
+        # Clean up the projects concurrently, the project associated
+        # services only reset quotas
+        with futures.ThreadPoolExecutor(
+                max_workers=self.options.workers) as pool:
+            list(pool.map(self._clean_project, projects))
 
         kwargs = {'data': self.dry_run_data,
                   'is_dry_run': is_dry_run,
                   'saved_state_json': self.json_data,
                   'is_preserve': is_preserve,
                   'is_save_state': is_save_state,
-                  'got_exceptions': self.GOT_EXCEPTIONS}
+                  'got_exceptions': self.GOT_EXCEPTIONS,
+                  'inventory': self.inventory}
         LOG.info("Processing global services")
         for service in self.global_services:
             svc = service(admin_mgr, **kwargs)
             svc.run()
 
         LOG.info("Processing services")
-        for service in self.resource_cleanup_services:
-            svc = service(self.admin_mgr, **kwargs)
-            svc.run()
+        services = [service(self.admin_mgr, **kwargs)
+                    for service in self.resource_cleanup_services]
+        if is_dry_run:
+            for svc in services:
+                svc.run()
+        else:
+            engine = cleanup_engine.CleanupEngine(
+                services, workers=self.options.workers)
+            engine.run()
+            engine.log_stats()
+
+        if self.inventory:
+            LOG.info("Listed %s resource types for the inventory",
+                     self.inventory.list_calls)
 
         if is_dry_run:
             with open(DRY_RUN_JSON, 'w+') as f:
@@ -222,7 +333,8 @@ class TempestCleanup(command.Command):
                   'is_preserve': is_preserve,
                   'is_save_state': False,
                   'project_id': project_id,
-                  'got_exceptions': self.GOT_EXCEPTIONS}
+                  'got_exceptions': self.GOT_EXCEPTIONS,
+                  'inventory': self.inventory}
         for service in self.project_associated_services:
             svc = service(self.admin_mgr, **kwargs)
             svc.run()
@@ -269,6 +381,15 @@ class TempestCleanup(command.Command):
                             help="Generate JSON file:" + DRY_RUN_JSON +
                             ", that reports the objects that would have "
                             "been deleted had a full cleanup been run.")
+        parser.add_argument('--global-inventory', action="store_true",
+                            dest='global_inventory', default=False,
+                            help="List each type of resource once for all "
+                            "the projects. The saved state must be "
+                            "initialized with this option too.")
+        parser.add_argument('--workers', type=int, default=4,
+                            dest='workers',
+                            help="Number of concurrent deletion requests, "
+                            "resources are deleted in dependency order.")
         return parser
 
     def get_description(self):
@@ -283,7 +404,8 @@ class TempestCleanup(command.Command):
                   'saved_state_json': data,
                   'is_preserve': False,
                   'is_save_state': True,
-                  'got_exceptions': self.GOT_EXCEPTIONS}
+                  'got_exceptions': self.GOT_EXCEPTIONS,
+                  'inventory': self.inventory}
         for service in self.global_services:
             svc = service(admin_mgr, **kwargs)
             svc.run()
@@ -296,14 +418,13 @@ class TempestCleanup(command.Command):
             svc = service(admin_mgr, **kwargs)
             svc.run()
 
-        with open(SAVED_STATE_JSON, 'w+') as f:
-            f.write(json.dumps(data, sort_keys=True,
-                               indent=2, separators=(',', ': ')))
+        if self.inventory:
+            data[GLOBAL_INVENTORY_KEY] = True
+        _write_saved_state(SAVED_STATE_JSON, data)
 
     def _load_json(self, saved_state_json=SAVED_STATE_JSON):
         try:
-            with open(saved_state_json, 'rb') as json_file:
-                self.json_data = json.load(json_file)
+            self.json_data = _read_saved_state(saved_state_json)
 
         except IOError as ex:
             LOG.exception("Failed loading saved state, please be sure you"
@@ -0,0 +1,190 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from concurrent import futures
+import threading
+import time
+
+from oslo_log import log as logging
+
+from tempest.lib.common import poller
+from tempest.lib import exceptions
+
+LOG = logging.getLogger('tempest.cmd.cleanup')
+
+
+class CleanupEngine(object):
+    """Delete the resources of cleanup services in dependency order
+
+    Each service declares in its ``depends_on`` attribute the services whose
+    resources must be gone before its own resources can be deleted, e.g.
+    ports are deleted once the servers are gone and networks once their
+    subnets and ports are gone. Services which do not depend on each other
+    run at the same time, and the resources of all the services are deleted
+    concurrently by a pool of at most `workers` threads.
+
+    The deletion of the resources of services with ``async_delete`` set,
+    like servers, is waited for before running the services depending on
+    them. All the resources of a service are waited for together, listing
+    the resources of the service once per poll rather than showing each
+    resource.
+
+    :param services: the cleanup service instances to run. Dependencies on
+        services which are not part of the list are ignored.
+    :param workers: maximum number of concurrent deletion requests
+    :param wait_timeout: seconds to wait for the deletions of a service,
+        defaults to the build timeout of the service client
+    :param wait_interval: seconds between polls while waiting for deletions,
+        defaults to the build interval of the service client
+    """
+
+    def __init__(self, services, workers=1, wait_timeout=None,
+                 wait_interval=None):
+        if workers < 1:
+            raise ValueError('workers must be at least 1, got %s' % workers)
+        self.services = list(services)
+        self.workers = workers
+        self.wait_timeout = wait_timeout
+        self.wait_interval = wait_interval
+        self._dependencies = self._resolve_dependencies(self.services)
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+
+    @staticmethod
+    def _resolve_dependencies(services):
+        by_name = dict((type(service).__name__, service)
+                       for service in services)
+        dependencies = {}
+        for service in services:
+            dependencies[service] = [by_name[name]
+                                     for name in service.depends_on
+                                     if name in by_name]
+        # A cycle would leave the services in it waiting for each other
+        ordered = set()
+        pending = list(services)
+        while pending:
+            ready = [service for service in pending
+                     if all(dep in ordered for dep in dependencies[service])]
+            if not ready:
+                raise ValueError(
+                    'Cleanup services depend on each other: %s' % ', '.join(
+                        sorted(type(service).__name__
+                               for service in pending)))
+            ordered.update(ready)
+            pending = [service for service in pending
+                       if service not in ordered]
+        return dependencies
+
+    def run(self):
+        """Run all the services, returning once they are all done"""
+        done = dict((service, threading.Event()) for service in self.services)
+        with futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            threads = [threading.Thread(target=self._run_service,
+                                        args=(service, pool, done))
+                       for service in self.services]
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    def _run_service(self, service, pool, done):
+        for dependency in self._dependencies[service]:
+            done[dependency].wait()
+        start = time.monotonic()
+        resources = []
+        deleted = []
+        remaining = []
+        try:
+            resources = service.list() or []
+            service.prepare_delete(resources)
+            results = list(pool.map(service.try_delete, resources))
+            deleted = [resource for resource, accepted
+                       in zip(resources, results) if accepted]
+            if service.async_delete and deleted:
+                remaining = self._wait_for_deletion(service, deleted)
+        except exceptions.NotImplemented as exc:
+            # Same as BaseService.run, missing extensions are not failures
+            LOG.exception("Got NotImplemented error in %s, full exception: "
+                          "%s", str(service.__class__), str(exc))
+            service.got_exceptions.append(exc)
+        except Exception:
+            LOG.exception("Cleanup of %s failed.", service.resource_type)
+        finally:
+            self._record(service, len(resources), len(deleted),
+                         len(remaining), time.monotonic() - start)
+            done[service].set()
+
+    def _wait_for_deletion(self, service, resources):
+        pending = set(service.resource_id(resource) for resource in resources)
+        waiter = poller.Poller('cleanup %s' % service.resource_type,
+                               timeout=self.wait_timeout,
+                               interval=self.wait_interval,
+                               client=service.client)
+        # A listing started once the previous poll of the service returned
+        # is current enough, the services waiting at the same time share it
+        # rather than each listing the resources of all the projects again
+        last_poll = time.monotonic()
+        for _ in waiter:
+            service.refresh(since=last_poll)
+            existing = set(service.resource_id(resource)
+                           for resource in service.list() or [])
+            last_poll = time.monotonic()
+            pending &= existing
+            if not pending:
+                waiter.settled()
+                return []
+        LOG.warning("%d %s still exist after waiting %s seconds for their "
+                    "deletion: %s", len(pending), service.resource_type,
+                    waiter.timeout, ', '.join(sorted(pending)))
+        return sorted(pending)
+
+    def _record(self, service, listed, deleted, remaining, elapsed):
+        with self._stats_lock:
+            stats = self._stats.setdefault(service.resource_type, {
+                'listed': 0, 'deleted': 0, 'failed': 0, 'remaining': 0,
+                'seconds': 0.0})
+            stats['listed'] += listed
+            stats['deleted'] += deleted
+            stats['failed'] += listed - deleted
+            stats['remaining'] += remaining
+            stats['seconds'] += elapsed
+
+    def get_stats(self):
+        """Return the deletion statistics by resource type
+
+        :return: dictionary by resource type of the number of resources
+            `listed`, of the ones whose deletion was accepted (`deleted`) or
+            `failed`, of the deleted ones which still existed once the wait
+            timed out (`remaining`), of the `seconds` taken by the service
+            and of its `throughput`, in resources deleted per second.
+        """
+        with self._stats_lock:
+            stats = dict((k, dict(v)) for k, v in self._stats.items())
+        for service_stats in stats.values():
+            seconds = service_stats['seconds']
+            service_stats['throughput'] = (
+                service_stats['deleted'] / seconds if seconds else 0.0)
+        return stats
+
+    def log_stats(self):
+        for resource_type, stats in sorted(self.get_stats().items()):
+            if not stats['listed']:
+                continue
+            LOG.info("Deleted %d of %d %s in %.1f seconds (%.1f/s), "
+                     "%d failed, %d not gone", stats['deleted'],
+                     stats['listed'], resource_type, stats['seconds'],
+                     stats['throughput'], stats['failed'],
+                     stats['remaining'])
@@ -12,7 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from urllib import parse as urllib
+import threading
+import time
 
 from oslo_log import log as logging
 
@@ -22,6 +23,7 @@ from tempest.common import identity
 from tempest.common import utils
 from tempest.common.utils import net_info
 from tempest import config
+from tempest.lib.common import rest_client
 from tempest.lib import exceptions
 
 LOG = logging.getLogger('tempest.cmd.cleanup')
@@ -94,7 +96,116 @@ def _get_network_id(net_name, project_name):
     return n_id
 
 
+def list_all(list_func, key, **params):
+    """List all the resources of a paginated listing
+
+    Follows the next links returned by Nova, Cinder, Neutron and Glance
+    when the listing is larger than their page size, see
+    `tempest.lib.common.rest_client.paginate`.
+
+    :param list_func: service client method returning the listing body
+    :param key: key of the resources in the body, e.g. ``servers``
+    :param params: query parameters of the listing
+    """
+    return list(rest_client.paginate(list_func, key, **params))
+
+
+def _get_project_id(resource):
+    for key in ('project_id', 'tenant_id', 'os-vol-tenant-attr:tenant_id',
+                'os-extended-snapshot-attributes:project_id'):
+        if key in resource:
+            return resource[key]
+    return None
+
+
+# Compute microversion used with the inventory, the first one listing the
+# project of the server groups
+INVENTORY_COMPUTE_MICROVERSION = '2.13'
+
+
+class Inventory(object):
+    """Admin wide snapshot of the resources to clean up
+
+    Each resource type is listed once for all the projects, the first time
+    a service needs it, and indexed by project, so that the services of all
+    the projects and the dry run, save state and delete modes are served
+    from a single listing instead of listing the resources for each of
+    them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._type_locks = {}
+        self._resources = {}
+        self._by_project = {}
+        self._listed_at = {}
+        self.list_calls = 0
+
+    def _type_lock(self, resource_type):
+        with self._lock:
+            return self._type_locks.setdefault(resource_type,
+                                               threading.Lock())
+
+    def list(self, resource_type, fetch, project_id=None):
+        """Return the resources of a type, listing them if needed
+
+        :param resource_type: the type of the resources, e.g. ``servers``
+        :param fetch: callable listing all the resources of the type
+        :param project_id: only return the resources of this project
+        """
+        with self._type_lock(resource_type):
+            if resource_type not in self._resources:
+                listed_at = time.monotonic()
+                resources = fetch()
+                by_project = {}
+                for resource in resources:
+                    by_project.setdefault(_get_project_id(resource),
+                                          []).append(resource)
+                with self._lock:
+                    self.list_calls += 1
+                self._resources[resource_type] = resources
+                self._by_project[resource_type] = by_project
+                self._listed_at[resource_type] = listed_at
+            # Copied under the type lock, an invalidation may drop them
+            if project_id is None:
+                return list(self._resources[resource_type])
+            return list(self._by_project[resource_type].get(project_id, []))
+
+    def invalidate(self, resource_type, since=None):
+        """Forget the resources of a type, the next list lists them again
+
+        :param since: only forget them if they were listed before this
+            `time.monotonic()` value, so that the services waiting for
+            deletions in the same round share a single new listing
+        """
+        with self._type_lock(resource_type):
+            if (since is not None and
+                    self._listed_at.get(resource_type, since) >= since):
+                return
+            self._resources.pop(resource_type, None)
+            self._by_project.pop(resource_type, None)
+            self._listed_at.pop(resource_type, None)
+
+
 class BaseService(object):
+    # Key of the resources in the saved state and in the dry run report
+    resource_type = None
+    # Name of the resources in the log messages
+    resource_name = None
+    # Names of the service classes whose resources must be deleted before
+    # the ones of this service, see cleanup_engine.CleanupEngine
+    depends_on = ()
+    # Whether the resources may still exist for a while once their deletion
+    # is accepted, so that their deletion has to be waited for before
+    # deleting the resources depending on them
+    async_delete = False
+    # Inventory listing the resources of all the projects at once, when
+    # not set the resources are listed by each service
+    inventory = None
+    # Whether the resources have a project, so that they can be served from
+    # the inventory, otherwise they are listed by each service
+    project_owned = True
+
     def __init__(self, kwargs):
         self.client = None
         for key, value in kwargs.items():
@@ -118,9 +229,72 @@ class BaseService(object):
     def list(self):
         pass
 
-    def delete(self):
+    def fetch_all(self):
+        """List the resources of all the projects for the inventory
+
+        The services listing their resources with `_list` must implement it,
+        so that they can be run with the global inventory.
+        """
+        raise NotImplementedError(
+            "%s does not implement fetch_all, its resources cannot be "
+            "listed with the global inventory" % self.__class__.__name__)
+
+    def _list(self, fetch):
+        """List the resources of the service
+
+        :param fetch: callable listing the resources when there is no
+            inventory
+        """
+        if self.inventory is None or not self.project_owned:
+            return fetch()
+        project_id = (getattr(self, 'tenant_id', None) or
+                      getattr(self, 'project_id', None))
+        return self.inventory.list(self.resource_type, self.fetch_all,
+                                   project_id=project_id)
+
+    def refresh(self, since=None):
+        """Make the next list see the current resources
+
+        :param since: `time.monotonic()` value, with an inventory a listing
+            of the resources started after it is current enough
+        """
+        if self.inventory is not None:
+            self.inventory.invalidate(self.resource_type, since=since)
+
+    def resource_id(self, resource):
+        return resource['id']
+
+    def prepare_delete(self, resources):
+        """Prepare the deletion of the listed resources
+
+        Called once before deleting the resources one by one, so that
+        services can look up what they need for all of them at once.
+        """
         pass
 
+    def delete_resource(self, resource):
+        """Delete a single resource, raising in case of failure"""
+        pass
+
+    def try_delete(self, resource):
+        """Delete a single resource, logging any failure
+
+        :return: whether the deletion request was accepted
+        """
+        try:
+            self.delete_resource(resource)
+        except Exception:
+            LOG.exception("Delete %s %s exception.", self.resource_name,
+                          self.resource_id(resource))
+            return False
+        return True
+
+    def delete(self):
+        resources = self.list() or []
+        self.prepare_delete(resources)
+        for resource in resources:
+            self.try_delete(resource)
+
     def dry_run(self):
         pass
 
@@ -148,6 +322,9 @@ class BaseService(object):
 
 
 class SnapshotService(BaseService):
+    resource_type = 'snapshots'
+    resource_name = 'Snapshot'
+    async_delete = True
 
     def __init__(self, manager, **kwargs):
         super(SnapshotService, self).__init__(kwargs)
@@ -155,7 +332,7 @@ class SnapshotService(BaseService):
 
     def list(self):
         client = self.client
-        snaps = client.list_snapshots()['snapshots']
+        snaps = self._list(lambda: client.list_snapshots()['snapshots'])
         if not self.is_save_state:
             # recreate list removing saved snapshots
             snaps = [snap for snap in snaps if snap['id']
@@ -163,15 +340,13 @@ class SnapshotService(BaseService):
         LOG.debug("List count, %s Snapshots", len(snaps))
         return snaps
 
-    def delete(self):
-        snaps = self.list()
-        client = self.client
-        for snap in snaps:
-            try:
-                LOG.debug("Deleting Snapshot with id %s", snap['id'])
-                client.delete_snapshot(snap['id'])
-            except Exception:
-                LOG.exception("Delete Snapshot %s exception.", snap['id'])
+    def fetch_all(self):
+        return list_all(self.client.list_snapshots, 'snapshots', detail=True,
+                        all_tenants=True)
+
+    def delete_resource(self, snap):
+        LOG.debug("Deleting Snapshot with id %s", snap['id'])
+        self.client.delete_snapshot(snap['id'])
 
     def dry_run(self):
         snaps = self.list()
@@ -185,6 +360,10 @@ class SnapshotService(BaseService):
 
 
 class ServerService(BaseService):
+    resource_type = 'servers'
+    resource_name = 'Server'
+    async_delete = True
+
     def __init__(self, manager, **kwargs):
         super(ServerService, self).__init__(kwargs)
         self.client = manager.servers_client
@@ -192,8 +371,7 @@ class ServerService(BaseService):
 
     def list(self):
         client = self.client
-        servers_body = client.list_servers()
-        servers = servers_body['servers']
+        servers = self._list(lambda: client.list_servers()['servers'])
         if not self.is_save_state:
             # recreate list removing saved servers
             servers = [server for server in servers if server['id']
@@ -201,15 +379,13 @@ class ServerService(BaseService):
         LOG.debug("List count, %s Servers", len(servers))
         return servers
 
-    def delete(self):
-        client = self.client
-        servers = self.list()
-        for server in servers:
-            try:
-                LOG.debug("Deleting Server with id %s", server['id'])
-                client.delete_server(server['id'])
-            except Exception:
-                LOG.exception("Delete Server %s exception.", server['id'])
+    def fetch_all(self):
+        return list_all(self.client.list_servers, 'servers', detail=True,
+                        all_tenants=True)
+
+    def delete_resource(self, server):
+        LOG.debug("Deleting Server with id %s", server['id'])
+        self.client.delete_server(server['id'])
 
     def dry_run(self):
         servers = self.list()
@@ -223,10 +399,14 @@ class ServerService(BaseService):
 
 
 class ServerGroupService(ServerService):
+    resource_type = 'server_groups'
+    resource_name = 'Server Group'
+    depends_on = ('ServerService',)
+    async_delete = False
 
     def list(self):
         client = self.server_groups_client
-        sgs = client.list_server_groups()['server_groups']
+        sgs = self._list(lambda: client.list_server_groups()['server_groups'])
         if not self.is_save_state:
             # recreate list removing saved server_groups
             sgs = [sg for sg in sgs if sg['id']
@@ -234,15 +414,15 @@ class ServerGroupService(ServerService):
         LOG.debug("List count, %s Server Groups", len(sgs))
         return sgs
 
-    def delete(self):
-        client = self.server_groups_client
-        sgs = self.list()
-        for sg in sgs:
-            try:
-                LOG.debug("Deleting Server Group with id %s", sg['id'])
-                client.delete_server_group(sg['id'])
-            except Exception:
-                LOG.exception("Delete Server Group %s exception.", sg['id'])
+    def fetch_all(self):
+        # The project of the server groups is only listed from compute 2.13,
+        # see INVENTORY_COMPUTE_MICROVERSION
+        return self.server_groups_client.list_server_groups(
+            all_projects=True)['server_groups']
+
+    def delete_resource(self, sg):
+        LOG.debug("Deleting Server Group with id %s", sg['id'])
+        self.server_groups_client.delete_server_group(sg['id'])
 
     def dry_run(self):
         sgs = self.list()
@@ -256,13 +436,19 @@ class ServerGroupService(ServerService):
 
 
 class KeyPairService(BaseService):
+    resource_type = 'keypairs'
+    resource_name = 'Keypair'
+    depends_on = ('ServerService',)
+    # Keypairs belong to users, not projects
+    project_owned = False
+
     def __init__(self, manager, **kwargs):
         super(KeyPairService, self).__init__(kwargs)
         self.client = manager.keypairs_client
 
     def list(self):
         client = self.client
-        keypairs = client.list_keypairs()['keypairs']
+        keypairs = self._list(lambda: client.list_keypairs()['keypairs'])
         if not self.is_save_state:
             # recreate list removing saved keypairs
             keypairs = [keypair for keypair in keypairs
@@ -271,16 +457,13 @@ class KeyPairService(BaseService):
         LOG.debug("List count, %s Keypairs", len(keypairs))
         return keypairs
 
-    def delete(self):
-        client = self.client
-        keypairs = self.list()
-        for k in keypairs:
-            name = k['keypair']['name']
-            try:
-                LOG.debug("Deleting keypair %s", name)
-                client.delete_keypair(name)
-            except Exception:
-                LOG.exception("Delete Keypair %s exception.", name)
+    def resource_id(self, keypair):
+        return keypair['keypair']['name']
+
+    def delete_resource(self, keypair):
+        name = keypair['keypair']['name']
+        LOG.debug("Deleting keypair %s", name)
+        self.client.delete_keypair(name)
 
     def dry_run(self):
         keypairs = self.list()
@@ -295,13 +478,18 @@ class KeyPairService(BaseService):
 
 
 class VolumeService(BaseService):
+    resource_type = 'volumes'
+    resource_name = 'Volume'
+    depends_on = ('ServerService', 'SnapshotService')
+    async_delete = True
+
     def __init__(self, manager, **kwargs):
         super(VolumeService, self).__init__(kwargs)
         self.client = manager.volumes_client_latest
 
     def list(self):
         client = self.client
-        vols = client.list_volumes()['volumes']
+        vols = self._list(lambda: client.list_volumes()['volumes'])
         if not self.is_save_state:
             # recreate list removing saved volumes
             vols = [vol for vol in vols if vol['id']
@@ -309,15 +497,15 @@ class VolumeService(BaseService):
         LOG.debug("List count, %s Volumes", len(vols))
         return vols
 
-    def delete(self):
-        client = self.client
-        vols = self.list()
-        for v in vols:
-            try:
-                LOG.debug("Deleting volume with id %s", v['id'])
-                client.delete_volume(v['id'])
-            except Exception:
-                LOG.exception("Delete Volume %s exception.", v['id'])
+    def fetch_all(self):
+        return list_all(
+            lambda **params: self.client.list_volumes(detail=True,
+                                                      params=params),
+            'volumes', all_tenants=True)
+
+    def delete_resource(self, vol):
+        LOG.debug("Deleting volume with id %s", vol['id'])
+        self.client.delete_volume(vol['id'])
 
     def dry_run(self):
         vols = self.list()
@@ -331,6 +519,8 @@ class VolumeService(BaseService):
 
 
 class VolumeQuotaService(BaseService):
+    resource_type = 'volume_quotas'
+
     def __init__(self, manager, **kwargs):
         super(VolumeQuotaService, self).__init__(kwargs)
         self.client = manager.volume_quotas_client_latest
@@ -352,6 +542,8 @@ class VolumeQuotaService(BaseService):
 
 
 class NovaQuotaService(BaseService):
+    resource_type = 'compute_quotas'
+
     def __init__(self, manager, **kwargs):
         super(NovaQuotaService, self).__init__(kwargs)
         self.client = manager.quotas_client
@@ -374,6 +566,8 @@ class NovaQuotaService(BaseService):
 
 
 class NetworkQuotaService(BaseService):
+    resource_type = 'network_quotas'
+
     def __init__(self, manager, **kwargs):
         super(NetworkQuotaService, self).__init__(kwargs)
         self.client = manager.network_quotas_client
@@ -388,9 +582,13 @@ class NetworkQuotaService(BaseService):
             LOG.exception("Delete Network Quotas exception for 'project %s'.",
                           self.project_id)
 
+    def fetch_all(self):
+        return self.client.list_quotas()['quotas']
+
     def dry_run(self):
-        resp = [quota for quota in self.client.list_quotas()['quotas']
-                if quota['project_id'] == self.project_id]
+        resp = self._list(
+            lambda: [quota for quota in self.client.list_quotas()['quotas']
+                     if quota['project_id'] == self.project_id])
         self.data['network_quotas'] = resp
 
 
@@ -417,11 +615,14 @@ class BaseNetworkService(BaseService):
 
 
 class NetworkService(BaseNetworkService):
+    resource_type = 'networks'
+    resource_name = 'Network'
+    depends_on = ('NetworkPortService', 'NetworkSubnetService')
 
     def list(self):
         client = self.networks_client
-        networks = client.list_networks(**self.tenant_filter)
-        networks = networks['networks']
+        networks = self._list(lambda: client.list_networks(
+            **self.tenant_filter)['networks'])
 
         if not self.is_save_state:
             # recreate list removing saved networks
@@ -434,15 +635,12 @@ class NetworkService(BaseNetworkService):
         LOG.debug("List count, %s Networks", len(networks))
         return networks
 
-    def delete(self):
-        client = self.networks_client
-        networks = self.list()
-        for n in networks:
-            try:
-                LOG.debug("Deleting Network with id %s", n['id'])
-                client.delete_network(n['id'])
-            except Exception:
-                LOG.exception("Delete Network %s exception.", n['id'])
+    def fetch_all(self):
+        return list_all(self.networks_client.list_networks, 'networks')
+
+    def delete_resource(self, network):
+        LOG.debug("Deleting Network with id %s", network['id'])
+        self.networks_client.delete_network(network['id'])
 
     def dry_run(self):
         networks = self.list()
@@ -456,11 +654,14 @@ class NetworkService(BaseNetworkService):
 
 
 class NetworkFloatingIpService(BaseNetworkService):
+    resource_type = 'floatingips'
+    resource_name = 'Network Floating IP'
+    depends_on = ('ServerService',)
 
     def list(self):
         client = self.floating_ips_client
-        flips = client.list_floatingips(**self.tenant_filter)
-        flips = flips['floatingips']
+        flips = self._list(lambda: client.list_floatingips(
+            **self.tenant_filter)['floatingips'])
 
         if not self.is_save_state:
             # recreate list removing saved flips
@@ -469,17 +670,13 @@ class NetworkFloatingIpService(BaseNetworkService):
         LOG.debug("List count, %s Network Floating IPs", len(flips))
         return flips
 
-    def delete(self):
-        client = self.floating_ips_client
-        flips = self.list()
-        for flip in flips:
-            try:
-                LOG.debug("Deleting Network Floating IP with id %s",
-                          flip['id'])
-                client.delete_floatingip(flip['id'])
-            except Exception:
-                LOG.exception("Delete Network Floating IP %s exception.",
-                              flip['id'])
+    def fetch_all(self):
+        return list_all(self.floating_ips_client.list_floatingips,
+                        'floatingips')
+
+    def delete_resource(self, flip):
+        LOG.debug("Deleting Network Floating IP with id %s", flip['id'])
+        self.floating_ips_client.delete_floatingip(flip['id'])
 
     def dry_run(self):
         flips = self.list()
@@ -493,11 +690,14 @@ class NetworkFloatingIpService(BaseNetworkService):
 
 
 class NetworkRouterService(BaseNetworkService):
+    resource_type = 'routers'
+    resource_name = 'Router'
+    depends_on = ('NetworkPortService', 'NetworkFloatingIpService')
 
     def list(self):
         client = self.routers_client
-        routers = client.list_routers(**self.tenant_filter)
-        routers = routers['routers']
+        routers = self._list(lambda: client.list_routers(
+            **self.tenant_filter)['routers'])
 
         if not self.is_save_state:
             # recreate list removing saved routers
@@ -510,28 +710,48 @@ class NetworkRouterService(BaseNetworkService):
         LOG.debug("List count, %s Routers", len(routers))
         return routers
 
-    def delete(self):
+    def fetch_all(self):
+        return list_all(self.routers_client.list_routers, 'routers')
+
+    def prepare_delete(self, routers):
+        # List the interfaces of all the routers at once, rather than
+        # listing the ports of each router
+        self._interfaces = dict((router['id'], []) for router in routers)
+        if not routers:
+            return
+        if self.inventory is not None:
+            ports = self.inventory.list(
+                'ports', lambda: list_all(self.ports_client.list_ports,
+                                          'ports'))
+        else:
+            ports = self.ports_client.list_ports(
+                **self.tenant_filter)['ports']
+        for port in ports:
+            if (port.get('device_id') in self._interfaces and
+                    net_info.is_router_interface_port(port)):
+                self._interfaces[port['device_id']].append(port)
+
+    def _router_interfaces(self, rid):
+        interfaces = getattr(self, '_interfaces', {})
+        if rid in interfaces:
+            return interfaces[rid]
+        return [port for port
+                in self.ports_client.list_ports(device_id=rid)['ports']
+                if net_info.is_router_interface_port(port)]
+
+    def delete_resource(self, router):
         client = self.routers_client
-        ports_client = self.ports_client
-        routers = self.list()
-        for router in routers:
-            rid = router['id']
-            ports = [port for port
-                     in ports_client.list_ports(device_id=rid)['ports']
-                     if net_info.is_router_interface_port(port)]
-            for port in ports:
-                try:
-                    LOG.debug("Deleting port with id %s of router with id %s",
-                              port['id'], rid)
-                    client.remove_router_interface(rid, port_id=port['id'])
-                except Exception:
-                    LOG.exception("Delete Router Interface exception for "
-                                  "'port %s' of 'router %s'.", port['id'], rid)
+        rid = router['id']
+        for port in self._router_interfaces(rid):
             try:
-                LOG.debug("Deleting Router with id %s", rid)
-                client.delete_router(rid)
+                LOG.debug("Deleting port with id %s of router with id %s",
+                          port['id'], rid)
+                client.remove_router_interface(rid, port_id=port['id'])
             except Exception:
-                LOG.exception("Delete Router %s exception.", rid)
+                LOG.exception("Delete Router Interface exception for "
+                              "'port %s' of 'router %s'.", port['id'], rid)
+        LOG.debug("Deleting Router with id %s", rid)
+        client.delete_router(rid)
 
     def dry_run(self):
         routers = self.list()
@@ -545,11 +765,14 @@ class NetworkRouterService(BaseNetworkService):
 
 
 class NetworkMeteringLabelRuleService(NetworkService):
+    resource_type = 'metering_label_rules'
+    resource_name = 'Metering Label Rule'
+    depends_on = ()
 
     def list(self):
         client = self.metering_label_rules_client
-        rules = client.list_metering_label_rules()
-        rules = rules['metering_label_rules']
+        rules = self._list(lambda: client.list_metering_label_rules()[
+            'metering_label_rules'])
         rules = self._filter_by_tenant_id(rules)
 
         if not self.is_save_state:
@@ -559,17 +782,15 @@ class NetworkMeteringLabelRuleService(NetworkService):
         LOG.debug("List count, %s Metering Label Rules", len(rules))
         return rules
 
-    def delete(self):
-        client = self.metering_label_rules_client
-        rules = self.list()
-        for rule in rules:
-            try:
-                LOG.debug("Deleting Metering Label Rule with id %s",
-                          rule['id'])
-                client.delete_metering_label_rule(rule['id'])
-            except Exception:
-                LOG.exception("Delete Metering Label Rule %s exception.",
-                              rule['id'])
+    def fetch_all(self):
+        return list_all(
+            self.metering_label_rules_client.list_metering_label_rules,
+            'metering_label_rules')
+
+    def delete_resource(self, rule):
+        LOG.debug("Deleting Metering Label Rule with id %s", rule['id'])
+        self.metering_label_rules_client.delete_metering_label_rule(
+            rule['id'])
 
     def dry_run(self):
         rules = self.list()
@@ -583,11 +804,14 @@ class NetworkMeteringLabelRuleService(NetworkService):
 
 
 class NetworkMeteringLabelService(BaseNetworkService):
+    resource_type = 'metering_labels'
+    resource_name = 'Metering Label'
+    depends_on = ('NetworkMeteringLabelRuleService',)
 
     def list(self):
         client = self.metering_labels_client
-        labels = client.list_metering_labels()
-        labels = labels['metering_labels']
+        labels = self._list(lambda: client.list_metering_labels()[
+            'metering_labels'])
         labels = self._filter_by_tenant_id(labels)
 
         if not self.is_save_state:
@@ -597,16 +821,13 @@ class NetworkMeteringLabelService(BaseNetworkService):
         LOG.debug("List count, %s Metering Labels", len(labels))
         return labels
 
-    def delete(self):
-        client = self.metering_labels_client
-        labels = self.list()
-        for label in labels:
-            try:
-                LOG.debug("Deleting Metering Label with id %s", label['id'])
-                client.delete_metering_label(label['id'])
-            except Exception:
-                LOG.exception("Delete Metering Label %s exception.",
-                              label['id'])
+    def fetch_all(self):
+        return list_all(self.metering_labels_client.list_metering_labels,
+                        'metering_labels')
+
+    def delete_resource(self, label):
+        LOG.debug("Deleting Metering Label with id %s", label['id'])
+        self.metering_labels_client.delete_metering_label(label['id'])
 
     def dry_run(self):
         labels = self.list()
@@ -620,11 +841,15 @@ class NetworkMeteringLabelService(BaseNetworkService):
 
 
 class NetworkPortService(BaseNetworkService):
+    resource_type = 'ports'
+    resource_name = 'Port'
+    depends_on = ('ServerService',)
 
     def list(self):
         client = self.ports_client
         ports = [port for port in
-                 client.list_ports(**self.tenant_filter)['ports']
+                 self._list(lambda: client.list_ports(
+                     **self.tenant_filter)['ports'])
                  if port["device_owner"] == "" or
                  port["device_owner"].startswith("compute:")]
 
@@ -638,15 +863,12 @@ class NetworkPortService(BaseNetworkService):
         LOG.debug("List count, %s Ports", len(ports))
         return ports
 
-    def delete(self):
-        client = self.ports_client
-        ports = self.list()
-        for port in ports:
-            try:
-                LOG.debug("Deleting port with id %s", port['id'])
-                client.delete_port(port['id'])
-            except Exception:
-                LOG.exception("Delete Port %s exception.", port['id'])
+    def fetch_all(self):
+        return list_all(self.ports_client.list_ports, 'ports')
+
+    def delete_resource(self, port):
+        LOG.debug("Deleting port with id %s", port['id'])
+        self.ports_client.delete_port(port['id'])
 
     def dry_run(self):
         ports = self.list()
@@ -660,12 +882,17 @@ class NetworkPortService(BaseNetworkService):
 
 
 class NetworkSecGroupService(BaseNetworkService):
+    resource_type = 'security_groups'
+    resource_name = 'security_group'
+    depends_on = ('ServerService', 'NetworkPortService')
+
     def list(self):
         client = self.security_groups_client
         filter = self.tenant_filter
         # cannot delete default sec group so never show it.
         secgroups = [secgroup for secgroup in
-                     client.list_security_groups(**filter)['security_groups']
+                     self._list(lambda: client.list_security_groups(
+                         **filter)['security_groups'])
                      if secgroup['name'] != 'default']
 
         if not self.is_save_state:
@@ -680,16 +907,13 @@ class NetworkSecGroupService(BaseNetworkService):
         LOG.debug("List count, %s security_groups", len(secgroups))
         return secgroups
 
-    def delete(self):
-        client = self.security_groups_client
-        secgroups = self.list()
-        for secgroup in secgroups:
-            try:
-                LOG.debug("Deleting security_group with id %s", secgroup['id'])
-                client.delete_security_group(secgroup['id'])
-            except Exception:
-                LOG.exception("Delete security_group %s exception.",
-                              secgroup['id'])
+    def fetch_all(self):
+        return list_all(self.security_groups_client.list_security_groups,
+                        'security_groups')
+
+    def delete_resource(self, secgroup):
+        LOG.debug("Deleting security_group with id %s", secgroup['id'])
+        self.security_groups_client.delete_security_group(secgroup['id'])
 
     def dry_run(self):
         secgroups = self.list()
@@ -703,11 +927,14 @@ class NetworkSecGroupService(BaseNetworkService):
 
 
 class NetworkSubnetService(BaseNetworkService):
+    resource_type = 'subnets'
+    resource_name = 'Subnet'
+    depends_on = ('NetworkPortService', 'NetworkRouterService')
 
     def list(self):
         client = self.subnets_client
-        subnets = client.list_subnets(**self.tenant_filter)
-        subnets = subnets['subnets']
+        subnets = self._list(lambda: client.list_subnets(
+            **self.tenant_filter)['subnets'])
         if not self.is_save_state:
             # recreate list removing saved subnets
             subnets = [subnet for subnet in subnets if subnet['id']
@@ -717,15 +944,12 @@ class NetworkSubnetService(BaseNetworkService):
         LOG.debug("List count, %s Subnets", len(subnets))
         return subnets
 
-    def delete(self):
-        client = self.subnets_client
-        subnets = self.list()
-        for subnet in subnets:
-            try:
-                LOG.debug("Deleting subnet with id %s", subnet['id'])
-                client.delete_subnet(subnet['id'])
-            except Exception:
-                LOG.exception("Delete Subnet %s exception.", subnet['id'])
+    def fetch_all(self):
+        return list_all(self.subnets_client.list_subnets, 'subnets')
+
+    def delete_resource(self, subnet):
+        LOG.debug("Deleting subnet with id %s", subnet['id'])
+        self.subnets_client.delete_subnet(subnet['id'])
 
     def dry_run(self):
         subnets = self.list()
@@ -739,10 +963,14 @@ class NetworkSubnetService(BaseNetworkService):
 
 
 class NetworkSubnetPoolsService(BaseNetworkService):
+    resource_type = 'subnetpools'
+    resource_name = 'Subnet Pool'
+    depends_on = ('NetworkSubnetService',)
 
     def list(self):
         client = self.subnetpools_client
-        pools = client.list_subnetpools(**self.tenant_filter)['subnetpools']
+        pools = self._list(lambda: client.list_subnetpools(
+            **self.tenant_filter)['subnetpools'])
         if not self.is_save_state:
             # recreate list removing saved subnet pools
             pools = [pool for pool in pools if pool['id']
@@ -753,15 +981,13 @@ class NetworkSubnetPoolsService(BaseNetworkService):
         LOG.debug("List count, %s Subnet Pools", len(pools))
         return pools
 
-    def delete(self):
-        client = self.subnetpools_client
-        pools = self.list()
-        for pool in pools:
-            try:
-                LOG.debug("Deleting Subnet Pool with id %s", pool['id'])
-                client.delete_subnetpool(pool['id'])
-            except Exception:
-                LOG.exception("Delete Subnet Pool %s exception.", pool['id'])
+    def fetch_all(self):
+        return list_all(self.subnetpools_client.list_subnetpools,
+                        'subnetpools')
+
+    def delete_resource(self, pool):
+        LOG.debug("Deleting Subnet Pool with id %s", pool['id'])
+        self.subnetpools_client.delete_subnetpool(pool['id'])
 
     def dry_run(self):
         pools = self.list()
@@ -776,6 +1002,8 @@ class NetworkSubnetPoolsService(BaseNetworkService):
 
 # begin global services
 class RegionService(BaseService):
+    resource_type = 'regions'
+    resource_name = 'Region'
 
     def __init__(self, manager, **kwargs):
         super(RegionService, self).__init__(kwargs)
@@ -793,15 +1021,9 @@ class RegionService(BaseService):
             LOG.debug("List count, %s Regions", len(regions['regions']))
             return regions['regions']
 
-    def delete(self):
-        client = self.client
-        regions = self.list()
-        for region in regions:
-            try:
-                LOG.debug("Deleting region with id %s", region['id'])
-                client.delete_region(region['id'])
-            except Exception:
-                LOG.exception("Delete Region %s exception.", region['id'])
+    def delete_resource(self, region):
+        LOG.debug("Deleting region with id %s", region['id'])
+        self.client.delete_region(region['id'])
 
     def dry_run(self):
         regions = self.list()
@@ -817,6 +1039,9 @@ class RegionService(BaseService):
 
 
 class FlavorService(BaseService):
+    resource_type = 'flavors'
+    resource_name = 'Flavor'
+
     def __init__(self, manager, **kwargs):
         super(FlavorService, self).__init__(kwargs)
         self.client = manager.flavors_client
@@ -835,15 +1060,9 @@ class FlavorService(BaseService):
         LOG.debug("List count, %s Flavors after reconcile", len(flavors))
         return flavors
 
-    def delete(self):
-        client = self.client
-        flavors = self.list()
-        for flavor in flavors:
-            try:
-                LOG.debug("Deleting flavor with id %s", flavor['id'])
-                client.delete_flavor(flavor['id'])
-            except Exception:
-                LOG.exception("Delete Flavor %s exception.", flavor['id'])
+    def delete_resource(self, flavor):
+        LOG.debug("Deleting flavor with id %s", flavor['id'])
+        self.client.delete_flavor(flavor['id'])
 
     def dry_run(self):
         flavors = self.list()
@@ -857,20 +1076,16 @@ class FlavorService(BaseService):
 
 
 class ImageService(BaseService):
+    resource_type = 'images'
+    resource_name = 'Image'
+
     def __init__(self, manager, **kwargs):
         super(ImageService, self).__init__(kwargs)
         self.client = manager.image_client_v2
 
     def list(self):
         client = self.client
-        response = client.list_images()
-        images = []
-        images.extend(response['images'])
-        while 'next' in response:
-            parsed = urllib.urlparse(response['next'])
-            marker = urllib.parse_qs(parsed.query)['marker'][0]
-            response = client.list_images(params={"marker": marker})
-            images.extend(response['images'])
+        images = list(client.iter_images())
 
         if not self.is_save_state:
             images = [image for image in images if image['id']
@@ -881,15 +1096,9 @@ class ImageService(BaseService):
         LOG.debug("List count, %s Images after reconcile", len(images))
         return images
 
-    def delete(self):
-        client = self.client
-        images = self.list()
-        for image in images:
-            try:
-                LOG.debug("Deleting image with id %s", image['id'])
-                client.delete_image(image['id'])
-            except Exception:
-                LOG.exception("Delete Image %s exception.", image['id'])
+    def delete_resource(self, image):
+        LOG.debug("Deleting image with id %s", image['id'])
+        self.client.delete_image(image['id'])
 
     def dry_run(self):
         images = self.list()
@@ -903,6 +1112,8 @@ class ImageService(BaseService):
 
 
 class UserService(BaseService):
+    resource_type = 'users'
+    resource_name = 'User'
 
     def __init__(self, manager, **kwargs):
         super(UserService, self).__init__(kwargs)
@@ -926,14 +1137,9 @@ class UserService(BaseService):
         LOG.debug("List count, %s Users after reconcile", len(users))
         return users
 
-    def delete(self):
-        users = self.list()
-        for user in users:
-            try:
-                LOG.debug("Deleting user with id %s", user['id'])
-                self.client.delete_user(user['id'])
-            except Exception:
-                LOG.exception("Delete User %s exception.", user['id'])
+    def delete_resource(self, user):
+        LOG.debug("Deleting user with id %s", user['id'])
+        self.client.delete_user(user['id'])
 
     def dry_run(self):
         users = self.list()
@@ -947,6 +1153,8 @@ class UserService(BaseService):
 
 
 class RoleService(BaseService):
+    resource_type = 'roles'
+    resource_name = 'Role'
 
     def __init__(self, manager, **kwargs):
         super(RoleService, self).__init__(kwargs)
@@ -967,14 +1175,9 @@ class RoleService(BaseService):
             LOG.exception("Cannot retrieve Roles.")
             return []
 
-    def delete(self):
-        roles = self.list()
-        for role in roles:
-            try:
-                LOG.debug("Deleting role with id %s", role['id'])
-                self.client.delete_role(role['id'])
-            except Exception:
-                LOG.exception("Delete Role %s exception.", role['id'])
+    def delete_resource(self, role):
+        LOG.debug("Deleting role with id %s", role['id'])
+        self.client.delete_role(role['id'])
 
     def dry_run(self):
         roles = self.list()
@@ -988,6 +1191,8 @@ class RoleService(BaseService):
 
 
 class ProjectService(BaseService):
+    resource_type = 'projects'
+    resource_name = 'project'
 
     def __init__(self, manager, **kwargs):
         super(ProjectService, self).__init__(kwargs)
@@ -1010,14 +1215,9 @@ class ProjectService(BaseService):
         LOG.debug("List count, %s Projects after reconcile", len(projects))
         return projects
 
-    def delete(self):
-        projects = self.list()
-        for project in projects:
-            try:
-                LOG.debug("Deleting project with id %s", project['id'])
-                self.client.delete_project(project['id'])
-            except Exception:
-                LOG.exception("Delete project %s exception.", project['id'])
+    def delete_resource(self, project):
+        LOG.debug("Deleting project with id %s", project['id'])
+        self.client.delete_project(project['id'])
 
     def dry_run(self):
         projects = self.list()
@@ -1031,6 +1231,8 @@ class ProjectService(BaseService):
 
 
 class DomainService(BaseService):
+    resource_type = 'domains'
+    resource_name = 'Domain'
 
     def __init__(self, manager, **kwargs):
         super(DomainService, self).__init__(kwargs)
@@ -1046,16 +1248,10 @@ class DomainService(BaseService):
         LOG.debug("List count, %s Domains after reconcile", len(domains))
         return domains
 
-    def delete(self):
-        client = self.client
-        domains = self.list()
-        for domain in domains:
-            try:
-                LOG.debug("Deleting domain with id %s", domain['id'])
-                client.update_domain(domain['id'], enabled=False)
-                client.delete_domain(domain['id'])
-            except Exception:
-                LOG.exception("Delete Domain %s exception.", domain['id'])
+    def delete_resource(self, domain):
+        LOG.debug("Deleting domain with id %s", domain['id'])
+        self.client.update_domain(domain['id'], enabled=False)
+        self.client.delete_domain(domain['id'])
 
     def dry_run(self):
         domains = self.list()
@@ -83,6 +83,17 @@ This worker file is passed into stestr. For some more details on how it
 operates please refer to the stestr scheduling docs:
 https://stestr.readthedocs.io/en/stable/MANUAL.html#test-scheduling
 
+Instead of writing a worker file, you can use the ``--timing-schedule``
+option to have tempest run write one out of the durations of the test classes
+in previous runs. The test classes are placed on ``--concurrency`` workers
+from the longest to the shortest, each on the worker with the least work so
+far. Test classes taking the same lock, like ``LockFixture('name')`` in their
+body, or tagged with the ``serial`` attribute are kept on the same worker.
+The durations are read from the subunit v2 streams passed with
+``--timing-history``, by default from the last runs in the stestr repository.
+The worker file is written to ``--timing-worker-file``, so that it can be
+inspected or reused with ``--worker-file``.
+
 Test Execution
 ==============
 There are several options to control how the tests are executed. By default
@@ -114,6 +125,12 @@ By default tempest run's output to STDOUT will be generated using the
 subunit-trace output filter. But, if you would prefer a subunit v2 stream be
 output to STDOUT use the ``--subunit`` flag
 
+When the ``api_metrics_dir`` option of the ``service-clients`` section of the
+configuration is set, each test worker writes the metrics of its API calls to
+that directory, and tempest run merges them at the end of the run into the
+``api-metrics.json`` and ``api-metrics.prom`` (Prometheus text format) files.
+The files of the workers of a previous run are removed when the run starts.
+
 Combining Runs
 ==============
 
@@ -124,6 +141,7 @@ as a single run you can leverage the ``--combine`` option which will append
 the current run's results with the previous runs.
 """
 
+import io
 import os
 import sys
 
@@ -131,13 +149,16 @@ from cliff import command
 from oslo_log import log
 from oslo_serialization import jsonutils as json
 from stestr import commands
+from stestr import scheduler
 
 from tempest import clients
 from tempest.cmd import cleanup_service
 from tempest.cmd import init
+from tempest.cmd import run_scheduler
 from tempest.cmd import workspace
 from tempest.common import credentials_factory as credentials
 from tempest import config
+from tempest.lib.common import api_metrics
 
 CONF = config.CONF
 SAVED_STATE_JSON = "saved_state.json"
@@ -251,10 +272,15 @@ class TempestRun(command.Command):
 
         else:
             serial = not parsed_args.parallel
+            worker_path = parsed_args.worker_file
+            if parsed_args.timing_schedule and not serial:
+                worker_path = self._write_timing_worker_file(
+                    parsed_args, regex, in_list, ex_list, ex_regex)
+            self._clear_api_metrics()
             params = {
                 'filters': regex, 'subunit_out': parsed_args.subunit,
                 'serial': serial, 'concurrency': parsed_args.concurrency,
-                'worker_path': parsed_args.worker_file,
+                'worker_path': worker_path,
                 'load_list': parsed_args.load_list,
                 'combine': parsed_args.combine
             }
@@ -269,6 +295,7 @@ class TempestRun(command.Command):
                 return_code = commands.run_command(
                     **params, blacklist_file=ex_list,
                     whitelist_file=in_list, black_regex=ex_regex)
+            self._merge_api_metrics()
             if return_code > 0:
                 sys.exit(return_code)
         return return_code
@@ -276,6 +303,70 @@ class TempestRun(command.Command):
     def get_description(self):
         return 'Run tempest'
 
+    def _list_test_ids(self, regex, in_list, ex_list, ex_regex):
+        output = io.BytesIO()
+        try:
+            commands.list_command(
+                filters=regex, include_list=in_list, exclude_list=ex_list,
+                exclude_regex=ex_regex, stdout=output)
+        except TypeError:
+            # Same as for --list-tests, stestr < 3.1.0
+            commands.list_command(
+                filters=regex, whitelist_file=in_list,
+                blacklist_file=ex_list, black_regex=ex_regex, stdout=output)
+        return output.getvalue().decode('utf8').split()
+
+    def _write_timing_worker_file(self, parsed_args, regex, in_list, ex_list,
+                                  ex_regex):
+        """Schedule the tests by their durations, see --timing-schedule
+
+        :return: the path of the worker file, None if the durations of the
+            tests are not known
+        """
+        streams = (parsed_args.timing_history or
+                   run_scheduler.repository_streams())
+        test_times = run_scheduler.load_test_times(streams)
+        if not test_times:
+            LOG.warning("No test durations found in %s, the tests are "
+                        "scheduled by stestr", ', '.join(streams) or
+                        'the stestr repository')
+            return None
+        test_ids = self._list_test_ids(regex, in_list, ex_list, ex_regex)
+        concurrency = (parsed_args.concurrency or
+                       scheduler.local_concurrency() or 1)
+        class_locks = run_scheduler.find_class_locks(
+            set(run_scheduler.test_class(test_id) for test_id in test_ids))
+        partitions = run_scheduler.schedule(test_ids, concurrency, test_times,
+                                            class_locks)
+        run_scheduler.write_worker_file(parsed_args.timing_worker_file,
+                                        partitions)
+        for index, (duration, classes) in enumerate(partitions):
+            LOG.info("Worker %d: %d test classes, %.0f seconds expected",
+                     index, len(classes), duration)
+        return parsed_args.timing_worker_file
+
+    def _clear_api_metrics(self):
+        """Remove the API call metrics written by the previous runs"""
+        directory = CONF.service_clients.api_metrics_dir
+        if directory:
+            api_metrics.remove_files(directory)
+
+    def _merge_api_metrics(self):
+        """Merge the API call metrics written by the test workers"""
+        directory = CONF.service_clients.api_metrics_dir
+        if not directory:
+            return
+        try:
+            metrics = api_metrics.merge_files(directory)
+        except (OSError, ValueError) as exc:
+            LOG.warning("Cannot merge the API call metrics in %s: %s",
+                        directory, exc)
+            return
+        if metrics is not None:
+            LOG.info("Metrics of %d API calls written to %s",
+                     sum(entry['calls'] for entry in metrics.values()),
+                     os.path.join(directory, api_metrics.SUMMARY_NAME))
+
     def _init_state(self):
         print("Initializing saved state.")
         data = {}
@@ -360,10 +451,31 @@ class TempestRun(command.Command):
                                  'on each newline. This command '
                                  'supports files created by the tempest '
                                  'run ``--list-tests`` command')
-        parser.add_argument('--worker-file', '--worker_file',
+        worker = parser.add_mutually_exclusive_group()
+        worker.add_argument('--worker-file', '--worker_file',
                             help='Optional path to a worker file. This file '
                             'contains each worker configuration to be '
                             'used to schedule the tests run')
+        worker.add_argument('--timing-schedule', dest='timing_schedule',
+                            action='store_true',
+                            help='Schedule the test classes on the workers '
+                                 'by their durations in previous runs, '
+                                 'longest first. Test classes taking the '
+                                 'same lock, or tagged serial, run on the '
+                                 'same worker')
+        parser.add_argument('--timing-history', dest='timing_history',
+                            action='append',
+                            help='Path to a subunit v2 stream of a previous '
+                                 'run to read the test durations from with '
+                                 '--timing-schedule, can be repeated. '
+                                 'Defaults to the last %d runs of the stestr '
+                                 'repository' %
+                                 run_scheduler.DEFAULT_HISTORY_RUNS)
+        parser.add_argument('--timing-worker-file', dest='timing_worker_file',
+                            default='timing_worker_file.yaml',
+                            help='Path of the worker file written with '
+                                 '--timing-schedule, the default is '
+                                 'timing_worker_file.yaml')
         # list only args
         parser.add_argument('--list-tests', '-l', action='store_true',
                             help='List tests',
@@ -0,0 +1,239 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Schedule test classes on workers by their duration in previous runs"""
+
+import ast
+import collections
+import heapq
+import importlib.util
+import os
+import re
+
+from oslo_log import log as logging
+import subunit
+import testtools
+import yaml
+
+LOG = logging.getLogger(__name__)
+
+# Number of runs of the stestr repository used when no stream is given
+DEFAULT_HISTORY_RUNS = 5
+
+# Test attribute of the classes which must not run at the same time as each
+# other, whatever their locks
+SERIAL_ATTR = 'serial'
+
+# Calls taking a lock name as first argument, e.g. LockFixture('name') or
+# lockutils.synchronized('name')
+_LOCK_CALLS = ('LockFixture', 'synchronized', 'lock')
+
+_FINAL_STATUSES = ('success', 'fail', 'skip', 'xfail', 'uxsuccess')
+
+
+def test_class(test_id):
+    """Return the id of the class of a test, without the test attributes"""
+    return test_id.split('[', 1)[0].rsplit('.', 1)[0]
+
+
+def _test_attrs(test_id):
+    if '[' not in test_id:
+        return set()
+    return set(test_id.split('[', 1)[1].rstrip(']').split(','))
+
+
+class _TestTimes(testtools.StreamResult):
+
+    def __init__(self):
+        super(_TestTimes, self).__init__()
+        self.starts = {}
+        self.times = collections.defaultdict(list)
+
+    def status(self, test_id=None, test_status=None, timestamp=None,
+               **kwargs):
+        if not test_id or timestamp is None:
+            return
+        if test_status == 'inprogress':
+            self.starts[test_id] = timestamp
+        elif test_status in _FINAL_STATUSES:
+            start = self.starts.pop(test_id, None)
+            if start is not None:
+                self.times[test_id.split('[', 1)[0]].append(
+                    (timestamp - start).total_seconds())
+
+
+def load_test_times(paths):
+    """Read the durations of the tests in subunit v2 streams
+
+    :param paths: the paths of the subunit v2 streams of previous runs
+    :return: dictionary of the mean duration in seconds of each test, by
+        test id without the test attributes
+    """
+    result = _TestTimes()
+    for path in paths:
+        with open(path, 'rb') as stream:
+            subunit.ByteStreamToStreamResult(stream).run(result)
+    return dict((test_id, sum(times) / len(times))
+                for test_id, times in result.times.items())
+
+
+def repository_streams(repo_path='.stestr', runs=DEFAULT_HISTORY_RUNS):
+    """Return the paths of the subunit streams of the last runs of stestr"""
+    try:
+        run_ids = sorted(int(name) for name in os.listdir(repo_path)
+                         if name.isdigit())
+    except OSError:
+        return []
+    return [os.path.join(repo_path, str(run_id))
+            for run_id in run_ids[-runs:]]
+
+
+def _call_name(node):
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+
+
+def find_class_locks(class_ids):
+    """Find the locks taken by test classes
+
+    The source of the test modules is parsed, without importing them, for
+    calls taking a constant lock name like ``LockFixture('name')`` or
+    ``lockutils.synchronized('name')`` in the body of the classes and of
+    their base classes defined in the same module. Locks taken by base
+    classes defined in other modules are not found.
+
+    :param class_ids: the ids of the test classes, i.e. module.Class
+    :return: dictionary of the set of lock names by class id, for the
+        classes taking locks
+    """
+    by_module = collections.defaultdict(set)
+    for class_id in class_ids:
+        module, _, name = class_id.rpartition('.')
+        by_module[module].add(name)
+    locks = {}
+    for module, names in by_module.items():
+        try:
+            path = importlib.util.find_spec(module).origin
+            with open(path) as source:
+                tree = ast.parse(source.read(), path)
+        except Exception:
+            LOG.debug('Cannot parse the source of %s to find its locks',
+                      module)
+            continue
+        classes = dict((node.name, node) for node in tree.body
+                       if isinstance(node, ast.ClassDef))
+        for name in names & set(classes):
+            class_locks = _class_locks(classes, name, set())
+            if class_locks:
+                locks['%s.%s' % (module, name)] = class_locks
+    return locks
+
+
+def _class_locks(classes, name, seen):
+    seen.add(name)
+    node = classes[name]
+    locks = set(call.args[0].value for call in ast.walk(node)
+                if isinstance(call, ast.Call) and
+                _call_name(call) in _LOCK_CALLS and call.args and
+                isinstance(call.args[0], ast.Constant) and
+                isinstance(call.args[0].value, str))
+    for base in node.bases:
+        if (isinstance(base, ast.Name) and base.id in classes and
+                base.id not in seen):
+            locks |= _class_locks(classes, base.id, seen)
+    return locks
+
+
+def schedule(test_ids, concurrency, test_times, class_locks=None):
+    """Partition test classes on workers, longest first
+
+    The duration of a class is the sum of the durations of its tests in
+    ``test_times``. Classes with no known duration are given the mean
+    duration of the known ones. Classes sharing a lock, or tagged with the
+    ``serial`` attribute, would wait for each other on different workers,
+    so they are scheduled together on the same worker.
+
+    Units of classes are then placed from the longest to the shortest on
+    the worker with the least work so far, which is the longest processing
+    time first approximation of the optimal schedule.
+
+    :param test_ids: the ids of the tests to run
+    :param concurrency: the number of workers
+    :param test_times: dictionary of test durations by test id, see
+        `load_test_times`
+    :param class_locks: dictionary of lock names by class id, see
+        `find_class_locks`
+    :return: a list of ``concurrency`` ``(duration, class_ids)`` tuples
+    """
+    durations = {}
+    unknown = set()
+    locks = collections.defaultdict(set)
+    for class_id, names in (class_locks or {}).items():
+        locks[class_id].update(names)
+    for test_id in test_ids:
+        class_id = test_class(test_id)
+        durations.setdefault(class_id, 0.0)
+        duration = test_times.get(test_id.split('[', 1)[0])
+        if duration is None:
+            unknown.add(class_id)
+        else:
+            durations[class_id] += duration
+        if SERIAL_ATTR in _test_attrs(test_id):
+            locks[class_id].add(SERIAL_ATTR)
+    known = [duration for class_id, duration in durations.items()
+             if class_id not in unknown]
+    default = sum(known) / len(known) if known else 1.0
+    for class_id in unknown:
+        durations[class_id] = max(durations[class_id], default)
+
+    # Group the classes sharing locks, transitively
+    units = dict((class_id, [class_id]) for class_id in durations)
+    lock_owner = {}
+    for class_id in sorted(durations):
+        for lock in sorted(locks.get(class_id, ())):
+            owner = lock_owner.setdefault(lock, class_id)
+            unit, other = units[owner], units[class_id]
+            if unit is not other:
+                unit.extend(other)
+                for member in other:
+                    units[member] = unit
+    unique_units = dict((id(unit), unit) for unit in units.values())
+    ordered = sorted(
+        ((sum(durations[c] for c in unit), sorted(unit))
+         for unit in unique_units.values()),
+        key=lambda item: (-item[0], item[1]))
+
+    workers = [(0.0, index, []) for index in range(concurrency)]
+    for duration, unit in ordered:
+        load, index, classes = heapq.heappop(workers)
+        classes.extend(unit)
+        heapq.heappush(workers, (load + duration, index, classes))
+    return [(load, classes) for load, _, classes in sorted(
+        workers, key=lambda worker: worker[1])]
+
+
+def write_worker_file(path, partitions):
+    """Write the partitions of test classes as a stestr worker file
+
+    :param path: the path of the worker file
+    :param partitions: the partitions as returned by `schedule`
+    """
+    workers = [{'worker': ['^%s\\.' % re.escape(class_id)
+                           for class_id in sorted(classes)]}
+               for _, classes in partitions if classes]
+    with open(path, 'w') as worker_file:
+        yaml.safe_dump(workers, worker_file, default_flow_style=False)
@@ -33,6 +33,15 @@ Runtime Arguments
   data to stdout in the non cliff deprecated CLI
 * ``--all-stdout, -a``: (Optional) Print Request and Response Headers and Body
   data to stdout
+* ``--summary``: (Optional) Print a summary of the calls instead of each call,
+  see below
+* ``--runs``: (Optional) The paths of the subunit v2 streams of several runs,
+  oldest first, to summarize instead of ``--subunit``
+* ``--jobs, -j``: (Optional) The number of processes summarizing the runs,
+  defaults to the number of CPUs
+* ``--regression-threshold``: (Optional) The ratio of the median latency of an
+  API in the last run to its median latency in the previous runs from which it
+  is reported as a regression, defaults to 1.5
 
 
 Usage
@@ -59,6 +68,22 @@ Ports file JSON structure
   }
 
 
+Summary
+^^^^^^^
+
+With ``--summary``, the stream is processed as it is read, keeping only the
+statistics of the calls rather than the logs of the tests, so that large
+streams are summarized quickly and in bounded memory. Only subunit v2 streams
+are supported. The calls are grouped by service, HTTP verb and URL template,
+i.e. the path of the URL with the ids and the random names replaced by
+placeholders, and three tables are printed: the calls and latency percentiles
+by API, by service and the calls by test. With ``--runs``, the runs are
+summarized in parallel, the tables show all the runs together, and the APIs
+whose median latency in the last run is at least ``--regression-threshold``
+times their median latency in the previous runs are listed. The summary is
+written as JSON to ``--output-file`` when given, with the rows of each table
+as lists of values under the ``columns`` of the table.
+
 Output file JSON structure
 ^^^^^^^^^^^^^^^^^^^^^^^^^^
 ::
@@ -81,7 +106,9 @@ Output file JSON structure
 """
 import argparse
 import collections
+from concurrent import futures
 import io
+import math
 import os
 import re
 import sys
@@ -92,6 +119,8 @@ from oslo_serialization import jsonutils as json
 import subunit
 import testtools
 
+from tempest.lib.common import api_metrics
+
 
 DESCRIPTION = "Outputs all HTTP calls a given test made that were logged."
 
@@ -252,6 +281,261 @@ class FileAccumulator(testtools.StreamResult):
         stream.write(file_bytes)
 
 
+class LatencyHistogram(object):
+    """Latencies in buckets growing by ``GROWTH``, for bounded memory
+
+    The percentiles are the upper bound of their bucket, i.e. they are at
+    most ``GROWTH - 1`` too large, and never more than the maximum.
+    """
+
+    GROWTH = 1.02
+
+    def __init__(self):
+        self.buckets = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        # 1 ms resolution, which is the resolution of the logs
+        self.buckets[math.floor(math.log(max(seconds, 0.001),
+                                         self.GROWTH))] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        rank = self.count * percent / 100.0
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.GROWTH ** (bucket + 1), self.max)
+        return self.max
+
+
+class CallStats(testtools.StreamResult):
+    """Statistics of the API calls logged in a subunit v2 stream
+
+    The log attachments are parsed as their packets are read, only the last
+    incomplete line of the logs of each test is kept between packets.
+
+    :param services: the names of the services by port, see `UrlParser`
+    :param non_subunit_name: the name of the log attachments
+    """
+
+    call_re = re.compile(
+        br'Request \((?P<name>[^)\n]*)\): (?P<code>\d{3}) (?P<verb>\w+) '
+        br'(?P<url>[^ \n]+)(?: (?P<secs>[\d.]+)s)?')
+
+    def __init__(self, services=None, non_subunit_name='pythonlogging'):
+        super(CallStats, self).__init__()
+        self.non_subunit_name = non_subunit_name
+        self.url_parser = UrlParser(services)
+        self.apis = collections.defaultdict(LatencyHistogram)
+        self.errors = collections.Counter()
+        self.tests = collections.defaultdict(lambda: [0, 0.0])
+        self._services = {}
+        self._partial = {}
+
+    def status(self, test_id=None, file_name=None, file_bytes=None,
+               eof=False, **kwargs):
+        if file_name != self.non_subunit_name:
+            return
+        data = self._partial.pop((test_id, file_name), b'')
+        if file_bytes:
+            data += bytes(file_bytes)
+        if not eof:
+            end = data.rfind(b'\n') + 1
+            if end < len(data):
+                self._partial[(test_id, file_name)] = data[end:]
+            data = data[:end]
+        for match in self.call_re.finditer(data):
+            self._add_call(test_id, match)
+
+    def stopTestRun(self):
+        super(CallStats, self).stopTestRun()
+        # The logs of tests interrupted before their last newline
+        for (test_id, file_name) in list(self._partial):
+            self.status(test_id=test_id, file_name=file_name, eof=True)
+
+    def _add_call(self, test_id, match):
+        url = match.group('url').decode('utf-8', 'replace')
+        port = url.split('/', 3)[2].rpartition(':')[2] if '//' in url else ''
+        service = self._services.get(port)
+        if service is None:
+            service = self._services[port] = self.url_parser.get_service(url)
+        key = (service, match.group('verb').decode('ascii'),
+               api_metrics.url_template(url))
+        seconds = float(match.group('secs') or 0)
+        self.apis[key].add(seconds)
+        if int(match.group('code')) >= 400:
+            self.errors[key] += 1
+        test = self.tests[test_id or match.group('name').decode(
+            'utf-8', 'replace')]
+        test[0] += 1
+        test[1] += seconds
+
+    def merge(self, other):
+        for key, histogram in other.apis.items():
+            self.apis[key].merge(histogram)
+        self.errors.update(other.errors)
+        for test_id, (calls, seconds) in other.tests.items():
+            test = self.tests[test_id]
+            test[0] += calls
+            test[1] += seconds
+
+    def __getstate__(self):
+        # Sent back by the processes summarizing the runs
+        return {'non_subunit_name': self.non_subunit_name,
+                'services': self.url_parser.services,
+                'apis': dict(self.apis), 'errors': self.errors,
+                'tests': dict(self.tests)}
+
+    def __setstate__(self, state):
+        self.__init__(state['services'], state['non_subunit_name'])
+        self.apis.update(state['apis'])
+        self.errors.update(state['errors'])
+        self.tests.update(state['tests'])
+
+
+def call_stats(path, services=None, non_subunit_name='pythonlogging'):
+    """Return the `CallStats` of the subunit v2 stream of a file or stdin"""
+    stats = CallStats(services, non_subunit_name)
+    stream = open(path, 'rb') if isinstance(path, str) else path
+    try:
+        stats.startTestRun()
+        subunit.ByteStreamToStreamResult(
+            stream, non_subunit_name=non_subunit_name).run(stats)
+        stats.stopTestRun()
+    finally:
+        if stream is not path:
+            stream.close()
+    return stats
+
+
+def summarize_runs(paths, services=None, non_subunit_name='pythonlogging',
+                   jobs=None):
+    """Return the `CallStats` of several runs, in parallel processes
+
+    :param paths: the paths of the subunit v2 streams of the runs
+    :param jobs: the number of processes, by default the number of CPUs
+    :return: the `CallStats` of each run, in the order of the paths
+    """
+    if len(paths) == 1 or jobs == 1:
+        return [call_stats(path, services, non_subunit_name)
+                for path in paths]
+    with futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(call_stats, paths,
+                             [services] * len(paths),
+                             [non_subunit_name] * len(paths)))
+
+
+_TEXT_COLUMNS = ('service', 'verb', 'url', 'test')
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000)
+
+
+def summary(runs, regression_threshold=1.5):
+    """Return the summary tables of the calls of one or several runs
+
+    :param runs: the `CallStats` of the runs, oldest first
+    :param regression_threshold: see the ``--regression-threshold`` option
+    :return: dictionary of tables, each with its ``columns`` and ``rows``
+    """
+    total = CallStats()
+    for stats in runs:
+        total.merge(stats)
+    percentiles = ['p50_ms', 'p90_ms', 'p99_ms', 'max_ms']
+
+    def latencies(histogram):
+        return [_ms(histogram.percentile(50)), _ms(histogram.percentile(90)),
+                _ms(histogram.percentile(99)), _ms(histogram.max)]
+
+    apis = sorted(total.apis.items(), key=lambda item: -item[1].total)
+    by_service = collections.defaultdict(LatencyHistogram)
+    service_errors = collections.Counter()
+    for key, histogram in apis:
+        by_service[key[0]].merge(histogram)
+        service_errors[key[0]] += total.errors[key]
+    tables = {
+        'apis': {
+            'columns': ['service', 'verb', 'url', 'calls', 'errors',
+                        'total_s'] + percentiles,
+            'rows': [list(key) + [histogram.count, total.errors[key],
+                                  round(histogram.total, 3)] +
+                     latencies(histogram) for key, histogram in apis]},
+        'services': {
+            'columns': ['service', 'calls', 'errors', 'total_s'] +
+            percentiles,
+            'rows': [[service, histogram.count, service_errors[service],
+                      round(histogram.total, 3)] + latencies(histogram)
+                     for service, histogram in sorted(
+                         by_service.items(),
+                         key=lambda item: -item[1].total)]},
+        'tests': {
+            'columns': ['test', 'calls', 'total_s'],
+            'rows': [[test_id, calls, round(seconds, 3)]
+                     for test_id, (calls, seconds) in sorted(
+                         total.tests.items(),
+                         key=lambda item: (-item[1][0], item[0]))]},
+    }
+    if len(runs) > 1:
+        previous = CallStats()
+        for stats in runs[:-1]:
+            previous.merge(stats)
+        rows = []
+        for key, histogram in runs[-1].apis.items():
+            before = previous.apis.get(key)
+            if before is None:
+                continue
+            last_p50 = histogram.percentile(50)
+            before_p50 = before.percentile(50)
+            if before_p50 and last_p50 >= before_p50 * regression_threshold:
+                rows.append(list(key) + [
+                    _ms(before_p50), _ms(last_p50),
+                    round(last_p50 / before_p50, 2)])
+        tables['regressions'] = {
+            'columns': ['service', 'verb', 'url', 'previous_p50_ms',
+                        'last_p50_ms', 'ratio'],
+            'rows': sorted(rows, key=lambda row: -row[-1])}
+    return tables
+
+
+def output_summary(tables, output_file=None):
+    if output_file is not None:
+        with open(output_file, 'w') as outfile:
+            outfile.write(json.dumps(tables))
+        return
+    for name in ('apis', 'services', 'tests', 'regressions'):
+        if name not in tables:
+            continue
+        columns = tables[name]['columns']
+        cells = [columns] + [['-' if value is None else str(value)
+                              for value in row]
+                             for row in tables[name]['rows']]
+        widths = [max(len(row[index]) for row in cells)
+                  for index in range(len(columns))]
+        for row in cells:
+            # Names on the left, numbers on the right
+            sys.stdout.write('  '.join(
+                value.ljust(width) if column in _TEXT_COLUMNS else
+                value.rjust(width)
+                for column, value, width in zip(columns, row, widths))
+                .rstrip() + '\n')
+        sys.stdout.write('\n')
+
+
 class ArgumentParser(argparse.ArgumentParser):
 
     def __init__(self):
@@ -261,9 +545,15 @@ class ArgumentParser(argparse.ArgumentParser):
         _parser_add_args(self)
 
 
-def parse(stream, non_subunit_name, ports):
+def _load_ports(ports):
     if ports is not None and os.path.exists(ports):
-        ports = json.loads(open(ports).read())
+        with open(ports) as ports_file:
+            ports = json.loads(ports_file.read())
+    return ports
+
+
+def parse(stream, non_subunit_name, ports):
+    ports = _load_ports(ports)
 
     url_parser = UrlParser(ports)
     suite = subunit.ByteStreamToStreamResult(
@@ -318,6 +608,17 @@ def entry_point(cl_args=None):
         print("Use of: 'subunit-describe-calls' is deprecated, "
               "please use: 'tempest subunit-describe-calls'")
         cl_args = ArgumentParser().parse_args()
+    if cl_args.summary or cl_args.runs:
+        ports = _load_ports(cl_args.ports)
+        if cl_args.runs:
+            runs = summarize_runs(cl_args.runs, ports,
+                                  cl_args.non_subunit_name, cl_args.jobs)
+        else:
+            runs = [call_stats(cl_args.subunit, ports,
+                               cl_args.non_subunit_name)]
+        output_summary(summary(runs, cl_args.regression_threshold),
+                       cl_args.output_file)
+        return
     parser = parse(cl_args.subunit, cl_args.non_subunit_name, cl_args.ports)
     output(parser, cl_args.output_file, cl_args.all_stdout)
 
@@ -364,6 +665,32 @@ def _parser_add_args(parser):
              " tempest subunit-describe-calls CLI commands."
     )
 
+    parser.add_argument(
+        "--summary", action='store_true',
+        help="Print the number of calls and their latency percentiles by "
+             "API, by service and by test instead of each call."
+    )
+
+    parser.add_argument(
+        "--runs", metavar="<subunit file>", nargs="+", default=None,
+        help="Summarize the subunit v2 streams of several runs, oldest "
+             "first, and list the APIs slower in the last run."
+    )
+
+    parser.add_argument(
+        "-j", "--jobs", metavar="<jobs>", type=int, default=None,
+        help="The number of processes summarizing the runs, defaults to "
+             "the number of CPUs."
+    )
+
+    parser.add_argument(
+        "--regression-threshold", metavar="<ratio>", type=float,
+        default=1.5,
+        help="The ratio of the median latency of an API in the last run to "
+             "its median latency in the previous runs from which it is "
+             "listed as a regression."
+    )
+
 
 class TempestSubunitDescribeCalls(Command):
 
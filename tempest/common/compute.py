@@ -309,9 +309,15 @@ def create_test_server(clients, validatable=False, validation_resources=None,
 
         for server in servers:
             try:
-                waiters.wait_for_server_status(
-                    clients.servers_client, server['id'], wait_until,
-                    request_id=request_id)
+                if len(servers) == 1:
+                    waiters.wait_for_server_status(
+                        clients.servers_client, server['id'], wait_until,
+                        request_id=request_id)
+                elif server is servers[0]:
+                    # Poll all the servers with one list call per interval
+                    waiters.wait_for_servers_status(
+                        clients.servers_client, [s['id'] for s in servers],
+                        wait_until, request_id=request_id)
                 if CONF.validation.run_validation and validatable:
                     if CONF.validation.connect_method == 'floating':
                         _setup_validation_fip(
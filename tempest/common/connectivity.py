@@ -0,0 +1,157 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Check the connectivity of many pairs of hosts at the same time"""
+
+from concurrent import futures
+import subprocess
+import time
+
+from oslo_log import log as logging
+
+from tempest.common.utils import net_utils
+from tempest.lib import exceptions as lib_exc
+
+LOG = logging.getLogger(__name__)
+
+# The source of the probes run from the host running tempest
+LOCAL_SOURCE = 'localhost'
+
+
+class ConnectivityResult(object):
+    """Result of the connectivity checks of a (source, dest, protocol) pair
+
+    :ivar succeeded: whether the expected result was observed before the
+        deadline
+    :ivar attempts: the number of probes run
+    :ivar latency: the time in seconds taken by the last probe
+    :ivar first_success: the time in seconds from the start of the checks of
+        the matrix to the first probe with the expected result, None if
+        there was none
+    """
+
+    def __init__(self):
+        self.succeeded = False
+        self.attempts = 0
+        self.latency = None
+        self.first_success = None
+
+    def __repr__(self):
+        return ('<ConnectivityResult succeeded=%s attempts=%d latency=%s '
+                'first_success=%s>' % (self.succeeded, self.attempts,
+                                       self.latency, self.first_success))
+
+
+def remote_probe(source, dest, protocol='icmp', should_succeed=True,
+                 nic=None):
+    """Return a probe checking the connectivity of dest from a server
+
+    :param source: the RemoteClient of the server running the check
+    :param dest: the IP address to check
+    :param protocol: 'icmp', 'tcp' or 'udp', see the ``<protocol>_check``
+        methods of the RemoteClient
+    :param should_succeed: whether dest should be reachable
+    :param nic: the network interface of the server to check from
+    :return: a callable returning True when the expected result is observed
+    """
+    checker = getattr(source, '%s_check' % protocol)
+
+    def probe():
+        try:
+            checker(dest, nic=nic)
+        except lib_exc.SSHExecCommandFailed:
+            LOG.warning('Failed to check %(protocol)s connectivity for IP '
+                        '%(dest)s via a ssh connection from: %(src)s.',
+                        dict(protocol=protocol, dest=dest,
+                             src=source.ssh_client.host))
+            return not should_succeed
+        return should_succeed
+    return probe
+
+
+def local_ping_probe(dest, should_succeed=True, mtu=None):
+    """Return a probe pinging dest from the host running tempest
+
+    :param dest: the IP address to ping
+    :param should_succeed: whether dest should be reachable
+    :param mtu: network MTU to check, the packets are not fragmented
+    :return: a callable returning True when the expected result is observed
+    """
+    cmd = ['ping', '-c1', '-w1']
+    if mtu:
+        cmd += ['-M', 'do',
+                '-s', str(net_utils.get_ping_payload_size(mtu, 4))]
+    cmd.append(dest)
+
+    def probe():
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE)
+        proc.communicate()
+        return (proc.returncode == 0) == should_succeed
+    return probe
+
+
+def probe_matrix(probes, timeout, interval=1, max_workers=8):
+    """Run connectivity probes concurrently until they pass or time out
+
+    Each probe is run again every ``interval`` seconds until it returns
+    True, by a pool of ``max_workers`` threads. The probes share a deadline
+    of ``timeout`` seconds from the start of the matrix rather than having a
+    timeout each, so the checks of N pairs take at most about ``timeout``
+    seconds instead of N times ``timeout``. Each probe is run at least once,
+    even when it is started by the pool after the deadline.
+
+    The exceptions raised by the probes are raised again once all the
+    probes have completed.
+
+    :param probes: dictionary of probes by key, e.g. the
+        (source, dest, protocol) tuple, each returning True when the
+        expected result is observed, see `remote_probe`
+    :param timeout: the time in seconds given to the probes to pass
+    :param interval: the time in seconds to wait between two runs of a probe
+    :param max_workers: the number of probes run at the same time
+    :return: dictionary of the `ConnectivityResult` of the probes by key
+    """
+    start = time.time()
+    deadline = start + timeout
+
+    def run(key, probe, result):
+        while True:
+            result.attempts += 1
+            probe_start = time.time()
+            passed = probe()
+            now = time.time()
+            result.latency = now - probe_start
+            if passed:
+                result.succeeded = True
+                result.first_success = now - start
+                LOG.debug('Connectivity check %s passed in %.1f seconds, '
+                          'after %d attempts', key, result.first_success,
+                          result.attempts)
+                return result
+            if now + interval >= deadline:
+                LOG.debug('Connectivity check %s failed %d times',
+                          key, result.attempts)
+                return result
+            time.sleep(interval)
+
+    results = dict((key, ConnectivityResult()) for key in probes)
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = [executor.submit(run, key, probe, results[key])
+                   for key, probe in probes.items()]
+    for future in running:
+        # Raise the first exception of a probe, if any
+        future.result()
+    return results
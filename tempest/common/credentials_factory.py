@@ -11,6 +11,9 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import atexit
+import threading
+
 from oslo_concurrency import lockutils
 
 from tempest import clients
@@ -111,6 +114,47 @@ def get_preprov_provider_params(identity_version):
     ]))
 
 
+# Process wide pools of dynamic credentials, by identity version
+_credential_pools = {}
+_credential_pools_lock = threading.Lock()
+
+
+def get_credential_pool(identity_version):
+    """Return the pool of dynamic credentials for an identity version
+
+    The pool is created and starts provisioning credentials on first use,
+    and it is closed when the process exits.
+
+    :param identity_version: 'v2' or 'v3'
+    :return: A `DynamicCredentialPool`, or None if the pool is disabled
+    """
+    if (not CONF.auth.use_dynamic_credentials or
+            not CONF.auth.dynamic_credentials_pool_size):
+        return None
+    with _credential_pools_lock:
+        pool = _credential_pools.get(identity_version)
+        if not pool:
+            provider = dynamic_creds.DynamicCredentialProvider(
+                name='CredentialPool',
+                **get_dynamic_provider_params(identity_version))
+            pool = dynamic_creds.DynamicCredentialPool(
+                provider, CONF.auth.dynamic_credentials_pool_size,
+                acquire_timeout=CONF.auth.dynamic_credentials_pool_timeout)
+            _credential_pools[identity_version] = pool
+            pool.start()
+        return pool
+
+
+@atexit.register
+def close_credential_pools():
+    """Delete all the pooled dynamic credentials"""
+    with _credential_pools_lock:
+        pools = list(_credential_pools.values())
+        _credential_pools.clear()
+    for pool in pools:
+        pool.close()
+
+
 def get_credentials_provider(name, network_resources=None,
                              force_tenant_isolation=False,
                              identity_version=None):
@@ -135,9 +179,14 @@ def get_credentials_provider(name, network_resources=None,
     # the test should be skipped else it would fail.
     identity_version = identity_version or CONF.identity.auth_version
     if CONF.auth.use_dynamic_credentials or force_tenant_isolation:
+        # Pooled credentials come with the default network resources
+        credential_pool = None
+        if not network_resources:
+            credential_pool = get_credential_pool(identity_version)
         return dynamic_creds.DynamicCredentialProvider(
             name=name,
             network_resources=network_resources,
+            credential_pool=credential_pool,
             **get_dynamic_provider_params(identity_version))
     else:
         if CONF.auth.test_accounts_file:
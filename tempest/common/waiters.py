@@ -19,6 +19,7 @@ from oslo_log import log as logging
 from tempest.common import image as common_image
 from tempest import config
 from tempest import exceptions
+from tempest.lib.common import poller as lib_poller
 from tempest.lib.common.utils import test_utils
 from tempest.lib import exceptions as lib_exc
 from tempest.lib.services.image.v1 import images_client as images_v1_client
@@ -31,6 +32,32 @@ def _get_task_state(body):
     return body.get('OS-EXT-STS:task_state', None)
 
 
+def _server_reached_status(body, status, ready_wait):
+    server_status = body['status']
+    # NOTE(afazekas): Now the BUILD status only reached
+    # between the UNKNOWN->ACTIVE transition.
+    # TODO(afazekas): enumerate and validate the stable status set
+    if status == 'BUILD' and server_status != 'UNKNOWN':
+        return True
+    if server_status != status:
+        return False
+    # NOTE(afazekas): The instance is in "ready for action state"
+    # when no task in progress
+    return not ready_wait or _get_task_state(body) is None
+
+
+def _log_server_transition(server_id, old_body, body, start_time):
+    old_task_state = _get_task_state(old_body)
+    task_state = _get_task_state(body)
+    if (body['status'] != old_body['status'] or
+            task_state != old_task_state):
+        LOG.info('Server %s state transition "%s" ==> "%s" after %d second '
+                 'wait', server_id,
+                 '/'.join((old_body['status'], str(old_task_state))),
+                 '/'.join((body['status'], str(task_state))),
+                 time.time() - start_time)
+
+
 # NOTE(afazekas): This function needs to know a token and a subject.
 def wait_for_server_status(client, server_id, status, ready_wait=True,
                            extra_timeout=0, raise_on_error=True,
@@ -39,40 +66,22 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
 
     # NOTE(afazekas): UNKNOWN status possible on ERROR
     # or in a very early stage.
-    body = client.show_server(server_id)['server']
-    old_status = server_status = body['status']
-    old_task_state = task_state = _get_task_state(body)
-    start_time = int(time.time())
-    timeout = client.build_timeout + extra_timeout
-    while True:
-        # NOTE(afazekas): Now the BUILD status only reached
-        # between the UNKNOWN->ACTIVE transition.
-        # TODO(afazekas): enumerate and validate the stable status set
-        if status == 'BUILD' and server_status != 'UNKNOWN':
-            return
-        if server_status == status:
-            if ready_wait:
-                if status == 'BUILD':
-                    return
-                # NOTE(afazekas): The instance is in "ready for action state"
-                # when no task in progress
-                if task_state is None:
-                    # without state api extension 3 sec usually enough
-                    time.sleep(CONF.compute.ready_wait)
-                    return
-            else:
-                return
-
-        time.sleep(client.build_interval)
+    poller = lib_poller.Poller('server', client=client,
+                               extra_timeout=extra_timeout)
+    body = None
+    for _ in poller:
+        old_body = body
         body = client.show_server(server_id)['server']
-        server_status = body['status']
-        task_state = _get_task_state(body)
-        if (server_status != old_status) or (task_state != old_task_state):
-            LOG.info('State transition "%s" ==> "%s" after %d second wait',
-                     '/'.join((old_status, str(old_task_state))),
-                     '/'.join((server_status, str(task_state))),
-                     time.time() - start_time)
-        if (server_status == 'ERROR') and raise_on_error:
+        if old_body:
+            _log_server_transition(server_id, old_body, body,
+                                   poller.start_time)
+        if _server_reached_status(body, status, ready_wait):
+            poller.settled()
+            if ready_wait and status != 'BUILD':
+                # without state api extension 3 sec usually enough
+                time.sleep(CONF.compute.ready_wait)
+            return
+        if (body['status'] == 'ERROR') and raise_on_error:
             details = ''
             if 'fault' in body:
                 details += 'Fault: %s.' % body['fault']
@@ -80,51 +89,131 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
                 details += ' Server boot request ID: %s.' % request_id
             raise exceptions.BuildErrorException(details, server_id=server_id)
 
-        timed_out = int(time.time()) - start_time >= timeout
-
-        if timed_out:
-            expected_task_state = 'None' if ready_wait else 'n/a'
-            message = ('Server %(server_id)s failed to reach %(status)s '
-                       'status and task state "%(expected_task_state)s" '
-                       'within the required time (%(timeout)s s).' %
-                       {'server_id': server_id,
-                        'status': status,
-                        'expected_task_state': expected_task_state,
-                        'timeout': timeout})
-            if request_id:
-                message += ' Server boot request ID: %s.' % request_id
-            message += ' Current status: %s.' % server_status
-            message += ' Current task state: %s.' % task_state
-            caller = test_utils.find_test_caller()
-            if caller:
-                message = '(%s) %s' % (caller, message)
-            raise lib_exc.TimeoutException(message)
-        old_status = server_status
-        old_task_state = task_state
+    expected_task_state = 'None' if ready_wait else 'n/a'
+    message = ('Server %(server_id)s failed to reach %(status)s '
+               'status and task state "%(expected_task_state)s" '
+               'within the required time (%(timeout)s s).' %
+               {'server_id': server_id,
+                'status': status,
+                'expected_task_state': expected_task_state,
+                'timeout': poller.timeout})
+    if request_id:
+        message += ' Server boot request ID: %s.' % request_id
+    message += ' Current status: %s.' % body['status']
+    message += ' Current task state: %s.' % _get_task_state(body)
+    caller = test_utils.find_test_caller()
+    if caller:
+        message = '(%s) %s' % (caller, message)
+    raise lib_exc.TimeoutException(message)
+
+
+def wait_for_servers_status(client, server_ids, status, ready_wait=True,
+                            extra_timeout=0, raise_on_error=True,
+                            request_id=None):
+    """Waits for a set of servers to reach a given status.
+
+    This is the batched version of `wait_for_server_status`: instead of
+    polling each server with `show_server`, all the servers are polled with
+    one `list_servers` call per build interval. After the first call only
+    the servers changed since the previous one are listed, using the
+    `changes-since` filter. Servers which cannot be found in the listing,
+    e.g. because they belong to another project, are polled individually.
+
+    The error and timeout semantics are the ones of `wait_for_server_status`
+    for each of the servers.
+
+    :param client: Compute servers client
+    :param server_ids: IDs of the servers to wait for
+    :param status: Server status to wait for
+    :returns: dict of the last server details by server ID
+    """
+    pending = set(server_ids)
+    servers = {}
+    unlisted = None
+    poller = lib_poller.Poller('server', client=client,
+                               extra_timeout=extra_timeout)
+    changes_since = None
+    for _ in poller:
+        params = {}
+        if changes_since:
+            params['changes-since'] = changes_since
+        listed = client.list_servers(detail=True, **params)['servers']
+        for body in listed:
+            # NOTE: the anchor for changes-since comes from the server side
+            # timestamps, so that the clock of the test node does not matter
+            if body.get('updated') and (not changes_since or
+                                        body['updated'] > changes_since):
+                changes_since = body['updated']
+        listed = dict((body['id'], body) for body in listed
+                      if body['id'] in pending)
+        if unlisted is None:
+            unlisted = pending - set(listed)
+        for server_id in unlisted & pending:
+            listed[server_id] = client.show_server(server_id)['server']
+
+        for server_id, body in listed.items():
+            if server_id in servers:
+                _log_server_transition(server_id, servers[server_id], body,
+                                       poller.start_time)
+            servers[server_id] = body
+            if _server_reached_status(body, status, ready_wait):
+                pending.discard(server_id)
+                continue
+            if body['status'] == 'DELETED':
+                raise lib_exc.NotFound('Server %s was deleted while '
+                                       'waiting for it to reach %s status' %
+                                       (server_id, status))
+            if body['status'] == 'ERROR' and raise_on_error:
+                details = ''
+                if 'fault' in body:
+                    details += 'Fault: %s.' % body['fault']
+                if request_id:
+                    details += ' Server boot request ID: %s.' % request_id
+                raise exceptions.BuildErrorException(details,
+                                                     server_id=server_id)
+
+        if not pending:
+            poller.settled()
+            if ready_wait and status != 'BUILD':
+                # without state api extension 3 sec usually enough
+                time.sleep(CONF.compute.ready_wait)
+            return servers
+
+    expected_task_state = 'None' if ready_wait else 'n/a'
+    message = ('Servers %(server_ids)s failed to reach %(status)s '
+               'status and task state "%(expected_task_state)s" '
+               'within the required time (%(timeout)s s).' %
+               {'server_ids': ', '.join(sorted(pending)),
+                'status': status,
+                'expected_task_state': expected_task_state,
+                'timeout': poller.timeout})
+    if request_id:
+        message += ' Server boot request ID: %s.' % request_id
+    for server_id in sorted(pending):
+        body = servers[server_id]
+        message += (' Server %s current status: %s, task state: %s.' %
+                    (server_id, body['status'], _get_task_state(body)))
+    caller = test_utils.find_test_caller()
+    if caller:
+        message = '(%s) %s' % (caller, message)
+    raise lib_exc.TimeoutException(message)
 
 
 def wait_for_server_termination(client, server_id, ignore_error=False):
     """Waits for server to reach termination."""
-    try:
-        body = client.show_server(server_id)['server']
-    except lib_exc.NotFound:
-        return
-    old_status = body['status']
-    old_task_state = _get_task_state(body)
-    start_time = int(time.time())
-    while True:
-        time.sleep(client.build_interval)
+    poller = lib_poller.Poller('server_termination', client=client)
+    body = None
+    for _ in poller:
+        old_body = body
         try:
             body = client.show_server(server_id)['server']
         except lib_exc.NotFound:
+            poller.settled()
             return
+        if old_body:
+            _log_server_transition(server_id, old_body, body,
+                                   poller.start_time)
         server_status = body['status']
-        task_state = _get_task_state(body)
-        if (server_status != old_status) or (task_state != old_task_state):
-            LOG.info('State transition "%s" ==> "%s" after %d second wait',
-                     '/'.join((old_status, str(old_task_state))),
-                     '/'.join((server_status, str(task_state))),
-                     time.time() - start_time)
         if server_status == 'ERROR' and not ignore_error:
             raise lib_exc.DeleteErrorException(
                 "Server %s failed to delete and is in ERROR status" %
@@ -140,12 +229,10 @@ def wait_for_server_termination(client, server_id, ignore_error=False):
             except lib_exc.NotFound:
                 # The instance may have been deleted so ignore
                 # NotFound exception
+                poller.settled()
                 return
 
-        if int(time.time()) - start_time >= client.build_timeout:
-            raise lib_exc.TimeoutException
-        old_status = server_status
-        old_task_state = task_state
+    raise lib_exc.TimeoutException
 
 
 def wait_for_image_status(client, image_id, status):
@@ -167,8 +254,8 @@ def wait_for_image_status(client, image_id, status):
         show_image = client.show_image
 
     current_status = 'An unknown status'
-    start = int(time.time())
-    while int(time.time()) - start < client.build_timeout:
+    poller = lib_poller.Poller('image', client=client)
+    for _ in poller:
         image = show_image(image_id)
         # Compute image client returns response wrapped in 'image' element
         # which is not the case with Glance image client.
@@ -177,6 +264,7 @@ def wait_for_image_status(client, image_id, status):
 
         current_status = image['status']
         if current_status == status:
+            poller.settled()
             return
         if current_status.lower() == 'killed':
             raise exceptions.ImageKilledException(image_id=image_id,
@@ -184,8 +272,6 @@ def wait_for_image_status(client, image_id, status):
         if current_status.lower() == 'error':
             raise exceptions.AddImageException(image_id=image_id)
 
-        time.sleep(client.build_interval)
-
     message = ('Image %(image_id)s failed to reach %(status)s state '
                '(current state %(current_status)s) within the required '
                'time (%(timeout)s s).' % {'image_id': image_id,
@@ -201,14 +287,14 @@ def wait_for_image_status(client, image_id, status):
 def wait_for_image_tasks_status(client, image_id, status):
     """Waits for an image tasks to reach a given status."""
     pending_tasks = []
-    start = int(time.time())
-    while int(time.time()) - start < client.build_timeout:
+    poller = lib_poller.Poller('image_tasks', client=client)
+    for _ in poller:
         tasks = client.show_image_tasks(image_id)['tasks']
 
         pending_tasks = [task for task in tasks if task['status'] != status]
         if not pending_tasks:
+            poller.settled()
             return tasks
-        time.sleep(client.build_interval)
 
     message = ('Image %(image_id)s tasks: %(pending_tasks)s '
                'failed to reach %(status)s state within the required '
@@ -232,18 +318,17 @@ def wait_for_image_imported_to_stores(client, image_id, stores=None):
     """
 
     exc_cls = lib_exc.TimeoutException
-    start = int(time.time())
-    while int(time.time()) - start < client.build_timeout:
+    poller = lib_poller.Poller('image_import', client=client)
+    for _ in poller:
         image = client.show_image(image_id)
         if image['status'] == 'active' and (stores is None or
                                             image['stores'] == stores):
+            poller.settled()
             return
         if image.get('os_glance_failed_import'):
             exc_cls = lib_exc.OtherRestClientException
             break
 
-        time.sleep(client.build_interval)
-
     message = ('Image %s failed to import on stores: %s' %
                (image_id, str(image.get('os_glance_failed_import'))))
     caller = test_utils.find_test_caller()
@@ -259,22 +344,21 @@ def wait_for_image_copied_to_stores(client, image_id):
     This return the list of stores where copy is failed.
     """
 
-    start = int(time.time())
     store_left = []
-    while int(time.time()) - start < client.build_timeout:
+    poller = lib_poller.Poller('image_copy', client=client)
+    for _ in poller:
         image = client.show_image(image_id)
         store_left = image.get('os_glance_importing_to_stores')
         # NOTE(danms): If os_glance_importing_to_stores is None, then
         # we've raced with the startup of the task and should continue
         # to wait.
         if store_left is not None and not store_left:
+            poller.settled()
             return image['os_glance_failed_import']
         if image['status'].lower() == 'killed':
             raise exceptions.ImageKilledException(image_id=image_id,
                                                   status=image['status'])
 
-        time.sleep(client.build_interval)
-
     message = ('Image %s failed to finish the copy operation '
                'on stores: %s' % (image_id, str(store_left)))
     caller = test_utils.find_test_caller()
@@ -294,64 +378,65 @@ def wait_for_volume_resource_status(client, resource_id, status):
         r'(volume|group-snapshot|snapshot|backup|group)',
         client.resource_type)[-1].replace('-', '_')
     show_resource = getattr(client, 'show_' + resource_name)
-    resource_status = show_resource(resource_id)[resource_name]['status']
-    start = int(time.time())
-
-    while resource_status != status:
-        time.sleep(client.build_interval)
-        resource_status = show_resource(resource_id)[
-            '{}'.format(resource_name)]['status']
-        if resource_status == 'error' and resource_status != status:
+    poller = lib_poller.Poller(resource_name, client=client)
+    for _ in poller:
+        resource_status = show_resource(resource_id)[resource_name]['status']
+        if resource_status == status:
+            poller.settled()
+            LOG.info('%s %s reached %s after waiting for %f seconds',
+                     resource_name, resource_id, status,
+                     time.time() - poller.start_time)
+            return
+        if resource_status == 'error':
             raise exceptions.VolumeResourceBuildErrorException(
                 resource_name=resource_name, resource_id=resource_id)
         if resource_name == 'volume' and resource_status == 'error_restoring':
             raise exceptions.VolumeRestoreErrorException(volume_id=resource_id)
-        if resource_status == 'error_extending' and resource_status != status:
+        if resource_status == 'error_extending':
             raise exceptions.VolumeExtendErrorException(volume_id=resource_id)
 
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('%s %s failed to reach %s status (current %s) '
-                       'within the required time (%s s).' %
-                       (resource_name, resource_id, status, resource_status,
-                        client.build_timeout))
-            raise lib_exc.TimeoutException(message)
-    LOG.info('%s %s reached %s after waiting for %f seconds',
-             resource_name, resource_id, status, time.time() - start)
+    message = ('%s %s failed to reach %s status (current %s) '
+               'within the required time (%s s).' %
+               (resource_name, resource_id, status, resource_status,
+                client.build_timeout))
+    raise lib_exc.TimeoutException(message)
 
 
 def wait_for_volume_attachment_create(client, volume_id, server_id):
     """Waits for a volume attachment to be created at a given volume."""
-    start = int(time.time())
-    while True:
+    poller = lib_poller.Poller('volume_attachment_create',
+                               client=client)
+    for _ in poller:
         attachments = client.show_volume(volume_id)['volume']['attachments']
         found = [a for a in attachments if a['server_id'] == server_id]
         if found:
+            poller.settled()
             LOG.info('Attachment %s created for volume %s to server %s after '
                      'waiting for %f seconds', found[0]['attachment_id'],
-                     volume_id, server_id, time.time() - start)
+                     volume_id, server_id, time.time() - poller.start_time)
             return found[0]
-        time.sleep(client.build_interval)
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Failed to attach volume %s to server %s '
-                       'within the required time (%s s).' %
-                       (volume_id, server_id, client.build_timeout))
-            raise lib_exc.TimeoutException(message)
+    message = ('Failed to attach volume %s to server %s '
+               'within the required time (%s s).' %
+               (volume_id, server_id, client.build_timeout))
+    raise lib_exc.TimeoutException(message)
 
 
 def wait_for_volume_attachment_remove(client, volume_id, attachment_id):
     """Waits for a volume attachment to be removed from a given volume."""
-    start = int(time.time())
-    attachments = client.show_volume(volume_id)['volume']['attachments']
-    while any(attachment_id == a['attachment_id'] for a in attachments):
-        time.sleep(client.build_interval)
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Failed to remove attachment %s from volume %s '
-                       'within the required time (%s s).' %
-                       (attachment_id, volume_id, client.build_timeout))
-            raise lib_exc.TimeoutException(message)
+    poller = lib_poller.Poller('volume_attachment_remove',
+                               client=client)
+    for _ in poller:
         attachments = client.show_volume(volume_id)['volume']['attachments']
-    LOG.info('Attachment %s removed from volume %s after waiting for %f '
-             'seconds', attachment_id, volume_id, time.time() - start)
+        if not any(attachment_id == a['attachment_id'] for a in attachments):
+            poller.settled()
+            LOG.info('Attachment %s removed from volume %s after waiting for '
+                     '%f seconds', attachment_id, volume_id,
+                     time.time() - poller.start_time)
+            return
+    message = ('Failed to remove attachment %s from volume %s '
+               'within the required time (%s s).' %
+               (attachment_id, volume_id, client.build_timeout))
+    raise lib_exc.TimeoutException(message)
 
 
 def wait_for_volume_attachment_remove_from_server(
@@ -360,81 +445,69 @@ def wait_for_volume_attachment_remove_from_server(
 
     This waiter checks the compute API if the volume attachment is removed.
     """
-    start = int(time.time())
-
-    try:
-        volumes = client.list_volume_attachments(
-            server_id)['volumeAttachments']
-    except lib_exc.NotFound:
-        # Ignore 404s on detach in case the server is deleted or the volume
-        # is already detached.
-        return
-
-    while any(volume for volume in volumes if volume['volumeId'] == volume_id):
-        time.sleep(client.build_interval)
-
-        timed_out = int(time.time()) - start >= client.build_timeout
-        if timed_out:
-            console_output = client.get_console_output(server_id)['output']
-            LOG.debug('Console output for %s\nbody=\n%s',
-                      server_id, console_output)
-            message = ('Volume %s failed to detach from server %s within '
-                       'the required time (%s s) from the compute API '
-                       'perspective' %
-                       (volume_id, server_id, client.build_timeout))
-            raise lib_exc.TimeoutException(message)
+    poller = lib_poller.Poller('volume_attachment_remove_from_server',
+                               client=client)
+    for _ in poller:
         try:
             volumes = client.list_volume_attachments(
                 server_id)['volumeAttachments']
         except lib_exc.NotFound:
             # Ignore 404s on detach in case the server is deleted or the volume
             # is already detached.
+            poller.settled()
             return
-    return
+        if not any(volume for volume in volumes
+                   if volume['volumeId'] == volume_id):
+            poller.settled()
+            return
+
+    console_output = client.get_console_output(server_id)['output']
+    LOG.debug('Console output for %s\nbody=\n%s',
+              server_id, console_output)
+    message = ('Volume %s failed to detach from server %s within '
+               'the required time (%s s) from the compute API '
+               'perspective' %
+               (volume_id, server_id, client.build_timeout))
+    raise lib_exc.TimeoutException(message)
 
 
 def wait_for_volume_migration(client, volume_id, new_host):
     """Waits for a Volume to move to a new host."""
-    body = client.show_volume(volume_id)['volume']
-    host = body['os-vol-host-attr:host']
-    migration_status = body['migration_status']
-    start = int(time.time())
-
+    poller = lib_poller.Poller('volume_migration', client=client)
     # new_host is hostname@backend while current_host is hostname@backend#type
-    while migration_status != 'success' or new_host not in host:
-        time.sleep(client.build_interval)
+    for _ in poller:
         body = client.show_volume(volume_id)['volume']
         host = body['os-vol-host-attr:host']
         migration_status = body['migration_status']
+        if migration_status == 'success' and new_host in host:
+            poller.settled()
+            return
 
         if migration_status == 'error':
             message = ('volume %s failed to migrate.' % (volume_id))
             raise lib_exc.TempestException(message)
 
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Volume %s failed to migrate to %s (current %s) '
-                       'within the required time (%s s).' %
-                       (volume_id, new_host, host, client.build_timeout))
-            raise lib_exc.TimeoutException(message)
+    message = ('Volume %s failed to migrate to %s (current %s) '
+               'within the required time (%s s).' %
+               (volume_id, new_host, host, client.build_timeout))
+    raise lib_exc.TimeoutException(message)
 
 
 def wait_for_volume_retype(client, volume_id, new_volume_type):
     """Waits for a Volume to have a new volume type."""
-    body = client.show_volume(volume_id)['volume']
-    current_volume_type = body['volume_type']
-    start = int(time.time())
-
-    while current_volume_type != new_volume_type:
-        time.sleep(client.build_interval)
+    poller = lib_poller.Poller('volume_retype', client=client)
+    for _ in poller:
         body = client.show_volume(volume_id)['volume']
         current_volume_type = body['volume_type']
+        if current_volume_type == new_volume_type:
+            poller.settled()
+            return
 
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Volume %s failed to reach %s volume type (current %s) '
-                       'within the required time (%s s).' %
-                       (volume_id, new_volume_type, current_volume_type,
-                        client.build_timeout))
-            raise lib_exc.TimeoutException(message)
+    message = ('Volume %s failed to reach %s volume type (current %s) '
+               'within the required time (%s s).' %
+               (volume_id, new_volume_type, current_volume_type,
+                client.build_timeout))
+    raise lib_exc.TimeoutException(message)
 
 
 def wait_for_qos_operations(client, qos_id, operation, args=None):
@@ -446,52 +519,43 @@ def wait_for_qos_operations(client, qos_id, operation, args=None):
     args = volume-type-id disassociated when operation = 'disassociate'
     args = None when operation = 'disassociate-all'
     """
-    start_time = int(time.time())
-    while True:
+    poller = lib_poller.Poller('qos', client=client)
+    for _ in poller:
         if operation == 'qos-key-unset':
             body = client.show_qos(qos_id)['qos_specs']
-            if not any(key in body['specs'] for key in args):
-                return
+            done = not any(key in body['specs'] for key in args)
         elif operation == 'disassociate':
             body = client.show_association_qos(qos_id)['qos_associations']
-            if not any(args in body[i]['id'] for i in range(0, len(body))):
-                return
+            done = not any(args in body[i]['id'] for i in range(0, len(body)))
         elif operation == 'disassociate-all':
             body = client.show_association_qos(qos_id)['qos_associations']
-            if not body:
-                return
+            done = not body
         else:
             msg = (" operation value is either not defined or incorrect.")
             raise lib_exc.UnprocessableEntity(msg)
+        if done:
+            poller.settled()
+            return
 
-        if int(time.time()) - start_time >= client.build_timeout:
-            raise lib_exc.TimeoutException
-        time.sleep(client.build_interval)
+    raise lib_exc.TimeoutException
 
 
 def wait_for_interface_status(client, server_id, port_id, status):
     """Waits for an interface to reach a given status."""
-    body = (client.show_interface(server_id, port_id)
-            ['interfaceAttachment'])
-    interface_status = body['port_state']
-    start = int(time.time())
-
-    while(interface_status != status):
-        time.sleep(client.build_interval)
+    poller = lib_poller.Poller('interface', client=client)
+    for _ in poller:
         body = (client.show_interface(server_id, port_id)
                 ['interfaceAttachment'])
         interface_status = body['port_state']
-
-        timed_out = int(time.time()) - start >= client.build_timeout
-
-        if interface_status != status and timed_out:
-            message = ('Interface %s failed to reach %s status '
-                       '(current %s) within the required time (%s s).' %
-                       (port_id, status, interface_status,
-                        client.build_timeout))
-            raise lib_exc.TimeoutException(message)
-
-    return body
+        if interface_status == status:
+            poller.settled()
+            return body
+
+    message = ('Interface %s failed to reach %s status '
+               '(current %s) within the required time (%s s).' %
+               (port_id, status, interface_status,
+                client.build_timeout))
+    raise lib_exc.TimeoutException(message)
 
 
 def wait_for_interface_detach(client, server_id, port_id, detach_request_id):
@@ -512,23 +576,17 @@ def wait_for_interface_detach(client, server_id, port_id, detach_request_id):
             if event['event'] == 'compute_detach_interface'
         ]
 
-    detach_event_results = _get_detach_event_results()
-
-    start = int(time.time())
-
-    while "Success" not in detach_event_results:
-        time.sleep(client.build_interval)
-        detach_event_results = _get_detach_event_results()
-        if "Success" in detach_event_results:
+    poller = lib_poller.Poller('interface_detach', client=client)
+    for _ in poller:
+        if "Success" in _get_detach_event_results():
+            poller.settled()
             return client.show_instance_action(
                 server_id, detach_request_id)['instanceAction']
 
-        timed_out = int(time.time()) - start >= client.build_timeout
-        if timed_out:
-            message = ('Interface %s failed to detach from server %s within '
-                       'the required time (%s s)' % (port_id, server_id,
-                                                     client.build_timeout))
-            raise lib_exc.TimeoutException(message)
+    message = ('Interface %s failed to detach from server %s within '
+               'the required time (%s s)' % (port_id, server_id,
+                                             client.build_timeout))
+    raise lib_exc.TimeoutException(message)
 
 
 def wait_for_server_floating_ip(servers_client, server, floating_ip,
@@ -553,60 +611,60 @@ def wait_for_server_floating_ip(servers_client, server, floating_ip,
                     return address
         return None
 
-    start_time = int(time.time())
-    while True:
+    poller = lib_poller.Poller('floating_ip', client=servers_client)
+    for _ in poller:
         server = servers_client.show_server(server['id'])['server']
         address = _get_floating_ip_in_server_addresses(floating_ip, server)
         if address is None and wait_for_disassociate:
+            poller.settled()
             return None
         if not wait_for_disassociate and address:
+            poller.settled()
             return address
 
-        if int(time.time()) - start_time >= servers_client.build_timeout:
-            if wait_for_disassociate:
-                msg = ('Floating ip %s failed to disassociate from server %s '
-                       'in time.' % (floating_ip, server['id']))
-            else:
-                msg = ('Floating ip %s failed to associate with server %s '
-                       'in time.' % (floating_ip, server['id']))
-            raise lib_exc.TimeoutException(msg)
-        time.sleep(servers_client.build_interval)
+    if wait_for_disassociate:
+        msg = ('Floating ip %s failed to disassociate from server %s '
+               'in time.' % (floating_ip, server['id']))
+    else:
+        msg = ('Floating ip %s failed to associate with server %s '
+               'in time.' % (floating_ip, server['id']))
+    raise lib_exc.TimeoutException(msg)
 
 
 def wait_for_ping(server_ip, timeout=30, interval=1):
     """Waits for an address to become pingable"""
-    start_time = int(time.time())
-    while int(time.time()) - start_time < timeout:
+    poller = lib_poller.Poller('ping', timeout, interval)
+    for _ in poller:
         response = os.system("ping -c 1 " + server_ip)
         if response == 0:
+            poller.settled()
             return
-        time.sleep(interval)
     raise lib_exc.TimeoutException()
 
 
-def wait_for_ssh(ssh_client, timeout=30):
+def wait_for_ssh(ssh_client, timeout=30, interval=1):
     """Waits for SSH connection to become usable"""
-    start_time = int(time.time())
-    while int(time.time()) - start_time < timeout:
+    poller = lib_poller.Poller('ssh', timeout, interval)
+    for _ in poller:
         try:
             ssh_client.validate_authentication()
-            return
         except lib_exc.SSHTimeout:
-            pass
+            continue
+        poller.settled()
+        return
     raise lib_exc.TimeoutException()
 
 
 def wait_for_caching(client, cache_client, image_id):
     """Waits until image is cached"""
-    start = int(time.time())
-    while int(time.time()) - start < client.build_timeout:
+    poller = lib_poller.Poller('image_cache', client=client)
+    for _ in poller:
         caching = cache_client.list_cache()
         output = [image['image_id'] for image in caching['cached_images']]
         if output and image_id in output:
+            poller.settled()
             return caching
 
-        time.sleep(client.build_interval)
-
     message = ('Image %s failed to cache in time.' % image_id)
     caller = test_utils.find_test_caller()
     if caller:
@@ -617,12 +675,15 @@ def wait_for_caching(client, cache_client, image_id):
 def wait_for_object_create(object_client, container_name, object_name,
                            interval=1):
     """Waits for created object to become available"""
-    start_time = time.time()
-    while time.time() - start_time < object_client.build_timeout:
+    poller = lib_poller.Poller('object', interval=interval,
+                               client=object_client)
+    for _ in poller:
         try:
-            return object_client.get_object(container_name, object_name)
+            obj = object_client.get_object(container_name, object_name)
         except lib_exc.NotFound:
-            time.sleep(interval)
+            continue
+        poller.settled()
+        return obj
     message = ('Object %s failed to create within the required time (%s s).' %
                (object_name, object_client.build_timeout))
     raise lib_exc.TimeoutException(message)
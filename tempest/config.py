@@ -76,6 +76,23 @@ AuthGroup = [
                      "creates. However in some neutron configurations, like "
                      "with VLAN provider networks, this doesn't work. So if "
                      "set to False the isolated networks will not be created"),
+    cfg.IntOpt('dynamic_credentials_pool_size',
+               default=0,
+               min=0,
+               help="If use_dynamic_credentials is set to True, the number "
+                    "of primary and alt project credentials, including "
+                    "their isolated network resources, which each test "
+                    "worker provisions in the background ahead of the test "
+                    "classes needing them. The pooled credentials are "
+                    "deleted when the test worker exits. Test classes "
+                    "with custom network resources do not use the pool. "
+                    "0 disables the pool."),
+    cfg.IntOpt('dynamic_credentials_pool_timeout',
+               default=60,
+               min=0,
+               help="Time in seconds to wait for pooled credentials when "
+                    "the pool is empty before creating credentials "
+                    "synchronously instead."),
     cfg.StrOpt('admin_username',
                help="Username for an administrative user. This is needed for "
                     "authenticating requests made by project isolation to "
@@ -134,6 +151,14 @@ IdentityGroup = [
                default='v3',
                help="Identity API version to be used for authentication "
                     "for API tests."),
+    cfg.StrOpt('token_cache_dir',
+               default=None,
+               help="When set, tokens are cached in this directory and "
+                    "shared by all the test workers using the same "
+                    "credentials and scope, until they get close to their "
+                    "expiry, instead of each auth provider requesting its "
+                    "own token. Tests which revoke tokens of shared "
+                    "credentials should not be run with this option."),
     cfg.StrOpt('region',
                default='RegionOne',
                help="The identity region name to use. Also used as the other "
@@ -214,7 +239,67 @@ ServiceClientsGroup = [
                help='Timeout in seconds to wait for the http request to '
                     'return'),
     cfg.StrOpt('proxy_url',
-               help='Specify an http proxy to use.')
+               help='Specify an http proxy to use.'),
+    cfg.BoolOpt('keep_alive',
+                default=False,
+                help='Keep HTTP connections to the services open and reuse '
+                     'them across API calls, instead of opening a new '
+                     'connection for each request.'),
+    cfg.IntOpt('pool_maxsize',
+               default=10,
+               help='Number of idle connections kept for each host when '
+                    'keep_alive is enabled.'),
+    cfg.IntOpt('pool_idle_timeout',
+               default=30,
+               help='Time in seconds after which idle connections to a host '
+                    'are closed rather than reused, when keep_alive is '
+                    'enabled. Set to 0 to keep them indefinitely.'),
+    cfg.IntOpt('response_validation_sample_rate',
+               default=1,
+               min=1,
+               help='Validate the body and headers of only one in N '
+                    'successful responses against the JSON schema of the '
+                    'API. The first response for each schema is always '
+                    'validated. The default, 1, validates all responses.'),
+    cfg.IntOpt('poll_fast_polls',
+               default=0,
+               min=0,
+               help='Number of polls done every poll_fast_interval seconds '
+                    'when a waiter starts, before switching to the '
+                    'build_interval of the service.'),
+    cfg.FloatOpt('poll_fast_interval',
+                 default=0.5,
+                 min=0,
+                 help='Time in seconds between polls in the fast phase of '
+                      'the waiters, see poll_fast_polls.'),
+    cfg.FloatOpt('poll_backoff',
+                 default=1.0,
+                 min=1.0,
+                 help='Factor by which the waiters multiply the interval '
+                      'between polls after each poll, starting from the '
+                      'build_interval of the service. The default, 1, '
+                      'polls at a constant interval.'),
+    cfg.FloatOpt('poll_max_interval',
+                 help='Maximum time in seconds between polls when '
+                      'poll_backoff is greater than 1.'),
+    cfg.FloatOpt('poll_jitter',
+                 default=0.0,
+                 min=0.0,
+                 max=0.99,
+                 help='Randomize the interval between polls by up to this '
+                      'fraction of it, so that parallel workers do not poll '
+                      'in lock step.'),
+    cfg.StrOpt('api_metrics_dir',
+               help='Directory where the metrics of the API calls made by '
+                    'the service clients are written: latency histograms, '
+                    'bytes sent and received, status codes, errors and '
+                    'retries by service, method and URL template. Each test '
+                    'worker writes its metrics as JSON and Prometheus text '
+                    'files, merged into api-metrics.json and '
+                    'api-metrics.prom at the end of tempest run, which '
+                    'removes the files of the workers of the previous run '
+                    'when it starts. Metrics are not recorded when not '
+                    'set.'),
 ]
 
 identity_feature_group = cfg.OptGroup(name='identity-feature-enabled',
@@ -768,6 +853,14 @@ NetworkGroup = [
     cfg.IntOpt('project_network_v6_mask_bits',
                default=64,
                help="The mask bits for project ipv6 subnets"),
+    cfg.StrOpt('cidr_lease_dir',
+               default=None,
+               help="When set, the CIDRs of the project subnets created by "
+                    "the tests and the dynamic credentials are leased from "
+                    "tables in this directory shared by all the test "
+                    "workers. The subnets which exist are listed once per "
+                    "run instead of looking for a free block with API calls "
+                    "for each subnet."),
     cfg.BoolOpt('project_networks_reachable',
                 default=False,
                 help="Whether project networks can be reached directly from "
@@ -956,6 +1049,12 @@ ValidationGroup = [
                default=1,
                help="The number of ping packets originating from remote "
                     "linux hosts"),
+    cfg.IntOpt('connectivity_check_workers',
+               default=8,
+               min=1,
+               help="The number of connectivity checks run at the same "
+                    "time by the connectivity matrix of the scenario "
+                    "tests, see check_connectivity_matrix."),
     cfg.StrOpt('floating_ip_range',
                default='10.0.0.0/29',
                help='Unallocated floating IP range, which will be used to '
@@ -970,6 +1069,20 @@ ValidationGroup = [
                default='ecdsa',
                help='Type of key to use for ssh connections. '
                     'Valid types are rsa, ecdsa'),
+    cfg.BoolOpt('ssh_connection_reuse',
+                default=False,
+                help='Keep the ssh connections to the instances open and run '
+                     'the following commands over them, each on a new '
+                     'channel, instead of opening a new connection for each '
+                     'command. The connections are closed at the end of '
+                     'each test class.'),
+    cfg.IntOpt('ssh_connection_idle_timeout',
+               default=60,
+               min=0,
+               help='Time in seconds after which an unused ssh connection '
+                    'is closed rather than reused, when ssh_connection_reuse '
+                    'is enabled. Set to 0 to keep them until the end of the '
+                    'test class.'),
     cfg.IntOpt('allowed_network_downtime',
                default=5.0,
                help="Allowed VM network connection downtime during live "
@@ -1195,6 +1308,23 @@ ScenarioGroup = [
                help='Image container format'),
     cfg.DictOpt('img_properties', help='Glance image properties. '
                 'Use for custom images which require them'),
+    cfg.StrOpt('image_cache_dir',
+               default=None,
+               help="When set, the images of img_file created by the "
+                    "scenario tests are uploaded once per run with the "
+                    "configured admin credentials and shared by the tests "
+                    "of all the workers through a registry in this "
+                    "directory, instead of being uploaded and deleted by "
+                    "each test. The images are deleted when a worker exits "
+                    "and no test of the other workers still uses them. "
+                    "Tests which modify the image they "
+                    "get should not be run with this option."),
+    cfg.StrOpt('image_cache_visibility',
+               default='community',
+               choices=['community', 'public'],
+               help="The visibility of the images shared by the tests, "
+                    "see image_cache_dir, so that the projects of all the "
+                    "tests can boot servers from them."),
     # TODO(yfried): add support for dhcpcd
     cfg.StrOpt('dhcp_client',
                default='udhcpc',
@@ -22,6 +22,7 @@ from urllib import parse as urlparse
 
 from oslo_log import log as logging
 
+from tempest.lib.common import token_cache
 from tempest.lib import exceptions
 from tempest.lib.services.identity.v2 import token_client as json_v2id
 from tempest.lib.services.identity.v3 import token_client as json_v3id
@@ -64,6 +65,82 @@ def apply_url_filters(url, filters):
     return url
 
 
+class _V2CatalogIndex(object):
+    """Service catalog of an Identity V2 token, indexed for base_url"""
+
+    def __init__(self, catalog):
+        self._services = {}
+        self._named_services = {}
+        for service in catalog:
+            entry = (service['endpoints'], {})
+            for endpoint in service['endpoints']:
+                # The last endpoint of a region takes precedence
+                entry[1][endpoint.get('region')] = endpoint
+            self._services.setdefault(service['type'], entry)
+            self._named_services.setdefault(
+                (service['type'], service.get('name')), entry)
+
+    def lookup(self, service, region, name, endpoint_type):
+        if name is None:
+            entry = self._services.get(service)
+        else:
+            entry = self._named_services.get((service, name))
+        if entry is None:
+            return None
+        endpoints, by_region = entry
+        _base_url = None
+        if region is not None and region in by_region:
+            _base_url = by_region[region].get(endpoint_type)
+        if not _base_url:
+            # No region or name matching, use the first
+            _base_url = endpoints[0].get(endpoint_type)
+        return _base_url
+
+
+class _V3CatalogIndex(object):
+    """Service catalog of an Identity V3 token, indexed for base_url"""
+
+    def __init__(self, catalog):
+        self.empty = not catalog
+        self._services = {}
+        self._named_services = {}
+        for service in catalog:
+            self._services.setdefault(service['type'], service)
+            self._named_services.setdefault(
+                (service['type'], service.get('name')), service)
+        # Endpoints indexes, built on first use of each service
+        self._endpoints = {}
+
+    def get_service(self, service, name=None):
+        if name is None:
+            return self._services.get(service)
+        return self._named_services.get((service, name))
+
+    def has_service(self, service):
+        return service in self._services
+
+    def lookup(self, service_entry, region, endpoint_type):
+        index = self._endpoints.get(id(service_entry))
+        if index is None:
+            endpoints = service_entry['endpoints']
+            by_interface = {}
+            by_region = {}
+            for endpoint in endpoints:
+                by_interface.setdefault(endpoint['interface'], {}).setdefault(
+                    endpoint['region'], endpoint)
+                by_region.setdefault(endpoint['region'], endpoint)
+            index = (endpoints, by_interface, by_region)
+            self._endpoints[id(service_entry)] = index
+        endpoints, by_interface, by_region = index
+        # Filter by endpoint type (interface), if there is no matching type,
+        # keep all and try matching by region at least
+        regions = by_interface.get(endpoint_type, by_region)
+        # Filter by region, if there is no matching region take the first
+        # endpoint
+        endpoint = regions.get(region, endpoints[0])
+        return endpoint.get('url', None)
+
+
 class AuthProvider(object, metaclass=abc.ABCMeta):
     """Provide authentication"""
 
@@ -268,13 +345,98 @@ class KeystoneAuthProvider(AuthProvider):
         self.proxy_url = proxy_url
         self.auth_url = auth_url
         self.auth_client = self._auth_client(auth_url)
+        # The catalog index of the last auth data used by base_url
+        self._catalog_index = (None, None)
+        # Base URLs resolved for the current auth data, by filters
+        self._base_urls = {}
+        self._base_urls_auth_data = None
+
+    def get_auth(self):
+        """Returns auth from cache if available, else auth first
+
+        When the token cache is enabled, a valid token obtained by another
+        auth provider, possibly in another process, for the same credentials
+        and scope is used before requesting a new one.
+        """
+        if ((self.cache is None or self.is_expired(self.cache)) and
+                token_cache.is_enabled()):
+            self._set_shared_auth(force=False)
+        return super(KeystoneAuthProvider, self).get_auth()
+
+    def set_auth(self):
+        self._invalidate_base_urls()
+        if token_cache.is_enabled():
+            self._set_shared_auth(force=True)
+        else:
+            super(KeystoneAuthProvider, self).set_auth()
+
+    def clear_auth(self):
+        self._invalidate_base_urls()
+        super(KeystoneAuthProvider, self).clear_auth()
+
+    def set_alt_auth_data(self, request_part, auth_data):
+        self._invalidate_base_urls()
+        super(KeystoneAuthProvider, self).set_alt_auth_data(request_part,
+                                                            auth_data)
+
+    def reset_alt_auth_data(self):
+        self._invalidate_base_urls()
+        super(KeystoneAuthProvider, self).reset_alt_auth_data()
+
+    def _invalidate_base_urls(self):
+        self._base_urls = {}
+        self._base_urls_auth_data = None
+
+    def _get_base_url(self, filters, auth_data):
+        # The endpoints only change with the auth data, so resolve them once
+        # per token and filters. Alternate auth data is not memoized.
+        if auth_data is not self.cache:
+            return self.base_url(filters=filters, auth_data=auth_data)
+        try:
+            key = frozenset(filters.items())
+        except (AttributeError, TypeError):
+            # No or unhashable filters, let base_url handle them
+            return self.base_url(filters=filters, auth_data=auth_data)
+        if self._base_urls_auth_data is not auth_data:
+            self._base_urls = {}
+            self._base_urls_auth_data = auth_data
+        base_url = self._base_urls.get(key)
+        if base_url is None:
+            base_url = self.base_url(filters=filters, auth_data=auth_data)
+            self._base_urls[key] = base_url
+        return base_url
+
+    def _set_shared_auth(self, force):
+        self.cache = token_cache.get_auth(
+            self._token_cache_key(), self._get_auth, self.is_expired,
+            force=force)
+        self._fill_credentials(self.cache[1])
+
+    def _token_cache_key(self):
+        # Use the credentials as initially defined, the ones filled in after
+        # authentication do not change the token
+        initial = dict((k, self.credentials.get(k)) for k in
+                       self.credentials.get_init_attributes())
+        return token_cache.cache_key(self.__class__.__name__, self.auth_url,
+                                     self.scope, initial)
+
+    def _get_catalog_index(self, auth_data_body):
+        body, index = self._catalog_index
+        if body is not auth_data_body:
+            index = self._build_catalog_index(auth_data_body)
+            self._catalog_index = (auth_data_body, index)
+        return index
+
+    @abc.abstractmethod
+    def _build_catalog_index(self, auth_data_body):
+        return
 
     def _decorate_request(self, filters, method, url, headers=None, body=None,
                           auth_data=None):
         if auth_data is None:
             auth_data = self.get_auth()
         token, _ = auth_data
-        base_url = self.base_url(filters=filters, auth_data=auth_data)
+        base_url = self._get_base_url(filters, auth_data)
         # build authenticated request
         # returns new request, it does not touch the original values
         _headers = copy.deepcopy(headers) if headers is not None else {}
@@ -398,24 +560,17 @@ class KeystoneV2AuthProvider(KeystoneAuthProvider):
         if service is None:
             raise exceptions.EndpointNotFound("No service provided")
 
-        _base_url = None
-        for ep in _auth_data['serviceCatalog']:
-            if ep["type"] == service:
-                if name is not None and ep["name"] != name:
-                    continue
-                for _ep in ep['endpoints']:
-                    if region is not None and _ep['region'] == region:
-                        _base_url = _ep.get(endpoint_type)
-                if not _base_url:
-                    # No region or name matching, use the first
-                    _base_url = ep['endpoints'][0].get(endpoint_type)
-                break
+        catalog = self._get_catalog_index(_auth_data)
+        _base_url = catalog.lookup(service, region, name, endpoint_type)
         if _base_url is None:
             raise exceptions.EndpointNotFound(
                 "service: %s, region: %s, endpoint_type: %s, name: %s" %
                 (service, region, endpoint_type, name))
         return apply_url_filters(_base_url, filters)
 
+    def _build_catalog_index(self, auth_data_body):
+        return _V2CatalogIndex(auth_data_body['serviceCatalog'])
+
     def is_expired(self, auth_data):
         _, access = auth_data
         expiry = self._parse_expiry_time(access['token']['expires'])
@@ -540,23 +695,14 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
 
         if 'URL' in endpoint_type:
             endpoint_type = endpoint_type.replace('URL', '')
-        _base_url = None
-        catalog = _auth_data.get('catalog', [])
-
-        # Select entries with matching service type
-        service_catalog = [ep for ep in catalog if ep['type'] == service]
-        if service_catalog:
-            if name is not None:
-                service_catalog = (
-                    [ep for ep in service_catalog if ep['name'] == name])
-                if service_catalog:
-                    service_catalog = service_catalog[0]['endpoints']
-                else:
-                    raise exceptions.EndpointNotFound(name)
-            else:
-                service_catalog = service_catalog[0]['endpoints']
-        else:
-            if not catalog and service == 'identity':
+        catalog = self._get_catalog_index(_auth_data)
+
+        # Select the entry with matching service type
+        service_entry = catalog.get_service(service, name)
+        if service_entry is None:
+            if catalog.has_service(service):
+                raise exceptions.EndpointNotFound(name)
+            if catalog.empty and service == 'identity':
                 # NOTE(andreaf) If there's no catalog at all and the service
                 # is identity, it's a valid use case. Having a non-empty
                 # catalog with no identity in it is not valid instead.
@@ -573,25 +719,16 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
                        'Catalog: %s')
                 raise exceptions.EndpointNotFound(msg % (
                     self.scope, self.credentials, _auth_data, service, region,
-                    endpoint_type, catalog))
-        # Filter by endpoint type (interface)
-        filtered_catalog = [ep for ep in service_catalog if
-                            ep['interface'] == endpoint_type]
-        if not filtered_catalog:
-            # No matching type, keep all and try matching by region at least
-            filtered_catalog = service_catalog
-        # Filter by region
-        filtered_catalog = [ep for ep in filtered_catalog if
-                            ep['region'] == region]
-        if not filtered_catalog:
-            # No matching region (or name), take the first endpoint
-            filtered_catalog = [service_catalog[0]]
+                    endpoint_type, _auth_data.get('catalog', [])))
         # There should be only one match. If not take the first.
-        _base_url = filtered_catalog[0].get('url', None)
+        _base_url = catalog.lookup(service_entry, region, endpoint_type)
         if _base_url is None:
             raise exceptions.EndpointNotFound(service)
         return apply_url_filters(_base_url, filters)
 
+    def _build_catalog_index(self, auth_data_body):
+        return _V3CatalogIndex(auth_data_body.get('catalog', []))
+
     def is_expired(self, auth_data):
         _, access = auth_data
         expiry = self._parse_expiry_time(access['expires_at'])
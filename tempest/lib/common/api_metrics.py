@@ -0,0 +1,351 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Metrics of the API calls made by the service clients
+
+When enabled with `enable_api_metrics`, every request sent by a
+``RestClient`` is recorded by service, HTTP method and URL template, i.e.
+the path of the URL with the ids and the random names replaced by
+placeholders. For each of them the metrics are:
+
+* ``calls``: the number of requests sent
+* ``seconds``: the total time taken by the requests
+* ``buckets``: the number of requests by latency, see ``BUCKETS``
+* ``bytes_out`` and ``bytes_in``: the size of the request and response
+  bodies, when known
+* ``statuses``: the number of responses by status code
+* ``errors``: the number of requests which got no response, by class of the
+  exception raised
+* ``retries``: the number of requests sent again after a 413 response with a
+  retry-after header
+
+The metrics of each process can be written with `write_files`, as JSON and
+in the Prometheus text format, the files of several workers merged with
+`merge_files` and removed with `remove_files`.
+"""
+
+import glob
+import os
+import re
+import threading
+
+from oslo_serialization import jsonutils as json
+
+from tempest.lib.common import shared_state
+
+# Upper bounds in seconds of the latency buckets. Requests taking longer
+# than the last bound are counted in an extra bucket.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+           30.0, 60.0)
+
+WORKER_PREFIX = 'api-metrics-worker-'
+SUMMARY_NAME = 'api-metrics'
+
+_settings = {'enabled': False}
+
+# API call metrics by (service, method, url template)
+_metrics_lock = threading.Lock()
+_metrics = {}
+
+# The path of a URL, a faster urllib.parse.urlsplit(url).path
+_URL_PATH = re.compile(r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*://[^/?#]*)?([^?#]*)')
+_ID_SEGMENT = re.compile(
+    r'^([0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}|'
+    r'[0-9a-f]{16,}|\d+)$', re.IGNORECASE)
+# data_utils.rand_name, i.e. <prefix>-<name>-<random number>
+_NAME_SEGMENT = re.compile(r'^.+-\d{5,}$')
+
+
+def enable_api_metrics():
+    """Record the metrics of the API calls of this process"""
+    _settings['enabled'] = True
+
+
+def disable_api_metrics():
+    """Stop recording the metrics of the API calls"""
+    _settings['enabled'] = False
+
+
+def is_enabled():
+    return _settings['enabled']
+
+
+def url_template(url):
+    """Return the path of a URL with its ids and random names replaced
+
+    The scheme, host and query string are dropped, path segments which look
+    like ids are replaced by ``{id}`` and the ones which look like names
+    made by ``data_utils.rand_name`` by ``{name}``, so that the calls to
+    the same API are recorded together.
+    """
+    path = _URL_PATH.match(url).group(1)
+    segments = []
+    for segment in path.split('/'):
+        if _ID_SEGMENT.match(segment):
+            segment = '{id}'
+        elif _NAME_SEGMENT.match(segment):
+            segment = '{name}'
+        segments.append(segment)
+    return '/'.join(segments) or '/'
+
+
+def _new_entry():
+    return {'calls': 0, 'seconds': 0.0, 'buckets': [0] * (len(BUCKETS) + 1),
+            'bytes_out': 0, 'bytes_in': 0, 'statuses': {}, 'errors': {},
+            'retries': 0}
+
+
+def _bucket(seconds):
+    for index, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            return index
+    return len(BUCKETS)
+
+
+def record(service, method, url, seconds, status=None, error=None,
+           bytes_out=0, bytes_in=0):
+    """Record an API call, if the metrics are enabled
+
+    :param service: the service of the client, e.g. 'compute'
+    :param method: the HTTP method
+    :param url: the URL of the request
+    :param seconds: the time taken by the request
+    :param status: the status code of the response
+    :param error: the exception raised when no response was received
+    :param bytes_out: the size of the request body
+    :param bytes_in: the size of the response body
+    """
+    if not _settings['enabled']:
+        return
+    key = (service or '', method.upper(), url_template(url))
+    with _metrics_lock:
+        entry = _metrics.get(key)
+        if entry is None:
+            entry = _metrics[key] = _new_entry()
+        entry['calls'] += 1
+        entry['seconds'] += seconds
+        entry['buckets'][_bucket(seconds)] += 1
+        entry['bytes_out'] += bytes_out
+        entry['bytes_in'] += bytes_in
+        if error is not None:
+            name = type(error).__name__
+            entry['errors'][name] = entry['errors'].get(name, 0) + 1
+        else:
+            status = str(status)
+            entry['statuses'][status] = entry['statuses'].get(status, 0) + 1
+
+
+def record_retries(service, method, url, retries):
+    """Record the number of times an API call was retried"""
+    if not _settings['enabled'] or not retries:
+        return
+    key = (service or '', method.upper(), url_template(url))
+    with _metrics_lock:
+        entry = _metrics.get(key)
+        if entry is None:
+            entry = _metrics[key] = _new_entry()
+        entry['retries'] += retries
+
+
+def get_metrics():
+    """Return the API call metrics of the current process
+
+    :return: dictionary of the metrics described in the module docstring by
+        (service, method, url template)
+    """
+    with _metrics_lock:
+        return dict((key, _copy_entry(entry))
+                    for key, entry in _metrics.items())
+
+
+def reset_metrics():
+    """Reset the API call metrics of the current process"""
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def _copy_entry(entry):
+    entry = dict(entry)
+    entry['buckets'] = list(entry['buckets'])
+    entry['statuses'] = dict(entry['statuses'])
+    entry['errors'] = dict(entry['errors'])
+    return entry
+
+
+def merge(metrics_list):
+    """Merge the metrics of several processes
+
+    :param metrics_list: metrics as returned by `get_metrics` or `load`
+    :return: the sum of the metrics, in the same format
+    """
+    merged = {}
+    for metrics in metrics_list:
+        for key, entry in metrics.items():
+            total = merged.get(key)
+            if total is None:
+                merged[key] = _copy_entry(entry)
+                continue
+            for name in ('calls', 'seconds', 'bytes_out', 'bytes_in',
+                         'retries'):
+                total[name] += entry[name]
+            total['buckets'] = [a + b for a, b in zip(total['buckets'],
+                                                      entry['buckets'])]
+            for name in ('statuses', 'errors'):
+                for value, count in entry[name].items():
+                    total[name][value] = total[name].get(value, 0) + count
+    return merged
+
+
+def _document(metrics):
+    calls = []
+    for (service, method, url), entry in sorted(metrics.items()):
+        call = {'service': service, 'method': method, 'url': url}
+        call.update(entry)
+        calls.append(call)
+    return {'buckets': list(BUCKETS), 'calls': calls}
+
+
+def dump(metrics):
+    """Return the metrics as a JSON document"""
+    return json.dumps(_document(metrics), sort_keys=True, indent=2,
+                      separators=(',', ': '))
+
+
+def load(document):
+    """Return the metrics of a JSON document written by `dump`"""
+    data = json.loads(document)
+    if list(data['buckets']) != list(BUCKETS):
+        raise ValueError('The metrics were recorded with other buckets: %s'
+                         % data['buckets'])
+    metrics = {}
+    for call in data['calls']:
+        key = (call.pop('service'), call.pop('method'), call.pop('url'))
+        metrics[key] = call
+    return metrics
+
+
+def _labels(**labels):
+    return ','.join('%s="%s"' % (name, str(value).replace('\\', '\\\\')
+                                 .replace('"', '\\"'))
+                    for name, value in sorted(labels.items()))
+
+
+def to_prometheus(metrics):
+    """Return the metrics in the Prometheus text exposition format"""
+    series = {
+        'duration': [], 'bytes_out': [], 'bytes_in': [], 'responses': [],
+        'errors': [], 'retries': []}
+    for (service, method, url), entry in sorted(metrics.items()):
+        labels = dict(service=service, method=method, url=url)
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), entry['buckets']):
+            cumulative += count
+            series['duration'].append(
+                'tempest_api_request_duration_seconds_bucket{%s} %d' % (
+                    _labels(le=bound, **labels), cumulative))
+        series['duration'].append(
+            'tempest_api_request_duration_seconds_sum{%s} %r' % (
+                _labels(**labels), entry['seconds']))
+        series['duration'].append(
+            'tempest_api_request_duration_seconds_count{%s} %d' % (
+                _labels(**labels), entry['calls']))
+        series['bytes_out'].append('tempest_api_request_bytes_total{%s} %d' % (
+            _labels(**labels), entry['bytes_out']))
+        series['bytes_in'].append('tempest_api_response_bytes_total{%s} %d' % (
+            _labels(**labels), entry['bytes_in']))
+        for status, count in sorted(entry['statuses'].items()):
+            series['responses'].append('tempest_api_responses_total{%s} %d' % (
+                _labels(status=status, **labels), count))
+        for error, count in sorted(entry['errors'].items()):
+            series['errors'].append('tempest_api_errors_total{%s} %d' % (
+                _labels(error=error, **labels), count))
+        series['retries'].append('tempest_api_retries_total{%s} %d' % (
+            _labels(**labels), entry['retries']))
+    lines = []
+    for name, metric, kind, help_text in [
+            ('duration', 'tempest_api_request_duration_seconds', 'histogram',
+             'Time taken by the API requests'),
+            ('bytes_out', 'tempest_api_request_bytes_total', 'counter',
+             'Size of the bodies of the API requests'),
+            ('bytes_in', 'tempest_api_response_bytes_total', 'counter',
+             'Size of the bodies of the API responses'),
+            ('responses', 'tempest_api_responses_total', 'counter',
+             'API responses by status code'),
+            ('errors', 'tempest_api_errors_total', 'counter',
+             'API requests which got no response, by exception class'),
+            ('retries', 'tempest_api_retries_total', 'counter',
+             'API requests retried after a 413 response')]:
+        lines.append('# HELP %s %s' % (metric, help_text))
+        lines.append('# TYPE %s %s' % (metric, kind))
+        lines.extend(series[name])
+    return '\n'.join(lines) + '\n'
+
+
+def write_files(directory, name=None, metrics=None):
+    """Write the metrics as JSON and Prometheus text files
+
+    :param directory: the directory of the files, created if needed
+    :param name: the name of the files without extension, by default the
+        name of the files of the current worker process
+    :param metrics: the metrics to write, by default the ones of the
+        current process
+    :return: the paths of the JSON and the Prometheus text files
+    """
+    if name is None:
+        name = '%s%d' % (WORKER_PREFIX, os.getpid())
+    if metrics is None:
+        metrics = get_metrics()
+    os.makedirs(directory, exist_ok=True)
+    json_path = os.path.join(directory, name + '.json')
+    shared_state.write_json(json_path, _document(metrics))
+    prom_path = os.path.join(directory, name + '.prom')
+    shared_state.write_file(prom_path, to_prometheus(metrics))
+    return [json_path, prom_path]
+
+
+def remove_files(directory):
+    """Remove the metrics files of the workers written in a directory
+
+    The workers write files named after their pid and `merge_files` merges
+    all of them, the files of a previous run are removed before the next
+    one starts.
+    """
+    for path in glob.glob(os.path.join(directory, WORKER_PREFIX + '*')):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def merge_files(directory):
+    """Merge the metrics files of the workers written in a directory
+
+    The merged metrics are written to the ``api-metrics.json`` and
+    ``api-metrics.prom`` files of the directory.
+
+    :param directory: the directory of the metrics files of the workers
+    :return: the merged metrics, None if there is no file of the workers
+    """
+    paths = sorted(glob.glob(os.path.join(directory,
+                                          WORKER_PREFIX + '*.json')))
+    if not paths:
+        return None
+    metrics_list = []
+    for path in paths:
+        with open(path) as metrics_file:
+            metrics_list.append(load(metrics_file.read()))
+    metrics = merge(metrics_list)
+    write_files(directory, name=SUMMARY_NAME, metrics=metrics)
+    return metrics
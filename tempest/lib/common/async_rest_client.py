@@ -0,0 +1,99 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import asyncio
+from concurrent import futures
+import functools
+
+from tempest.lib.common import rest_client
+
+
+class AsyncRestClient(object):
+    """Asyncio front-end for a RestClient based service client
+
+    Wraps an existing service client, such as a `ServersClient` or a
+    `PortsClient`, and exposes each of its public methods as a coroutine
+    function. Calls are executed by the wrapped client on a pool of worker
+    threads, so the `request()`/`get()`/`post()` contract, the error checking
+    done by `_error_checker` and the response schema validation are exactly
+    the ones of the blocking client, while many calls can be in flight from a
+    single event loop::
+
+        servers = AsyncRestClient(manager.servers_client, max_workers=50)
+        bodies = await asyncio.gather(
+            *[servers.show_server(server_id) for server_id in server_ids])
+
+    Non callable attributes, and private ones, are returned as they are
+    from the wrapped client.
+
+    The HTTP transport is shared by all the threads; when keep-alive is
+    enabled its `pool_maxsize` should be close to `max_workers` so that
+    connections are reused rather than discarded.
+
+    :param client: an instance of `RestClient` or of one of its subclasses
+    :param int max_workers: number of calls which can be executed at the same
+        time. If neither this nor `executor` is specified, the default
+        executor of the running event loop is used.
+    :param executor: a `concurrent.futures.Executor` used to run the calls.
+    """
+
+    def __init__(self, client, max_workers=None, executor=None):
+        if not isinstance(client, rest_client.RestClient):
+            raise TypeError('AsyncRestClient requires a RestClient, got %s' %
+                            type(client).__name__)
+        self._client = client
+        self._own_executor = executor is None and max_workers is not None
+        if self._own_executor:
+            executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._executor = executor
+
+    @property
+    def client(self):
+        """The wrapped blocking client"""
+        return self._client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def wrapper(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+        return wrapper
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking callable on the executor of this client
+
+        Useful for helpers which take a client rather than being a method
+        of it, such as waiters::
+
+            await servers.run(waiters.wait_for_server_status,
+                              servers.client, server_id, 'ACTIVE')
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
+
+    def close(self):
+        """Shut down the executor, if it was created by this client"""
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,143 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Allocation of subnet CIDRs shared by the test workers
+
+Without it, each subnet creation walks the blocks of the project network
+CIDR in order and asks Neutron whether each one is in use, or tries to
+create a subnet on each until there is no overlap, so late in a parallel
+run every worker goes through all the blocks already taken by the others.
+
+Once enabled, the blocks are leased from a table in a file shared by the
+workers, locked while it is updated. The subnets which exist are listed
+once, by the first allocation of a run, and blocks are then handed out from
+the table without any API call and given back when the subnets are
+deleted. The table keeps the processes using it, forgetting the ones
+which exited at each allocation. A run starts when none of them is still
+running, so the leases and the snapshot of a previous run are dropped.
+"""
+
+import hashlib
+import os
+
+import netaddr
+from oslo_log import log as logging
+
+from tempest.lib.common import shared_state
+
+LOG = logging.getLogger(__name__)
+
+# Process wide allocator settings, see enable_cidr_allocator()
+_settings = {'lease_dir': None}
+
+_stats = shared_state.Counters('allocated', 'released', 'conflicts',
+                               'snapshots', 'exhausted')
+
+
+def enable_cidr_allocator(lease_dir):
+    """Share the allocation of subnet CIDRs through files in lease_dir
+
+    :param lease_dir: the directory of the lease tables, created if it does
+                      not exist
+    """
+    os.makedirs(lease_dir, exist_ok=True)
+    _settings['lease_dir'] = lease_dir
+
+
+def disable_cidr_allocator():
+    """Stop sharing the allocation, the tables are left on disk"""
+    _settings['lease_dir'] = None
+
+
+def is_enabled():
+    return _settings['lease_dir'] is not None
+
+
+def get_stats():
+    """Return the number of blocks allocated, released and so on"""
+    return _stats.get()
+
+
+def reset_stats():
+    _stats.reset()
+
+
+def _table_path(pool, prefixlen):
+    key = hashlib.sha256(
+        ('%s/%d' % (netaddr.IPNetwork(pool).cidr, prefixlen)).encode(
+            'utf-8')).hexdigest()
+    return os.path.join(_settings['lease_dir'], 'cidr-%s.json' % key)
+
+
+def _locked_table(pool, prefixlen):
+    """Load the table of a pool, locked, and store it back on exit"""
+    return shared_state.locked_json(
+        _table_path(pool, prefixlen),
+        lambda: {'users': [], 'taken': [], 'leases': {}})
+
+
+def allocate(pool, prefixlen, snapshot):
+    """Lease a block of a pool which is not used by any subnet
+
+    :param pool: the CIDR the blocks are allocated from, e.g.
+                 ``[network] project_network_cidr``
+    :param prefixlen: the mask bits of the blocks
+    :param snapshot: a callable returning the CIDRs of the existing subnets,
+                     only called by the first allocation of a run
+    :return: the CIDR of the leased block, None if all the blocks are used
+    """
+    pool_net = netaddr.IPNetwork(pool)
+    with _locked_table(pool, prefixlen) as table:
+        # Forget the processes which exited, their pids may be reused
+        table['users'] = [user for user in table['users']
+                          if shared_state.is_alive(user)]
+        if not table['users']:
+            # A new run, what was used by the previous one may be gone
+            table['leases'] = {}
+            table['taken'] = sorted(set(
+                str(netaddr.IPNetwork(cidr).cidr) for cidr in snapshot()
+                if netaddr.IPNetwork(cidr).version == pool_net.version))
+            _stats.count('snapshots')
+        pid = os.getpid()
+        if pid not in table['users']:
+            table['users'].append(pid)
+        used = netaddr.IPSet(table['taken'] + list(table['leases']))
+        for block in pool_net.subnet(prefixlen):
+            if used.isdisjoint(netaddr.IPSet([block])):
+                cidr = str(block)
+                table['leases'][cidr] = pid
+                _stats.count('allocated')
+                return cidr
+    LOG.warning('All the /%d blocks of %s are in use', prefixlen, pool)
+    _stats.count('exhausted')
+    return None
+
+
+def release(pool, prefixlen, cidr):
+    """Give back a block once its subnet is deleted"""
+    with _locked_table(pool, prefixlen) as table:
+        if table['leases'].pop(cidr, None) is not None:
+            _stats.count('released')
+
+
+def mark_in_use(pool, prefixlen, cidr):
+    """Record that a leased block is used by a subnet not in the snapshot
+
+    Subnets can be created after the snapshot by something else than the
+    test workers, the creation of a subnet on the block then fails with an
+    overlap. The block is kept out of the allocations of the run.
+    """
+    with _locked_table(pool, prefixlen) as table:
+        table['leases'].pop(cidr, None)
+        if cidr not in table['taken']:
+            table['taken'].append(cidr)
+    _stats.count('conflicts')
@@ -11,6 +11,7 @@
 # under the License.
 
 import abc
+import threading
 
 from oslo_log import log as logging
 
@@ -20,6 +21,49 @@ from tempest.lib.services.identity.v2 import identity_client as v2_identity
 
 LOG = logging.getLogger(__name__)
 
+# Per-process cache of the roles by lower case name, shared by all the
+# CredsClient instances, v2 and v3 alike, as a test run talks to one cloud.
+_roles = {}
+_roles_lock = threading.Lock()
+_role_cache_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def get_role_cache_stats():
+    """Return the counters of the role cache
+
+    ``hits`` is the number of role lookups served from the cache, i.e. the
+    number of calls to list roles avoided, ``misses`` the number of lookups
+    which listed the roles, and ``invalidations`` the number of times the
+    cache was dropped because a role was created or already existed, or a
+    cached role was not found.
+    """
+    with _roles_lock:
+        return dict(_role_cache_stats)
+
+
+def invalidate_role_cache():
+    """Drop the cached roles, the next lookup lists them again"""
+    with _roles_lock:
+        _roles.clear()
+        _role_cache_stats['invalidations'] += 1
+
+
+def _forget_role(role):
+    """Drop a cached role which was not found, e.g. because it was deleted"""
+    with _roles_lock:
+        lc_role_name = role['name'].lower()
+        if _roles.get(lc_role_name) is role:
+            del _roles[lc_role_name]
+            _role_cache_stats['invalidations'] += 1
+
+
+def reset_role_cache():
+    """Drop the cached roles and reset the counters"""
+    with _roles_lock:
+        _roles.clear()
+        for counter in _role_cache_stats:
+            _role_cache_stats[counter] = 0
+
 
 class CredsClient(object, metaclass=abc.ABCMeta):
     """This class is a wrapper around the identity clients
@@ -59,30 +103,57 @@ class CredsClient(object, metaclass=abc.ABCMeta):
         pass
 
     def _check_role_exists(self, role_name):
-        try:
-            roles = self._list_roles()
-            lc_role_name = role_name.lower()
-            role = next(r for r in roles if r['name'].lower() == lc_role_name)
-        except StopIteration:
-            return None
-        return role
+        lc_role_name = role_name.lower()
+        with _roles_lock:
+            role = _roles.get(lc_role_name)
+            if role:
+                _role_cache_stats['hits'] += 1
+                return role
+        # The role may have been created since the roles were cached
+        roles = self._list_roles()
+        with _roles_lock:
+            _roles.clear()
+            _roles.update((r['name'].lower(), r) for r in roles)
+            _role_cache_stats['misses'] += 1
+            return _roles.get(lc_role_name)
 
     def create_user_role(self, role_name):
         if not self._check_role_exists(role_name):
-            self.roles_client.create_role(name=role_name)
+            try:
+                self.roles_client.create_role(name=role_name)
+            finally:
+                # Either the role is new or it was created concurrently
+                invalidate_role_cache()
+
+    def _assign_role(self, role_name, assign):
+        """Assign a role, looked up again if the cached one was not found
+
+        :param role_name: name of the role to be assigned
+        :param assign: a callable assigning the role, given the role dict
+        """
+        for attempt in range(2):
+            role = self._check_role_exists(role_name)
+            if not role:
+                msg = 'No "%s" role found' % role_name
+                raise lib_exc.NotFound(msg)
+            try:
+                return assign(role)
+            except lib_exc.NotFound:
+                if attempt:
+                    raise
+                # The role may have been deleted since it was cached
+                _forget_role(role)
 
     def assign_user_role(self, user, project, role_name):
-        role = self._check_role_exists(role_name)
-        if not role:
-            msg = 'No "%s" role found' % role_name
-            raise lib_exc.NotFound(msg)
-        try:
-            self.roles_client.create_user_role_on_project(project['id'],
-                                                          user['id'],
-                                                          role['id'])
-        except lib_exc.Conflict:
-            LOG.debug("Role %s already assigned on project %s for user %s",
-                      role['id'], project['id'], user['id'])
+        def assign(role):
+            try:
+                self.roles_client.create_user_role_on_project(project['id'],
+                                                              user['id'],
+                                                              role['id'])
+            except lib_exc.Conflict:
+                LOG.debug("Role %s already assigned on project %s for user "
+                          "%s", role['id'], project['id'], user['id'])
+        self._assign_role(role_name, assign)
 
     @abc.abstractmethod
     def get_credentials(
@@ -231,16 +302,15 @@ class V3CredsClient(CredsClient):
         # because of that it's not defined in the parent class.
         if domain is None:
             domain = self.creds_domain
-        role = self._check_role_exists(role_name)
-        if not role:
-            msg = 'No "%s" role found' % role_name
-            raise lib_exc.NotFound(msg)
-        try:
-            self.roles_client.create_user_role_on_domain(
-                domain['id'], user['id'], role['id'])
-        except lib_exc.Conflict:
-            LOG.debug("Role %s already assigned on domain %s for user %s",
-                      role['id'], domain['id'], user['id'])
+
+        def assign(role):
+            try:
+                self.roles_client.create_user_role_on_domain(
+                    domain['id'], user['id'], role['id'])
+            except lib_exc.Conflict:
+                LOG.debug("Role %s already assigned on domain %s for user "
+                          "%s", role['id'], domain['id'], user['id'])
+        self._assign_role(role_name, assign)
 
     def assign_user_role_on_system(self, user, role_name):
         """Assign the specified role on the system
@@ -248,16 +318,14 @@ class V3CredsClient(CredsClient):
         :param user: a user dict
         :param role_name: name of the role to be assigned
         """
-        role = self._check_role_exists(role_name)
-        if not role:
-            msg = 'No "%s" role found' % role_name
-            raise lib_exc.NotFound(msg)
-        try:
-            self.roles_client.create_user_role_on_system(
-                user['id'], role['id'])
-        except lib_exc.Conflict:
-            LOG.debug("Role %s already assigned on the system for user %s",
-                      role['id'], user['id'])
+        def assign(role):
+            try:
+                self.roles_client.create_user_role_on_system(
+                    user['id'], role['id'])
+            except lib_exc.Conflict:
+                LOG.debug("Role %s already assigned on the system for user "
+                          "%s", role['id'], user['id'])
+        self._assign_role(role_name, assign)
 
 
 def get_creds_client(identity_client,
@@ -13,10 +13,12 @@
 #    under the License.
 
 import ipaddress
+import threading
 
 import netaddr
 from oslo_log import log as logging
 
+from tempest.lib.common import cidr_allocator
 from tempest.lib.common import cred_client
 from tempest.lib.common import cred_provider
 from tempest.lib.common.utils import data_utils
@@ -63,6 +65,10 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
     :param identity_admin_endpoint_type: The endpoint type for identity
                                          admin clients. Defaults to public.
     :param identity_uri: Identity URI of the target cloud
+    :param DynamicCredentialPool credential_pool: a pool of pre-provisioned
+                                                  project credentials, used
+                                                  for primary and alt
+                                                  credentials when provided
     """
 
     def __init__(self, identity_version, name=None, network_resources=None,
@@ -72,7 +78,8 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
                  neutron_available=False, create_networks=True,
                  project_network_cidr=None, project_network_mask_bits=None,
                  public_network_id=None, resource_prefix=None,
-                 identity_admin_endpoint_type='public', identity_uri=None):
+                 identity_admin_endpoint_type='public', identity_uri=None,
+                 credential_pool=None):
         super(DynamicCredentialProvider, self).__init__(
             identity_version=identity_version, identity_uri=identity_uri,
             admin_role=admin_role, name=name,
@@ -80,6 +87,10 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
             network_resources=network_resources)
         self.network_resources = network_resources
         self._creds = {}
+        # Keys in self._creds of the credentials obtained from the pool,
+        # those are owned and cleaned up by the pool.
+        self._pooled_creds = set()
+        self.credential_pool = credential_pool
         self.ports = []
         self.resource_prefix = resource_prefix or ''
         self.neutron_available = neutron_available
@@ -331,34 +342,76 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
     def _create_subnet(self, subnet_name, tenant_id, network_id):
         base_cidr = netaddr.IPNetwork(self.project_network_cidr)
         mask_bits = self.project_network_mask_bits
+        if cidr_allocator.is_enabled():
+            return self._create_leased_subnet(subnet_name, tenant_id,
+                                              network_id, base_cidr,
+                                              mask_bits)
         for subnet_cidr in base_cidr.subnet(mask_bits):
-            try:
-                if self.network_resources:
-                    resp_body = self.subnets_admin_client.\
-                        create_subnet(
-                            network_id=network_id, cidr=str(subnet_cidr),
-                            name=subnet_name,
-                            tenant_id=tenant_id,
-                            enable_dhcp=self.network_resources['dhcp'],
-                            ip_version=(ipaddress.ip_network(
-                                str(subnet_cidr)).version))
-                else:
-                    resp_body = self.subnets_admin_client.\
-                        create_subnet(network_id=network_id,
-                                      cidr=str(subnet_cidr),
-                                      name=subnet_name,
-                                      tenant_id=tenant_id,
-                                      ip_version=(ipaddress.ip_network(
-                                          str(subnet_cidr)).version))
+            resp_body = self._try_create_subnet(subnet_name, tenant_id,
+                                                network_id, subnet_cidr)
+            if resp_body is not None:
                 break
-            except lib_exc.BadRequest as e:
-                if 'overlaps with another subnet' not in str(e):
-                    raise
         else:
             message = 'Available CIDR for subnet creation could not be found'
             raise Exception(message)
         return resp_body['subnet']
 
+    def _create_leased_subnet(self, subnet_name, tenant_id, network_id,
+                              base_cidr, mask_bits):
+        """Create a subnet on a block leased from the CIDR allocator
+
+        The block is released with the subnet, see
+        `_clear_isolated_net_resources`.
+        """
+        pool = str(base_cidr)
+
+        def list_subnet_cidrs():
+            return [subnet['cidr'] for subnet in
+                    self.subnets_admin_client.iter_subnets(fields='cidr')]
+
+        while True:
+            subnet_cidr = cidr_allocator.allocate(pool, mask_bits,
+                                                  list_subnet_cidrs)
+            if subnet_cidr is None:
+                message = ('Available CIDR for subnet creation could not be '
+                           'found')
+                raise Exception(message)
+            try:
+                resp_body = self._try_create_subnet(
+                    subnet_name, tenant_id, network_id, subnet_cidr)
+            except Exception:
+                cidr_allocator.release(pool, mask_bits, subnet_cidr)
+                raise
+            if resp_body is not None:
+                return resp_body['subnet']
+            # Used by a subnet created since the allocator listed them
+            cidr_allocator.mark_in_use(pool, mask_bits, subnet_cidr)
+
+    def _try_create_subnet(self, subnet_name, tenant_id, network_id,
+                           subnet_cidr):
+        """Create a subnet, return None if its cidr overlaps another one"""
+        try:
+            if self.network_resources:
+                return self.subnets_admin_client.\
+                    create_subnet(
+                        network_id=network_id, cidr=str(subnet_cidr),
+                        name=subnet_name,
+                        tenant_id=tenant_id,
+                        enable_dhcp=self.network_resources['dhcp'],
+                        ip_version=(ipaddress.ip_network(
+                            str(subnet_cidr)).version))
+            return self.subnets_admin_client.\
+                create_subnet(network_id=network_id,
+                              cidr=str(subnet_cidr),
+                              name=subnet_name,
+                              tenant_id=tenant_id,
+                              ip_version=(ipaddress.ip_network(
+                                  str(subnet_cidr)).version))
+        except lib_exc.BadRequest as e:
+            if 'overlaps with another subnet' not in str(e):
+                raise
+        return None
+
     def _create_router(self, router_name, tenant_id):
         kwargs = {'name': router_name,
                   'tenant_id': tenant_id}
@@ -378,6 +431,9 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
         elif scope and (
                 self._creds.get("%s_%s" % (scope, str(credential_type)))):
             credentials = self._creds["%s_%s" % (scope, str(credential_type))]
+        elif (not scope and credential_type in ['primary', 'alt'] and
+              self._get_pooled_credentials(credential_type)):
+            credentials = self._creds[str(credential_type)]
         else:
             LOG.debug("Creating new dynamic creds for scope: %s and "
                       "credential_type: %s", scope, credential_type)
@@ -414,18 +470,33 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
             # question and discussed a lot in Xena cycle PTG. Once we sort
             # out that then if needed we can update the network creation here.
             if (not scope or scope == 'project'):
-                if (self.neutron_available and self.create_networks):
-                    network, subnet, router = self._create_network_resources(
-                        credentials.tenant_id)
-                    credentials.set_resources(network=network, subnet=subnet,
-                                              router=router)
-                    LOG.info("Created isolated network resources for:\n"
-                             " credentials: %s", credentials)
+                self._set_network_resources(credentials)
             else:
                 LOG.info("Network resources are not created for scope: %s",
                          scope)
         return credentials
 
+    def _set_network_resources(self, credentials):
+        if (self.neutron_available and self.create_networks):
+            network, subnet, router = self._create_network_resources(
+                credentials.tenant_id)
+            credentials.set_resources(network=network, subnet=subnet,
+                                      router=router)
+            LOG.info("Created isolated network resources for:\n"
+                     " credentials: %s", credentials)
+
+    def _get_pooled_credentials(self, credential_type):
+        if not self.credential_pool:
+            return False
+        credentials = self.credential_pool.acquire()
+        if not credentials:
+            return False
+        self._creds[str(credential_type)] = credentials
+        self._pooled_creds.add(str(credential_type))
+        LOG.info("Acquired pooled dynamic creds:\n"
+                 " credentials: %s", credentials)
+        return True
+
     # TODO(gmann): Remove this method in favor of get_project_member_creds()
     # after the deprecation phase.
     def get_primary_creds(self):
@@ -544,12 +615,20 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
                 self.network_resources.get('subnet')):
                 self._clear_isolated_subnet(creds.subnet['id'],
                                             creds.subnet['name'])
+                if cidr_allocator.is_enabled():
+                    cidr_allocator.release(self.project_network_cidr,
+                                           self.project_network_mask_bits,
+                                           creds.subnet['cidr'])
             if (not self.network_resources or
                 self.network_resources.get('network')):
                 self._clear_isolated_network(creds.network['id'],
                                              creds.network['name'])
 
     def clear_creds(self):
+        # Pooled credentials are cleaned up in bulk when the pool is closed
+        for key in self._pooled_creds:
+            self._creds.pop(key, None)
+        self._pooled_creds = set()
         if not self._creds:
             return
         self._clear_isolated_net_resources()
@@ -597,3 +676,126 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
 
     def is_role_available(self, role):
         return True
+
+
+class DynamicCredentialPool(object):
+    """A pool of project credentials provisioned in the background
+
+    Creating a project, a user, its role assignments and its network
+    resources takes several seconds, which otherwise happens synchronously
+    when a test class first asks for credentials. The pool keeps up to
+    ``size`` sets of project credentials, with their network resources,
+    ready to be handed out. Credentials are handed out once and never go
+    back into the pool; they are all deleted together by `close`.
+
+    The credentials are created by a dedicated `DynamicCredentialProvider`,
+    so they have the same roles and network resources as the primary and alt
+    credentials of a provider with the same parameters and no custom
+    network_resources.
+
+    :param DynamicCredentialProvider provider: the provider used to create
+                                               and delete the credentials
+    :param int size: the number of credentials kept ready
+    :param float acquire_timeout: how long `acquire` waits for credentials
+                                  when the pool is empty
+    """
+
+    def __init__(self, provider, size, acquire_timeout=None):
+        if size < 1:
+            raise lib_exc.InvalidConfiguration(
+                'The size of a credential pool must be at least 1')
+        self.provider = provider
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self._available = []
+        self._count = 0
+        self._closed = False
+        self._failed = False
+        self._cond = threading.Condition()
+        self._stats = {'created': 0, 'acquired': 0, 'misses': 0}
+        self._thread = None
+
+    def start(self):
+        """Start provisioning credentials in the background"""
+        with self._cond:
+            if self._thread or self._closed:
+                return
+            self._thread = threading.Thread(
+                target=self._fill, name='dynamic-credential-pool',
+                daemon=True)
+            self._thread.start()
+
+    def _fill(self):
+        while True:
+            with self._cond:
+                while not self._closed and len(self._available) >= self.size:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            try:
+                credentials = self.provider._create_creds()
+                # Register the credentials with the provider right away, so
+                # that close() deletes them even if the network setup fails
+                with self._cond:
+                    self._count += 1
+                    key = 'pool-%d' % self._count
+                    self.provider._creds[key] = credentials
+                self.provider._set_network_resources(credentials)
+            except Exception:
+                LOG.exception("Failed to provision pooled credentials, "
+                              "the credential pool stops filling")
+                with self._cond:
+                    self._failed = True
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._stats['created'] += 1
+                self._available.append(credentials)
+                self._cond.notify_all()
+
+    def acquire(self):
+        """Hand out one set of pre-provisioned credentials
+
+        Waits up to ``acquire_timeout`` seconds for the background thread
+        when the pool is empty.
+
+        :return: a `TestResources` instance, or None when no credentials
+                 are available; the caller is expected to create its own
+                 credentials then.
+        """
+        self.start()
+        with self._cond:
+            if not self._available and not (self._closed or self._failed):
+                self._cond.wait_for(
+                    lambda: (self._available or self._closed or
+                             self._failed),
+                    timeout=self.acquire_timeout)
+            if not self._available:
+                self._stats['misses'] += 1
+                return None
+            credentials = self._available.pop(0)
+            self._stats['acquired'] += 1
+            self._cond.notify_all()
+            return credentials
+
+    def get_stats(self):
+        """Return the number of credentials created, acquired and missed"""
+        with self._cond:
+            return dict(self._stats, available=len(self._available))
+
+    def close(self):
+        """Stop the background thread and delete all the credentials
+
+        This deletes the credentials which have been handed out as well, so
+        it must be called only once the tests using them are done.
+        """
+        with self._cond:
+            self._closed = True
+            self._available = []
+            self._cond.notify_all()
+            thread = self._thread
+        if thread:
+            thread.join()
+        LOG.info("Deleting pooled dynamic credentials, pool stats: %s",
+                 self.get_stats())
+        self.provider.clear_creds()
@@ -12,13 +12,291 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+from http import client as http_client
+import io
+import mmap
+import os
+import socket
+import ssl
+import stat
+import threading
+import time
 
 import urllib3
+from urllib3 import connection
+from urllib3 import connectionpool
 
+from tempest.lib.common import shared_state
 
-class ClosingProxyHttp(urllib3.ProxyManager):
+# Number of idle connections kept per host when keep-alive is enabled
+DEFAULT_POOL_MAXSIZE = 10
+
+# Process wide keep-alive settings, see enable_keep_alive()
+_keep_alive = {}
+
+# Connection reuse counters. Tempest workers are separate processes, so these
+# are effectively per worker.
+_stats = shared_state.Counters('requests', 'connections', 'stale_retries')
+
+# Whether the request being sent by the thread opened a new connection
+_request_state = threading.local()
+
+# Methods which can be re-sent whatever the server did with the first try
+_IDEMPOTENT_METHODS = frozenset(['DELETE', 'GET', 'HEAD', 'OPTIONS', 'PUT',
+                                 'TRACE'])
+# Errors of a connection closed by the server before any response
+_STALE_CONNECTION_ERRORS = (ConnectionResetError, BrokenPipeError,
+                            http_client.RemoteDisconnected)
+
+
+def enable_keep_alive(pool_maxsize=DEFAULT_POOL_MAXSIZE, idle_timeout=None):
+    """Enable persistent connections for the http clients
+
+    By default every request is sent with a ``connection: close`` header, so
+    each API call opens a new TCP (and TLS) connection. Once keep-alive is
+    enabled, clients created afterwards keep their connections open and
+    reuse them for later requests to the same host.
+
+    :param pool_maxsize: number of idle connections kept for each host
+    :param idle_timeout: connections to a host which has not been used for
+        this many seconds are closed instead of reused. None disables it.
+    """
+    _keep_alive['pool_maxsize'] = pool_maxsize
+    _keep_alive['idle_timeout'] = idle_timeout
+
+
+def disable_keep_alive():
+    """Disable persistent connections for clients created afterwards"""
+    _keep_alive.clear()
+
+
+def get_pool_stats():
+    """Return the connection reuse counters of the current process
+
+    :return: dictionary with the number of `requests` sent, of `connections`
+        established, of `reused` connections and of `stale_retries`, i.e.
+        requests re-sent because a kept alive connection was found closed.
+    """
+    stats = _stats.get()
+    stats['reused'] = max(stats['requests'] - stats['connections'], 0)
+    return stats
+
+
+def reset_pool_stats():
+    """Reset the connection reuse counters of the current process"""
+    _stats.reset()
+
+
+class FileBody(object):
+    """A region of a file sent as a request body without reading it
+
+    The connections of ClosingHttp and ClosingProxyHttp send it with
+    socket.sendfile(), so on plain HTTP the data goes from the file to the
+    socket in the kernel, without being copied into Python objects. TLS
+    connections read it a block at a time. Either way the request has a
+    Content-Length and the whole region is never held in memory.
+
+    The region is read at its offset, so the same body can be sent again,
+    e.g. when a request is retried after a stale keep-alive connection.
+
+    :param file: a file object opened in binary mode
+    :param offset: the position in the file of the start of the region
+    :param length: the size of the region, by default up to the end of the
+                   file
+    """
+
+    BLOCKSIZE = 64 * 1024
+
+    def __init__(self, file, offset=0, length=None):
+        self.file = file
+        self.offset = offset
+        if length is None:
+            length = os.fstat(file.fileno()).st_size - offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        """Read the region a block at a time, e.g. for chunked requests"""
+        fd = self.file.fileno()
+        position = self.offset
+        end = self.offset + self.length
+        while position < end:
+            block = os.pread(fd, min(self.BLOCKSIZE, end - position),
+                             position)
+            if not block:
+                return
+            position += len(block)
+            yield block
+
+    def __repr__(self):
+        return '<FileBody %s offset=%d length=%d>' % (
+            getattr(self.file, 'name', self.file), self.offset, self.length)
+
+    def send(self, sock):
+        """Send the region on a socket"""
+        if (hasattr(os, 'sendfile') and isinstance(sock, socket.socket) and
+                not isinstance(sock, ssl.SSLSocket)):
+            sock.sendfile(self.file, self.offset, self.length)
+            return
+        # TLS sockets would read the file from its current position, which
+        # is shared with the other regions of the file being sent
+        for block in self:
+            sock.sendall(block)
+
+
+def as_body(body):
+    """Return a request body which can be sent without copying it
+
+    Regular files opened in binary mode are turned into a `FileBody` from
+    their current position, and buffers such as memoryviews and mmap'd
+    regions into byte memoryviews, so that their size is known and they
+    are sent as they are. Other bodies are returned unchanged.
+    """
+    if body is None or isinstance(body, (bytes, str, FileBody)):
+        return body
+    if isinstance(body, mmap.mmap):
+        # mmap has a read() method, it would be read a block at a time
+        return memoryview(body)
+    if hasattr(body, 'fileno') and not isinstance(body, io.TextIOBase):
+        try:
+            fd = body.fileno()
+            if stat.S_ISREG(os.fstat(fd).st_mode):
+                return FileBody(body, body.tell())
+        except (OSError, ValueError, io.UnsupportedOperation):
+            pass
+        return body
+    try:
+        view = memoryview(body)
+    except TypeError:
+        return body
+    return view.cast('B') if view.format != 'B' else view
+
+
+class _FileBodyMixin(object):
+    """Send FileBody and file request bodies with socket.sendfile()"""
+
+    def request(self, method, url, body=None, headers=None, **kwargs):
+        body = as_body(body)
+        header_names = set(str(name).lower() for name in headers or {})
+        if (not isinstance(body, FileBody) or kwargs.get('chunked') or
+                'transfer-encoding' in header_names):
+            return super(_FileBodyMixin, self).request(
+                method, url, body=body, headers=headers, **kwargs)
+        headers = dict(headers or {})
+        if 'content-length' not in header_names:
+            headers['Content-Length'] = str(len(body))
+        # Only the headers, the body is sent right after them
+        super(_FileBodyMixin, self).request(method, url, body=None,
+                                            headers=headers, **kwargs)
+        body.send(self.sock)
+
+
+class _CountingHTTPConnection(_FileBodyMixin, connection.HTTPConnection):
+    def connect(self):
+        _stats.count('connections')
+        _request_state.connected = True
+        super(_CountingHTTPConnection, self).connect()
+
+
+class _CountingHTTPSConnection(_FileBodyMixin, connection.HTTPSConnection):
+    def connect(self):
+        _stats.count('connections')
+        _request_state.connected = True
+        super(_CountingHTTPSConnection, self).connect()
+
+
+class _CountingHTTPConnectionPool(connectionpool.HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(connectionpool.HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+_counting_pool_classes = {'http': _CountingHTTPConnectionPool,
+                          'https': _CountingHTTPSConnectionPool}
+
+
+class _KeepAliveMixin(object):
+    """Connection handling shared by ClosingHttp and ClosingProxyHttp"""
+
+    def _setup_keep_alive(self, kwargs, keep_alive, pool_maxsize,
+                          idle_timeout):
+        if keep_alive is None:
+            keep_alive = bool(_keep_alive)
+        self.keep_alive = keep_alive
+        self.idle_timeout = None
+        self._last_used = {}
+        if keep_alive:
+            kwargs['maxsize'] = pool_maxsize or _keep_alive.get(
+                'pool_maxsize', DEFAULT_POOL_MAXSIZE)
+            if idle_timeout is None:
+                idle_timeout = _keep_alive.get('idle_timeout')
+            self.idle_timeout = idle_timeout
+
+    def _close_idle_connections(self, url):
+        pool = self.connection_from_url(url)
+        if pool.pool is None:
+            return
+        # Closed connections stay in the pool and reconnect on next use
+        for conn in list(pool.pool.queue):
+            if conn is not None:
+                conn.close()
+
+    @staticmethod
+    def _can_resend(method, body, exc, last_used):
+        # Only when a pooled connection was used, not a new one
+        if last_used is None or _request_state.connected:
+            return False
+        # Files and iterators were consumed by the first try, a FileBody
+        # is read at its offset again
+        if body is not None and not isinstance(
+                body, (bytes, str, memoryview, FileBody)):
+            return False
+        if method.upper() in _IDEMPOTENT_METHODS:
+            return True
+        # Other methods only when the server closed the connection before
+        # any response, i.e. without processing the request
+        cause = exc.args[-1] if exc.args else None
+        return isinstance(cause, _STALE_CONNECTION_ERRORS)
+
+    def _send(self, send, url, method, *args, **kwargs):
+        _stats.count('requests')
+        if not self.keep_alive:
+            original_headers = kwargs.get('headers', {})
+            new_headers = dict(original_headers, connection='close')
+            new_kwargs = dict(kwargs, headers=new_headers)
+            return send(method, url, *args, **new_kwargs)
+
+        parsed = urllib3.util.parse_url(url)
+        host = (parsed.scheme, parsed.host, parsed.port)
+        last_used = self._last_used.get(host)
+        if (last_used is not None and self.idle_timeout and
+                time.monotonic() - last_used > self.idle_timeout):
+            self._close_idle_connections(url)
+        _request_state.connected = False
+        try:
+            r = send(method, url, *args, **kwargs)
+        except urllib3.exceptions.ProtocolError as exc:
+            # The server or a load balancer may have closed a kept alive
+            # connection while it was idle in the pool. urllib3 only retries
+            # idempotent methods, so re-send once on a fresh connection.
+            if not self._can_resend(method, kwargs.get('body'), exc,
+                                    last_used):
+                raise
+            _stats.count('stale_retries')
+            self._close_idle_connections(url)
+            r = send(method, url, *args, **kwargs)
+        self._last_used[host] = time.monotonic()
+        return r
+
+
+class ClosingProxyHttp(_KeepAliveMixin, urllib3.ProxyManager):
     def __init__(self, proxy_url, disable_ssl_certificate_validation=False,
-                 ca_certs=None, timeout=None, follow_redirects=True):
+                 ca_certs=None, timeout=None, follow_redirects=True,
+                 keep_alive=None, pool_maxsize=None, idle_timeout=None):
         self.follow_redirects = follow_redirects
         kwargs = {}
 
@@ -32,9 +310,12 @@ class ClosingProxyHttp(urllib3.ProxyManager):
         if timeout:
             kwargs['timeout'] = timeout
 
+        self._setup_keep_alive(kwargs, keep_alive, pool_maxsize, idle_timeout)
+
         super(ClosingProxyHttp, self).__init__(proxy_url, **kwargs)
+        self.pool_classes_by_scheme = _counting_pool_classes
 
-    def request(self, url, method, *args, **kwargs):
+    def request(self, url, method, *args, stream=False, **kwargs):
 
         class Response(dict):
             def __init__(self, info):
@@ -46,10 +327,6 @@ class ClosingProxyHttp(urllib3.ProxyManager):
                 self.version = info.version
                 self['content-location'] = url
 
-        original_headers = kwargs.get('headers', {})
-        new_headers = dict(original_headers, connection='close')
-        new_kwargs = dict(kwargs, headers=new_headers)
-
         if self.follow_redirects:
             # Follow up to 5 redirections. Don't raise an exception if
             # it's exceeded but return the HTTP 3XX response instead.
@@ -58,14 +335,20 @@ class ClosingProxyHttp(urllib3.ProxyManager):
             # Do not follow redirections. Don't raise an exception if
             # a redirect is found, but return the HTTP 3XX response instead.
             retry = urllib3.util.Retry(redirect=False)
-        r = super(ClosingProxyHttp, self).request(method, url, retries=retry,
-                                                  *args, **new_kwargs)
+        if stream:
+            kwargs['preload_content'] = False
+        r = self._send(super(ClosingProxyHttp, self).request, url, method,
+                       retries=retry, *args, **kwargs)
+        if stream:
+            # The body is read by the caller, which releases the connection
+            return Response(r), r
         return Response(r), r.data
 
 
-class ClosingHttp(urllib3.poolmanager.PoolManager):
+class ClosingHttp(_KeepAliveMixin, urllib3.poolmanager.PoolManager):
     def __init__(self, disable_ssl_certificate_validation=False,
-                 ca_certs=None, timeout=None, follow_redirects=True):
+                 ca_certs=None, timeout=None, follow_redirects=True,
+                 keep_alive=None, pool_maxsize=None, idle_timeout=None):
         self.follow_redirects = follow_redirects
         kwargs = {}
 
@@ -79,9 +362,12 @@ class ClosingHttp(urllib3.poolmanager.PoolManager):
         if timeout:
             kwargs['timeout'] = timeout
 
+        self._setup_keep_alive(kwargs, keep_alive, pool_maxsize, idle_timeout)
+
         super(ClosingHttp, self).__init__(**kwargs)
+        self.pool_classes_by_scheme = _counting_pool_classes
 
-    def request(self, url, method, *args, **kwargs):
+    def request(self, url, method, *args, stream=False, **kwargs):
 
         class Response(dict):
             def __init__(self, info):
@@ -95,10 +381,6 @@ class ClosingHttp(urllib3.poolmanager.PoolManager):
                 self.version = info.version
                 self['content-location'] = url
 
-        original_headers = kwargs.get('headers', {})
-        new_headers = dict(original_headers, connection='close')
-        new_kwargs = dict(kwargs, headers=new_headers)
-
         if self.follow_redirects:
             # Follow up to 5 redirections. Don't raise an exception if
             # it's exceeded but return the HTTP 3XX response instead.
@@ -107,6 +389,11 @@ class ClosingHttp(urllib3.poolmanager.PoolManager):
             # Do not follow redirections. Don't raise an exception if
             # a redirect is found, but return the HTTP 3XX response instead.
             retry = urllib3.util.Retry(redirect=False)
-        r = super(ClosingHttp, self).request(method, url, retries=retry,
-                                             *args, **new_kwargs)
+        if stream:
+            kwargs['preload_content'] = False
+        r = self._send(super(ClosingHttp, self).request, url, method,
+                       retries=retry, *args, **kwargs)
+        if stream:
+            # The body is read by the caller, which releases the connection
+            return Response(r), r
         return Response(r), r.data
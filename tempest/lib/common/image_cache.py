@@ -0,0 +1,189 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Images uploaded once and shared by the tests of all the workers
+
+Once enabled, the tests needing an image made of a local file look it up in
+a registry shared by the workers through files in a directory, by a key
+made of the hash of the file and of the attributes of the image, e.g. its
+disk format and visibility, see `cache_key`. The first test uploads it,
+while the entry is locked so that the tests of other workers needing the
+same image wait for it instead of uploading it too.
+
+The registry counts the references to the image of each process. Tests
+release their reference in their cleanup, and a process drops its
+references when it exits. An image is only deleted when a process exits,
+if no test of a running process holds a reference to it any more.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+
+from oslo_log import log as logging
+
+from tempest.lib.common import shared_state
+
+LOG = logging.getLogger(__name__)
+
+# Process wide image cache settings, see enable_image_cache()
+_settings = {'cache_dir': None}
+
+_stats = shared_state.Counters('hits', 'uploads', 'deleted')
+
+# The digests of the files hashed by this process, by (path, size, mtime)
+_digests = {}
+
+# The delete callables of the images used by this process, by cache key
+_exit_lock = threading.Lock()
+_used = {}
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def enable_image_cache(cache_dir):
+    """Share the images uploaded by the tests through files in cache_dir
+
+    :param cache_dir: the directory of the registry, created if it does not
+                      exist
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    _settings['cache_dir'] = cache_dir
+
+
+def disable_image_cache():
+    """Stop sharing images, the images already shared are left as is"""
+    _settings['cache_dir'] = None
+
+
+def is_enabled():
+    return _settings['cache_dir'] is not None
+
+
+def get_stats():
+    """Return the number of images reused, uploaded and deleted"""
+    return _stats.get()
+
+
+def reset_stats():
+    _stats.reset()
+
+
+def file_digest(path):
+    """Return the sha256 of a file, hashed once per process"""
+    stat = os.stat(path)
+    file_id = (os.path.abspath(path), stat.st_size, stat.st_mtime)
+    digest = _digests.get(file_id)
+    if digest is None:
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as image_file:
+            for chunk in iter(lambda: image_file.read(_CHUNK_SIZE), b''):
+                sha256.update(chunk)
+        digest = _digests[file_id] = sha256.hexdigest()
+    return digest
+
+
+def cache_key(digest, **attributes):
+    """Build the key of an image out of its content and attributes
+
+    :param digest: the hash of the content of the image, see `file_digest`
+    :param attributes: the JSON serializable attributes of the image, e.g.
+                       its disk and container formats, properties and
+                       visibility
+    """
+    data = json.dumps([digest, attributes], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _locked_entry(key):
+    """Load the registry entry of a key, locked, and store it back on exit"""
+    return shared_state.locked_json(
+        os.path.join(_settings['cache_dir'], 'image-%s.json' % key),
+        lambda: {'image_id': None, 'refs': {}})
+
+
+def _live_refs(entry):
+    """The references held by the tests of running processes"""
+    return dict((pid, count) for pid, count in entry['refs'].items()
+                if count > 0 and shared_state.is_alive(int(pid)))
+
+
+def acquire(key, create, exists, delete):
+    """Return the image of a key, uploading it if it is not shared yet
+
+    :param key: the cache key of the image, see `cache_key`
+    :param create: a callable creating and uploading the image, returning
+                   its id
+    :param exists: a callable telling whether the image of an id is still
+                   usable, e.g. it was not deleted
+    :param delete: a callable deleting the image of an id, called when a
+                   process exits and no test of a running process holds a
+                   reference to the image
+    :return: the id of the image
+    """
+    pid = str(os.getpid())
+    with _locked_entry(key) as entry:
+        entry['refs'] = _live_refs(entry)
+        if entry['image_id'] and exists(entry['image_id']):
+            _stats.count('hits')
+        else:
+            entry['image_id'] = create()
+            _stats.count('uploads')
+        entry['refs'][pid] = entry['refs'].get(pid, 0) + 1
+        image_id = entry['image_id']
+    with _exit_lock:
+        if not _used:
+            atexit.register(release_all)
+        _used[key] = delete
+    return image_id
+
+
+def release(key):
+    """Release a reference to the image of a key taken by `acquire`
+
+    The image is kept until the process exits, for the other tests of the
+    process. Once released by all its tests, the exit of another process
+    may delete it.
+    """
+    pid = str(os.getpid())
+    with _locked_entry(key) as entry:
+        if entry['refs'].get(pid):
+            entry['refs'][pid] -= 1
+
+
+def release_all():
+    """Drop the references of this process, deleting the unused images
+
+    Called when the process exits. The images which are not referenced by
+    a test of another running process are deleted.
+    """
+    if not is_enabled():
+        return
+    pid = str(os.getpid())
+    with _exit_lock:
+        used = dict(_used)
+        _used.clear()
+    for key, delete in used.items():
+        with _locked_entry(key) as entry:
+            entry['refs'].pop(pid, None)
+            entry['refs'] = _live_refs(entry)
+            if entry['refs'] or not entry['image_id']:
+                continue
+            try:
+                delete(entry['image_id'])
+                _stats.count('deleted')
+            except Exception:
+                LOG.exception('Failed to delete the shared image %s',
+                              entry['image_id'])
+            entry['image_id'] = None
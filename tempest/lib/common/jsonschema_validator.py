@@ -12,6 +12,8 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import threading
+
 import jsonschema
 from oslo_serialization import base64
 from oslo_utils import timeutils
@@ -20,6 +22,95 @@ from oslo_utils import timeutils
 JSONSCHEMA_VALIDATOR = jsonschema.Draft4Validator
 FORMAT_CHECKER = jsonschema.draft4_format_checker
 
+# Maximum number of compiled validators kept in the cache. Response schemas
+# are module level constants, so this is only reached if schemas are built
+# on the fly.
+VALIDATOR_CACHE_SIZE = 2048
+
+# Compiled validators and sampling counters, keyed by the id() of the schema.
+# The schema itself is stored along with them so that its id cannot be
+# reused by another object while the entry is in the cache.
+_validators = {}
+# The sampling counters are updated by the threads sending requests
+_sample_lock = threading.Lock()
+_sample_counters = {}
+
+_sampling = {'rate': 1}
+
+
+def get_validator(schema):
+    """Return a validator for the schema, compiled only once
+
+    The schema is checked and the validator built the first time a given
+    schema object is seen; later calls with the same object return the
+    cached validator.
+
+    :param schema: JSON schema, as a dict
+    :raises jsonschema.SchemaError: if the schema itself is invalid
+    """
+    entry = _validators.get(id(schema))
+    if entry is None or entry[0] is not schema:
+        JSONSCHEMA_VALIDATOR.check_schema(schema)
+        if len(_validators) >= VALIDATOR_CACHE_SIZE:
+            _validators.clear()
+        entry = (schema, JSONSCHEMA_VALIDATOR(schema,
+                                              format_checker=FORMAT_CHECKER))
+        _validators[id(schema)] = entry
+    return entry[1]
+
+
+def validate(instance, schema):
+    """Validate an instance against a schema using a cached validator
+
+    This is equivalent to `jsonschema.validate` with the validator and
+    format checker used by Tempest.
+
+    :raises jsonschema.ValidationError: if the instance is invalid
+    """
+    error = jsonschema.exceptions.best_match(
+        get_validator(schema).iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def set_sample_rate(rate):
+    """Validate only one in `rate` successful responses for each schema
+
+    The first response for each schema is always validated. A rate of 1,
+    the default, validates every response. Setting the current rate again
+    keeps counting the responses where they are.
+
+    :param rate: positive integer
+    """
+    if rate < 1:
+        raise ValueError('The sample rate must be a positive integer, '
+                         'got %s' % rate)
+    with _sample_lock:
+        if rate != _sampling['rate']:
+            _sampling['rate'] = rate
+            _sample_counters.clear()
+
+
+def is_sampled(schema):
+    """Whether a response for the schema is to be validated
+
+    :param schema: the response schema, including the status code
+    """
+    rate = _sampling['rate']
+    if rate == 1:
+        return True
+    schema_id = id(schema)
+    with _sample_lock:
+        entry = _sample_counters.get(schema_id)
+        if entry is None or entry[0] is not schema:
+            if len(_sample_counters) >= VALIDATOR_CACHE_SIZE:
+                _sample_counters.clear()
+            entry = [schema, 0]
+            _sample_counters[schema_id] = entry
+        count = entry[1]
+        entry[1] = count + 1
+    return count % rate == 0
+
 
 # NOTE(gmann): Add customized format checker for 'date-time' format because:
 # 1. jsonschema needs strict_rfc3339 or isodate module to be installed
@@ -0,0 +1,186 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import random
+import threading
+import time
+
+# Process wide polling settings, see configure(). The defaults poll at a
+# constant interval, which is what the waiters always did.
+_settings = {
+    'fast_polls': 0,
+    'fast_interval': 0,
+    'backoff': 1.0,
+    'max_interval': None,
+    'jitter': 0.0,
+}
+
+# Polling metrics by resource type
+_metrics_lock = threading.Lock()
+_metrics = {}
+
+
+def configure(fast_polls=0, fast_interval=0, backoff=1.0, max_interval=None,
+              jitter=0.0):
+    """Configure the polling schedule of all the waiters
+
+    The first `fast_polls` polls are done every `fast_interval` seconds, to
+    catch resources which settle quickly. After that the interval starts
+    from the `interval` of the poller, usually the `build_interval` of the
+    client, and it is multiplied by `backoff` after each poll, up to
+    `max_interval`.
+
+    :param fast_polls: number of polls of the fast phase
+    :param fast_interval: seconds between polls in the fast phase
+    :param backoff: factor applied to the interval after each poll; 1 keeps
+        the interval constant
+    :param max_interval: upper bound of the interval, in seconds
+    :param jitter: randomize each interval by up to this fraction of it, to
+        avoid workers polling in lock step
+    """
+    if backoff < 1:
+        raise ValueError('backoff must be at least 1, got %s' % backoff)
+    if not 0 <= jitter < 1:
+        raise ValueError('jitter must be in [0, 1), got %s' % jitter)
+    _settings.update(fast_polls=fast_polls, fast_interval=fast_interval,
+                     backoff=backoff, max_interval=max_interval,
+                     jitter=jitter)
+
+
+def get_metrics():
+    """Return the polling metrics of the current process
+
+    :return: dictionary by resource type of the number of `waits`, of
+        `settled` resources, of `timeouts`, of `polls`, of `wasted_polls`
+        i.e. polls which did not see the resource settled, and of the total
+        `settle_time` in seconds of the settled resources.
+    """
+    with _metrics_lock:
+        return dict((k, dict(v)) for k, v in _metrics.items())
+
+
+def reset_metrics():
+    """Reset the polling metrics of the current process"""
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def _record(resource_type, polls, outcome, settle_time=0):
+    with _metrics_lock:
+        metrics = _metrics.setdefault(resource_type, {
+            'waits': 0, 'settled': 0, 'timeouts': 0, 'polls': 0,
+            'wasted_polls': 0, 'settle_time': 0.0})
+        metrics['waits'] += 1
+        metrics[outcome] += 1
+        metrics['polls'] += polls
+        metrics['wasted_polls'] += polls - 1 if outcome == 'settled' else polls
+        metrics['settle_time'] += settle_time
+
+
+class Poller(object):
+    """Polling loop with a deadline, shared by all the waiters
+
+    Iterating over a poller yields once for each poll. The first poll
+    happens straight away, the following ones after sleeping according to
+    the schedule set by `configure`. From the second poll on, the iteration
+    stops once the deadline is reached, in which case the waiter is expected
+    to raise its timeout exception::
+
+        poller = Poller('image', client=client)
+        for _ in poller:
+            image = client.show_image(image_id)
+            if image['status'] == status:
+                poller.settled()
+                return image
+        raise lib_exc.TimeoutException(...)
+
+    Waiters should call `settled` once the resource reached the expected
+    state, so that the time to settle and the number of polls are recorded
+    in the metrics for the resource type.
+
+    :param resource_type: name of the resource polled, used for the metrics
+    :param timeout: seconds after which the iteration stops. Defaults to
+        the `build_timeout` of the client, plus `extra_timeout`.
+    :param interval: base number of seconds between polls. Defaults to the
+        `build_interval` of the client.
+    :param client: a service client. Its attributes are only read when
+        needed.
+    :param extra_timeout: seconds added to the `build_timeout` of the client
+    """
+
+    def __init__(self, resource_type, timeout=None, interval=None,
+                 client=None, extra_timeout=0):
+        self.resource_type = resource_type
+        self._timeout = timeout
+        self._interval = interval
+        self._client = client
+        self._extra_timeout = extra_timeout
+        self.polls = 0
+        self.start_time = None
+        self._start = None
+
+    @property
+    def timeout(self):
+        if self._timeout is None:
+            return self._client.build_timeout + self._extra_timeout
+        return self._timeout
+
+    @property
+    def interval(self):
+        if self._interval is None:
+            return self._client.build_interval
+        return self._interval
+
+    def _next_interval(self, remaining=None):
+        settings = _settings
+        if self.polls <= settings['fast_polls']:
+            delay = min(settings['fast_interval'], self.interval)
+        elif settings['backoff'] == 1 and not settings['jitter']:
+            return self.interval
+        else:
+            steps = self.polls - settings['fast_polls'] - 1
+            delay = self.interval * settings['backoff'] ** steps
+            if settings['max_interval']:
+                delay = min(delay, max(settings['max_interval'],
+                                       self.interval))
+        if settings['jitter']:
+            delay *= random.uniform(1 - settings['jitter'],
+                                    1 + settings['jitter'])
+        if remaining is not None:
+            # Do not sleep past the deadline
+            delay = min(delay, remaining)
+        return delay
+
+    def __iter__(self):
+        # NOTE: time.time() is used for the deadline, as it always was in
+        # the waiters, while the metrics use a monotonic clock.
+        self.start_time = int(time.time())
+        self._start = time.monotonic()
+        self.polls = 1
+        yield self.polls
+        time.sleep(self._next_interval())
+        while True:
+            self.polls += 1
+            yield self.polls
+            elapsed = int(time.time()) - self.start_time
+            if elapsed >= self.timeout:
+                _record(self.resource_type, self.polls, 'timeouts')
+                return
+            time.sleep(self._next_interval(self.timeout - elapsed))
+
+    def settled(self):
+        """Record that the polled resource reached the expected state"""
+        _record(self.resource_type, self.polls, 'settled',
+                time.monotonic() - self._start)
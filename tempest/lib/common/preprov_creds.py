@@ -14,7 +14,6 @@
 
 import os
 
-from oslo_concurrency import lockutils
 from oslo_log import log as logging
 from oslo_utils.secretutils import md5
 import yaml
@@ -44,9 +43,10 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
 
     This credentials provider loads the details of pre-provisioned
     accounts from a YAML file, in the format specified by
-    ``etc/accounts.yaml.sample``. It locks accounts while in use, using the
-    external locking mechanism, allowing for multiple python processes
-    to share a single account file, and thus running tests in parallel.
+    ``etc/accounts.yaml.sample``. It locks accounts while in use, by
+    atomically creating a file per account in the accounts_lock_dir, allowing
+    for multiple python processes to share a single account file, and thus
+    running tests in parallel.
 
     The accounts_lock_dir must be generated using `lockutils.get_lock_path`
     from the oslo.concurrency library. For instance::
@@ -93,6 +93,7 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
             object_storage_reseller_admin_role)
         self.accounts_dir = accounts_lock_dir
         self._creds = {}
+        self._match_hash_lists = {}
 
     @classmethod
     def _append_role(cls, role, account_hash, hash_dict):
@@ -189,36 +190,70 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
         return self.is_multi_user()
 
     def _create_hash_file(self, hash_string):
+        # O_EXCL makes the creation of the file an atomic claim of the
+        # account, so concurrent workers do not need a global lock
         path = os.path.join(self.accounts_dir, hash_string)
-        if not os.path.isfile(path):
-            with open(path, 'w') as fd:
-                fd.write(self.name)
-            return True
-        return False
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as hash_file:
+            hash_file.write(self.name)
+        return True
+
+    def _read_hash_file(self, hash_string):
+        path = os.path.join(self.accounts_dir, hash_string)
+        try:
+            with open(path, 'r') as fd:
+                return fd.read()
+        except FileNotFoundError:
+            # Released in the meantime
+            return ''
 
-    @lockutils.synchronized('test_accounts_io', external=True)
     def _get_free_hash(self, hashes):
         # Cast as a list because in some edge cases a set will be passed in
         hashes = list(hashes)
-        if not os.path.isdir(self.accounts_dir):
-            os.mkdir(self.accounts_dir)
-            # Create File from first hash (since none are in use)
-            self._create_hash_file(hashes[0])
-            return hashes[0]
-        names = []
-        for _hash in hashes:
-            res = self._create_hash_file(_hash)
-            if res:
+        # Start looking at a different position in each process, so that
+        # concurrent workers do not all compete for the same accounts
+        start = os.getpid() % len(hashes)
+        hashes = hashes[start:] + hashes[:start]
+        # Try the accounts which were free when listing the lock directory
+        # first, so that a claim usually takes a single open() call. The
+        # others are still tried as they may have been released since then,
+        # which makes a claim O(n) in the worst case.
+        try:
+            claimed = set(os.listdir(self.accounts_dir))
+        except FileNotFoundError:
+            claimed = set()
+        candidates = ([x for x in hashes if x not in claimed] +
+                      [x for x in hashes if x in claimed])
+        for _hash in candidates:
+            while True:
+                try:
+                    claimed = self._create_hash_file(_hash)
+                    break
+                except FileNotFoundError:
+                    # The lock directory does not exist yet, or it was
+                    # removed by a worker releasing the last allocated
+                    # account, which can happen again before the claim
+                    os.makedirs(self.accounts_dir, exist_ok=True)
+            if claimed:
                 return _hash
-            else:
-                path = os.path.join(self.accounts_dir, _hash)
-                with open(path, 'r') as fd:
-                    names.append(fd.read())
+        names = [self._read_hash_file(_hash) for _hash in hashes]
         msg = ('Insufficient number of users provided. %s have allocated all '
                'the credentials for this allocation request' % ','.join(names))
         raise lib_exc.InvalidCredentials(msg)
 
     def _get_match_hash_list(self, roles=None, scope=None):
+        # The accounts matching a given set of roles never change, compute
+        # them only once
+        key = (frozenset(roles or ()), scope)
+        if key not in self._match_hash_lists:
+            self._match_hash_lists[key] = self._build_match_hash_list(
+                roles, scope)
+        return self._match_hash_lists[key]
+
+    def _build_match_hash_list(self, roles=None, scope=None):
         hashes = []
         if roles:
             # Loop over all the creds for each role in the subdict and generate
@@ -243,15 +278,15 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
             temp_list = set(hashes[0])
             for hash_list in hashes[1:]:
                 temp_list = temp_list & set(hash_list)
-            hashes = temp_list
+            # Keep the order of the accounts file
+            hashes = [x for x in hashes[0] if x in temp_list]
         else:
-            hashes = self.hash_dict['creds'].keys()
+            hashes = list(self.hash_dict['creds'].keys())
         # NOTE(mtreinish): admin is a special case because of the increased
         # privilege set which could potentially cause issues on tests where
         # that is not expected. So unless the admin role isn't specified do
         # not allocate admin.
-        admin_hashes = self.hash_dict['roles'].get(self.admin_role,
-                                                   None)
+        admin_hashes = set(self.hash_dict['roles'].get(self.admin_role, ()))
         if ((not roles or self.admin_role not in roles) and
                 admin_hashes):
             useable_hashes = [x for x in hashes if x not in admin_hashes]
@@ -275,16 +310,20 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
         LOG.info('%s allocated creds:\n%s', self.name, clean_creds)
         return self._wrap_creds_with_network(free_hash)
 
-    @lockutils.synchronized('test_accounts_io', external=True)
     def remove_hash(self, hash_string):
         hash_path = os.path.join(self.accounts_dir, hash_string)
-        if not os.path.isfile(hash_path):
+        try:
+            os.remove(hash_path)
+        except FileNotFoundError:
             LOG.warning('Expected an account lock file %s to remove, but '
                         'one did not exist', hash_path)
-        else:
-            os.remove(hash_path)
+            return
+        try:
             if not os.listdir(self.accounts_dir):
                 os.rmdir(self.accounts_dir)
+        except OSError:
+            # Another worker claimed or released an account meanwhile
+            pass
 
     def get_hash(self, creds):
         for _hash in self.hash_dict['creds']:
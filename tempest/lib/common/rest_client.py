@@ -16,6 +16,7 @@
 
 from collections import abc
 import email.utils
+import hashlib
 import re
 import time
 import urllib
@@ -24,9 +25,12 @@ import jsonschema
 from oslo_log import log as logging
 from oslo_log import versionutils
 from oslo_serialization import jsonutils as json
+from oslo_utils.secretutils import md5
 
+from tempest.lib.common import api_metrics
 from tempest.lib.common import http
 from tempest.lib.common import jsonschema_validator
+from tempest.lib.common import poller as lib_poller
 from tempest.lib.common import profiler
 from tempest.lib.common.utils import test_utils
 from tempest.lib import exceptions
@@ -45,6 +49,69 @@ JSONSCHEMA_VALIDATOR = jsonschema_validator.JSONSCHEMA_VALIDATOR
 FORMAT_CHECKER = jsonschema_validator.FORMAT_CHECKER
 
 
+def _body_size(body, headers=None):
+    """Return the size of a request or response body, 0 if not known"""
+    if isinstance(body, bytes):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    if isinstance(body, memoryview):
+        return body.nbytes
+    if isinstance(body, http.FileBody):
+        return len(body)
+    # Streamed bodies, e.g. files or chunked uploads
+    try:
+        return int((headers or {}).get('content-length', 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _next_marker(body, key):
+    """Return the marker of the next page of a listing, None if last"""
+    # Nova, Cinder and Neutron: a <key>_links list with a next link.
+    # Glance: a next key with the URL of the next page.
+    next_url = body.get('next')
+    for link in body.get(key + '_links') or []:
+        if link.get('rel') == 'next':
+            next_url = link.get('href')
+    if not next_url:
+        return None
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(next_url).query)
+    return query.get('marker', [None])[0]
+
+
+def paginate(list_func, key, **params):
+    """Yield the resources of a paginated listing, one page at a time
+
+    The pages are requested as the resources are consumed, following the
+    next links of the listings of Nova, Cinder, Neutron and Glance with
+    their ``marker`` query parameter, so that only one page is held in
+    memory at a time. Give a ``limit`` parameter to choose the size of the
+    pages, the services otherwise use their own default size.
+
+    :param list_func: service client method returning the body of a page
+        of the listing, called with the query parameters as keyword
+        arguments
+    :param key: key of the resources in the body, e.g. ``servers``
+    :param params: query parameters of the listing
+    """
+    marker = None
+    while True:
+        page_params = dict(params)
+        if marker is not None:
+            page_params['marker'] = marker
+        body = list_func(**page_params)
+        resources = body[key]
+        for resource in resources:
+            yield resource
+        next_marker = _next_marker(body, key)
+        # Stop on an empty page or a next link pointing to the same page,
+        # which would loop forever
+        if not resources or next_marker is None or next_marker == marker:
+            return
+        marker = next_marker
+
+
 class RestClient(object):
     """Unified OpenStack RestClient class
 
@@ -105,17 +172,38 @@ class RestClient(object):
                                        'vary', 'www-authenticate'))
         self.dscv = disable_ssl_certificate_validation
 
-        if proxy_url:
-            self.http_obj = http.ClosingProxyHttp(
-                proxy_url,
-                disable_ssl_certificate_validation=self.dscv,
-                ca_certs=ca_certs,
-                timeout=http_timeout, follow_redirects=follow_redirects)
-        else:
-            self.http_obj = http.ClosingHttp(
-                disable_ssl_certificate_validation=self.dscv,
-                ca_certs=ca_certs,
-                timeout=http_timeout, follow_redirects=follow_redirects)
+        # The connection pool is only created when the first request is sent
+        self._http_params = {
+            'proxy_url': proxy_url,
+            'disable_ssl_certificate_validation': self.dscv,
+            'ca_certs': ca_certs,
+            'timeout': http_timeout,
+            'follow_redirects': follow_redirects}
+        self._http_obj = None
+
+    @property
+    def http_obj(self):
+        """The HTTP connection pool of the client, created on first use"""
+        if self._http_obj is None:
+            params = dict(self._http_params)
+            proxy_url = params.pop('proxy_url')
+            if proxy_url:
+                self._http_obj = http.ClosingProxyHttp(proxy_url, **params)
+            else:
+                self._http_obj = http.ClosingHttp(**params)
+        return self._http_obj
+
+    @http_obj.setter
+    def http_obj(self, http_obj):
+        self._http_obj = http_obj
+
+    def http_pool_key(self):
+        """Return a key identifying the HTTP settings of the client
+
+        Clients with the same key can share their HTTP connection pool, see
+        `http_obj`.
+        """
+        return tuple(sorted(self._http_params.items()))
 
     def get_headers(self, accept_type=None, send_type=None):
         """Return the default headers which will be used with outgoing requests
@@ -298,7 +386,7 @@ class RestClient(object):
         """
         return self.request('POST', url, extra_headers, headers, body, chunked)
 
-    def get(self, url, headers=None, extra_headers=False):
+    def get(self, url, headers=None, extra_headers=False, stream=False):
         """Send a HTTP GET request using keystone service catalog and auth
 
         :param str url: the relative url to send the get request to
@@ -307,10 +395,16 @@ class RestClient(object):
                                    returned by the get_headers() method are to
                                    be used but additional headers are needed in
                                    the request pass them in as a dict.
+        :param bool stream: return the body of a successful response as a
+                            ResponseBodyStream, read as it is received
         :return: a tuple with the first entry containing the response headers
                  and the second the response body
         :rtype: tuple
         """
+        if stream:
+            return self.request('GET', url, extra_headers, headers,
+                                stream=True)
+        # Subclasses overriding request() may not know about stream
         return self.request('GET', url, extra_headers, headers)
 
     def delete(self, url, headers=None, body=None, extra_headers=False):
@@ -574,7 +668,8 @@ class RestClient(object):
         if method != 'HEAD' and not resp_body and resp.status >= 400:
             self.LOG.warning("status >= 400 response with empty body")
 
-    def _request(self, method, url, headers=None, body=None, chunked=False):
+    def _request(self, method, url, headers=None, body=None, chunked=False,
+                 stream=False):
         """A simple HTTP request interface."""
         # Authenticate the request with the auth provider
         req_url, req_headers, req_body = self.auth_provider.auth_request(
@@ -582,7 +677,7 @@ class RestClient(object):
 
         resp, resp_body = self.raw_request(
             req_url, method, headers=req_headers, body=req_body,
-            chunked=chunked
+            chunked=chunked, stream=stream
         )
         # Verify HTTP response codes
         self.response_checker(method, resp, resp_body)
@@ -590,7 +685,7 @@ class RestClient(object):
         return resp, resp_body
 
     def raw_request(self, url, method, headers=None, body=None, chunked=False,
-                    log_req_body=None):
+                    log_req_body=None, stream=False):
         """Send a raw HTTP request without the keystone catalog or auth
 
         This method sends a HTTP request in the same manner as the request()
@@ -604,34 +699,64 @@ class RestClient(object):
                              specified, then the headers returned from the
                              get_headers() method are used. If the request
                              explicitly requires no headers use an empty dict.
-        :param str body: Body to send with the request
+        :param str body: Body to send with the request. Files opened in
+                         binary mode, memoryviews, mmap'd regions and
+                         http.FileBody regions of files are sent without
+                         being read into memory, see http.as_body.
         :param bool chunked: sends the body with chunked encoding
         :param str log_req_body: Whether to log the request body or not.
                                  It is default to None which means request
                                  body is safe to log otherwise pass any string
                                  you want to log in place of request body.
                                  For example: '<omitted>'
+        :param bool stream: return the body of a successful response as a
+                            ResponseBodyStream instead of reading it at once.
+                            The bodies of the other responses are read, for
+                            the error checks.
         :rtype: tuple
         :return: a tuple with the first entry containing the response headers
                  and the second the response body
         """
         if headers is None:
             headers = self.get_headers()
+        # Only passed when set, the http objects of the unit tests do not
+        # know about it
+        stream_kwargs = {'stream': True} if stream else {}
         # Do the actual request, and time it
         start = time.time()
         self._log_request_start(method, url)
-        resp, resp_body = self.http_obj.request(
-            url, method, headers=headers,
-            body=body, chunked=chunked)
+        try:
+            resp, resp_body = self.http_obj.request(
+                url, method, headers=headers,
+                body=body, chunked=chunked, **stream_kwargs)
+        except Exception as exc:
+            if api_metrics.is_enabled():
+                api_metrics.record(self.service, method, url,
+                                   time.time() - start, error=exc,
+                                   bytes_out=_body_size(body, headers))
+            raise
+        log_resp_body = resp_body
+        if stream:
+            resp_body = ResponseBodyStream(resp, resp_body)
+            if resp.status >= 300 or resp.status in (204, 205):
+                resp_body = log_resp_body = resp_body.read()
+            else:
+                log_resp_body = '<streamed>'
         end = time.time()
+        if api_metrics.is_enabled():
+            # The size of a streamed body is its content-length, if any
+            api_metrics.record(self.service, method, url, end - start,
+                               status=resp.status,
+                               bytes_out=_body_size(body, headers),
+                               bytes_in=_body_size(resp_body, resp))
         req_body = body if log_req_body is None else log_req_body
         self._log_request(method, url, resp, secs=(end - start),
                           req_headers=headers, req_body=req_body,
-                          resp_body=resp_body)
+                          resp_body=log_resp_body)
         return resp, resp_body
 
     def request(self, method, url, extra_headers=False, headers=None,
-                body=None, chunked=False):
+                body=None, chunked=False, stream=False):
         """Send a HTTP request with keystone auth and using the catalog
 
         This method will send an HTTP request using keystone auth in the
@@ -656,8 +781,13 @@ class RestClient(object):
                              specified, then the headers returned from the
                              get_headers() method are used. If the request
                              explicitly requires no headers use an empty dict.
-        :param str body: Body to send with the request
+        :param str body: Body to send with the request. Files opened in
+                         binary mode, memoryviews, mmap'd regions and
+                         http.FileBody regions of files are sent without
+                         being read into memory, see http.as_body.
         :param bool chunked: sends the body with chunked encoding
+        :param bool stream: return the body of a successful response as a
+                            ResponseBodyStream, read as it is received
         :rtype: tuple
         :return: a tuple with the first entry containing the response headers
                  and the second the response body
@@ -702,7 +832,8 @@ class RestClient(object):
                 headers = self.get_headers()
 
         resp, resp_body = self._request(method, url, headers=headers,
-                                        body=body, chunked=chunked)
+                                        body=body, chunked=chunked,
+                                        stream=stream)
 
         while (resp.status == 413 and
                'retry-after' in resp and
@@ -716,7 +847,13 @@ class RestClient(object):
             )
             time.sleep(delay)
             resp, resp_body = self._request(method, url,
-                                            headers=headers, body=body)
+                                            headers=headers, body=body,
+                                            stream=stream)
+        if retry:
+            # The full URL of the request, the one of the metrics of the calls
+            api_metrics.record_retries(self.service, method,
+                                       resp.get('content-location', url),
+                                       retry)
         self._error_checker(resp, resp_body)
         return resp, resp_body
 
@@ -917,25 +1054,26 @@ class RestClient(object):
         :raises TimeoutException: If the build_timeout has elapsed and the
                                   resource still hasn't been deleted
         """
-        start_time = int(time.time())
-        while True:
+        poller = lib_poller.Poller(self.resource_type + '_deletion',
+                                   client=self)
+        for _ in poller:
             if self.is_resource_deleted(id, *args, **kwargs):
+                poller.settled()
                 return
-            if int(time.time()) - start_time >= self.build_timeout:
-                message = ('Failed to delete %(resource_type)s %(id)s within '
-                           'the required time (%(timeout)s s). Timer started '
-                           'at %(start_time)s. Timer ended at %(end_time)s. '
-                           'Waited for %(wait_time)s s.' %
-                           {'resource_type': self.resource_type, 'id': id,
-                            'timeout': self.build_timeout,
-                            'start_time': start_time,
-                            'end_time': int(time.time()),
-                            'wait_time': int(time.time()) - start_time})
-                caller = test_utils.find_test_caller()
-                if caller:
-                    message = '(%s) %s' % (caller, message)
-                raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+        start_time = poller.start_time
+        message = ('Failed to delete %(resource_type)s %(id)s within '
+                   'the required time (%(timeout)s s). Timer started '
+                   'at %(start_time)s. Timer ended at %(end_time)s. '
+                   'Waited for %(wait_time)s s.' %
+                   {'resource_type': self.resource_type, 'id': id,
+                    'timeout': self.build_timeout,
+                    'start_time': start_time,
+                    'end_time': int(time.time()),
+                    'wait_time': int(time.time()) - start_time})
+        caller = test_utils.find_test_caller()
+        if caller:
+            message = '(%s) %s' % (caller, message)
+        raise exceptions.TimeoutException(message)
 
     def wait_for_resource_activation(self, id):
         """Waits for a resource to become active
@@ -948,20 +1086,20 @@ class RestClient(object):
         :raises TimeoutException: If the build_timeout has elapsed and the
                                   resource still hasn't been active
         """
-        start_time = int(time.time())
-        while True:
+        poller = lib_poller.Poller(self.resource_type + '_activation',
+                                   client=self)
+        for _ in poller:
             if self.is_resource_active(id):
+                poller.settled()
                 return
-            if int(time.time()) - start_time >= self.build_timeout:
-                message = ('Failed to reach active state %(resource_type)s '
-                           '%(id)s within the required time (%(timeout)s s).' %
-                           {'resource_type': self.resource_type, 'id': id,
-                            'timeout': self.build_timeout})
-                caller = test_utils.find_test_caller()
-                if caller:
-                    message = '(%s) %s' % (caller, message)
-                raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+        message = ('Failed to reach active state %(resource_type)s '
+                   '%(id)s within the required time (%(timeout)s s).' %
+                   {'resource_type': self.resource_type, 'id': id,
+                    'timeout': self.build_timeout})
+        caller = test_utils.find_test_caller()
+        if caller:
+            message = '(%s) %s' % (caller, message)
+        raise exceptions.TimeoutException(message)
 
     def is_resource_deleted(self, id):
         """Subclasses override with specific deletion detection."""
@@ -990,16 +1128,20 @@ class RestClient(object):
         if resp.status in HTTP_SUCCESS + HTTP_REDIRECTION:
             cls.expected_success(schema['status_code'], resp.status)
 
+            # NOTE: in sampling mode the schema validation only happens for
+            # one in N successful responses, see
+            # jsonschema_validator.set_sample_rate
+            sampled = jsonschema_validator.is_sampled(schema)
+
             # Check the body of a response
             body_schema = schema.get('response_body')
             if body_schema:
-                try:
-                    jsonschema.validate(body, body_schema,
-                                        cls=JSONSCHEMA_VALIDATOR,
-                                        format_checker=FORMAT_CHECKER)
-                except jsonschema.ValidationError as ex:
-                    msg = ("HTTP response body is invalid (%s)" % ex)
-                    raise exceptions.InvalidHTTPResponseBody(msg)
+                if sampled:
+                    try:
+                        jsonschema_validator.validate(body, body_schema)
+                    except jsonschema.ValidationError as ex:
+                        msg = ("HTTP response body is invalid (%s)" % ex)
+                        raise exceptions.InvalidHTTPResponseBody(msg)
             else:
                 if body:
                     msg = ("HTTP response body should not exist (%s)" % body)
@@ -1007,11 +1149,9 @@ class RestClient(object):
 
             # Check the header of a response
             header_schema = schema.get('response_header')
-            if header_schema:
+            if header_schema and sampled:
                 try:
-                    jsonschema.validate(resp, header_schema,
-                                        cls=JSONSCHEMA_VALIDATOR,
-                                        format_checker=FORMAT_CHECKER)
+                    jsonschema_validator.validate(resp, header_schema)
                 except jsonschema.ValidationError as ex:
                     msg = ("HTTP response header is invalid (%s)" % ex)
                     raise exceptions.InvalidHTTPResponseHeader(msg)
@@ -1057,6 +1197,78 @@ class ResponseBodyData(object):
         return "response: %s\nBody: %s" % (self.response, self.data)
 
 
+class ResponseBodyStream(object):
+    """Class that wraps an http response and a body read as it is received.
+
+    The body is read in chunks, by iterating over the object or with read(),
+    and hashed as it is read, so that large downloads such as images and
+    objects are checked without being held in memory. The connection is
+    given back to the pool once the body is read or the object is closed.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, response, raw, chunk_size=None):
+        self.response = response
+        self.raw = raw
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.size = 0
+        self.md5 = md5(usedforsecurity=False)
+        self.sha256 = hashlib.sha256()
+        self.closed = False
+        self._exhausted = False
+
+    def read(self, amt=None):
+        """Read and hash up to amt bytes of the body, all of it if None"""
+        if self.closed:
+            return b''
+        data = self.raw.read(amt)
+        if data:
+            self.size += len(data)
+            self.md5.update(data)
+            self.sha256.update(data)
+        if amt is None or not data:
+            self._exhausted = True
+            self.close()
+        return data
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def consume(self):
+        """Read the rest of the body, only hashing it
+
+        :return: the size of the body
+        """
+        for _ in self:
+            pass
+        return self.size
+
+    def close(self):
+        """Stop reading the body and release the connection"""
+        if self.closed:
+            return
+        self.closed = True
+        if not self._exhausted:
+            # The connection can not be reused with a partly read body
+            self.raw.close()
+        self.raw.release_conn()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __str__(self):
+        return "response: %s\nBody: <streamed, %d bytes read>" % (
+            self.response, self.size)
+
+
 class ResponseBodyList(list):
     """Class that wraps an http response and list body into a single value.
 
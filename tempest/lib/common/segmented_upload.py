@@ -0,0 +1,253 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Upload of large Swift objects in segments sent in parallel
+
+A single PUT of a large object is bound by the throughput of one connection
+and of one object server. `SegmentedUploader` splits the data in segments,
+uploads them concurrently, at most ``max_workers`` at a time, and then
+writes a static (SLO) or dynamic (DLO) large object manifest, see
+https://docs.openstack.org/swift/latest/overview_large_objects.html
+
+The segments of bytes and buffers are slices of them, and the ones of
+regular files are regions of the file sent with ``socket.sendfile()``, see
+`tempest.lib.common.http.FileBody`. Other file-like objects are read one
+segment at a time, so that at most ``max_workers + 1`` segments are held in
+memory whatever the size of the object.
+"""
+
+from concurrent import futures
+import time
+from urllib import parse as urlparse
+
+from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
+from oslo_utils.secretutils import md5
+
+from tempest.lib.common import http
+from tempest.lib import exceptions
+
+LOG = logging.getLogger(__name__)
+
+SLO = 'slo'
+DLO = 'dlo'
+
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_WORKERS = 4
+# Below the max_deletes_per_request of the Swift bulk middleware
+BULK_DELETE_SIZE = 1000
+
+
+def _pop_all(head, rest):
+    while head:
+        yield head.pop(0)
+    yield from rest
+
+
+class SegmentedUploader(object):
+    """Upload and delete large objects made of segments
+
+    :param object_client: the ObjectClient the segments and the manifest
+                          are uploaded with
+    :param container_client: a ContainerClient, used to create the segment
+                             container and to list the segments of dynamic
+                             large objects
+    :param bulk_client: a BulkMiddlewareClient, used to delete the segments
+                        of dynamic large objects in one request. Without it
+                        they are deleted one by one.
+    :param segment_size: the size in bytes of the segments
+    :param max_workers: the maximum number of segments uploaded at once
+    """
+
+    def __init__(self, object_client, container_client=None,
+                 bulk_client=None, segment_size=DEFAULT_SEGMENT_SIZE,
+                 max_workers=DEFAULT_MAX_WORKERS):
+        self.object_client = object_client
+        self.container_client = container_client
+        self.bulk_client = bulk_client
+        self.segment_size = segment_size
+        self.max_workers = max_workers
+
+    def _read_segments(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        data = http.as_body(data)
+        if isinstance(data, http.FileBody):
+            # Regions of the file, only read to be hashed
+            for offset in range(0, len(data), self.segment_size):
+                yield http.FileBody(
+                    data.file, data.offset + offset,
+                    min(self.segment_size, len(data) - offset))
+            return
+        if isinstance(data, bytes):
+            data = memoryview(data)
+        if isinstance(data, memoryview):
+            # Slices of a memoryview are not copies
+            for offset in range(0, len(data), self.segment_size):
+                yield data[offset:offset + self.segment_size]
+            return
+        while True:
+            segment = data.read(self.segment_size)
+            if not segment:
+                return
+            yield segment
+
+    def _upload_segment(self, container, name, segment):
+        etag = md5(usedforsecurity=False)
+        for block in (segment if isinstance(segment, http.FileBody)
+                      else [segment]):
+            etag.update(block)
+        etag = etag.hexdigest()
+        # Swift checks the data against the etag and rejects the segment
+        # with a 422 if they do not match
+        resp, _ = self.object_client.create_object(
+            container, name, segment, metadata={'Etag': etag})
+        if resp.get('etag', etag).strip('"') != etag:
+            raise exceptions.TempestException(
+                'Segment %s/%s stored with etag %s instead of %s' % (
+                    container, name, resp['etag'], etag))
+        return etag
+
+    def upload(self, container, object_name, data, manifest=SLO,
+               segment_container=None, metadata=None):
+        """Upload an object in segments and write its manifest
+
+        Data fitting in a single segment is uploaded as a plain object.
+
+        :param container: the container of the object
+        :param object_name: the name of the object
+        :param data: the content of the object, bytes, a buffer or a
+                     file-like object
+        :param manifest: the kind of large object, SLO or DLO
+        :param segment_container: the container of the segments, by default
+                                  the container of the object. It is
+                                  created if a container_client was given.
+        :param metadata: headers set on the manifest, e.g. its metadata
+        :return: a tuple with the response of the manifest upload and the
+                 list of the segments, as in a static large object manifest
+        """
+        if manifest not in (SLO, DLO):
+            raise exceptions.InvalidParam(invalid_param='manifest=%s' %
+                                          manifest)
+        segment_container = segment_container or container
+        segments = self._read_segments(data)
+        # The first two segments, without holding them once uploaded
+        head = [next(segments, b''), next(segments, None)]
+        if head[1] is None:
+            resp, _ = self.object_client.create_object(
+                container, object_name, head[0], metadata=metadata)
+            return resp, []
+
+        if self.container_client and segment_container != container:
+            self.container_client.update_container(segment_container)
+        # Like python-swiftclient, a prefix of its own for each upload so
+        # that the segments of a previous upload are not part of a DLO
+        prefix = '%s/%s/%.6f/%d/' % (object_name, manifest, time.time(),
+                                     self.segment_size)
+        uploaded = []
+        # The segments being uploaded, by future
+        pending = {}
+
+        def _collect(done):
+            for future in done:
+                uploaded[pending.pop(future)]['etag'] = future.result()
+
+        with futures.ThreadPoolExecutor(self.max_workers) as executor:
+            try:
+                for index, segment in enumerate(_pop_all(head, segments)):
+                    if len(pending) >= self.max_workers:
+                        _collect(futures.wait(
+                            pending,
+                            return_when=futures.FIRST_COMPLETED).done)
+                    name = '%s%08d' % (prefix, index)
+                    uploaded.append({
+                        'path': '/%s/%s' % (segment_container, name),
+                        'etag': None,
+                        'size_bytes': len(segment)})
+                    pending[executor.submit(self._upload_segment,
+                                            segment_container, name,
+                                            segment)] = index
+                _collect(futures.wait(pending).done)
+            except Exception:
+                for future in pending:
+                    future.cancel()
+                futures.wait(pending)
+                LOG.warning('Failed to upload %s/%s in segments, deleting '
+                            'its segments', container, object_name)
+                self._delete_segments([segment['path']
+                                       for segment in uploaded])
+                raise
+
+        if manifest == SLO:
+            resp, _ = self.object_client.create_object(
+                container, object_name, json.dumps(uploaded),
+                params={'multipart-manifest': 'put'}, metadata=metadata)
+        else:
+            headers = dict(metadata or {})
+            headers['X-Object-Manifest'] = urlparse.quote(
+                '%s/%s' % (segment_container, prefix))
+            resp, _ = self.object_client.create_object(
+                container, object_name, '', metadata=headers)
+        return resp, uploaded
+
+    def delete(self, container, object_name):
+        """Delete an object and, for large objects, its segments
+
+        :return: the response of the deletion of the object
+        """
+        resp, _ = self.object_client.list_object_metadata(container,
+                                                          object_name)
+        if resp.get('x-static-large-object', '').lower() == 'true':
+            # Swift deletes the segments listed in the manifest
+            return self.object_client.delete_object(
+                container, object_name,
+                params={'multipart-manifest': 'delete'})
+        result = self.object_client.delete_object(container, object_name)
+        manifest = resp.get('x-object-manifest')
+        if manifest and self.container_client:
+            segment_container, prefix = urlparse.unquote(manifest).split(
+                '/', 1)
+            _, names = self.container_client.list_container_objects(
+                segment_container, params={'prefix': prefix})
+            self._delete_segments(['/%s/%s' % (segment_container, name)
+                                   for name in names])
+        elif manifest:
+            LOG.warning('The segments of %s/%s are not deleted, the '
+                        'uploader has no container client', container,
+                        object_name)
+        return result
+
+    def _delete_segments(self, paths):
+        """Delete segments by their /<container>/<name> path, best effort"""
+        if self.bulk_client:
+            for start in range(0, len(paths), BULK_DELETE_SIZE):
+                data = '\n'.join(urlparse.quote(path) for path in
+                                 paths[start:start + BULK_DELETE_SIZE])
+                try:
+                    self.bulk_client.delete_bulk_data(
+                        data=data, headers={'Content-Type': 'text/plain'})
+                except exceptions.RestClientException:
+                    LOG.exception('Failed to delete the segments %s',
+                                  paths[start:start + BULK_DELETE_SIZE])
+            return
+
+        def _delete(path):
+            container, name = path.lstrip('/').split('/', 1)
+            try:
+                self.object_client.delete_object(container, name)
+            except exceptions.NotFound:
+                pass
+            except exceptions.RestClientException:
+                LOG.exception('Failed to delete the segment %s', path)
+
+        with futures.ThreadPoolExecutor(self.max_workers) as executor:
+            list(executor.map(_delete, paths))
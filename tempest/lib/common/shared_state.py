@@ -0,0 +1,122 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""State shared by the test workers through files, and process counters
+
+The test workers are separate processes. The helpers sharing state between
+them, like the token cache, the CIDR allocator and the image cache, keep it
+in JSON files updated under a file lock, see `locked_json`, and tell which
+workers are still running with `is_alive`. Their per process statistics
+are kept in `Counters`.
+"""
+
+import contextlib
+import fcntl
+import json
+import os
+import tempfile
+import threading
+
+
+class Counters(object):
+    """Named counters of the current process, updated by several threads
+
+    :param names: the names of the counters, all starting at 0
+    """
+
+    def __init__(self, *names):
+        self._lock = threading.Lock()
+        self._counters = dict((name, 0) for name in names)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def get(self):
+        """Return a copy of the counters, by name"""
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path, shared by the processes of the host"""
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_json(path):
+    """Return the content of a JSON file, None if missing or unreadable"""
+    try:
+        with open(path) as json_file:
+            return json.load(json_file)
+    except (IOError, ValueError):
+        return None
+
+
+def write_file(path, content):
+    """Write a text file, readers never see it partially written"""
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + name)
+    try:
+        with os.fdopen(fd, 'w') as text_file:
+            text_file.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json(path, data):
+    """Write a JSON file, readers never see it partially written"""
+    write_file(path, json.dumps(data))
+
+
+@contextlib.contextmanager
+def locked_json(path, default):
+    """Load a JSON file, locked, and store it back on exit
+
+    The processes updating the file at the same time wait for each other.
+
+    :param path: the path of the file, the lock is ``path + '.lock'``
+    :param default: a callable returning the content of the file when it
+                    does not exist yet
+    """
+    with file_lock(path + '.lock'):
+        data = load_json(path) or default()
+        yield data
+        write_json(path, data)
+
+
+def is_alive(pid):
+    """Tell whether a process of the current user is running on this host
+
+    The test workers run as the same user, a process of another user is
+    one which reused the pid of a worker which exited.
+    """
+    try:
+        os.kill(pid, 0)
+    except (ProcessLookupError, PermissionError):
+        return False
+    return True
@@ -17,12 +17,14 @@
 import io
 import select
 import socket
+import threading
 import time
 import warnings
 
 from oslo_log import log as logging
 from oslo_utils.secretutils import md5
 
+from tempest.lib.common import shared_state
 from tempest.lib import exceptions
 
 
@@ -48,12 +50,104 @@ def get_fingerprint(self):
 
 paramiko.pkey.PKey.get_fingerprint = get_fingerprint
 
+# Seconds after which an unused cached connection is closed
+DEFAULT_IDLE_TIMEOUT = 60
+
+# Process wide connection cache settings, see enable_connection_cache()
+_cache_settings = {}
+
+# Cached connections by host, port, user and credentials, with the time
+# they were last used
+_cache_lock = threading.Lock()
+_connections = {}
+_key_locks = {}
+# Number of commands running over each connection, cached or not. A
+# connection dropped from the cache is closed once none is left.
+_in_use = {}
+_stats = shared_state.Counters('commands', 'connections', 'reconnects',
+                               'expired')
+
+
+def enable_connection_cache(idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Keep the ssh connections open and reuse them for later commands
+
+    By default every command opens a new ssh connection, which is closed
+    once the command completes. Once the cache is enabled, the connections
+    of the clients are kept by host, port, user and credentials, and each
+    command opens a new channel over the connection. Broken connections are
+    replaced transparently.
+
+    :param idle_timeout: seconds after which an unused connection is closed
+        rather than reused
+    """
+    _cache_settings['idle_timeout'] = idle_timeout
+
+
+def disable_connection_cache():
+    """Stop reusing ssh connections and close the cached ones"""
+    _cache_settings.clear()
+    close_cached_connections()
+
+
+def close_cached_connections():
+    """Close the cached ssh connections, e.g. once their servers are gone
+
+    The connections still used by commands are closed once the commands
+    complete.
+    """
+    with _cache_lock:
+        connections = [ssh for ssh, _ in _connections.values()
+                       if not _in_use.get(ssh)]
+        _connections.clear()
+        _prune_key_locks()
+    for ssh in connections:
+        ssh.close()
+
+
+def _prune_key_locks():
+    for key, key_lock in list(_key_locks.items()):
+        if key not in _connections and not key_lock.locked():
+            del _key_locks[key]
+
+
+def _pop_idle_connections(now):
+    """Drop the unused connections idle for too long, to be closed"""
+    idle_timeout = _cache_settings.get('idle_timeout')
+    if not idle_timeout:
+        return []
+    idle = []
+    for key, (ssh, last_used) in list(_connections.items()):
+        if not _in_use.get(ssh) and now - last_used > idle_timeout:
+            del _connections[key]
+            _stats.count('expired')
+            idle.append(ssh)
+    return idle
+
+
+def get_connection_stats():
+    """Return the ssh connection reuse counters of the current process
+
+    :return: dictionary with the number of `commands` run, of
+        `connections` established, of `reused` connections, of
+        `reconnects`, i.e. cached connections found broken, and of
+        `expired` connections closed after being idle too long.
+    """
+    stats = _stats.get()
+    stats['reused'] = max(stats['commands'] - stats['connections'], 0)
+    return stats
+
+
+def reset_connection_stats():
+    """Reset the ssh connection reuse counters of the current process"""
+    _stats.reset()
+
 
 class Client(object):
 
     def __init__(self, host, username, password=None, timeout=300, pkey=None,
                  channel_timeout=10, look_for_keys=False, key_filename=None,
-                 port=22, proxy_client=None, ssh_key_type='rsa'):
+                 port=22, proxy_client=None, ssh_key_type='rsa',
+                 reuse_connection=None):
         """SSH client.
 
         Many of parameters are just passed to the underlying implementation
@@ -76,6 +170,9 @@ class Client(object):
             for ssh-over-ssh.  The default is None, which means
             not to use ssh-over-ssh.
         :param ssh_key_type: ssh key type (rsa, ecdsa)
+        :param reuse_connection: Whether to keep the connection open and
+            reuse it for later commands, see `enable_connection_cache`.
+            The default, None, follows the process wide setting.
         :type proxy_client: ``tempest.lib.common.ssh.Client`` object
         """
         self.host = host
@@ -105,6 +202,117 @@ class Client(object):
             raise exceptions.SSHClientProxyClientLoop(
                 host=self.host, port=self.port, username=self.username)
         self._proxy_conn = None
+        self.reuse_connection = reuse_connection
+
+    def _reuse_connection(self):
+        if self.reuse_connection is None:
+            return bool(_cache_settings)
+        return self.reuse_connection
+
+    def _cache_key(self):
+        pkey = self.pkey.get_fingerprint() if self.pkey is not None else None
+        proxy = (self.proxy_client._cache_key()
+                 if self.proxy_client is not None else None)
+        return (self.host, self.port, self.username, self.password, pkey,
+                self.key_filename, proxy)
+
+    def _acquire_connection(self):
+        """Return an ssh connection, from the cache when enabled
+
+        The cached connections are shared by all the threads running
+        commands with the same key, each over its own channel.
+        """
+        if not self._reuse_connection():
+            _stats.count('connections')
+            return self._get_ssh_connection()
+        key = self._cache_key()
+        with _cache_lock:
+            # Only one connection is set up at a time for the same key
+            key_lock = _key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            unused = None
+            with _cache_lock:
+                ssh, last_used = _connections.get(key, (None, None))
+                if ssh is not None:
+                    transport = ssh.get_transport()
+                    idle_timeout = _cache_settings.get('idle_timeout')
+                    if (idle_timeout and not _in_use.get(ssh) and
+                            time.time() - last_used > idle_timeout):
+                        _stats.count('expired')
+                        del _connections[key]
+                        unused = ssh
+                    elif transport is None or not transport.is_active():
+                        _stats.count('reconnects')
+                        del _connections[key]
+                        if not _in_use.get(ssh):
+                            unused = ssh
+                    else:
+                        _connections[key] = (ssh, time.time())
+                        _in_use[ssh] = _in_use.get(ssh, 0) + 1
+                        return ssh
+            if unused is not None:
+                unused.close()
+            _stats.count('connections')
+            ssh = self._get_ssh_connection()
+            with _cache_lock:
+                _connections[key] = (ssh, time.time())
+                _in_use[ssh] = 1
+            return ssh
+
+    def _release_connection(self, ssh, broken=False):
+        """Give back a connection once a command is done with it
+
+        :param broken: drop the connection from the cache, e.g. after an
+            error, it is closed once the commands of the other threads
+            running over it complete
+        """
+        if not self._reuse_connection():
+            ssh.close()
+            return
+        key = self._cache_key()
+        now = time.time()
+        with _cache_lock:
+            users = _in_use.pop(ssh, 1) - 1
+            if users:
+                _in_use[ssh] = users
+            cached = _connections.get(key, (None,))[0] is ssh
+            if cached and broken:
+                del _connections[key]
+                cached = False
+            elif cached:
+                _connections[key] = (ssh, now)
+            unused = _pop_idle_connections(now)
+            if not cached and not users:
+                unused.append(ssh)
+            _prune_key_locks()
+        for connection in unused:
+            connection.close()
+
+    def _open_channel(self, ssh):
+        """Open a channel, over a new connection if the cached one broke
+
+        :return: the connection and the new channel
+        """
+        try:
+            return ssh, ssh.get_transport().open_session(
+                timeout=self.channel_timeout)
+        except (EOFError, socket.error, paramiko.SSHException):
+            if not self._reuse_connection():
+                ssh.close()
+                raise
+            # The server dropped the cached connection, e.g. after a reboot
+            LOG.info("ssh connection to %s@%s is broken, reconnecting",
+                     self.username, self.host)
+            _stats.count('reconnects')
+            self._release_connection(ssh, broken=True)
+            ssh = self._acquire_connection()
+            try:
+                return ssh, ssh.get_transport().open_session(
+                    timeout=self.channel_timeout)
+            except Exception:
+                # The callers only release the connections they got back
+                self._release_connection(ssh, broken=True)
+                raise
 
     def _get_ssh_connection(self, sleep=1.5, backoff=1):
         """Returns an ssh connection to the specified host."""
@@ -165,6 +373,58 @@ class Client(object):
     def _can_system_poll():
         return hasattr(select, 'poll')
 
+    def _start_command(self, channel, cmd):
+        channel.fileno()  # Register event pipe
+        channel.exec_command(cmd)
+        channel.shutdown_write()
+
+    def _read_output(self, channel, cmd, encoding):
+        """Read the output of a command until it completes
+
+        :return: the standard output, the standard error and the exit status
+            of the command
+        """
+        # If the executing host is linux-based, poll the channel
+        if self._can_system_poll():
+            out_data_chunks = []
+            err_data_chunks = []
+            poll = select.poll()
+            poll.register(channel, select.POLLIN)
+            start_time = time.time()
+
+            while True:
+                ready = poll.poll(self.channel_timeout)
+                if not any(ready):
+                    if not self._is_timed_out(start_time):
+                        continue
+                    raise exceptions.TimeoutException(
+                        "Command: '{0}' executed on host '{1}'.".format(
+                            cmd, self.host))
+                if not ready[0]:  # If there is nothing to read.
+                    continue
+                out_chunk = err_chunk = None
+                if channel.recv_ready():
+                    out_chunk = channel.recv(self.buf_size)
+                    out_data_chunks += out_chunk,
+                if channel.recv_stderr_ready():
+                    err_chunk = channel.recv_stderr(self.buf_size)
+                    err_data_chunks += err_chunk,
+                if not err_chunk and not out_chunk:
+                    break
+            out_data = b''.join(out_data_chunks)
+            err_data = b''.join(err_data_chunks)
+        # Just read from the channels
+        else:
+            out_file = channel.makefile('rb', self.buf_size)
+            err_file = channel.makefile_stderr('rb', self.buf_size)
+            out_data = out_file.read()
+            err_data = err_file.read()
+        if encoding:
+            out_data = out_data.decode(encoding)
+            err_data = err_data.decode(encoding)
+
+        return out_data, err_data, channel.recv_exit_status()
+
     def exec_command(self, cmd, encoding="utf-8"):
         """Execute the specified command on the server
 
@@ -179,55 +439,17 @@ class Client(object):
                  status. The exception contains command status stderr content.
         :raises: TimeoutException if cmd doesn't end when timeout expires.
         """
-        ssh = self._get_ssh_connection()
-        transport = ssh.get_transport()
-        with transport.open_session() as channel:
-            channel.fileno()  # Register event pipe
-            channel.exec_command(cmd)
-            channel.shutdown_write()
-
-            # If the executing host is linux-based, poll the channel
-            if self._can_system_poll():
-                out_data_chunks = []
-                err_data_chunks = []
-                poll = select.poll()
-                poll.register(channel, select.POLLIN)
-                start_time = time.time()
-
-                while True:
-                    ready = poll.poll(self.channel_timeout)
-                    if not any(ready):
-                        if not self._is_timed_out(start_time):
-                            continue
-                        raise exceptions.TimeoutException(
-                            "Command: '{0}' executed on host '{1}'.".format(
-                                cmd, self.host))
-                    if not ready[0]:  # If there is nothing to read.
-                        continue
-                    out_chunk = err_chunk = None
-                    if channel.recv_ready():
-                        out_chunk = channel.recv(self.buf_size)
-                        out_data_chunks += out_chunk,
-                    if channel.recv_stderr_ready():
-                        err_chunk = channel.recv_stderr(self.buf_size)
-                        err_data_chunks += err_chunk,
-                    if not err_chunk and not out_chunk:
-                        break
-                out_data = b''.join(out_data_chunks)
-                err_data = b''.join(err_data_chunks)
-            # Just read from the channels
-            else:
-                out_file = channel.makefile('rb', self.buf_size)
-                err_file = channel.makefile_stderr('rb', self.buf_size)
-                out_data = out_file.read()
-                err_data = err_file.read()
-            if encoding:
-                out_data = out_data.decode(encoding)
-                err_data = err_data.decode(encoding)
-
-            exit_status = channel.recv_exit_status()
-
-        ssh.close()
+        _stats.count('commands')
+        ssh, session = self._open_channel(self._acquire_connection())
+        broken = True
+        try:
+            with session as channel:
+                self._start_command(channel, cmd)
+                out_data, err_data, exit_status = self._read_output(
+                    channel, cmd, encoding)
+            broken = False
+        finally:
+            self._release_connection(ssh, broken)
 
         if 0 != exit_status:
             raise exceptions.SSHExecCommandFailed(
@@ -235,10 +457,86 @@ class Client(object):
                 stderr=err_data, stdout=out_data)
         return out_data
 
+    def exec_commands(self, cmds, encoding="utf-8", concurrent=False):
+        """Execute several commands over the same connection
+
+        Each command runs on its own channel of a single ssh connection, so
+        the connection is set up once for all of them even when the
+        connection cache is not enabled.
+
+        :param list cmds: Commands to run at remote server.
+        :param str encoding: Encoding for result from paramiko.
+                             Result will not be decoded if None.
+        :param bool concurrent: Start all the commands at once rather than
+                                one after the other. Only use it for
+                                commands which do not depend on each other.
+        :returns: list of the data read from standard output of each command.
+        :raises: SSHExecCommandFailed for the first command which returns a
+                 nonzero status. The following commands are not run, unless
+                 they are concurrent.
+        :raises: TimeoutException if a command doesn't end when timeout
+                 expires.
+        """
+        ssh = self._acquire_connection()
+        broken = True
+        outputs = []
+        try:
+            if concurrent:
+                sessions = []
+                try:
+                    for cmd in cmds:
+                        _stats.count('commands')
+                        ssh, channel = self._open_channel(ssh)
+                        sessions.append((cmd, channel))
+                        self._start_command(channel, cmd)
+                    results = [(cmd,) + self._read_output(channel, cmd,
+                                                          encoding)
+                               for cmd, channel in sessions]
+                finally:
+                    for _, channel in sessions:
+                        channel.close()
+            else:
+                results = []
+                for cmd in cmds:
+                    _stats.count('commands')
+                    ssh, session = self._open_channel(ssh)
+                    with session as channel:
+                        self._start_command(channel, cmd)
+                        results.append((cmd,) + self._read_output(
+                            channel, cmd, encoding))
+                    if results[-1][3] != 0:
+                        break
+            broken = False
+        finally:
+            self._release_connection(ssh, broken)
+
+        for cmd, out_data, err_data, exit_status in results:
+            if 0 != exit_status:
+                raise exceptions.SSHExecCommandFailed(
+                    command=cmd, exit_status=exit_status,
+                    stderr=err_data, stdout=out_data)
+            outputs.append(out_data)
+        return outputs
+
     def test_connection_auth(self):
         """Raises an exception when we can not connect to server via ssh."""
-        connection = self._get_ssh_connection()
-        connection.close()
+        # Always connect again, a cached connection may predate a reboot
+        _stats.count('connections')
+        ssh = self._get_ssh_connection()
+        if not self._reuse_connection():
+            ssh.close()
+            return
+        # The new connection replaces the cached one for later commands
+        key = self._cache_key()
+        with _cache_lock:
+            key_lock = _key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with _cache_lock:
+                previous, _ = _connections.get(key, (None, None))
+                _connections[key] = (ssh, time.time())
+                unused = previous is not None and not _in_use.get(previous)
+        if unused:
+            previous.close()
 
     def _get_proxy_channel(self):
         conn = self.proxy_client._get_ssh_connection()
@@ -0,0 +1,130 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import hashlib
+import json
+import os
+import stat
+
+from oslo_log import log as logging
+
+from tempest.lib.common import shared_state
+from tempest.lib import exceptions as lib_exc
+
+LOG = logging.getLogger(__name__)
+
+# Process wide token cache settings, see enable_token_cache()
+_settings = {'cache_dir': None}
+
+_stats = shared_state.Counters('hits', 'misses')
+
+
+def enable_token_cache(cache_dir):
+    """Share tokens across processes through files in cache_dir
+
+    Once enabled, Keystone auth providers look for a valid token for their
+    credentials and scope in ``cache_dir`` before requesting a new one, and
+    store the tokens they get there, so that all the test workers using the
+    same credentials share a token until it gets close to its expiry.
+
+    The cached files contain tokens, so the directory is only accessible by
+    its owner. The mode of an existing directory is changed to that, and a
+    directory of another user is refused.
+
+    :param cache_dir: the directory where tokens are stored, created if it
+                      does not exist
+    :raises InvalidConfiguration: if the directory belongs to another user
+    """
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    # makedirs does not change the mode of an existing directory
+    dir_stat = os.stat(cache_dir)
+    if dir_stat.st_uid != os.getuid():
+        raise lib_exc.InvalidConfiguration(
+            'The token cache directory %s belongs to another user' %
+            cache_dir)
+    if stat.S_IMODE(dir_stat.st_mode) != 0o700:
+        LOG.warning('Changing the mode of the token cache directory %s '
+                    'from %o to 700', cache_dir,
+                    stat.S_IMODE(dir_stat.st_mode))
+        os.chmod(cache_dir, 0o700)
+    _settings['cache_dir'] = cache_dir
+
+
+def disable_token_cache():
+    """Stop sharing tokens, tokens already cached are left on disk"""
+    _settings['cache_dir'] = None
+
+
+def is_enabled():
+    return _settings['cache_dir'] is not None
+
+
+def get_stats():
+    """Return the number of tokens taken from and missing in the cache"""
+    return _stats.get()
+
+
+def reset_stats():
+    _stats.reset()
+
+
+def cache_key(*parts):
+    """Build a cache key out of JSON serializable parts
+
+    The key is a hash, so secrets like passwords can be part of it.
+    """
+    data = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _load(key):
+    try:
+        token, auth_data = shared_state.load_json(
+            os.path.join(_settings['cache_dir'], key))
+    except (TypeError, ValueError):
+        # Not cached yet, or not readable
+        return None
+    return token, auth_data
+
+
+def _store(key, auth):
+    cache_dir = _settings['cache_dir']
+    try:
+        shared_state.write_json(os.path.join(cache_dir, key), list(auth))
+    except Exception:
+        LOG.warning('Failed to store the token in the cache %s', cache_dir)
+
+
+def get_auth(key, fetch, is_expired, force=False):
+    """Return auth data from the cache, or fetch and cache it
+
+    The cache entry is locked while looking it up and fetching, so that
+    concurrent processes needing the same token only request it once.
+
+    :param key: the cache key, see `cache_key`
+    :param fetch: a callable returning a new ``(token, auth_data)`` tuple
+    :param is_expired: a callable telling if ``(token, auth_data)`` is
+                       expired, or about to expire
+    :param force: fetch new auth data even if the cached one is valid
+    :return: a ``(token, auth_data)`` tuple
+    """
+    with shared_state.file_lock(
+            os.path.join(_settings['cache_dir'], key + '.lock')):
+        if not force:
+            auth = _load(key)
+            if auth is not None and not is_expired(auth):
+                _stats.count('hits')
+                return auth
+        _stats.count('misses')
+        auth = fetch()
+        _store(key, auth)
+        return auth
@@ -108,6 +108,19 @@ class RemoteClient(object):
         LOG.debug("Remote command: %s", cmd)
         return self.ssh_client.exec_command(cmd)
 
+    @debug_ssh
+    def exec_commands(self, cmds, concurrent=False):
+        """Execute several commands over the same ssh connection
+
+        :param cmds: the commands, each run with the shell prologue
+        :param concurrent: start all the commands at once, see
+            `tempest.lib.common.ssh.Client.exec_commands`
+        :return: the output of each command
+        """
+        cmds = [self.ssh_shell_prologue + " " + cmd for cmd in cmds]
+        LOG.debug("Remote commands: %s", cmds)
+        return self.ssh_client.exec_commands(cmds, concurrent=concurrent)
+
     @debug_ssh
     def validate_authentication(self):
         """Validate ssh connection and authentication
@@ -15,6 +15,9 @@
 import inspect
 import re
 import time
+# Last, the pinned flake8-import-order does not know that contextvars is
+# part of the standard library
+import contextvars  # noqa: H306
 
 from oslo_log import log as logging
 
@@ -23,15 +26,40 @@ from tempest.lib import exceptions
 LOG = logging.getLogger(__name__)
 
 
+# The test class and phase currently running, set by the test framework
+_test_caller = contextvars.ContextVar('test_caller', default=None)
+
+
+def set_test_caller(caller_name):
+    """Set the caller name returned by find_test_caller
+
+    Test frameworks call this when they start running a part of a test, so
+    that find_test_caller does not have to look through the call stack. The
+    name is only visible in the current context, i.e. in the current thread.
+
+    :param caller_name: the test class and method, e.g. ``Class:test_name``
+    :return: a token to pass to `reset_test_caller` once the part is done
+    """
+    return _test_caller.set(caller_name)
+
+
+def reset_test_caller(token):
+    """Restore the caller name as it was before set_test_caller"""
+    _test_caller.reset(token)
+
+
 def find_test_caller():
     """Find the caller class and test name.
 
-    Because we know that the interesting things that call us are
-    test_* methods, and various kinds of setUp / tearDown, we
+    If the test framework set the caller name, see `set_test_caller`, it is
+    returned. Otherwise, because we know that the interesting things that
+    call us are test_* methods, and various kinds of setUp / tearDown, we
     can look through the call stack to find appropriate methods,
     and the class we were in when those were called.
     """
-    caller_name = None
+    caller_name = _test_caller.get()
+    if caller_name is not None:
+        return caller_name
     names = []
     frame = inspect.currentframe()
     is_cleanup = False
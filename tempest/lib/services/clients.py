@@ -206,8 +206,9 @@ class ClientsFactory(object):
             :param later_kwargs: kwargs passed through to the service client
                 __init__ on top of defaults set at factory level.
             """
-            kwargs.update(later_kwargs)
-            _client = klass(auth_provider=auth_provider, **kwargs)
+            # Do not update the defaults, they are shared by all the calls
+            client_kwargs = dict(kwargs, **later_kwargs)
+            _client = klass(auth_provider=auth_provider, **client_kwargs)
             if alias:
                 setattr(self, alias, _client)
             return _client
@@ -16,6 +16,7 @@
 #    under the License.
 
 import copy
+import functools
 from urllib import parse as urllib
 
 from oslo_serialization import jsonutils as json
@@ -195,6 +196,15 @@ class ServersClient(base_compute_client.BaseComputeClient):
         self.validate_response(_schema, resp, body)
         return rest_client.ResponseBody(resp, body)
 
+    def iter_servers(self, detail=False, **params):
+        """Iterate over the servers, one page at a time
+
+        Takes the parameters of `list_servers` and yields the servers as
+        the pages are fetched, see `tempest.lib.common.rest_client.paginate`.
+        """
+        return rest_client.paginate(
+            functools.partial(self.list_servers, detail), 'servers', **params)
+
     def list_addresses(self, server_id):
         """Lists all addresses for a server.
 
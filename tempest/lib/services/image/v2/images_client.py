@@ -108,6 +108,16 @@ class ImagesClient(rest_client.RestClient):
         body = json.loads(body)
         return rest_client.ResponseBody(resp, body)
 
+    def iter_images(self, params=None):
+        """Iterate over the images, one page at a time
+
+        Takes the parameters of `list_images` and yields the images as the
+        pages are fetched, see `tempest.lib.common.rest_client.paginate`.
+        """
+        def list_page(**page_params):
+            return self.list_images(params=page_params)
+        return rest_client.paginate(list_page, 'images', **(params or {}))
+
     def show_image(self, image_id):
         """Show image details.
 
@@ -248,16 +258,22 @@ class ImagesClient(rest_client.RestClient):
         self.expected_success(202, resp.status)
         return rest_client.ResponseBody(resp)
 
-    def show_image_file(self, image_id):
+    def show_image_file(self, image_id, stream=False):
         """Download binary image data.
 
+        :param stream: return a rest_client.ResponseBodyStream, reading and
+                       hashing the data as it is received, instead of a
+                       ResponseBodyData holding all of it.
+
         For a full list of available parameters, please refer to the official
         API reference:
         https://docs.openstack.org/api-ref/image/v2/#download-binary-image-data
         """
         url = 'images/%s/file' % image_id
-        resp, body = self.get(url)
+        resp, body = self.get(url, stream=stream)
         self.expected_success([200, 204, 206], resp.status)
+        if stream and isinstance(body, rest_client.ResponseBodyStream):
+            return body
         return rest_client.ResponseBodyData(resp, body)
 
     def add_image_tag(self, image_id, tag):
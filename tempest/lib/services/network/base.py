@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 from urllib import parse as urllib
 
 from oslo_serialization import jsonutils as json
@@ -37,6 +38,17 @@ class BaseNetworkClient(rest_client.RestClient):
         self.expected_success(200, resp.status)
         return rest_client.ResponseBody(resp, body)
 
+    def iter_resources(self, uri, key, **filters):
+        """Iterate over the resources of a listing, one page at a time
+
+        :param uri: the uri of the listing, e.g. '/ports'
+        :param key: key of the resources in the body, e.g. 'ports'
+        :param filters: query parameters of the listing, give ``limit`` to
+            choose the size of the pages
+        """
+        return rest_client.paginate(functools.partial(self.list_resources,
+                                                      uri), key, **filters)
+
     def delete_resource(self, uri):
         req_uri = self.uri_prefix + uri
         resp, body = self.delete(req_uri)
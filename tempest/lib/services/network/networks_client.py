@@ -61,6 +61,14 @@ class NetworksClient(base.BaseNetworkClient):
         uri = '/networks'
         return self.list_resources(uri, **filters)
 
+    def iter_networks(self, **filters):
+        """Iterate over the networks, one page at a time
+
+        Takes the filters of `list_networks` and yields the networks as the
+        pages are fetched, see `tempest.lib.common.rest_client.paginate`.
+        """
+        return self.iter_resources('/networks', 'networks', **filters)
+
     def create_bulk_networks(self, **kwargs):
         """Create multiple networks in a single request.
 
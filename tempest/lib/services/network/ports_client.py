@@ -68,6 +68,14 @@ class PortsClient(base.BaseNetworkClient):
         uri = '/ports'
         return self.list_resources(uri, **filters)
 
+    def iter_ports(self, **filters):
+        """Iterate over the ports, one page at a time
+
+        Takes the filters of `list_ports` and yields the ports as the
+        pages are fetched, see `tempest.lib.common.rest_client.paginate`.
+        """
+        return self.iter_resources('/ports', 'ports', **filters)
+
     def create_bulk_ports(self, **kwargs):
         """Create multiple ports in a single request.
 
@@ -61,6 +61,14 @@ class SubnetsClient(base.BaseNetworkClient):
         uri = '/subnets'
         return self.list_resources(uri, **filters)
 
+    def iter_subnets(self, **filters):
+        """Iterate over the subnets, one page at a time
+
+        Takes the filters of `list_subnets` and yields the subnets as the
+        pages are fetched, see `tempest.lib.common.rest_client.paginate`.
+        """
+        return self.iter_resources('/subnets', 'subnets', **filters)
+
     def create_bulk_subnets(self, **kwargs):
         """Create multiple subnets in a single request.
 
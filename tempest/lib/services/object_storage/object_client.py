@@ -17,6 +17,7 @@ import ssl
 from http import client as httplib
 from urllib import parse as urlparse
 
+from tempest.lib.common import http
 from tempest.lib.common import rest_client
 from tempest.lib import exceptions
 
@@ -81,8 +82,13 @@ class ObjectClient(rest_client.RestClient):
         self.expected_success(200, resp.status)
         return resp, body
 
-    def get_object(self, container, object_name, metadata=None, params=None):
-        """Retrieve object's data."""
+    def get_object(self, container, object_name, metadata=None, params=None,
+                   stream=False):
+        """Retrieve object's data.
+
+        :param stream: return the data as a rest_client.ResponseBodyStream,
+                       read and hashed as it is received
+        """
 
         headers = {}
         if metadata:
@@ -92,7 +98,7 @@ class ObjectClient(rest_client.RestClient):
         url = "{0}/{1}".format(container, object_name)
         if params:
             url += '?%s' % urlparse.urlencode(params)
-        resp, body = self.get(url, headers=headers)
+        resp, body = self.get(url, headers=headers, stream=stream)
         self.expected_success([200, 206], resp.status)
         return resp, body
 
@@ -114,7 +120,13 @@ class ObjectClient(rest_client.RestClient):
 
     def create_object_continue(self, container, object_name,
                                data, metadata=None):
-        """Put an object using Expect:100-continue"""
+        """Put an object using Expect:100-continue
+
+        The data can be bytes, a file opened in binary mode, a memoryview, a
+        mmap'd region or a tempest.lib.common.http.FileBody. Files are sent
+        from their current position with socket.sendfile().
+        """
+        data = http.as_body(data)
         headers = {}
         if metadata:
             for key in metadata:
@@ -155,7 +167,10 @@ class ObjectClient(rest_client.RestClient):
 
         # If a continue was received go ahead and send the data
         # and get the final response
-        conn.send(data)
+        if isinstance(data, http.FileBody):
+            data.send(conn.sock)
+        else:
+            conn.send(data)
 
         resp = conn.getresponse()
 
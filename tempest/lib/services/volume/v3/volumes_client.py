@@ -83,6 +83,17 @@ class VolumesClient(base_client.BaseClient):
         self.validate_response(list_schema, resp, body)
         return rest_client.ResponseBody(resp, body)
 
+    def iter_volumes(self, detail=False, params=None):
+        """Iterate over the volumes, one page at a time
+
+        Takes the parameters of `list_volumes`, as a dictionary, and yields
+        the volumes as the pages are fetched, see
+        `tempest.lib.common.rest_client.paginate`.
+        """
+        def list_page(**page_params):
+            return self.list_volumes(detail=detail, params=page_params)
+        return rest_client.paginate(list_page, 'volumes', **(params or {}))
+
     def migrate_volume(self, volume_id, **kwargs):
         """Migrate a volume to a new backend
 
@@ -14,8 +14,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+import hashlib
 import os
-import subprocess
 
 import netaddr
 
@@ -23,14 +24,18 @@ from oslo_log import log
 from oslo_serialization import jsonutils as json
 from oslo_utils import netutils
 
+from tempest import clients
 from tempest.common import compute
+from tempest.common import connectivity
+from tempest.common import credentials_factory as credentials
 from tempest.common import image as common_image
 from tempest.common.utils.linux import remote_client
-from tempest.common.utils import net_utils
 from tempest.common import waiters
 from tempest import config
 from tempest import exceptions
 from tempest.lib.common import api_version_utils
+from tempest.lib.common import cidr_allocator
+from tempest.lib.common import image_cache
 from tempest.lib.common.utils import data_utils
 from tempest.lib.common.utils import test_utils
 from tempest.lib import exceptions as lib_exc
@@ -43,6 +48,20 @@ LOG = log.getLogger(__name__)
 LATEST_MICROVERSION = 'latest'
 
 
+# The image client of the images shared by the tests, see image_cache_dir
+_shared_image_clients = []
+
+
+def _shared_image_client():
+    # The configured admin credentials remain valid until the process exits,
+    # when the shared images are deleted, unlike the dynamic credentials of
+    # the test classes.
+    if not _shared_image_clients:
+        _shared_image_clients.append(clients.Manager(
+            credentials.get_configured_admin_credentials()).image_client_v2)
+    return _shared_image_clients[0]
+
+
 class ScenarioTest(tempest.test.BaseTestCase):
     """Base class for scenario tests. Uses tempest own clients. """
 
@@ -769,6 +788,9 @@ class ScenarioTest(tempest.test.BaseTestCase):
             if img_properties:
                 params.update(img_properties)
         params.update(kwargs)
+        if (image_cache.is_enabled() and
+                not CONF.image_feature_enabled.api_v1):
+            return self._shared_image_create(img_path, params)
         body = self.image_client.create_image(**params)
         image = body['image'] if 'image' in body else body
         self.addCleanup(self.image_client.delete_image, image['id'])
@@ -781,6 +803,45 @@ class ScenarioTest(tempest.test.BaseTestCase):
         LOG.debug("image:%s", image['id'])
         return image['id']
 
+    def _shared_image_create(self, img_path, params):
+        """Return the image of img_path shared by the tests of the run
+
+        The image is uploaded by the first test needing it, with the
+        configured admin credentials, and deleted when the last worker
+        using it exits, see `tempest.lib.common.image_cache`.
+        """
+        params = dict(params,
+                      visibility=CONF.scenario.image_cache_visibility)
+        name = params.pop('name')
+        key = image_cache.cache_key(image_cache.file_digest(img_path),
+                                    **params)
+        client = _shared_image_client()
+
+        def create():
+            image = client.create_image(name=name, **params)
+            try:
+                with open(img_path, 'rb') as image_file:
+                    client.store_image_file(image['id'], image_file)
+            except Exception:
+                test_utils.call_and_ignore_notfound_exc(
+                    client.delete_image, image['id'])
+                raise
+            return image['id']
+
+        def exists(image_id):
+            try:
+                return client.show_image(image_id)['status'] == 'active'
+            except lib_exc.NotFound:
+                return False
+
+        image_id = image_cache.acquire(
+            key, create, exists,
+            functools.partial(test_utils.call_and_ignore_notfound_exc,
+                              client.delete_image))
+        self.addCleanup(image_cache.release, key)
+        LOG.debug("shared image:%s", image_id)
+        return image_id
+
     def log_console_output(self, servers=None, client=None, **kwargs):
         """Console log output"""
         if not CONF.compute_feature_enabled.console_output:
@@ -886,24 +947,8 @@ class ScenarioTest(tempest.test.BaseTestCase):
                         ping_timeout=None, mtu=None, server=None):
         """ping ip address"""
         timeout = ping_timeout or CONF.validation.ping_timeout
-        cmd = ['ping', '-c1', '-w1']
-
-        if mtu:
-            cmd += [
-                # don't fragment
-                '-M', 'do',
-                # ping receives just the size of ICMP payload
-                '-s', str(net_utils.get_ping_payload_size(mtu, 4))
-            ]
-        cmd.append(ip_address)
-
-        def ping():
-            proc = subprocess.Popen(cmd,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.PIPE)
-            proc.communicate()
-
-            return (proc.returncode == 0) == should_succeed
+        ping = connectivity.local_ping_probe(
+            ip_address, should_succeed=should_succeed, mtu=mtu)
 
         caller = test_utils.find_test_caller()
         LOG.debug('%(caller)s begins to ping %(ip)s in %(timeout)s sec and the'
@@ -1330,8 +1375,42 @@ class NetworkScenarioTest(ScenarioTest):
                     CONF.network.project_network_cidr)
                 num_bits = CONF.network.project_network_mask_bits
 
-        # Repeatedly attempt subnet creation with sequential cidr
-        # blocks until an unallocated block is found.
+        if use_default_subnetpool:
+            result = _make_create_subnet_request(
+                namestart, network, ip_version, subnets_client,
+                **kwargs)
+        elif cidr_allocator.is_enabled():
+            # Lease a block from the allocator shared by the workers, only
+            # moving on to another one if it is used by a subnet created
+            # since the allocator listed them.
+            pool = str(tenant_cidr)
+
+            def list_subnet_cidrs():
+                return [subnet['cidr'] for subnet in
+                        self.os_admin.subnets_client.iter_subnets(
+                            fields='cidr')]
+
+            while result is None:
+                str_cidr = cidr_allocator.allocate(pool, num_bits,
+                                                   list_subnet_cidrs)
+                if str_cidr is None:
+                    break
+                try:
+                    result = _make_create_subnet_request(
+                        namestart, network, ip_version, subnets_client,
+                        cidr=str_cidr, **kwargs)
+                except Exception:
+                    cidr_allocator.release(pool, num_bits, str_cidr)
+                    raise
+                if result is None:
+                    cidr_allocator.mark_in_use(pool, num_bits, str_cidr)
+            if result is not None:
+                # Registered before the deletion of the subnet, so run after
+                self.addCleanup(cidr_allocator.release, pool, num_bits,
+                                str_cidr)
+        else:
+            # Repeatedly attempt subnet creation with sequential cidr
+            # blocks until an unallocated block is found.
             for subnet_cidr in tenant_cidr.subnet(num_bits):
                 str_cidr = str(subnet_cidr)
                 if cidr_in_use(str_cidr, project_id=network['project_id']):
@@ -1343,10 +1422,6 @@ class NetworkScenarioTest(ScenarioTest):
                 if result is not None:
                     break
 
-        else:
-            result = _make_create_subnet_request(
-                namestart, network, ip_version, subnets_client,
-                **kwargs)
         self.assertIsNotNone(result, 'Unable to allocate tenant network')
 
         subnet = result['subnet']
@@ -1433,19 +1508,9 @@ class NetworkScenarioTest(ScenarioTest):
             succeed. False otherwise.
         """
 
-        method_name = '%s_check' % protocol
-        connectivity_checker = getattr(source, method_name)
-
-        def connect_remote():
-            try:
-                connectivity_checker(dest, nic=nic)
-            except lib_exc.SSHExecCommandFailed:
-                LOG.warning('Failed to check %(protocol)s connectivity for '
-                            'IP %(dest)s via a ssh connection from: %(src)s.',
-                            dict(protocol=protocol, dest=dest,
-                                 src=source.ssh_client.host))
-                return not should_succeed
-            return should_succeed
+        connect_remote = connectivity.remote_probe(
+            source, dest, protocol=protocol, should_succeed=should_succeed,
+            nic=nic)
 
         result = test_utils.call_until_true(connect_remote,
                                             CONF.validation.ping_timeout, 1)
@@ -1461,6 +1526,71 @@ class NetworkScenarioTest(ScenarioTest):
         self.log_console_output()
         self.fail(msg)
 
+    def check_connectivity_matrix(self, pairs, timeout=None, max_workers=None):
+        """Check the connectivity of many pairs of hosts at the same time
+
+        The pairs are checked concurrently, sharing a deadline, instead of
+        one after the other with a timeout each like
+        ``check_remote_connectivity``, see
+        `tempest.common.connectivity.probe_matrix`.
+
+        :param pairs: iterable of ``(source, dest[, protocol[,
+            should_succeed]])`` tuples, where source is the RemoteClient of
+            the server to check from, or None to ping from the host running
+            tempest, dest is an IP address, protocol is 'icmp' (default),
+            'tcp' or 'udp' and should_succeed is True (default) if dest
+            should be reachable from source.
+        :param timeout: the time in seconds given to all the checks, by
+            default ``[validation] ping_timeout``
+        :param max_workers: the number of checks run at the same time, by
+            default ``[validation] connectivity_check_workers``
+        :returns: the result matrix, a dictionary of the
+            `tempest.common.connectivity.ConnectivityResult` of the checks
+            by (source host, dest, protocol)
+        :raises: AssertError if the result of any check does not match its
+            should_succeed value
+        """
+        probes = {}
+        expected = {}
+        for pair in pairs:
+            source, dest = pair[:2]
+            protocol = pair[2] if len(pair) > 2 else 'icmp'
+            should_succeed = pair[3] if len(pair) > 3 else True
+            if source is None:
+                if protocol != 'icmp':
+                    raise ValueError('Only icmp can be checked from the host '
+                                     'running tempest, not %s' % protocol)
+                key = (connectivity.LOCAL_SOURCE, dest, protocol)
+                probes[key] = connectivity.local_ping_probe(
+                    dest, should_succeed=should_succeed)
+            else:
+                key = (source.ssh_client.host, dest, protocol)
+                probes[key] = connectivity.remote_probe(
+                    source, dest, protocol=protocol,
+                    should_succeed=should_succeed)
+            expected[key] = should_succeed
+
+        results = connectivity.probe_matrix(
+            probes, timeout or CONF.validation.ping_timeout,
+            max_workers=(max_workers or
+                         CONF.validation.connectivity_check_workers))
+        failures = []
+        for key, result in sorted(results.items()):
+            source_host, dest, protocol = key
+            if result.succeeded:
+                continue
+            if expected[key]:
+                failures.append(
+                    "Timed out waiting for %s to become reachable from %s "
+                    "with %s" % (dest, source_host, protocol))
+            else:
+                failures.append("%s is reachable from %s with %s" % (
+                    dest, source_host, protocol))
+        if failures:
+            self.log_console_output()
+            self.fail('\n'.join(failures))
+        return results
+
     def get_router(self, client=None, project_id=None, **kwargs):
         """Retrieve a router for the given tenant id.
 
@@ -1696,6 +1826,17 @@ class ObjectStorageScenarioTest(ScenarioTest):
                 self.assertNotIn(obj, object_list)
 
     def download_and_verify(self, container_name, obj_name, expected_data):
-        """Asserts the object and expected data to verify if they are same"""
-        _, obj = self.object_client.get_object(container_name, obj_name)
-        self.assertEqual(obj, expected_data)
+        """Asserts the object and expected data to verify if they are same
+
+        The object is streamed and hashed as it is received, and compared
+        with the size and the hash of the expected data.
+        """
+        if isinstance(expected_data, str):
+            expected_data = expected_data.encode('utf-8')
+        _, obj = self.object_client.get_object(container_name, obj_name,
+                                               stream=True)
+        with obj:
+            size = obj.consume()
+        self.assertEqual(len(expected_data), size)
+        self.assertEqual(hashlib.sha256(expected_data).hexdigest(),
+                         obj.sha256.hexdigest())
@@ -384,9 +384,9 @@ class TestNetworkBasicOps(manager.NetworkScenarioTest):
             ip_address, private_key=private_key,
             server=self.floating_ip_tuple.server)
 
-        for remote_ip in address_list:
-            self.check_remote_connectivity(ssh_source, remote_ip,
-                                           should_connect)
+        self.check_connectivity_matrix(
+            [(ssh_source, remote_ip, 'icmp', should_connect)
+             for remote_ip in address_list])
 
     def _update_router_admin_state(self, router, admin_state_up):
         kwargs = dict(admin_state_up=admin_state_up)
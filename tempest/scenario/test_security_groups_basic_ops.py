@@ -374,10 +374,9 @@ class TestSecurityGroupsBasicOps(manager.NetworkScenarioTest):
 
     def _test_in_tenant_block(self, tenant):
         access_point_ssh = self._connect_to_access_point(tenant)
-        for server in tenant.servers:
-            self.check_remote_connectivity(source=access_point_ssh,
-                                           dest=self._get_server_ip(server),
-                                           should_succeed=False)
+        self.check_connectivity_matrix(
+            [(access_point_ssh, self._get_server_ip(server), 'icmp', False)
+             for server in tenant.servers])
 
     def _test_in_tenant_allow(self, tenant):
         ruleset = dict(
@@ -391,9 +390,9 @@ class TestSecurityGroupsBasicOps(manager.NetworkScenarioTest):
             **ruleset
         )
         access_point_ssh = self._connect_to_access_point(tenant)
-        for server in tenant.servers:
-            self.check_remote_connectivity(source=access_point_ssh,
-                                           dest=self._get_server_ip(server))
+        self.check_connectivity_matrix(
+            [(access_point_ssh, self._get_server_ip(server))
+             for server in tenant.servers])
 
     def _test_cross_tenant_block(self, source_tenant, dest_tenant, ruleset):
         # if public router isn't defined, then dest_tenant access is via
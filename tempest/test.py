@@ -14,6 +14,7 @@
 #    under the License.
 
 import atexit
+import functools
 import os
 import sys
 
@@ -26,9 +27,19 @@ from tempest import clients
 from tempest.common import credentials_factory as credentials
 from tempest.common import utils
 from tempest import config
+from tempest.lib.common import api_metrics
 from tempest.lib.common import api_microversion_fixture
+from tempest.lib.common import cidr_allocator
+from tempest.lib.common import cred_client
 from tempest.lib.common import fixed_network
+from tempest.lib.common import http
+from tempest.lib.common import image_cache
+from tempest.lib.common import jsonschema_validator
+from tempest.lib.common import poller
 from tempest.lib.common import profiler
+from tempest.lib.common import ssh
+from tempest.lib.common import token_cache
+from tempest.lib.common.utils import test_utils
 from tempest.lib.common import validation_resources as vr
 from tempest.lib import decorators
 from tempest.lib import exceptions as lib_exc
@@ -70,6 +81,97 @@ def validate_tearDownClass():
 
 atexit.register(validate_tearDownClass)
 
+# Whether _setup_process() ran in this worker process
+_process_setup_done = False
+
+
+def _setup_process():
+    """Set up the process wide helpers enabled in the configuration
+
+    Called by the setUpClass of each test class, only the first call of a
+    worker process sets them up.
+    """
+    global _process_setup_done
+    if _process_setup_done:
+        return
+    _process_setup_done = True
+    if CONF.service_clients.keep_alive:
+        http.enable_keep_alive(
+            pool_maxsize=CONF.service_clients.pool_maxsize,
+            idle_timeout=CONF.service_clients.pool_idle_timeout)
+    jsonschema_validator.set_sample_rate(
+        CONF.service_clients.response_validation_sample_rate)
+    poller.configure(
+        fast_polls=CONF.service_clients.poll_fast_polls,
+        fast_interval=CONF.service_clients.poll_fast_interval,
+        backoff=CONF.service_clients.poll_backoff,
+        max_interval=CONF.service_clients.poll_max_interval,
+        jitter=CONF.service_clients.poll_jitter)
+    if CONF.identity.token_cache_dir:
+        token_cache.enable_token_cache(CONF.identity.token_cache_dir)
+    if CONF.network.cidr_lease_dir:
+        cidr_allocator.enable_cidr_allocator(CONF.network.cidr_lease_dir)
+    if CONF.scenario.image_cache_dir:
+        image_cache.enable_image_cache(CONF.scenario.image_cache_dir)
+    if CONF.service_clients.api_metrics_dir:
+        api_metrics.enable_api_metrics()
+    if CONF.validation.ssh_connection_reuse:
+        ssh.enable_connection_cache(
+            idle_timeout=CONF.validation.ssh_connection_idle_timeout)
+
+
+def _log_process_stats(class_name):
+    """Log the statistics of the process wide helpers after a test class"""
+    stats = [('Polling metrics', poller.get_metrics)]
+    if CONF.service_clients.keep_alive:
+        stats.append(('HTTP connection reuse', http.get_pool_stats))
+    if CONF.auth.use_dynamic_credentials:
+        stats.append(('Role cache', cred_client.get_role_cache_stats))
+    if CONF.identity.token_cache_dir:
+        stats.append(('Token cache', token_cache.get_stats))
+    if CONF.network.cidr_lease_dir:
+        stats.append(('CIDR allocations', cidr_allocator.get_stats))
+    if CONF.scenario.image_cache_dir:
+        stats.append(('Shared images', image_cache.get_stats))
+    if CONF.validation.ssh_connection_reuse:
+        stats.append(('ssh connection reuse', ssh.get_connection_stats))
+    for name, get_stats in stats:
+        LOG.debug("%s after %s: %s", name, class_name, get_stats())
+
+
+def _test_caller_wrapper(f, caller):
+    """Return f, naming the caller of the requests sent while it runs"""
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        token = test_utils.set_test_caller(caller)
+        try:
+            return f(*args, **kwargs)
+        finally:
+            test_utils.reset_test_caller(token)
+    return wrapper
+
+
+def _as_test_caller(phase):
+    """Name the test class and phase for the requests sent while it runs
+
+    find_test_caller returns ``Class:phase`` while the decorated method of a
+    test class or instance runs, rather than looking through the call stack
+    for it on each request.
+
+    :param phase: the name of the phase
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(cls_or_self, *args, **kwargs):
+            if isinstance(cls_or_self, type):
+                cls = cls_or_self
+            else:
+                cls = type(cls_or_self)
+            return _test_caller_wrapper(f, '%s:%s' % (cls.__name__, phase))(
+                cls_or_self, *args, **kwargs)
+        return wrapper
+    return decorator
+
 
 class BaseTestCase(testtools.testcase.WithAttributes,
                    testtools.TestCase):
@@ -134,6 +236,7 @@ class BaseTestCase(testtools.testcase.WithAttributes,
         cls._teardowns = []
 
     @classmethod
+    @_as_test_caller('setUpClass')
     def setUpClass(cls):
         cls.__setupclass_called = True
         # Reset state
@@ -141,6 +244,7 @@ class BaseTestCase(testtools.testcase.WithAttributes,
         # It should never be overridden by descendants
         if hasattr(super(BaseTestCase, cls), 'setUpClass'):
             super(BaseTestCase, cls).setUpClass()
+        _setup_process()
         try:
             cls.skip_checks()
 
@@ -170,6 +274,7 @@ class BaseTestCase(testtools.testcase.WithAttributes,
                 del trace  # to avoid circular refs
 
     @classmethod
+    @_as_test_caller('tearDownClass')
     def tearDownClass(cls):
         # insert pdb breakpoint when pause_teardown is enabled
         if CONF.pause_teardown:
@@ -213,6 +318,17 @@ class BaseTestCase(testtools.testcase.WithAttributes,
                     LOG.exception("teardown of %s failed: %s", name, te)
                 if not etype:
                     etype, value, trace = sys_exec_info
+        _log_process_stats(cls.__name__)
+        if CONF.validation.ssh_connection_reuse:
+            # The servers of the class are gone
+            ssh.close_cached_connections()
+        if CONF.service_clients.api_metrics_dir:
+            # The metrics of the worker so far, the files of the worker are
+            # rewritten after each class
+            try:
+                api_metrics.write_files(CONF.service_clients.api_metrics_dir)
+            except OSError as exc:
+                LOG.warning("Cannot write the API call metrics: %s", exc)
         # If exceptions were raised during teardown, and not before, re-raise
         # the first one
         if re_raise and etype is not None:
@@ -221,6 +337,30 @@ class BaseTestCase(testtools.testcase.WithAttributes,
             finally:
                 del trace  # to avoid circular refs
 
+    # NOTE: the cleanups of the test run outside of the phases below
+    @_as_test_caller('_run_cleanups')
+    def run(self, result=None):
+        # The setUp, test method and tearDown of this run are named through
+        # instance attributes, which the test runner looks up. The instance
+        # attributes set before, e.g. by the test runner, are restored after
+        # the run.
+        names = ('setUp', 'tearDown', self._testMethodName)
+        missing = object()
+        previous = dict((name, self.__dict__.get(name, missing))
+                        for name in names)
+        for name in names:
+            setattr(self, name, _test_caller_wrapper(
+                getattr(self, name),
+                '%s:%s' % (type(self).__name__, name)))
+        try:
+            return super(BaseTestCase, self).run(result)
+        finally:
+            for name, value in previous.items():
+                if value is missing:
+                    self.__dict__.pop(name, None)
+                else:
+                    setattr(self, name, value)
+
     def tearDown(self):
         super(BaseTestCase, self).tearDown()
         # insert pdb breakpoint when pause_teardown is enabled
@@ -12,8 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 from unittest import mock
 
+import fixtures
+from oslo_serialization import jsonutils as json
+
 from tempest.cmd import cleanup
 from tempest.tests import base
 
@@ -40,3 +44,47 @@ class TestTempestCleanup(base.TestCase):
             self.assertEqual(str(exc), '[\'exception\']')
             return
         assert False
+
+
+class TestSavedState(base.TestCase):
+
+    data = {'servers': {'id1': 'server1', 'id2': {'name': 'server2'}},
+            'networks': {},
+            cleanup.GLOBAL_INVENTORY_KEY: True}
+
+    def setUp(self):
+        super(TestSavedState, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'saved_state.json')
+
+    def test_write_saved_state(self):
+        cleanup._write_saved_state(self.path, self.data)
+        with open(self.path) as f:
+            records = [json.loads(line) for line in f]
+        # One record per line
+        self.assertEqual([
+            {'type': cleanup.GLOBAL_INVENTORY_KEY, 'value': True},
+            {'type': 'networks'},
+            {'type': 'servers', 'id': 'id1', 'value': 'server1'},
+            {'type': 'servers', 'id': 'id2', 'value': {'name': 'server2'}}],
+            records)
+
+    def test_read_saved_state(self):
+        cleanup._write_saved_state(self.path, self.data)
+        with mock.patch.object(json, 'load') as load:
+            self.assertEqual(self.data, cleanup._read_saved_state(self.path))
+        # Parsed line by line, not as a whole
+        load.assert_not_called()
+
+    def test_read_saved_state_invalid_record(self):
+        cleanup._write_saved_state(self.path, self.data)
+        with open(self.path, 'a') as f:
+            f.write('{"type": "servers", "id": \n')
+        # Not loaded again as a saved state of a previous version
+        self.assertRaises(ValueError, cleanup._read_saved_state, self.path)
+
+    def test_read_saved_state_previous_version(self):
+        path = 'tempest/tests/cmd/test_saved_state_json.json'
+        with open(path, 'rb') as f:
+            data = json.load(f)
+        self.assertEqual(data, cleanup._read_saved_state(path))
@@ -0,0 +1,212 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+from unittest import mock
+
+from tempest.cmd import cleanup_engine
+from tempest.cmd import cleanup_service
+from tempest.lib import exceptions
+from tempest.tests import base
+
+
+class FakeService(cleanup_service.BaseService):
+    """In memory cleanup service recording the order of the deletions"""
+
+    def __init__(self, events, ids, **kwargs):
+        kwargs.setdefault('got_exceptions', [])
+        super(FakeService, self).__init__(kwargs)
+        self.client = mock.Mock(build_timeout=1, build_interval=0)
+        self.events = events
+        self.existing = set(ids)
+        self.lists = 0
+        self.lock = threading.Lock()
+
+    def list(self):
+        with self.lock:
+            self.lists += 1
+            return [{'id': id_} for id_ in sorted(self.existing)]
+
+    def delete_resource(self, resource):
+        if resource['id'].startswith('fail'):
+            raise exceptions.Conflict()
+        # Let the other deletions start, if they can
+        time.sleep(0.01)
+        self.events.append((self.resource_type, resource['id']))
+        if not self.async_delete:
+            with self.lock:
+                self.existing.discard(resource['id'])
+
+
+class ServerService(FakeService):
+    resource_type = 'servers'
+    async_delete = True
+
+    def list(self):
+        # Deleted servers are gone by the time they are listed again
+        deleted = set(id_ for type_, id_ in self.events
+                      if type_ == self.resource_type)
+        with self.lock:
+            self.existing -= deleted
+        return super(ServerService, self).list()
+
+
+class NetworkPortService(FakeService):
+    resource_type = 'ports'
+    depends_on = ('ServerService',)
+
+
+class NetworkSubnetService(FakeService):
+    resource_type = 'subnets'
+    depends_on = ('NetworkPortService', 'NetworkRouterService')
+
+
+class NetworkService(FakeService):
+    resource_type = 'networks'
+    depends_on = ('NetworkPortService', 'NetworkSubnetService')
+
+
+class KeyPairService(FakeService):
+    resource_type = 'keypairs'
+
+
+class TestCleanupEngine(base.TestCase):
+
+    def setUp(self):
+        super(TestCleanupEngine, self).setUp()
+        self.events = []
+        self.servers = ServerService(self.events, ['s1', 's2'])
+        self.ports = NetworkPortService(self.events, ['p1', 'p2', 'p3'])
+        self.subnets = NetworkSubnetService(self.events, ['sn1'])
+        self.networks = NetworkService(self.events, ['n1', 'n2'])
+
+    def _order(self, resource_type):
+        return [i for i, (type_, _) in enumerate(self.events)
+                if type_ == resource_type]
+
+    def test_dependency_order(self):
+        engine = cleanup_engine.CleanupEngine(
+            [self.networks, self.subnets, self.ports, self.servers],
+            workers=4)
+        engine.run()
+        self.assertEqual(8, len(self.events))
+        self.assertLess(max(self._order('servers')),
+                        min(self._order('ports')))
+        self.assertLess(max(self._order('ports')),
+                        min(self._order('subnets')))
+        self.assertLess(max(self._order('subnets')),
+                        min(self._order('networks')))
+
+    def test_workers_bound(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+        delete_resource = FakeService.delete_resource
+
+        def counting_delete(service, resource):
+            with lock:
+                running.append(resource)
+                peak.append(len(running))
+            try:
+                delete_resource(service, resource)
+            finally:
+                with lock:
+                    running.remove(resource)
+
+        self.patchobject(FakeService, 'delete_resource', counting_delete)
+        keypairs = KeyPairService(self.events,
+                                  ['k%d' % i for i in range(10)])
+        engine = cleanup_engine.CleanupEngine([keypairs, self.ports],
+                                              workers=3)
+        engine.run()
+        self.assertEqual(13, len(self.events))
+        self.assertLessEqual(max(peak), 3)
+        self.assertGreater(max(peak), 1)
+
+    def test_async_deletions_waited_in_batch(self):
+        engine = cleanup_engine.CleanupEngine([self.servers, self.ports],
+                                              workers=2, wait_interval=0)
+        engine.run()
+        # One list to find the servers and one to see they are all gone
+        self.assertEqual(2, self.servers.lists)
+        stats = engine.get_stats()
+        self.assertEqual(2, stats['servers']['deleted'])
+        self.assertEqual(0, stats['servers']['remaining'])
+
+    def test_async_deletions_waited_with_inventory(self):
+        inventory = cleanup_service.Inventory()
+        servers = ServerService(self.events, ['s1', 's2'],
+                                inventory=inventory)
+        servers.fetch_all = lambda: ServerService.list(servers)
+        self.patchobject(servers, 'list',
+                         lambda: servers._list(servers.fetch_all))
+        engine = cleanup_engine.CleanupEngine([servers], wait_interval=0)
+        engine.run()
+        # The listing made before the deletions is not reused
+        self.assertEqual(2, inventory.list_calls)
+        self.assertEqual(0, engine.get_stats()['servers']['remaining'])
+
+    def test_async_deletions_timeout(self):
+        self.patchobject(ServerService, 'list', FakeService.list)
+        engine = cleanup_engine.CleanupEngine([self.servers, self.ports],
+                                              wait_timeout=0, wait_interval=0)
+        engine.run()
+        stats = engine.get_stats()
+        self.assertEqual(2, stats['servers']['remaining'])
+        # The dependent services still run
+        self.assertEqual(3, stats['ports']['deleted'])
+
+    def test_failed_deletions(self):
+        ports = NetworkPortService(self.events, ['p1', 'fail1'])
+        engine = cleanup_engine.CleanupEngine([ports])
+        engine.run()
+        stats = engine.get_stats()['ports']
+        self.assertEqual(2, stats['listed'])
+        self.assertEqual(1, stats['deleted'])
+        self.assertEqual(1, stats['failed'])
+        self.assertIn('throughput', stats)
+
+    def test_not_implemented(self):
+        self.patchobject(self.ports, 'list',
+                         side_effect=exceptions.NotImplemented())
+        engine = cleanup_engine.CleanupEngine([self.ports, self.subnets])
+        engine.run()
+        self.assertEqual(1, len(self.ports.got_exceptions))
+        self.assertEqual([('subnets', 'sn1')], self.events)
+
+    def test_missing_dependencies_ignored(self):
+        engine = cleanup_engine.CleanupEngine([self.networks])
+        engine.run()
+        self.assertEqual(2, len(self.events))
+
+    def test_dependency_cycle(self):
+        self.patchobject(ServerService, 'depends_on', ('NetworkService',))
+        self.assertRaises(ValueError, cleanup_engine.CleanupEngine,
+                          [self.servers, self.ports, self.networks,
+                           self.subnets])
+
+    def test_invalid_workers(self):
+        self.assertRaises(ValueError, cleanup_engine.CleanupEngine,
+                          [self.ports], workers=0)
+
+    def test_cleanup_services_dependencies(self):
+        # The dependencies of the actual services have no cycle
+        services = [type(cls.__name__, (object,),
+                         {'depends_on': cls.depends_on})()
+                    for cls in vars(cleanup_service).values()
+                    if isinstance(cls, type) and
+                    issubclass(cls, cleanup_service.BaseService)]
+        cleanup_engine.CleanupEngine._resolve_dependencies(services)
@@ -13,6 +13,9 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+from unittest import mock
+
 import fixtures
 
 from oslo_serialization import jsonutils as json
@@ -76,6 +79,94 @@ class TestBaseService(base.TestCase):
         base.run()
         self.assertEqual(len(base.got_exceptions), 3)
 
+    def test_fetch_all_not_implemented(self):
+        service = self.TestException({'inventory':
+                                      cleanup_service.Inventory()})
+        exc = self.assertRaises(NotImplementedError, service._list, list)
+        self.assertIn('TestException does not implement fetch_all', str(exc))
+
+
+class TestInventory(base.TestCase):
+
+    resources = [{'id': 'r1', 'project_id': 'p1'},
+                 {'id': 'r2', 'tenant_id': 'p2'},
+                 {'id': 'r3', 'project_id': 'p1'}]
+
+    def test_list_once(self):
+        inventory = cleanup_service.Inventory()
+        fetch = mock.Mock(return_value=self.resources)
+        self.assertEqual(self.resources, inventory.list('servers', fetch))
+        self.assertEqual([self.resources[0], self.resources[2]],
+                         inventory.list('servers', fetch, project_id='p1'))
+        self.assertEqual([self.resources[1]],
+                         inventory.list('servers', fetch, project_id='p2'))
+        self.assertEqual([], inventory.list('servers', fetch,
+                                            project_id='p3'))
+        fetch.assert_called_once_with()
+        self.assertEqual(1, inventory.list_calls)
+
+    def test_invalidate(self):
+        inventory = cleanup_service.Inventory()
+        fetch = mock.Mock(side_effect=[self.resources, []])
+        inventory.list('servers', fetch)
+        inventory.invalidate('servers')
+        self.assertEqual([], inventory.list('servers', fetch))
+        self.assertEqual(2, fetch.call_count)
+
+    def test_invalidate_since(self):
+        inventory = cleanup_service.Inventory()
+        fetch = mock.Mock(side_effect=[self.resources, []])
+        before = time.monotonic()
+        inventory.list('servers', fetch)
+        # Listed after the poll, kept
+        inventory.invalidate('servers', since=before)
+        self.assertEqual(self.resources, inventory.list('servers', fetch))
+        inventory.invalidate('servers', since=time.monotonic())
+        self.assertEqual([], inventory.list('servers', fetch))
+        self.assertEqual(2, fetch.call_count)
+
+    def _service(self, service_class, manager):
+        return service_class(manager, inventory=cleanup_service.Inventory(),
+                             project_id='p1', is_save_state=True)
+
+    def test_keypairs_not_in_inventory(self):
+        manager = mock.Mock()
+        manager.keypairs_client.list_keypairs.return_value = {
+            'keypairs': [{'keypair': {'name': 'kp1'}}]}
+        service = self._service(cleanup_service.KeyPairService, manager)
+        # Keypairs have no project, they are listed by each service
+        self.assertEqual([{'keypair': {'name': 'kp1'}}], service.list())
+        self.assertEqual(0, service.inventory.list_calls)
+
+    def test_server_groups_in_inventory(self):
+        manager = mock.Mock()
+        manager.server_groups_client.list_server_groups.return_value = {
+            'server_groups': [{'id': 'sg1', 'project_id': 'p1'},
+                              {'id': 'sg2', 'project_id': 'p2'}]}
+        service = self._service(cleanup_service.ServerGroupService, manager)
+        self.assertEqual([{'id': 'sg1', 'project_id': 'p1'}], service.list())
+        self.assertEqual(1, service.inventory.list_calls)
+        list_server_groups = manager.server_groups_client.list_server_groups
+        list_server_groups.assert_called_once_with(all_projects=True)
+
+    def test_list_all_follows_next_links(self):
+        pages = [
+            {'servers': [{'id': 'r1'}, {'id': 'r2'}],
+             'servers_links': [{'rel': 'next',
+                                'href': 'http://nova/servers?marker=r2'}]},
+            {'servers': [{'id': 'r3'}],
+             'servers_links': [{'rel': 'next',
+                                'href': 'http://nova/servers?marker=r3'}]},
+            {'servers': []}]
+        list_func = mock.Mock(side_effect=pages)
+        resources = cleanup_service.list_all(list_func, 'servers',
+                                             all_tenants=True)
+        self.assertEqual(['r1', 'r2', 'r3'], [r['id'] for r in resources])
+        self.assertEqual([mock.call(all_tenants=True),
+                          mock.call(all_tenants=True, marker='r2'),
+                          mock.call(all_tenants=True, marker='r3')],
+                         list_func.call_args_list)
+
 
 class MockFunctionsBase(base.TestCase):
 
@@ -373,6 +464,20 @@ class TestServerService(BaseCmdServiceTests):
     def test_save_state(self):
         self._test_saved_state_true([(self.get_method, self.response, 200)])
 
+    def test_list_inventory(self):
+        serv = self._create_cmd_service(self.service_class)
+        serv.inventory = cleanup_service.Inventory()
+        # Servers of all the projects
+        serv.project_id = None
+        list_servers = self.patchobject(serv.client, 'list_servers',
+                                        return_value=self.response)
+        self.assertEqual(1, len(serv.list()))
+        serv.dry_run()
+        list_servers.assert_called_once_with(detail=True, all_tenants=True)
+        serv.refresh()
+        serv.list()
+        self.assertEqual(2, list_servers.call_count)
+
 
 class TestServerGroupService(BaseCmdServiceTests):
 
@@ -666,6 +771,27 @@ class TestNetworkQuotaService(BaseCmdServiceTests):
                     (self.delete_method, "delete", None)]
         self._test_dry_run_true(dry_mock)
 
+    def test_dry_run_inventory(self):
+        inventory = cleanup_service.Inventory()
+        creds = fake_credentials.FakeKeystoneV3Credentials()
+        os = clients.Manager(creds)
+        list_quotas = self.patchobject(
+            os.network_quotas_client, 'list_quotas',
+            return_value=self.response)
+        data = {}
+        for project_id in ('81e8490db559474dacb2212fca9cca2d', 'other'):
+            data[project_id] = {}
+            serv = cleanup_service.NetworkQuotaService(
+                os, is_save_state=False, is_preserve=False, is_dry_run=True,
+                project_id=project_id, data=data[project_id],
+                saved_state_json=self.saved_state, inventory=inventory)
+            serv.run()
+        list_quotas.assert_called_once_with()
+        self.assertEqual(
+            self.response['quotas'],
+            data['81e8490db559474dacb2212fca9cca2d']['network_quotas'])
+        self.assertEqual([], data['other']['network_quotas'])
+
 
 # Begin network service classes
 class TestNetworkService(BaseCmdServiceTests):
@@ -905,6 +1031,31 @@ class TestNetworkRouterService(BaseCmdServiceTests):
                        (self.log_method, 'exception', None)]
         self._test_delete(delete_mock)
 
+    def test_delete_interfaces_listed_once(self):
+        serv = self._create_cmd_service(self.service_class)
+        routers = [{'id': 'router1'}, {'id': 'router2'}]
+        ports = [{'id': 'port1', 'device_id': 'router1',
+                  'device_owner': 'network:router_interface'},
+                 {'id': 'port2', 'device_id': 'router2',
+                  'device_owner': 'network:router_interface_distributed'},
+                 {'id': 'port3', 'device_id': 'router2',
+                  'device_owner': 'network:router_gateway'},
+                 {'id': 'port4', 'device_id': 'other-router',
+                  'device_owner': 'network:router_interface'}]
+        self.patchobject(serv, 'list', return_value=routers)
+        list_ports = self.patchobject(serv.ports_client, 'list_ports',
+                                      return_value={'ports': ports})
+        remove = self.patchobject(serv.routers_client,
+                                  'remove_router_interface')
+        delete = self.patchobject(serv.routers_client, 'delete_router')
+        serv.delete()
+        list_ports.assert_called_once_with()
+        self.assertEqual([mock.call('router1', port_id='port1'),
+                          mock.call('router2', port_id='port2')],
+                         remove.call_args_list)
+        self.assertEqual([mock.call('router1'), mock.call('router2')],
+                         delete.call_args_list)
+
     def test_dry_run(self):
         dry_mock = [(self.get_method, self.response, 200),
                     (self.delete_method, "delete", None)]
@@ -21,12 +21,15 @@ import tempfile
 from unittest import mock
 
 import fixtures
+import yaml
 
 from tempest.cmd import run
 from tempest.cmd import workspace
 from tempest import config
+from tempest.lib.common import api_metrics
 from tempest.lib.common.utils import data_utils
 from tempest.tests import base
+from tempest.tests.cmd import test_run_scheduler
 
 DEVNULL = open(os.devnull, 'wb')
 atexit.register(DEVNULL.close)
@@ -362,6 +365,7 @@ class TestTakeAction(base.TestCase):
         parsed_args.workspace = None
         parsed_args.state = None
         parsed_args.list_tests = False
+        parsed_args.timing_schedule = False
         parsed_args.config_file = path
 
         with mock.patch('stestr.commands.run_command') as m:
@@ -392,6 +396,7 @@ class TestTakeAction(base.TestCase):
         parsed_args.workspace_path = self.store_file
         parsed_args.state = None
         parsed_args.list_tests = False
+        parsed_args.timing_schedule = False
         parsed_args.config_file = path
 
         with mock.patch('stestr.commands.run_command') as m:
@@ -408,6 +413,7 @@ class TestTakeAction(base.TestCase):
         parsed_args.workspace_path = self.store_file
         parsed_args.state = None
         parsed_args.list_tests = False
+        parsed_args.timing_schedule = False
         parsed_args.config_file = ''
 
         with mock.patch('stestr.commands.run_command') as m:
@@ -440,6 +446,7 @@ class TestTakeAction(base.TestCase):
         parsed_args.workspace_path = self.store_file
         parsed_args.state = True
         parsed_args.list_tests = False
+        parsed_args.timing_schedule = False
         parsed_args.config_file = ''
 
         with mock.patch('stestr.commands.run_command') as m:
@@ -459,6 +466,7 @@ class TestTakeAction(base.TestCase):
         parsed_args.workspace_path = self.store_file
         parsed_args.state = True
         parsed_args.list_tests = False
+        parsed_args.timing_schedule = False
         parsed_args.config_file = path
 
         with mock.patch('stestr.commands.run_command') as m:
@@ -466,3 +474,94 @@ class TestTakeAction(base.TestCase):
             self.assertEqual(0, tempest_run.take_action(parsed_args))
             m.assert_called()
         mock_init_state.assert_called()
+
+    def _timing_args(self, history):
+        parsed_args = mock.Mock()
+        parsed_args.workspace = None
+        parsed_args.state = None
+        parsed_args.list_tests = False
+        parsed_args.config_file = ''
+        parsed_args.parallel = True
+        parsed_args.concurrency = 2
+        parsed_args.timing_schedule = True
+        parsed_args.timing_history = [history]
+        parsed_args.timing_worker_file = os.path.join(self.directory,
+                                                      'workers.yaml')
+        return parsed_args
+
+    def _list_command(self, stdout, **kwargs):
+        stdout.write(b'mod.A.test_1[id-1]\nmod.A.test_2\nmod.B.test_1\n'
+                     b'mod.C.test_1\n')
+        return 0
+
+    def test_timing_schedule(self):
+        self._setup_test_dirs()
+        open('.stestr.conf', 'w').close()
+        history = os.path.join(self.directory, 'history')
+        test_run_scheduler.write_stream(history, {'mod.A.test_1': 3.0,
+                                                  'mod.A.test_2': 2.0,
+                                                  'mod.B.test_1': 4.0})
+        parsed_args = self._timing_args(history)
+        tempest_run = run.TempestRun(app=mock.Mock(), app_args=mock.Mock())
+
+        with mock.patch('stestr.commands.list_command',
+                        side_effect=self._list_command), \
+                mock.patch('stestr.commands.run_command') as m:
+            m.return_value = 0
+            self.assertEqual(0, tempest_run.take_action(parsed_args))
+        worker_path = m.call_args[1]['worker_path']
+        self.assertEqual(parsed_args.timing_worker_file, worker_path)
+        with open(worker_path) as worker_file:
+            workers = yaml.safe_load(worker_file)
+        # C is unknown, it is given the mean duration of A and B
+        self.assertEqual([{'worker': ['^mod\\.A\\.']},
+                          {'worker': ['^mod\\.B\\.', '^mod\\.C\\.']}],
+                         workers)
+
+    def test_timing_schedule_no_history(self):
+        self._setup_test_dirs()
+        open('.stestr.conf', 'w').close()
+        history = os.path.join(self.directory, 'history')
+        test_run_scheduler.write_stream(history, {})
+        parsed_args = self._timing_args(history)
+        parsed_args.worker_file = None
+        tempest_run = run.TempestRun(app=mock.Mock(), app_args=mock.Mock())
+
+        with mock.patch('stestr.commands.run_command') as m:
+            m.return_value = 0
+            self.assertEqual(0, tempest_run.take_action(parsed_args))
+        self.assertIsNone(m.call_args[1]['worker_path'])
+
+    def test_api_metrics_merged(self):
+        self._setup_test_dirs()
+        open('.stestr.conf', 'w').close()
+        metrics_dir = os.path.join(self.directory, 'metrics')
+        metrics = {('compute', 'GET', '/servers'): {
+            'calls': 2, 'seconds': 0.3, 'buckets': [0] * 14,
+            'bytes_out': 0, 'bytes_in': 10, 'statuses': {'200': 2},
+            'errors': {}, 'retries': 0}}
+        # Left by a previous run
+        api_metrics.write_files(metrics_dir,
+                                api_metrics.WORKER_PREFIX + '2', metrics)
+
+        def run_workers(**kwargs):
+            for worker in ('0', '1'):
+                api_metrics.write_files(metrics_dir,
+                                        api_metrics.WORKER_PREFIX + worker,
+                                        metrics)
+            return 0
+        parsed_args = self._timing_args(None)
+        parsed_args.timing_schedule = False
+        parsed_args.worker_file = None
+        tempest_run = run.TempestRun(app=mock.Mock(), app_args=mock.Mock())
+
+        with mock.patch.object(run, 'CONF') as conf, \
+                mock.patch('stestr.commands.run_command') as m:
+            conf.service_clients.api_metrics_dir = metrics_dir
+            m.side_effect = run_workers
+            self.assertEqual(0, tempest_run.take_action(parsed_args))
+        self.assertFalse(os.path.exists(os.path.join(
+            metrics_dir, api_metrics.WORKER_PREFIX + '2.json')))
+        with open(os.path.join(metrics_dir, 'api-metrics.json')) as summary:
+            merged = api_metrics.load(summary.read())
+        self.assertEqual(4, merged[('compute', 'GET', '/servers')]['calls'])
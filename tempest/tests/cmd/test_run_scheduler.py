@@ -0,0 +1,152 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import os
+import shutil
+import tempfile
+
+import subunit
+import yaml
+
+from tempest.cmd import run_scheduler
+from tempest.tests import base
+
+START = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def write_stream(path, durations):
+    with open(path, 'wb') as stream:
+        result = subunit.StreamResultToBytes(stream)
+        for test_id, seconds in durations.items():
+            result.status(test_id=test_id, test_status='inprogress',
+                          timestamp=START)
+            result.status(test_id=test_id, test_status='success',
+                          timestamp=START + datetime.timedelta(
+                              seconds=seconds))
+
+
+class TestLoadTestTimes(base.TestCase):
+
+    def setUp(self):
+        super(TestLoadTestTimes, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_load_test_times(self):
+        first = os.path.join(self.directory, '0')
+        second = os.path.join(self.directory, '1')
+        write_stream(first, {'mod.A.test_a[id-1,smoke]': 4.0,
+                             'mod.B.test_b': 1.0})
+        write_stream(second, {'mod.A.test_a[id-1,smoke]': 2.0})
+        self.assertEqual({'mod.A.test_a': 3.0, 'mod.B.test_b': 1.0},
+                         run_scheduler.load_test_times([first, second]))
+
+    def test_repository_streams(self):
+        for name in ('1', '2', '10', 'next-stream', 'format'):
+            open(os.path.join(self.directory, name), 'w').close()
+        self.assertEqual(
+            [os.path.join(self.directory, name) for name in ('2', '10')],
+            run_scheduler.repository_streams(self.directory, runs=2))
+
+    def test_repository_streams_no_repository(self):
+        self.assertEqual([], run_scheduler.repository_streams(
+            os.path.join(self.directory, 'missing')))
+
+
+class TestSchedule(base.TestCase):
+
+    test_ids = ['mod.Slow.test_1[id-1]', 'mod.Slow.test_2[id-2]',
+                'mod.Medium.test_1', 'mod.Fast.test_1', 'mod.Fast.test_2',
+                'mod.New.test_1']
+    test_times = {'mod.Slow.test_1': 50.0, 'mod.Slow.test_2': 40.0,
+                  'mod.Medium.test_1': 60.0, 'mod.Fast.test_1': 10.0,
+                  'mod.Fast.test_2': 10.0}
+
+    def _workers(self, partitions):
+        return [sorted(classes) for _, classes in partitions]
+
+    def test_longest_first(self):
+        partitions = run_scheduler.schedule(self.test_ids, 2,
+                                            self.test_times)
+        # New has the mean duration of the known classes, 56.7 seconds
+        self.assertEqual([['mod.Fast', 'mod.Slow'], ['mod.Medium', 'mod.New']],
+                         self._workers(partitions))
+        self.assertEqual(110.0, partitions[0][0])
+
+    def test_more_workers_than_classes(self):
+        partitions = run_scheduler.schedule(self.test_ids, 6,
+                                            self.test_times)
+        self.assertEqual(6, len(partitions))
+        self.assertEqual([[], [], ['mod.Fast'], ['mod.Medium'], ['mod.New'],
+                          ['mod.Slow']],
+                         sorted(self._workers(partitions)))
+
+    def test_no_known_times(self):
+        partitions = run_scheduler.schedule(self.test_ids, 2, {})
+        self.assertEqual([2, 2], [len(classes) for _, classes in partitions])
+
+    def test_locks(self):
+        locks = {'mod.Slow': set(['quotas']), 'mod.Fast': set(['quotas']),
+                 'mod.Medium': set(['zones'])}
+        partitions = run_scheduler.schedule(self.test_ids, 3,
+                                            self.test_times, locks)
+        self.assertIn(['mod.Fast', 'mod.Slow'], self._workers(partitions))
+
+    def test_locks_transitive(self):
+        locks = {'mod.Slow': set(['quotas']),
+                 'mod.Fast': set(['quotas', 'zones']),
+                 'mod.Medium': set(['zones'])}
+        partitions = run_scheduler.schedule(self.test_ids, 3,
+                                            self.test_times, locks)
+        self.assertIn(['mod.Fast', 'mod.Medium', 'mod.Slow'],
+                      self._workers(partitions))
+
+    def test_serial(self):
+        test_ids = ['mod.Slow.test_1[id-1,serial]', 'mod.Medium.test_1',
+                    'mod.Fast.test_1[serial,smoke]']
+        partitions = run_scheduler.schedule(test_ids, 2, self.test_times)
+        self.assertEqual([['mod.Fast', 'mod.Slow'], ['mod.Medium']],
+                         self._workers(partitions))
+
+
+class TestFindClassLocks(base.TestCase):
+
+    def test_find_class_locks(self):
+        module = 'tempest.api.compute.admin.test_quotas'
+        locks = run_scheduler.find_class_locks([
+            # The lock is taken by the base class
+            module + '.QuotasAdminTestJSON',
+            module + '.QuotaClassesAdminTestJSON',
+            'tempest.api.compute.servers.test_servers.ServersTestJSON',
+            'tempest.not_a_module.Test'])
+        self.assertEqual({module + '.QuotasAdminTestJSON':
+                          set(['compute_quotas']),
+                          module + '.QuotaClassesAdminTestJSON':
+                          set(['compute_quotas'])}, locks)
+
+
+class TestWriteWorkerFile(base.TestCase):
+
+    def test_write_worker_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'workers.yaml')
+        run_scheduler.write_worker_file(
+            path, [(2.0, ['mod.B', 'mod.A']), (1.0, ['mod.C']), (0.0, [])])
+        with open(path) as worker_file:
+            workers = yaml.safe_load(worker_file)
+        self.assertEqual([{'worker': ['^mod\\.A\\.', '^mod\\.B\\.']},
+                          {'worker': ['^mod\\.C\\.']}], workers)
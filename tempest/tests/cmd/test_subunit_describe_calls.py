@@ -117,6 +117,76 @@ class TestUrlParser(base.TestCase):
         self.assertEqual(url, self.test_object.url_path(url))
 
 
+class TestLatencyHistogram(base.TestCase):
+
+    def test_percentile(self):
+        histogram = subunit_describe_calls.LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        for ms in range(1, 101):
+            histogram.add(ms / 1000.0)
+        self.assertEqual(100, histogram.count)
+        self.assertAlmostEqual(5.05, histogram.total)
+        # The percentiles are at most 2% over
+        self.assertTrue(0.05 <= histogram.percentile(50) <= 0.05 * 1.02)
+        self.assertTrue(0.09 <= histogram.percentile(90) <= 0.09 * 1.02)
+        self.assertEqual(0.1, histogram.percentile(100))
+
+    def test_merge(self):
+        first = subunit_describe_calls.LatencyHistogram()
+        first.add(0.2)
+        second = subunit_describe_calls.LatencyHistogram()
+        second.add(2.0)
+        second.add(3.0)
+        first.merge(second)
+        self.assertEqual(3, first.count)
+        self.assertEqual(3.0, first.max)
+        self.assertTrue(2.0 <= first.percentile(50) <= 2.0 * 1.02)
+
+
+class TestCallStats(base.TestCase):
+
+    line = (b'2026-01-01 00:00:00,000 1 INFO [tempest.lib.common.rest_client]'
+            b' Request (Test:test_a): %s GET http://cloud:9696/v2.0/ports/'
+            b'3715e0bb-b1b3-4291-aa13-2c86c3b9ec93 %ss\n')
+
+    def test_status_split_lines(self):
+        stats = subunit_describe_calls.CallStats()
+        logs = self.line % (b'200', b'0.100') + self.line % (b'404', b'0.300')
+        # Packets cut in the middle of the lines
+        for start in range(0, len(logs), 50):
+            stats.status(test_id='mod.Test.test_a',
+                         file_name='pythonlogging',
+                         file_bytes=logs[start:start + 50])
+        stats.status(test_id='mod.Test.test_a', file_name='other',
+                     file_bytes=self.line % (b'200', b'0.100'))
+        stats.stopTestRun()
+        key = ('Neutron', 'GET', '/v2.0/ports/{id}')
+        self.assertEqual([key], list(stats.apis))
+        self.assertEqual(2, stats.apis[key].count)
+        self.assertEqual(1, stats.errors[key])
+        self.assertEqual({'mod.Test.test_a': [2, 0.4]}, dict(stats.tests))
+
+    def test_summary_regressions(self):
+        runs = []
+        for seconds in (b'0.100', b'0.100', b'0.300'):
+            stats = subunit_describe_calls.CallStats()
+            stats.status(test_id='mod.Test.test_a', eof=True,
+                         file_name='pythonlogging',
+                         file_bytes=self.line % (b'200', seconds))
+            runs.append(stats)
+        tables = subunit_describe_calls.summary(runs)
+        # The percentiles are the upper bounds of the buckets, up to the
+        # maximum
+        self.assertEqual([['Neutron', 'GET', '/v2.0/ports/{id}', 3, 0, 0.5,
+                           101, 300, 300, 300]], tables['apis']['rows'])
+        self.assertEqual([['mod.Test.test_a', 3, 0.5]],
+                         tables['tests']['rows'])
+        self.assertEqual([['Neutron', 'GET', '/v2.0/ports/{id}', 100, 300,
+                           3.0]], tables['regressions']['rows'])
+        self.assertNotIn('regressions',
+                         subunit_describe_calls.summary(runs[:1]))
+
+
 class TestCliBase(base.TestCase):
     """Base class for share code on all CLI sub-process testing"""
 
@@ -433,3 +503,36 @@ class TestSubunitDescribeCalls(TestCliBase):
 
         self.assertIn("Traceback (most recent call last):", stderr_data)
         self.assertIn("entry_point(parsed_args)", stderr_data)
+
+    def _assert_summary(self, data):
+        self.assertIn('service  verb    url                        calls  '
+                      'errors', data)
+        self.assertIn('Nova     DELETE  /v2.1/{id}/os-agents/{id}      4'
+                      '       1', data)
+        self.assertIn('test  calls  total_s', data)
+
+    def test_take_action_summary(self):
+        parser = self.test_object.get_parser('NAME')
+        parsed_args = parser.parse_args(["-s" + self._subunit_file,
+                                         "--summary"])
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.test_object.take_action(parsed_args)
+        self._assert_summary(mock_stdout.getvalue())
+
+    def test_take_action_runs(self):
+        temp_file = tempfile.mkstemp()[1]
+        self.addCleanup(os.remove, temp_file)
+        parser = self.test_object.get_parser('NAME')
+        parsed_args = parser.parse_args(
+            ["--runs", self._subunit_file, self._subunit_file, "-j", "2",
+             "-o", temp_file])
+        with patch('sys.stdout', new=StringIO()):
+            self.test_object.take_action(parsed_args)
+        with open(temp_file, 'r') as file:
+            tables = json.loads(file.read())
+        self.assertEqual(['service', 'calls', 'errors', 'total_s', 'p50_ms',
+                          'p90_ms', 'p99_ms', 'max_ms'],
+                         tables['services']['columns'])
+        self.assertEqual(16, tables['services']['rows'][0][1])
+        # Same latencies in both runs
+        self.assertEqual([], tables['regressions']['rows'])
@@ -0,0 +1,119 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+from unittest import mock
+
+from tempest.common import connectivity
+from tempest.lib import exceptions as lib_exc
+from tempest.tests import base
+
+
+class TestProbeMatrix(base.TestCase):
+
+    def setUp(self):
+        super(TestProbeMatrix, self).setUp()
+        self.sleep = self.patch('time.sleep')
+
+    def test_probe_matrix(self):
+        probes = {
+            ('a', '10.0.0.2', 'icmp'): mock.Mock(return_value=True),
+            ('a', '10.0.0.3', 'icmp'): mock.Mock(
+                side_effect=[False, False, True]),
+        }
+        results = connectivity.probe_matrix(probes, timeout=60, interval=2)
+        self.assertEqual(set(probes), set(results))
+        first = results[('a', '10.0.0.2', 'icmp')]
+        self.assertTrue(first.succeeded)
+        self.assertEqual(1, first.attempts)
+        self.assertIsNotNone(first.latency)
+        self.assertIsNotNone(first.first_success)
+        second = results[('a', '10.0.0.3', 'icmp')]
+        self.assertTrue(second.succeeded)
+        self.assertEqual(3, second.attempts)
+        self.sleep.assert_called_with(2)
+        self.assertEqual(2, self.sleep.call_count)
+
+    def test_shared_deadline(self):
+        now = [100.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+        self.sleep.side_effect = sleep
+        self.patch('time.time', side_effect=lambda: now[0])
+        probes = dict((index, mock.Mock(return_value=False))
+                      for index in range(3))
+
+        results = connectivity.probe_matrix(probes, timeout=10, interval=1,
+                                            max_workers=1)
+        # The first probe used all the time given to the matrix, the others
+        # are still run once
+        self.assertEqual([10, 1, 1],
+                         [results[index].attempts for index in range(3)])
+        for result in results.values():
+            self.assertFalse(result.succeeded)
+            self.assertIsNone(result.first_success)
+
+    def test_concurrent(self):
+        # Probes waiting for each other can only pass if they run at the
+        # same time
+        barrier = threading.Barrier(3, timeout=10)
+        probes = dict((index, lambda: barrier.wait() is not None)
+                      for index in range(3))
+        results = connectivity.probe_matrix(probes, timeout=60,
+                                            max_workers=3)
+        self.assertTrue(all(result.succeeded for result in results.values()))
+
+    def test_probe_error(self):
+        probes = {'ok': mock.Mock(return_value=True),
+                  'error': mock.Mock(side_effect=lib_exc.SSHTimeout(
+                      host='10.0.0.2', user='cirros', password=None))}
+        self.assertRaises(lib_exc.SSHTimeout, connectivity.probe_matrix,
+                          probes, timeout=60)
+        probes['ok'].assert_called_once_with()
+
+
+class TestProbes(base.TestCase):
+
+    def test_remote_probe(self):
+        source = mock.Mock()
+        probe = connectivity.remote_probe(source, '10.0.0.2', protocol='tcp',
+                                          nic='eth1')
+        self.assertTrue(probe())
+        source.tcp_check.assert_called_once_with('10.0.0.2', nic='eth1')
+        source.tcp_check.side_effect = lib_exc.SSHExecCommandFailed(
+            command='nc', exit_status=1, stdout='', stderr='')
+        self.assertFalse(probe())
+
+    def test_remote_probe_should_fail(self):
+        source = mock.Mock()
+        source.icmp_check.side_effect = lib_exc.SSHExecCommandFailed(
+            command='ping', exit_status=1, stdout='', stderr='')
+        probe = connectivity.remote_probe(source, '10.0.0.2',
+                                          should_succeed=False)
+        self.assertTrue(probe())
+
+    @mock.patch('subprocess.Popen')
+    def test_local_ping_probe(self, popen):
+        popen.return_value.returncode = 0
+        probe = connectivity.local_ping_probe('10.0.0.2', mtu=1450)
+        self.assertTrue(probe())
+        self.assertEqual(
+            ['ping', '-c1', '-w1', '-M', 'do', '-s', '1422', '10.0.0.2'],
+            popen.call_args[0][0])
+        popen.return_value.returncode = 1
+        self.assertFalse(probe())
+        self.assertTrue(connectivity.local_ping_probe(
+            '10.0.0.2', should_succeed=False)())
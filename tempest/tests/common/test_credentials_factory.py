@@ -116,7 +116,40 @@ class TestCredentialsFactory(base.TestCase):
             expected_identity_version)
         mock_dynamic_credentials_provider_class.assert_called_once_with(
             name=expected_name, network_resources=expected_network_resources,
-            **expected_params)
+            credential_pool=None, **expected_params)
+
+    @mock.patch.object(dynamic_creds, 'DynamicCredentialPool')
+    @mock.patch.object(dynamic_creds, 'DynamicCredentialProvider')
+    @mock.patch.object(cf, 'get_dynamic_provider_params')
+    def test_get_credentials_provider_dynamic_pool(
+            self, mock_dynamic_provider_params,
+            mock_dynamic_credentials_provider_class,
+            mock_dynamic_credentials_pool_class):
+        cfg.CONF.set_default('use_dynamic_credentials', True, group='auth')
+        cfg.CONF.set_default('dynamic_credentials_pool_size', 3,
+                             group='auth')
+        self.addCleanup(cf._credential_pools.clear)
+        mock_dynamic_provider_params.return_value = {'foo': 'bar'}
+        pool = mock_dynamic_credentials_pool_class.return_value
+        for name in ('first', 'second'):
+            cf.get_credentials_provider(name, identity_version='v3')
+            mock_dynamic_credentials_provider_class.assert_called_with(
+                name=name, network_resources=None, credential_pool=pool,
+                foo='bar')
+        # Test classes with custom network resources do not use the pool
+        cf.get_credentials_provider(
+            'third', network_resources={'network': True},
+            identity_version='v3')
+        mock_dynamic_credentials_provider_class.assert_called_with(
+            name='third', network_resources={'network': True},
+            credential_pool=None, foo='bar')
+        mock_dynamic_credentials_pool_class.assert_called_once_with(
+            mock_dynamic_credentials_provider_class.return_value, 3,
+            acquire_timeout=60)
+        pool.start.assert_called_once_with()
+        cf.close_credential_pools()
+        pool.close.assert_called_once_with()
+        self.assertEqual({}, cf._credential_pools)
 
     @mock.patch.object(preprov_creds, 'PreProvisionedCredentialProvider')
     @mock.patch.object(cf, 'get_preprov_provider_params')
@@ -168,7 +201,7 @@ class TestCredentialsFactory(base.TestCase):
             expected_identity_version)
         mock_dynamic_credentials_provider_class.assert_called_once_with(
             name=expected_name, network_resources=expected_network_resources,
-            **expected_params)
+            credential_pool=None, **expected_params)
 
     @mock.patch.object(cf, 'get_credentials')
     def test_get_configured_admin_credentials(self, mock_get_credentials):
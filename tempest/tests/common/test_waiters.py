@@ -18,11 +18,14 @@ from unittest import mock
 from oslo_utils.fixture import uuidsentinel as uuids
 
 from tempest.common import waiters
+from tempest import config
 from tempest import exceptions
+from tempest.lib.common import poller
 from tempest.lib import exceptions as lib_exc
 from tempest.lib.services.compute import servers_client
 from tempest.lib.services.volume.v2 import volumes_client
 from tempest.tests import base
+from tempest.tests import fake_config
 import tempest.tests.utils as utils
 
 
@@ -144,6 +147,94 @@ class TestImageWaiters(base.TestCase):
                           self.client, 'fake_image_id', 'success')
 
 
+class TestServersWaiters(base.TestCase):
+    def setUp(self):
+        super(TestServersWaiters, self).setUp()
+        # The waiter reads CONF.compute.ready_wait once the servers are ready
+        self.useFixture(fake_config.ConfigFixture())
+        self.patchobject(config, 'TempestConfigPrivate',
+                         fake_config.FakePrivate)
+        self.client = mock.Mock(spec=servers_client.ServersClient,
+                                build_timeout=10, build_interval=1)
+        self.patch('time.sleep')
+
+    @staticmethod
+    def _server(server_id, status, task_state=None,
+                updated='2026-01-01T00:00:00Z', **kwargs):
+        return dict(id=server_id, status=status, updated=updated,
+                    **{'OS-EXT-STS:task_state': task_state}, **kwargs)
+
+    def test_wait_for_servers_status(self):
+        self.client.list_servers.side_effect = [
+            {'servers': [self._server(uuids.a, 'BUILD', 'spawning'),
+                         self._server(uuids.b, 'BUILD', 'spawning'),
+                         self._server(uuids.other, 'ACTIVE')]},
+            {'servers': [self._server(uuids.a, 'ACTIVE',
+                                      updated='2026-01-01T00:00:05Z')]},
+            {'servers': [self._server(uuids.b, 'ACTIVE',
+                                      updated='2026-01-01T00:00:07Z')]}]
+        servers = waiters.wait_for_servers_status(
+            self.client, [uuids.a, uuids.b], 'ACTIVE')
+        self.assertEqual({uuids.a, uuids.b}, set(servers))
+        self.assertEqual('ACTIVE', servers[uuids.b]['status'])
+        self.client.list_servers.assert_has_calls([
+            mock.call(detail=True),
+            mock.call(detail=True,
+                      **{'changes-since': '2026-01-01T00:00:00Z'}),
+            mock.call(detail=True,
+                      **{'changes-since': '2026-01-01T00:00:05Z'})])
+        self.client.show_server.assert_not_called()
+
+    def test_wait_for_servers_status_unlisted_server(self):
+        self.client.list_servers.return_value = {
+            'servers': [self._server(uuids.a, 'ACTIVE')]}
+        self.client.show_server.side_effect = [
+            {'server': self._server(uuids.b, 'BUILD', 'spawning')},
+            {'server': self._server(uuids.b, 'ACTIVE')}]
+        servers = waiters.wait_for_servers_status(
+            self.client, [uuids.a, uuids.b], 'ACTIVE')
+        self.assertEqual({uuids.a, uuids.b}, set(servers))
+        self.assertEqual(2, self.client.show_server.call_count)
+
+    def test_wait_for_servers_status_error(self):
+        self.client.list_servers.return_value = {
+            'servers': [self._server(uuids.a, 'ACTIVE'),
+                        self._server(uuids.b, 'ERROR',
+                                     fault={'message': 'boom'})]}
+        ex = self.assertRaises(exceptions.BuildErrorException,
+                               waiters.wait_for_servers_status,
+                               self.client, [uuids.a, uuids.b], 'ACTIVE',
+                               request_id='req-1')
+        self.assertIn(uuids.b, str(ex))
+        self.assertIn('boom', str(ex))
+        self.assertIn('req-1', str(ex))
+
+    def test_wait_for_servers_status_error_not_raised(self):
+        self.client.list_servers.return_value = {
+            'servers': [self._server(uuids.a, 'ERROR')]}
+        servers = waiters.wait_for_servers_status(
+            self.client, [uuids.a], 'ERROR')
+        self.assertEqual('ERROR', servers[uuids.a]['status'])
+
+    def test_wait_for_servers_status_timeout(self):
+        self.patch('time.time', side_effect=[0., 11.])
+        self.client.list_servers.return_value = {
+            'servers': [self._server(uuids.a, 'ACTIVE'),
+                        self._server(uuids.b, 'BUILD', 'spawning')]}
+        ex = self.assertRaises(lib_exc.TimeoutException,
+                               waiters.wait_for_servers_status,
+                               self.client, [uuids.a, uuids.b], 'ACTIVE')
+        self.assertIn(uuids.b, str(ex))
+        self.assertNotIn(uuids.a, str(ex))
+
+    def test_wait_for_servers_status_ready_wait(self):
+        self.client.list_servers.side_effect = [
+            {'servers': [self._server(uuids.a, 'ACTIVE', 'powering-on')]},
+            {'servers': [self._server(uuids.a, 'ACTIVE')]}]
+        waiters.wait_for_servers_status(self.client, [uuids.a], 'ACTIVE')
+        self.assertEqual(2, self.client.list_servers.call_count)
+
+
 class TestInterfaceWaiters(base.TestCase):
 
     build_timeout = 1.
@@ -394,9 +485,14 @@ class TestVolumeWaiters(base.TestCase):
                            show_volume=show_volume)
         self.patch('time.time')
         self.patch('time.sleep')
+        poller.reset_metrics()
+        self.addCleanup(poller.reset_metrics)
         att = waiters.wait_for_volume_attachment_create(
             client, uuids.volume_id, uuids.server_id)
         assert att == vol_attached['volume']['attachments'][0]
+        # Recorded apart from the detachments
+        self.assertEqual(['volume_attachment_create'],
+                         list(poller.get_metrics()))
         # Assert that show volume is called until the attachment is removed.
         show_volume.assert_has_calls([mock.call(uuids.volume_id),
                                       mock.call(uuids.volume_id),
@@ -414,8 +510,12 @@ class TestVolumeWaiters(base.TestCase):
                            show_volume=show_volume)
         self.patch('time.time')
         self.patch('time.sleep')
+        poller.reset_metrics()
+        self.addCleanup(poller.reset_metrics)
         waiters.wait_for_volume_attachment_remove(client, uuids.volume_id,
                                                   uuids.attachment_id)
+        self.assertEqual(['volume_attachment_remove'],
+                         list(poller.get_metrics()))
         # Assert that show volume is called until the attachment is removed.
         show_volume.assert_has_calls([mock.call(uuids.volume_id),
                                       mock.call(uuids.volume_id),
@@ -488,9 +588,10 @@ class TestVolumeWaiters(base.TestCase):
             build_timeout=1,
             list_volume_attachments=mock_list_volume_attachments,
             get_console_output=mock_get_console_output)
+        # The deadline is checked after the second poll
         self.patch(
             'time.time',
-            side_effect=[0., 0.5, mock_client.build_timeout + 1.])
+            side_effect=[0., mock_client.build_timeout + 1.])
         self.patch('time.sleep')
 
         self.assertRaises(
@@ -566,9 +667,35 @@ class TestVolumeWaiters(base.TestCase):
             timeout,
             True
         ]
+        self.patch('time.sleep')
+        poller.reset_metrics()
+        self.addCleanup(poller.reset_metrics)
         # Assert that nothing is raised if validate_authentication passes
         # before the timeout
         waiters.wait_for_ssh(mock_ssh_client, 10)
+        metrics = poller.get_metrics()['ssh']
+        self.assertEqual(1, metrics['settled'])
+        self.assertEqual(3, metrics['polls'])
+
+    def test_wait_for_ssh_backoff(self):
+        mock_ssh_client = mock.Mock()
+        timeout = lib_exc.SSHTimeout(
+            host='foo',
+            username='bar',
+            password='fizz'
+        )
+        mock_ssh_client.validate_authentication.side_effect = [
+            timeout,
+            timeout,
+            timeout,
+            True
+        ]
+        sleep = self.patch('time.sleep')
+        poller.configure(backoff=2)
+        self.addCleanup(poller.configure)
+        waiters.wait_for_ssh(mock_ssh_client, 60, 1)
+        self.assertEqual([mock.call(1), mock.call(2), mock.call(4)],
+                         sleep.call_args_list)
 
     def test_wait_for_ssh_timeout(self):
         mock_ssh_client = mock.Mock()
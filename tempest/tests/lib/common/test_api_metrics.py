@@ -0,0 +1,161 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+
+from tempest.lib.common import api_metrics
+from tempest.tests import base
+
+KEY = ('compute', 'GET', '/v2.1/servers/{id}')
+
+
+class TestUrlTemplate(base.TestCase):
+
+    def test_ids(self):
+        self.assertEqual(
+            '/v2.1/servers/{id}/os-interface/{id}',
+            api_metrics.url_template(
+                'https://cloud:8774/v2.1/servers/'
+                '6b8d2a3e-5f1c-4c6e-9e1a-3f2b1c0d9e8f/os-interface/'
+                '0123456789abcdef0123456789abcdef?all_tenants=1'))
+
+    def test_numbers_and_names(self):
+        self.assertEqual(
+            '/v2/images/{id}/members/{name}',
+            api_metrics.url_template(
+                '/v2/images/42/members/tempest-member-1234567'))
+
+    def test_static_path(self):
+        self.assertEqual('/v3/auth/tokens',
+                         api_metrics.url_template('http://keystone/v3/auth/'
+                                                  'tokens'))
+        self.assertEqual('/', api_metrics.url_template('http://keystone'))
+
+
+class TestApiMetrics(base.TestCase):
+
+    def setUp(self):
+        super(TestApiMetrics, self).setUp()
+        api_metrics.enable_api_metrics()
+        self.addCleanup(api_metrics.disable_api_metrics)
+        api_metrics.reset_metrics()
+        self.addCleanup(api_metrics.reset_metrics)
+        self.url = 'http://cloud/v2.1/servers/1'
+
+    def _record_calls(self):
+        api_metrics.record('compute', 'get', self.url, 0.02, status=200,
+                           bytes_in=100)
+        api_metrics.record('compute', 'GET', self.url, 90, status=404,
+                           bytes_in=10)
+        api_metrics.record('compute', 'GET', self.url, 0.5,
+                           error=ConnectionResetError())
+        api_metrics.record_retries('compute', 'GET', self.url, 2)
+
+    def test_record(self):
+        self._record_calls()
+        metrics = api_metrics.get_metrics()
+        self.assertEqual([KEY], list(metrics))
+        entry = metrics[KEY]
+        self.assertEqual(3, entry['calls'])
+        self.assertEqual(90.52, entry['seconds'])
+        buckets = [0] * (len(api_metrics.BUCKETS) + 1)
+        buckets[2] = buckets[6] = buckets[-1] = 1
+        self.assertEqual(buckets, entry['buckets'])
+        self.assertEqual(110, entry['bytes_in'])
+        self.assertEqual({'200': 1, '404': 1}, entry['statuses'])
+        self.assertEqual({'ConnectionResetError': 1}, entry['errors'])
+        self.assertEqual(2, entry['retries'])
+
+    def test_disabled(self):
+        api_metrics.disable_api_metrics()
+        self._record_calls()
+        self.assertEqual({}, api_metrics.get_metrics())
+
+    def test_merge(self):
+        self._record_calls()
+        first = api_metrics.get_metrics()
+        api_metrics.reset_metrics()
+        api_metrics.record('image', 'GET', 'http://cloud/v2/images', 0.1,
+                           status=200)
+        api_metrics.record('compute', 'GET', self.url, 0.001, status=200)
+        merged = api_metrics.merge([first, api_metrics.get_metrics()])
+        self.assertEqual(2, len(merged))
+        self.assertEqual(4, merged[KEY]['calls'])
+        self.assertEqual({'200': 2, '404': 1}, merged[KEY]['statuses'])
+        self.assertEqual(1, merged[KEY]['buckets'][0])
+        # The metrics merged are not modified
+        self.assertEqual(3, first[KEY]['calls'])
+
+    def test_dump_load(self):
+        self._record_calls()
+        metrics = api_metrics.get_metrics()
+        self.assertEqual(metrics,
+                         api_metrics.load(api_metrics.dump(metrics)))
+
+    def test_load_other_buckets(self):
+        self.assertRaises(ValueError, api_metrics.load,
+                          '{"buckets": [1, 2], "calls": []}')
+
+    def test_to_prometheus(self):
+        self._record_calls()
+        text = api_metrics.to_prometheus(api_metrics.get_metrics())
+        labels = 'method="GET",service="compute",url="/v2.1/servers/{id}"'
+        self.assertIn('# TYPE tempest_api_request_duration_seconds '
+                      'histogram\n', text)
+        self.assertIn('tempest_api_request_duration_seconds_bucket{le="0.025",'
+                      '%s} 1\n' % labels, text)
+        self.assertIn('tempest_api_request_duration_seconds_bucket{le="60.0",'
+                      '%s} 2\n' % labels, text)
+        self.assertIn('tempest_api_request_duration_seconds_bucket{le="+Inf",'
+                      '%s} 3\n' % labels, text)
+        self.assertIn('tempest_api_request_duration_seconds_count{%s} 3\n'
+                      % labels, text)
+        self.assertIn('tempest_api_responses_total{method="GET",'
+                      'service="compute",status="404",'
+                      'url="/v2.1/servers/{id}"} 1\n', text)
+        self.assertIn('tempest_api_errors_total{error="ConnectionResetError",'
+                      '%s} 1\n' % labels, text)
+        self.assertIn('tempest_api_retries_total{%s} 2\n' % labels, text)
+
+    def test_write_and_merge_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.assertIsNone(api_metrics.merge_files(directory))
+        self._record_calls()
+        paths = api_metrics.write_files(directory)
+        self.assertEqual(
+            [os.path.join(directory, 'api-metrics-worker-%d.%s' % (
+                os.getpid(), extension)) for extension in ('json', 'prom')],
+            paths)
+        api_metrics.write_files(directory, name='api-metrics-worker-0')
+        merged = api_metrics.merge_files(directory)
+        self.assertEqual(6, merged[KEY]['calls'])
+        with open(os.path.join(directory, 'api-metrics.json')) as summary:
+            self.assertEqual(merged, api_metrics.load(summary.read()))
+        self.assertTrue(os.path.isfile(
+            os.path.join(directory, 'api-metrics.prom')))
+
+    def test_remove_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self._record_calls()
+        api_metrics.write_files(directory)
+        api_metrics.merge_files(directory)
+        api_metrics.remove_files(directory)
+        self.assertEqual(['api-metrics.json', 'api-metrics.prom'],
+                         sorted(os.listdir(directory)))
+        self.assertIsNone(api_metrics.merge_files(directory))
@@ -0,0 +1,95 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import asyncio
+import threading
+
+import fixtures
+
+from tempest.lib.common import async_rest_client
+from tempest.lib.common import http
+from tempest.lib.common import rest_client
+from tempest.lib import exceptions
+from tempest.tests import base
+from tempest.tests.lib import fake_auth_provider
+from tempest.tests.lib import fake_http
+
+
+class TestAsyncRestClient(base.TestCase):
+
+    url = 'fake_endpoint'
+
+    def setUp(self):
+        super(TestAsyncRestClient, self).setUp()
+        self.fake_http = fake_http.fake_httplib2()
+        self.rest_client = rest_client.RestClient(
+            fake_auth_provider.FakeAuthProvider(), None, None)
+        self.patchobject(http.ClosingHttp, 'request', self.fake_http.request)
+        self.useFixture(fixtures.MockPatchObject(self.rest_client,
+                                                 '_log_request'))
+        self.client = async_rest_client.AsyncRestClient(self.rest_client,
+                                                        max_workers=4)
+        self.addCleanup(self.client.close)
+
+    def test_requires_rest_client(self):
+        self.assertRaises(TypeError, async_rest_client.AsyncRestClient,
+                          object())
+
+    def test_get(self):
+        resp, body = asyncio.run(self.client.get(self.url))
+        self.assertEqual('GET', body['method'])
+        self.assertEqual(200, resp.status)
+
+    def test_post(self):
+        __, body = asyncio.run(self.client.post(self.url, '{}', {}))
+        self.assertEqual('POST', body['method'])
+
+    def test_attributes_not_wrapped(self):
+        self.assertIs(self.rest_client.auth_provider,
+                      self.client.auth_provider)
+        self.assertEqual(self.rest_client._error_checker,
+                         self.client._error_checker)
+        self.assertIs(self.rest_client, self.client.client)
+
+    def test_error_checker(self):
+        self.fake_http.return_type = 404
+
+        async def get():
+            return await self.client.get(self.url)
+
+        self.assertRaises(exceptions.NotFound, asyncio.run, get())
+
+    def test_calls_in_flight(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def request(http_obj, *args, **kwargs):
+            # Only returns when all the requests have been sent
+            barrier.wait()
+            return self.fake_http.request(*args, **kwargs)
+        self.patchobject(http.ClosingHttp, 'request', request)
+
+        async def gather():
+            return await asyncio.gather(
+                *[self.client.get(self.url) for _ in range(3)])
+
+        results = asyncio.run(gather())
+        self.assertEqual(3, len(results))
+
+    def test_run(self):
+        def helper(client, value):
+            return client, value
+
+        result = asyncio.run(self.client.run(helper, self.rest_client, 1))
+        self.assertEqual((self.rest_client, 1), result)
@@ -0,0 +1,124 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import threading
+from unittest import mock
+
+import fixtures
+
+from tempest.lib.common import cidr_allocator
+from tempest.lib.common import shared_state
+from tempest.tests import base
+
+POOL = '10.100.0.0/24'
+
+
+class TestCidrAllocator(base.TestCase):
+
+    def setUp(self):
+        super(TestCidrAllocator, self).setUp()
+        self.lease_dir = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'leases')
+        cidr_allocator.enable_cidr_allocator(self.lease_dir)
+        self.addCleanup(cidr_allocator.disable_cidr_allocator)
+        cidr_allocator.reset_stats()
+        self.addCleanup(cidr_allocator.reset_stats)
+        self.snapshot = mock.Mock(return_value=[
+            '10.100.0.0/28', '10.100.0.32/27', '192.168.0.0/24',
+            '2001:db8::/64'])
+
+    def test_enable(self):
+        self.assertTrue(cidr_allocator.is_enabled())
+        self.assertTrue(os.path.isdir(self.lease_dir))
+        cidr_allocator.disable_cidr_allocator()
+        self.assertFalse(cidr_allocator.is_enabled())
+
+    def test_allocate(self):
+        self.assertEqual('10.100.0.16/28',
+                         cidr_allocator.allocate(POOL, 28, self.snapshot))
+        # 10.100.0.32/27 covers the next two /28 blocks
+        self.assertEqual('10.100.0.64/28',
+                         cidr_allocator.allocate(POOL, 28, self.snapshot))
+        # The subnets are only listed once
+        self.snapshot.assert_called_once_with()
+        self.assertEqual({'allocated': 2, 'released': 0, 'conflicts': 0,
+                          'snapshots': 1, 'exhausted': 0},
+                         cidr_allocator.get_stats())
+
+    def test_release(self):
+        cidr = cidr_allocator.allocate(POOL, 28, self.snapshot)
+        cidr_allocator.release(POOL, 28, cidr)
+        self.assertEqual(cidr,
+                         cidr_allocator.allocate(POOL, 28, self.snapshot))
+        self.assertEqual(1, cidr_allocator.get_stats()['released'])
+
+    def test_mark_in_use(self):
+        cidr = cidr_allocator.allocate(POOL, 28, self.snapshot)
+        cidr_allocator.mark_in_use(POOL, 28, cidr)
+        cidr_allocator.release(POOL, 28, cidr)
+        self.assertEqual('10.100.0.64/28',
+                         cidr_allocator.allocate(POOL, 28, self.snapshot))
+        self.assertEqual(1, cidr_allocator.get_stats()['conflicts'])
+
+    def test_exhausted(self):
+        self.assertIsNone(cidr_allocator.allocate('10.100.0.32/27', 28,
+                                                  self.snapshot))
+        self.assertEqual(1, cidr_allocator.get_stats()['exhausted'])
+
+    def test_pools(self):
+        self.assertEqual('10.100.0.16/28',
+                         cidr_allocator.allocate(POOL, 28, self.snapshot))
+        self.assertEqual('10.100.0.0/26',
+                         cidr_allocator.allocate('10.100.0.0/16', 26,
+                                                 lambda: []))
+        self.assertEqual('2001:db8:0:1::/64',
+                         cidr_allocator.allocate('2001:db8::/48', 64,
+                                                 self.snapshot))
+
+    def test_new_run(self):
+        cidr_allocator.allocate(POOL, 28, self.snapshot)
+        self.snapshot.return_value = []
+        # All the processes of the previous run are gone
+        with mock.patch.object(shared_state, 'is_alive',
+                               return_value=False):
+            self.assertEqual('10.100.0.0/28',
+                             cidr_allocator.allocate(POOL, 28, self.snapshot))
+        self.assertEqual(2, self.snapshot.call_count)
+
+    def test_exited_users_forgotten(self):
+        cidr_allocator.allocate(POOL, 28, self.snapshot)
+        with cidr_allocator._locked_table(POOL, 28) as table:
+            # A worker which exited, and a pid reused by another user
+            table['users'] += [999999999, 1]
+        with mock.patch('os.kill', side_effect=[None, ProcessLookupError,
+                                                PermissionError]):
+            cidr_allocator.allocate(POOL, 28, self.snapshot)
+        with cidr_allocator._locked_table(POOL, 28) as table:
+            self.assertEqual([os.getpid()], table['users'])
+        # Still the same run
+        self.snapshot.assert_called_once_with()
+
+    def test_concurrent(self):
+        cidrs = []
+
+        def allocate():
+            for _ in range(5):
+                cidrs.append(cidr_allocator.allocate('10.100.0.0/16', 28,
+                                                     self.snapshot))
+        threads = [threading.Thread(target=allocate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(20, len(set(cidrs)))
+        self.assertNotIn(None, cidrs)
@@ -14,6 +14,7 @@
 from unittest import mock
 
 from tempest.lib.common import cred_client
+from tempest.lib import exceptions as lib_exc
 from tempest.tests import base
 
 
@@ -129,3 +130,95 @@ class TestCredClientV3(base.TestCase):
             project_id=fake_project['id'],
             email='fake_email',
             domain_id='fake_domain_id')
+
+
+class TestRoleCache(base.TestCase):
+    def setUp(self):
+        super(TestRoleCache, self).setUp()
+        cred_client.reset_role_cache()
+        self.addCleanup(cred_client.reset_role_cache)
+        self.roles_client = mock.MagicMock()
+        self.roles_client.list_roles.return_value = {
+            'roles': [{'id': 'member_id', 'name': 'member'},
+                      {'id': 'admin_id', 'name': 'Admin'}]
+        }
+        self.domains_client = mock.MagicMock()
+        self.domains_client.list_domains.return_value = {
+            'domains': [{'id': 'fake_domain_id', 'name': 'some_domain'}]
+        }
+        self.v2_creds_client = cred_client.V2CredsClient(
+            mock.MagicMock(), mock.MagicMock(), mock.MagicMock(),
+            self.roles_client)
+        self.v3_creds_client = cred_client.V3CredsClient(
+            mock.MagicMock(), mock.MagicMock(), mock.MagicMock(),
+            self.roles_client, self.domains_client, 'some_domain')
+        self.user = {'id': 'fake_user_id'}
+        self.project = {'id': 'fake_project_id'}
+
+    def test_roles_listed_once(self):
+        self.v2_creds_client.assign_user_role(self.user, self.project,
+                                              'admin')
+        self.v3_creds_client.assign_user_role(self.user, self.project,
+                                              'member')
+        self.v3_creds_client.assign_user_role_on_domain(self.user, 'admin')
+        self.roles_client.list_roles.assert_called_once_with()
+        self.roles_client.create_user_role_on_domain.assert_called_once_with(
+            'fake_domain_id', 'fake_user_id', 'admin_id')
+        self.assertEqual({'hits': 2, 'misses': 1, 'invalidations': 0},
+                         cred_client.get_role_cache_stats())
+
+    def test_unknown_role_lists_again(self):
+        self.v3_creds_client.assign_user_role(self.user, self.project,
+                                              'member')
+        self.roles_client.list_roles.return_value['roles'].append(
+            {'id': 'reader_id', 'name': 'reader'})
+        self.v3_creds_client.assign_user_role(self.user, self.project,
+                                              'reader')
+        self.roles_client.create_user_role_on_project.assert_called_with(
+            'fake_project_id', 'fake_user_id', 'reader_id')
+        self.assertEqual(2, self.roles_client.list_roles.call_count)
+
+    def test_create_user_role_invalidates(self):
+        self.v3_creds_client.create_user_role('reader')
+        self.roles_client.create_role.assert_called_once_with(name='reader')
+        # An existing role is not created again
+        self.v3_creds_client.create_user_role('member')
+        self.roles_client.create_role.assert_called_once_with(name='reader')
+        self.assertEqual(1, cred_client.get_role_cache_stats()[
+            'invalidations'])
+
+    def test_create_user_role_conflict_invalidates(self):
+        self.roles_client.create_role.side_effect = lib_exc.Conflict()
+        self.assertRaises(lib_exc.Conflict,
+                          self.v2_creds_client.create_user_role, 'reader')
+        self.assertEqual(1, cred_client.get_role_cache_stats()[
+            'invalidations'])
+        self.v2_creds_client.assign_user_role(self.user, self.project,
+                                              'member')
+        self.assertEqual(2, self.roles_client.list_roles.call_count)
+
+    def test_deleted_role_looked_up_again(self):
+        self.v3_creds_client.assign_user_role(self.user, self.project,
+                                              'member')
+        # The role was deleted and created again with another id
+        self.roles_client.list_roles.return_value = {
+            'roles': [{'id': 'new_member_id', 'name': 'member'}]}
+        self.roles_client.create_user_role_on_project.side_effect = [
+            lib_exc.NotFound(), None]
+        self.v3_creds_client.assign_user_role(self.user, self.project,
+                                              'member')
+        self.roles_client.create_user_role_on_project.assert_called_with(
+            'fake_project_id', 'fake_user_id', 'new_member_id')
+        self.assertEqual(2, self.roles_client.list_roles.call_count)
+        self.assertEqual(1, cred_client.get_role_cache_stats()[
+            'invalidations'])
+
+    def test_not_found_raised_after_lookup_again(self):
+        self.roles_client.create_user_role_on_system.side_effect = (
+            lib_exc.NotFound())
+        self.assertRaises(lib_exc.NotFound,
+                          self.v3_creds_client.assign_user_role_on_system,
+                          self.user, 'admin')
+        self.assertEqual(
+            2, self.roles_client.create_user_role_on_system.call_count)
+        self.assertEqual(2, self.roles_client.list_roles.call_count)
@@ -19,6 +19,8 @@ from oslo_config import cfg
 
 from tempest.common import credentials_factory as credentials
 from tempest import config
+from tempest.lib.common import cidr_allocator
+from tempest.lib.common import cred_client
 from tempest.lib.common import dynamic_creds
 from tempest.lib.common import rest_client
 from tempest.lib import exceptions as lib_exc
@@ -63,6 +65,8 @@ class TestDynamicCredentialProvider(base.TestCase):
 
     def setUp(self):
         super(TestDynamicCredentialProvider, self).setUp()
+        cred_client.reset_role_cache()
+        self.addCleanup(cred_client.reset_role_cache)
         self.useFixture(fake_config.ConfigFixture())
         self.useFixture(registry_fixture.RegistryFixture())
         self.patchobject(config, 'TempestConfigPrivate',
@@ -436,6 +440,70 @@ class TestDynamicCredentialProvider(base.TestCase):
         self.assertEqual(alt_creds.tenant_id, '1234')
         self.assertEqual(alt_creds.user_id, '1234')
 
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_pooled_creds(self, MockRestClient):
+        pool = dynamic_creds.DynamicCredentialPool(
+            dynamic_creds.DynamicCredentialProvider(**self.fixed_params), 1,
+            acquire_timeout=10)
+        creds = dynamic_creds.DynamicCredentialProvider(
+            credential_pool=pool, **self.fixed_params)
+        self._mock_assign_user_role()
+        self._mock_list_role()
+        self._mock_user_create('1234', 'fake_prim_user')
+        self._mock_tenant_create('1234', 'fake_prim_tenant')
+        primary_creds = creds.get_primary_creds()
+        self.assertEqual(primary_creds.user_id, '1234')
+        self.assertIs(primary_creds, creds.get_primary_creds())
+        self.assertEqual(1, pool.get_stats()['acquired'])
+        user_mock = self.patchobject(self.users_client.UsersClient,
+                                     'delete_user')
+        tenant_mock = self.patchobject(self.tenants_client_class,
+                                       self.delete_tenant)
+        # Pooled credentials are only deleted when the pool is closed
+        creds.clear_creds()
+        user_mock.assert_not_called()
+        tenant_mock.assert_not_called()
+        pool.close()
+        self.assertIn(mock.call('1234'), user_mock.mock_calls)
+        self.assertIn(mock.call('1234'), tenant_mock.mock_calls)
+
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_pooled_creds_not_available(self, MockRestClient):
+        pool = mock.Mock(spec=dynamic_creds.DynamicCredentialPool)
+        pool.acquire.return_value = None
+        creds = dynamic_creds.DynamicCredentialProvider(
+            credential_pool=pool, **self.fixed_params)
+        self._mock_assign_user_role()
+        self._mock_list_role()
+        self._mock_user_create('1234', 'fake_alt_user')
+        self._mock_tenant_create('1234', 'fake_alt_tenant')
+        alt_creds = creds.get_alt_creds()
+        pool.acquire.assert_called_once_with()
+        self.assertEqual(alt_creds.user_id, '1234')
+        user_mock = self.patchobject(self.users_client.UsersClient,
+                                     'delete_user')
+        self.patchobject(self.tenants_client_class, self.delete_tenant)
+        creds.clear_creds()
+        user_mock.assert_called_once_with('1234')
+
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_pool_not_used_for_admin_creds(self, MockRestClient):
+        pool = mock.Mock(spec=dynamic_creds.DynamicCredentialPool)
+        creds = dynamic_creds.DynamicCredentialProvider(
+            credential_pool=pool, **self.fixed_params)
+        self._mock_list_roles('1234', 'admin')
+        self._mock_user_create('1234', 'fake_admin_user')
+        self._mock_tenant_create('1234', 'fake_admin_tenant')
+        self.patchobject(self.roles_client.RolesClient,
+                         'create_user_role_on_project')
+        creds.get_admin_creds()
+        pool.acquire.assert_not_called()
+
+    def test_pool_invalid_size(self):
+        self.assertRaises(lib_exc.InvalidConfiguration,
+                          dynamic_creds.DynamicCredentialPool,
+                          mock.Mock(), 0)
+
     @mock.patch('tempest.lib.common.rest_client.RestClient')
     def test_no_network_creation_with_config_set(self, MockRestClient):
         creds = dynamic_creds.DynamicCredentialProvider(
@@ -495,6 +563,30 @@ class TestDynamicCredentialProvider(base.TestCase):
         self.assertEqual(router['id'], '1234')
         self.assertEqual(router['name'], 'fake_router')
 
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_network_creation_leased_cidr(self, MockRestClient):
+        cidr_allocator.enable_cidr_allocator(
+            self.useFixture(fixtures.TempDir()).path)
+        self.addCleanup(cidr_allocator.disable_cidr_allocator)
+        creds = dynamic_creds.DynamicCredentialProvider(
+            neutron_available=True,
+            project_network_cidr='10.100.0.0/16', project_network_mask_bits=28,
+            **self.fixed_params)
+        self.useFixture(fixtures.MockPatchObject(
+            creds.subnets_admin_client, 'iter_subnets',
+            return_value=iter([{'cidr': '10.100.0.0/28'}])))
+        # A subnet created on the second block since it was listed
+        subnet_fix = self.useFixture(fixtures.MockPatchObject(
+            creds.subnets_admin_client, 'create_subnet',
+            side_effect=[lib_exc.BadRequest('overlaps with another subnet'),
+                         {'subnet': {'id': '1234',
+                                     'cidr': '10.100.0.32/28'}}]))
+        subnet = creds._create_subnet('fake_subnet', '1234', '1234')
+        self.assertEqual('10.100.0.32/28', subnet['cidr'])
+        self.assertEqual(['10.100.0.16/28', '10.100.0.32/28'],
+                         [call[1]['cidr'] for call in
+                          subnet_fix.mock.call_args_list])
+
     @mock.patch('tempest.lib.common.rest_client.RestClient')
     def test_network_cleanup(self, MockRestClient):
         def side_effect(**args):
@@ -12,6 +12,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import array
+from http import client as http_client
+import io
+import mmap
+import os
+import socket
+import tempfile
+from unittest import mock
+
 import urllib3
 
 from tempest.lib.common import http
@@ -149,6 +158,324 @@ class TestClosingHttp(base.TestCase):
              'xtra key': 'Xtra Value'},
             response)
 
+    def test_request_stream(self):
+        # Given
+        connection = self.closing_http()
+        http_response = urllib3.HTTPResponse()
+        request = self.patch('urllib3.PoolManager.request',
+                             return_value=http_response)
+        retry = self.patch('urllib3.util.Retry')
+
+        # When
+        response, body = connection.request(
+            method=REQUEST_METHOD,
+            url=REQUEST_URL,
+            stream=True)
+
+        # Then
+        request.assert_called_once_with(
+            REQUEST_METHOD,
+            REQUEST_URL,
+            headers={'connection': 'close'},
+            preload_content=False,
+            retries=retry(raise_on_redirect=False, redirect=5))
+        self.assertEqual(http_response.status, response.status)
+        self.assertIs(http_response, body)
+
+    def test_closing_http_with_keep_alive(self):
+        connection = self.closing_http(keep_alive=True, pool_maxsize=4)
+        self.assertTrue(connection.keep_alive)
+        self.assertEqual(4, connection.connection_pool_kw['maxsize'])
+
+    def test_closing_http_keep_alive_enabled_globally(self):
+        http.enable_keep_alive(pool_maxsize=3, idle_timeout=5)
+        self.addCleanup(http.disable_keep_alive)
+        connection = self.closing_http()
+        self.assertTrue(connection.keep_alive)
+        self.assertEqual(3, connection.connection_pool_kw['maxsize'])
+        self.assertEqual(5, connection.idle_timeout)
+
+    def test_closing_http_keep_alive_disabled(self):
+        connection = self.closing_http()
+        self.assertFalse(connection.keep_alive)
+        self.assertNotIn('maxsize', connection.connection_pool_kw)
+
+    def test_request_with_keep_alive(self):
+        # Given
+        connection = self.closing_http(keep_alive=True)
+        headers = {'Xtra Key': 'Xtra Value'}
+        http_response = urllib3.HTTPResponse()
+        request = self.patch('urllib3.PoolManager.request',
+                             return_value=http_response)
+        retry = self.patch('urllib3.util.Retry')
+
+        # When
+        connection.request(
+            method=REQUEST_METHOD,
+            url=REQUEST_URL,
+            headers=headers)
+
+        # Then
+        request.assert_called_once_with(
+            REQUEST_METHOD,
+            REQUEST_URL,
+            headers=headers,
+            retries=retry(raise_on_redirect=False, redirect=5))
+
+    def test_request_with_keep_alive_stale_connection(self):
+        connection = self.closing_http(keep_alive=True)
+        http_response = urllib3.HTTPResponse()
+        request = self.patch('urllib3.PoolManager.request',
+                             return_value=http_response)
+        close_idle = self.patchobject(connection,
+                                      '_close_idle_connections')
+        connection.request(method=REQUEST_METHOD, url=REQUEST_URL)
+        request.side_effect = [urllib3.exceptions.ProtocolError(),
+                               http_response]
+        http.reset_pool_stats()
+
+        _, data = connection.request(method=REQUEST_METHOD, url=REQUEST_URL)
+
+        self.assertEqual(http_response.data, data)
+        self.assertEqual(3, request.call_count)
+        close_idle.assert_called_once_with(REQUEST_URL)
+        self.assertEqual(1, http.get_pool_stats()['stale_retries'])
+
+    def test_request_with_keep_alive_first_request_not_retried(self):
+        connection = self.closing_http(keep_alive=True)
+        self.patch('urllib3.PoolManager.request',
+                   side_effect=urllib3.exceptions.ProtocolError())
+        self.assertRaises(urllib3.exceptions.ProtocolError,
+                          connection.request,
+                          method=REQUEST_METHOD, url=REQUEST_URL)
+
+    def _stale_connection_retried(self, error, method='POST', body=None):
+        connection = self.closing_http(keep_alive=True)
+        http_response = urllib3.HTTPResponse()
+        request = self.patch('urllib3.PoolManager.request',
+                             return_value=http_response)
+        self.patchobject(connection, '_close_idle_connections')
+        connection.request(method=method, url=REQUEST_URL)
+        request.side_effect = [error, http_response]
+        try:
+            connection.request(method=method, url=REQUEST_URL, body=body)
+        except urllib3.exceptions.ProtocolError:
+            return False
+        return True
+
+    def test_request_with_keep_alive_post_not_retried(self):
+        # The server may have processed the request before failing
+        self.assertFalse(self._stale_connection_retried(
+            urllib3.exceptions.ProtocolError(
+                'Connection aborted.', TimeoutError())))
+
+    def test_request_with_keep_alive_post_remote_disconnected(self):
+        for error in (http_client.RemoteDisconnected(),
+                      ConnectionResetError()):
+            self.assertTrue(self._stale_connection_retried(
+                urllib3.exceptions.ProtocolError('Connection aborted.',
+                                                 error),
+                body=b'data'))
+
+    def test_request_with_keep_alive_consumed_body_not_retried(self):
+        error = urllib3.exceptions.ProtocolError(
+            'Connection aborted.', http_client.RemoteDisconnected())
+        self.assertFalse(self._stale_connection_retried(
+            error, method='PUT', body=io.BytesIO(b'data')))
+        self.assertFalse(self._stale_connection_retried(
+            error, method='PUT', body=iter([b'data'])))
+
+    def test_request_with_keep_alive_file_body_retried(self):
+        error = urllib3.exceptions.ProtocolError(
+            'Connection aborted.', http_client.RemoteDisconnected())
+        with tempfile.TemporaryFile() as body_file:
+            body_file.write(b'data')
+            body_file.flush()
+            self.assertTrue(self._stale_connection_retried(
+                error, method='PUT', body=http.FileBody(body_file)))
+
+    def test_request_with_keep_alive_new_connection_not_retried(self):
+        connection = self.closing_http(keep_alive=True)
+        request = self.patch('urllib3.PoolManager.request',
+                             return_value=urllib3.HTTPResponse())
+        connection.request(method=REQUEST_METHOD, url=REQUEST_URL)
+
+        def connect_and_fail(*args, **kwargs):
+            # The pooled connection was closed and a new one opened
+            http._request_state.connected = True
+            raise urllib3.exceptions.ProtocolError()
+
+        request.side_effect = connect_and_fail
+        self.assertRaises(urllib3.exceptions.ProtocolError,
+                          connection.request,
+                          method=REQUEST_METHOD, url=REQUEST_URL)
+        self.assertEqual(2, request.call_count)
+
+    def test_request_with_keep_alive_idle_timeout(self):
+        connection = self.closing_http(keep_alive=True, idle_timeout=10)
+        self.patch('urllib3.PoolManager.request',
+                   return_value=urllib3.HTTPResponse())
+        close_idle = self.patchobject(connection,
+                                      '_close_idle_connections')
+        monotonic = self.patch('time.monotonic', return_value=100)
+        connection.request(method=REQUEST_METHOD, url=REQUEST_URL)
+        monotonic.return_value = 105
+        connection.request(method=REQUEST_METHOD, url=REQUEST_URL)
+        self.assertFalse(close_idle.called)
+        monotonic.return_value = 120
+        connection.request(method=REQUEST_METHOD, url=REQUEST_URL)
+        close_idle.assert_called_once_with(REQUEST_URL)
+
+    def test_pool_stats(self):
+        connection = self.closing_http()
+        self.patch('urllib3.PoolManager.request',
+                   return_value=urllib3.HTTPResponse())
+        http.reset_pool_stats()
+        connection.request(method=REQUEST_METHOD, url=REQUEST_URL)
+        connection.request(method=REQUEST_METHOD, url=REQUEST_URL)
+        self.assertEqual(
+            {'requests': 2, 'connections': 0, 'reused': 2,
+             'stale_retries': 0},
+            http.get_pool_stats())
+
+
+class TestPoolStats(base.TestCase):
+
+    def setUp(self):
+        super(TestPoolStats, self).setUp()
+        http.reset_pool_stats()
+
+    def test_connections_counted(self):
+        pool = http.ClosingHttp().connection_from_url(REQUEST_URL)
+        conn = pool._new_conn()
+        self.patch('urllib3.connection.HTTPConnection.connect')
+        conn.connect()
+        conn.connect()
+        stats = http.get_pool_stats()
+        self.assertEqual(2, stats['connections'])
+        self.assertEqual(0, stats['reused'])
+
+
+class TestFileBody(base.TestCase):
+
+    def setUp(self):
+        super(TestFileBody, self).setUp()
+        self.file = tempfile.TemporaryFile()
+        self.addCleanup(self.file.close)
+        self.file.write(b'0123456789')
+        self.file.flush()
+
+    def test_region(self):
+        body = http.FileBody(self.file, 2, 5)
+        self.assertEqual(5, len(body))
+        self.assertEqual(b'23456', b''.join(body))
+        # Read at its offset, again and again
+        self.assertEqual(b'23456', b''.join(body))
+
+    def test_up_to_the_end(self):
+        body = http.FileBody(self.file, 4)
+        self.assertEqual(6, len(body))
+        self.assertEqual(b'456789', b''.join(body))
+
+    def test_send_sendfile(self):
+        sender, receiver = socket.socketpair()
+        self.addCleanup(sender.close)
+        self.addCleanup(receiver.close)
+        sendfile = self.patchobject(socket.socket, 'sendfile',
+                                    wraps=sender.sendfile)
+        http.FileBody(self.file, 1, 3).send(sender)
+        sendfile.assert_called_once_with(self.file, 1, 3)
+        self.assertEqual(b'123', receiver.recv(10))
+
+    def test_send_other_transport(self):
+        sock = mock.Mock()
+        http.FileBody(self.file, 1, 3).send(sock)
+        sock.sendall.assert_called_once_with(b'123')
+        sock.sendfile.assert_not_called()
+
+
+class TestAsBody(base.TestCase):
+
+    def test_file(self):
+        with tempfile.TemporaryFile() as body_file:
+            body_file.write(b'0123456789')
+            body_file.seek(3)
+            body = http.as_body(body_file)
+            self.assertIsInstance(body, http.FileBody)
+            self.assertEqual(3, body.offset)
+            self.assertEqual(7, len(body))
+
+    def test_text_file(self):
+        with tempfile.TemporaryFile('w+') as body_file:
+            self.assertIs(body_file, http.as_body(body_file))
+
+    def test_not_regular_file(self):
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(read_fd, 'rb') as pipe, os.fdopen(write_fd, 'wb'):
+            self.assertIs(pipe, http.as_body(pipe))
+
+    def test_mmap(self):
+        with tempfile.TemporaryFile() as body_file:
+            body_file.write(b'0123456789')
+            body_file.flush()
+            region = mmap.mmap(body_file.fileno(), 0)
+            body = http.as_body(region)
+            self.assertIsInstance(body, memoryview)
+            self.assertEqual(b'0123456789', body)
+            body.release()
+            region.close()
+
+    def test_buffer(self):
+        body = http.as_body(array.array('I', [1, 2]))
+        self.assertEqual('B', body.format)
+        self.assertEqual(8, len(body))
+
+    def test_unchanged(self):
+        for body in (None, b'data', 'data', [b'da', b'ta']):
+            self.assertIs(body, http.as_body(body))
+
+
+class TestFileBodyConnection(base.TestCase):
+
+    def setUp(self):
+        super(TestFileBodyConnection, self).setUp()
+        pool = http.ClosingHttp().connection_from_url(REQUEST_URL)
+        self.conn = pool._new_conn()
+        self.conn.sock = mock.Mock()
+        self.request = self.patch(
+            'urllib3.connection.HTTPConnection.request')
+        self.file = tempfile.TemporaryFile()
+        self.addCleanup(self.file.close)
+        self.file.write(b'0123456789')
+        self.file.seek(0)
+
+    def test_file_body(self):
+        self.conn.request('PUT', '/object', body=self.file,
+                          headers={'X-Auth-Token': 'token'})
+        # The headers, then the body on the socket
+        self.request.assert_called_once_with(
+            'PUT', '/object', body=None,
+            headers={'X-Auth-Token': 'token', 'Content-Length': '10'})
+        self.conn.sock.sendall.assert_called_once_with(b'0123456789')
+
+    def test_file_body_content_length(self):
+        self.conn.request('PUT', '/object', body=self.file,
+                          headers={'content-length': '4'})
+        self.request.assert_called_once_with(
+            'PUT', '/object', body=None, headers={'content-length': '4'})
+
+    def test_file_body_chunked(self):
+        self.conn.request('PUT', '/object', body=self.file, chunked=True)
+        body = self.request.call_args[1]['body']
+        self.assertIsInstance(body, http.FileBody)
+        self.assertEqual(b'0123456789', b''.join(body))
+        self.conn.sock.sendall.assert_not_called()
+
+    def test_other_body(self):
+        self.conn.request('PUT', '/object', body=b'data')
+        self.request.assert_called_once_with('PUT', '/object', body=b'data',
+                                             headers=None)
+
 
 class TestClosingProxyHttp(TestClosingHttp):
 
@@ -0,0 +1,132 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import hashlib
+import os
+from unittest import mock
+
+import fixtures
+
+from tempest.lib.common import image_cache
+from tempest.tests import base
+
+# A process of the same user which is alive, other than the one running
+# the tests
+OTHER_PID = str(os.getppid())
+
+
+class TestImageCache(base.TestCase):
+
+    def setUp(self):
+        super(TestImageCache, self).setUp()
+        self.cache_dir = self.useFixture(fixtures.TempDir()).path
+        image_cache.enable_image_cache(self.cache_dir)
+        self.addCleanup(image_cache.disable_image_cache)
+        image_cache.reset_stats()
+        self.addCleanup(image_cache.reset_stats)
+        self.register = self.patch('atexit.register')
+        self.addCleanup(image_cache._used.clear)
+        self.create = mock.Mock(side_effect=['image1', 'image2'])
+        self.exists = mock.Mock(return_value=True)
+        self.delete = mock.Mock()
+        self.key = image_cache.cache_key('digest', disk_format='qcow2')
+
+    def _acquire(self):
+        return image_cache.acquire(self.key, self.create, self.exists,
+                                   self.delete)
+
+    def _refs(self):
+        with image_cache._locked_entry(self.key) as entry:
+            return dict(entry['refs'])
+
+    def test_file_digest(self):
+        path = os.path.join(self.cache_dir, 'image.img')
+        with open(path, 'wb') as image_file:
+            image_file.write(b'x' * 3000000)
+        expected = hashlib.sha256(b'x' * 3000000).hexdigest()
+        self.assertEqual(expected, image_cache.file_digest(path))
+        with mock.patch('builtins.open') as mock_open:
+            # Hashed once
+            self.assertEqual(expected, image_cache.file_digest(path))
+            mock_open.assert_not_called()
+
+    def test_cache_key(self):
+        self.assertEqual(self.key, image_cache.cache_key(
+            'digest', disk_format='qcow2'))
+        self.assertNotEqual(self.key, image_cache.cache_key(
+            'digest', disk_format='raw'))
+        self.assertNotEqual(self.key, image_cache.cache_key(
+            'other', disk_format='qcow2'))
+
+    def test_acquire_shared(self):
+        self.assertEqual('image1', self._acquire())
+        self.assertEqual('image1', self._acquire())
+        self.create.assert_called_once_with()
+        self.exists.assert_called_once_with('image1')
+        self.assertEqual({str(os.getpid()): 2}, self._refs())
+        self.assertEqual({'hits': 1, 'uploads': 1, 'deleted': 0},
+                         image_cache.get_stats())
+        self.register.assert_called_once_with(image_cache.release_all)
+
+    def test_acquire_deleted_image(self):
+        self._acquire()
+        self.exists.return_value = False
+        self.assertEqual('image2', self._acquire())
+        self.assertEqual(2, self.create.call_count)
+
+    def test_release(self):
+        self._acquire()
+        self._acquire()
+        image_cache.release(self.key)
+        self.assertEqual({str(os.getpid()): 1}, self._refs())
+        image_cache.release(self.key)
+        image_cache.release(self.key)
+        # The image is kept for the other tests of the process
+        self.assertEqual({str(os.getpid()): 0}, self._refs())
+        self.delete.assert_not_called()
+
+    def test_release_all(self):
+        self._acquire()
+        image_cache.release_all()
+        self.delete.assert_called_once_with('image1')
+        self.assertEqual({}, self._refs())
+        self.assertEqual(1, image_cache.get_stats()['deleted'])
+        # The next test uploads it again
+        self.assertEqual('image2', self._acquire())
+
+    def test_release_all_used_by_another_process(self):
+        self._acquire()
+        with image_cache._locked_entry(self.key) as entry:
+            entry['refs'][OTHER_PID] = 1
+        image_cache.release_all()
+        self.delete.assert_not_called()
+        self.assertEqual({OTHER_PID: 1}, self._refs())
+
+    def test_release_all_released_by_another_process(self):
+        self._acquire()
+        with image_cache._locked_entry(self.key) as entry:
+            entry['refs'][OTHER_PID] = 0
+        # The tests of the other process are done with the image
+        image_cache.release_all()
+        self.delete.assert_called_once_with('image1')
+        self.assertEqual({}, self._refs())
+
+    def test_dead_process_refs(self):
+        with image_cache._locked_entry(self.key) as entry:
+            entry['image_id'] = 'image0'
+            entry['refs']['999999999'] = 3
+        # The image of a previous run is reused, and deleted at the end of
+        # this one
+        self.assertEqual('image0', self._acquire())
+        self.assertEqual({str(os.getpid()): 1}, self._refs())
+        image_cache.release_all()
+        self.delete.assert_called_once_with('image0')
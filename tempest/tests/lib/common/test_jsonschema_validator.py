@@ -12,7 +12,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
+import copy
+
+import jsonschema
+
 from tempest.lib.api_schema.response.compute.v2_1 import parameter_types
+from tempest.lib.common import jsonschema_validator
 from tempest.lib.common import rest_client
 from tempest.lib import exceptions
 from tempest.tests import base
@@ -81,3 +87,93 @@ class TestJSONSchemaDateTimeFormat(base.TestCase):
         self.assertRaises(exceptions.InvalidHTTPResponseBody,
                           rest_client.RestClient.validate_response,
                           self.date_time_schema[0], resp, body)
+
+
+class TestValidatorCache(base.TestCase):
+    schema = {
+        'status_code': [200],
+        'response_body': {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string'}
+            },
+            'required': ['name']
+        }
+    }
+
+    def setUp(self):
+        super(TestValidatorCache, self).setUp()
+        self.addCleanup(jsonschema_validator.set_sample_rate, 1)
+
+    def test_validator_compiled_once(self):
+        body_schema = copy.deepcopy(self.schema['response_body'])
+        check_schema = self.patchobject(
+            jsonschema_validator.JSONSCHEMA_VALIDATOR, 'check_schema')
+        validator = jsonschema_validator.get_validator(body_schema)
+        self.assertIs(validator,
+                      jsonschema_validator.get_validator(body_schema))
+        self.assertIsNot(validator, jsonschema_validator.get_validator(
+            dict(body_schema)))
+        self.assertEqual(2, check_schema.call_count)
+
+    def test_validate(self):
+        body_schema = self.schema['response_body']
+        jsonschema_validator.validate({'name': 'foo'}, body_schema)
+        self.assertRaises(jsonschema.ValidationError,
+                          jsonschema_validator.validate,
+                          {'name': 1}, body_schema)
+
+    def test_invalid_schema(self):
+        self.assertRaises(jsonschema.SchemaError,
+                          jsonschema_validator.get_validator,
+                          {'type': 'no-such-type'})
+
+    def test_invalid_sample_rate(self):
+        self.assertRaises(ValueError,
+                          jsonschema_validator.set_sample_rate, 0)
+
+    def test_sampling(self):
+        jsonschema_validator.set_sample_rate(3)
+        resp = fake_http.fake_http_response('', status=200)
+        body = {'name': 1}
+        results = []
+        for _ in range(6):
+            try:
+                rest_client.RestClient.validate_response(self.schema, resp,
+                                                         body)
+                results.append(True)
+            except exceptions.InvalidHTTPResponseBody:
+                results.append(False)
+        # Only the first of every three responses is validated
+        self.assertEqual([False, True, True, False, True, True], results)
+
+    def test_sampling_same_rate(self):
+        jsonschema_validator.set_sample_rate(3)
+        resp = fake_http.fake_http_response('', status=200)
+        body = {'name': 'foo'}
+        validate = self.patchobject(jsonschema_validator, 'validate')
+        rest_client.RestClient.validate_response(self.schema, resp, body)
+        # Set again, e.g. by the next test class
+        jsonschema_validator.set_sample_rate(3)
+        rest_client.RestClient.validate_response(self.schema, resp, body)
+        self.assertEqual(1, validate.call_count)
+
+    def test_sampling_concurrent(self):
+        jsonschema_validator.set_sample_rate(10)
+        schema = self.schema['response_body']
+
+        def sample(_):
+            return sum(jsonschema_validator.is_sampled(schema)
+                       for _ in range(1000))
+
+        with futures.ThreadPoolExecutor(max_workers=8) as executor:
+            sampled = sum(executor.map(sample, range(8)))
+        self.assertEqual(800, sampled)
+
+    def test_sampling_status_code_always_checked(self):
+        jsonschema_validator.set_sample_rate(100)
+        resp = fake_http.fake_http_response('', status=201)
+        for _ in range(2):
+            self.assertRaises(exceptions.InvalidHttpSuccessCode,
+                              rest_client.RestClient.validate_response,
+                              self.schema, resp, {'name': 'foo'})
@@ -0,0 +1,100 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from tempest.lib.common import poller
+from tempest.tests import base
+
+
+class TestPoller(base.TestCase):
+
+    def setUp(self):
+        super(TestPoller, self).setUp()
+        self.sleep = self.patch('time.sleep')
+        self.time = self.patch('time.time', return_value=0.)
+        poller.reset_metrics()
+        self.addCleanup(poller.reset_metrics)
+        self.addCleanup(poller.configure)
+
+    def _poll(self, p, settle_at=None):
+        for attempt in p:
+            if attempt == settle_at:
+                p.settled()
+                return attempt
+            self.time.return_value = attempt * 10.
+
+    def test_constant_interval(self):
+        p = poller.Poller('thing', timeout=100, interval=3)
+        self.assertEqual(4, self._poll(p, settle_at=4))
+        self.assertEqual([mock.call(3)] * 3, self.sleep.call_args_list)
+
+    def test_timeout(self):
+        p = poller.Poller('thing', timeout=25, interval=1)
+        self.assertIsNone(self._poll(p))
+        # The deadline is passed after the third poll
+        self.assertEqual(3, p.polls)
+        metrics = poller.get_metrics()['thing']
+        self.assertEqual(1, metrics['timeouts'])
+        self.assertEqual(3, metrics['wasted_polls'])
+
+    def test_client_attributes(self):
+        client = mock.Mock(build_timeout=25, build_interval=2)
+        p = poller.Poller('thing', client=client, extra_timeout=5)
+        self.assertEqual(30, p.timeout)
+        self.assertEqual(2, p.interval)
+
+    def test_backoff(self):
+        poller.configure(fast_polls=2, fast_interval=0.5, backoff=2,
+                         max_interval=10)
+        p = poller.Poller('thing', timeout=1000, interval=2)
+        self._poll(p, settle_at=7)
+        self.assertEqual([0.5, 0.5, 2, 4, 8, 10],
+                         [c[0][0] for c in self.sleep.call_args_list])
+
+    def test_backoff_capped_by_deadline(self):
+        poller.configure(backoff=10)
+        p = poller.Poller('thing', timeout=35, interval=5)
+        self._poll(p)
+        # The later sleeps would be 50s and 500s, but only 15s and 5s are
+        # left before the deadline
+        self.assertEqual([5, 15, 5],
+                         [c[0][0] for c in self.sleep.call_args_list])
+
+    def test_jitter(self):
+        poller.configure(jitter=0.5)
+        p = poller.Poller('thing', timeout=1000, interval=2)
+        self._poll(p, settle_at=20)
+        for call in self.sleep.call_args_list:
+            self.assertTrue(1 <= call[0][0] <= 3)
+
+    def test_invalid_configuration(self):
+        self.assertRaises(ValueError, poller.configure, backoff=0.5)
+        self.assertRaises(ValueError, poller.configure, jitter=1)
+
+    def test_metrics(self):
+        self._poll(poller.Poller('thing', timeout=100, interval=1),
+                   settle_at=1)
+        self._poll(poller.Poller('thing', timeout=100, interval=1),
+                   settle_at=3)
+        self._poll(poller.Poller('other', timeout=100, interval=1),
+                   settle_at=2)
+        metrics = poller.get_metrics()
+        self.assertEqual(2, metrics['thing']['waits'])
+        self.assertEqual(2, metrics['thing']['settled'])
+        self.assertEqual(4, metrics['thing']['polls'])
+        self.assertEqual(2, metrics['thing']['wasted_polls'])
+        self.assertEqual(0, metrics['thing']['timeouts'])
+        self.assertEqual(1, metrics['other']['settled'])
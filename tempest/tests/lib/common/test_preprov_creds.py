@@ -12,6 +12,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
 import os
 import shutil
 from unittest import mock
@@ -140,124 +141,163 @@ class TestPreProvisionedCredentials(base.TestCase):
             self.assertIn(hash, hash_dict['creds'].keys())
             self.assertIn(hash_dict['creds'][hash], self.test_accounts)
 
+    def _get_lock_dir_provider(self):
+        accounts_lock_dir = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'test_accounts')
+        return preprov_creds.PreProvisionedCredentialProvider(
+            **dict(self.fixed_params, accounts_lock_dir=accounts_lock_dir))
+
+    def _claim(self, test_account_class, *hashes):
+        os.makedirs(test_account_class.accounts_dir, exist_ok=True)
+        for _hash in hashes:
+            path = os.path.join(test_account_class.accounts_dir, _hash)
+            with open(path, 'w') as fd:
+                fd.write('other class')
+
     def test_create_hash_file_previous_file(self):
         # Emulate the lock existing on the filesystem
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isfile', return_value=True))
-        with mock.patch('builtins.open', mock.mock_open(), create=True):
-            test_account_class = (
-                preprov_creds.PreProvisionedCredentialProvider(
-                    **self.fixed_params))
-            res = test_account_class._create_hash_file('12345')
+        test_account_class = self._get_lock_dir_provider()
+        self._claim(test_account_class, '12345')
+        res = test_account_class._create_hash_file('12345')
         self.assertFalse(res, "_create_hash_file should return False if the "
                          "pseudo-lock file already exists")
 
     def test_create_hash_file_no_previous_file(self):
         # Emulate the lock not existing on the filesystem
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isfile', return_value=False))
-        with mock.patch('builtins.open', mock.mock_open(), create=True):
-            test_account_class = (
-                preprov_creds.PreProvisionedCredentialProvider(
-                    **self.fixed_params))
-            res = test_account_class._create_hash_file('12345')
+        test_account_class = self._get_lock_dir_provider()
+        self._claim(test_account_class)
+        res = test_account_class._create_hash_file('12345')
         self.assertTrue(res, "_create_hash_file should return True if the "
                         "pseudo-lock doesn't already exist")
+        path = os.path.join(test_account_class.accounts_dir, '12345')
+        with open(path) as fd:
+            self.assertEqual(self.fixed_params['name'], fd.read())
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_no_previous_accounts(self, lock_mock):
+    @mock.patch('os.getpid', return_value=0)
+    def test_get_free_hash_no_previous_accounts(self, getpid_mock):
         # Emulate no pre-existing lock
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isdir', return_value=False))
         hash_list = self._get_hash_list(self.test_accounts)
-        mkdir_mock = self.useFixture(fixtures.MockPatch('os.mkdir'))
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isfile', return_value=False))
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
-        with mock.patch('builtins.open', mock.mock_open(),
-                        create=True) as open_mock:
-            test_account_class._get_free_hash(hash_list)
-            lock_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                     hash_list[0])
-            open_mock.assert_called_once_with(lock_path, 'w')
-        mkdir_path = os.path.join(self.fixed_params['accounts_lock_dir'])
-        mkdir_mock.mock.assert_called_once_with(mkdir_path)
-
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_no_free_accounts(self, lock_mock):
+        test_account_class = self._get_lock_dir_provider()
+        res = test_account_class._get_free_hash(hash_list)
+        self.assertEqual(hash_list[0], res)
+        self.assertEqual([hash_list[0]],
+                         os.listdir(test_account_class.accounts_dir))
+
+    def test_get_free_hash_no_free_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Emulate pre-existing lock dir
-        self.useFixture(fixtures.MockPatch('os.path.isdir', return_value=True))
+        test_account_class = self._get_lock_dir_provider()
         # Emulate all locks in list are in use
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isfile', return_value=True))
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
-        with mock.patch('builtins.open', mock.mock_open(), create=True):
-            self.assertRaises(lib_exc.InvalidCredentials,
-                              test_account_class._get_free_hash, hash_list)
+        self._claim(test_account_class, *hash_list)
+        exc = self.assertRaises(lib_exc.InvalidCredentials,
+                                test_account_class._get_free_hash, hash_list)
+        self.assertIn('other class', str(exc))
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_some_in_use_accounts(self, lock_mock):
-        # Emulate no pre-existing lock
-        self.useFixture(fixtures.MockPatch('os.path.isdir', return_value=True))
+    def test_get_free_hash_some_in_use_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
+        test_account_class = self._get_lock_dir_provider()
+        self._claim(test_account_class,
+                    *[x for x in hash_list if x != hash_list[3]])
+        res = test_account_class._get_free_hash(hash_list)
+        self.assertEqual(hash_list[3], res)
+
+    @mock.patch('os.getpid')
+    def test_get_free_hash_spreads_workers(self, getpid_mock):
+        hash_list = self._get_hash_list(self.test_accounts)
+        test_account_class = self._get_lock_dir_provider()
+        # Different worker processes start from different accounts
+        getpid_mock.return_value = 1
+        self.assertEqual(hash_list[1],
+                         test_account_class._get_free_hash(hash_list))
+        getpid_mock.return_value = 2
+        self.assertEqual(hash_list[2],
+                         test_account_class._get_free_hash(hash_list))
+        # And wrap around when their first accounts are taken
+        getpid_mock.return_value = len(hash_list) - 1
+        self._claim(test_account_class, hash_list[-1])
+        self.assertEqual(hash_list[0],
+                         test_account_class._get_free_hash(hash_list))
+
+    @mock.patch('os.getpid', return_value=0)
+    def test_get_free_hash_skips_claimed_accounts(self, getpid_mock):
+        hash_list = self._get_hash_list(self.test_accounts)
+        test_account_class = self._get_lock_dir_provider()
+        self._claim(test_account_class, *hash_list[:-1])
+        with mock.patch.object(test_account_class, '_create_hash_file',
+                               wraps=test_account_class._create_hash_file
+                               ) as create_mock:
+            res = test_account_class._get_free_hash(hash_list)
+        self.assertEqual(hash_list[-1], res)
+        # The free account is claimed straight away
+        create_mock.assert_called_once_with(hash_list[-1])
+
+    @mock.patch('os.getpid', return_value=0)
+    def test_get_free_hash_released_after_listing(self, getpid_mock):
+        hash_list = self._get_hash_list(self.test_accounts)
+        test_account_class = self._get_lock_dir_provider()
+        self._claim(test_account_class, *hash_list)
+        listdir = os.listdir
 
-        def _fake_is_file(path):
-            # Fake isfile() to return that the path exists unless a specific
-            # hash is in the path
-            if hash_list[3] in path:
-                return False
-            return True
-
-        self.patchobject(os.path, 'isfile', _fake_is_file)
-        with mock.patch('builtins.open', mock.mock_open(),
-                        create=True) as open_mock:
-            test_account_class._get_free_hash(hash_list)
-            lock_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                     hash_list[3])
-            open_mock.assert_has_calls([mock.call(lock_path, 'w')])
-
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_remove_hash_last_account(self, lock_mock):
+        def listdir_then_released(path):
+            names = listdir(path)
+            # Another worker releases an account after the listing
+            os.remove(os.path.join(path, hash_list[2]))
+            return names
+
+        with mock.patch('os.listdir', side_effect=listdir_then_released):
+            res = test_account_class._get_free_hash(hash_list)
+        self.assertEqual(hash_list[2], res)
+
+    def test_get_free_hash_concurrent(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Pretend the pseudo-lock is there
-        self.useFixture(
-            fixtures.MockPatch('os.path.isfile', return_value=True))
-        # Pretend the lock dir is empty
-        self.useFixture(fixtures.MockPatch('os.listdir', return_value=[]))
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
-        remove_mock = self.useFixture(fixtures.MockPatch('os.remove'))
-        rmdir_mock = self.useFixture(fixtures.MockPatch('os.rmdir'))
+        test_account_class = self._get_lock_dir_provider()
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            claimed = list(executor.map(
+                lambda _: test_account_class._get_free_hash(hash_list),
+                hash_list))
+        self.assertEqual(sorted(hash_list), sorted(claimed))
+
+    @mock.patch('os.getpid', return_value=0)
+    def test_get_free_hash_lock_dir_removed(self, getpid_mock):
+        hash_list = self._get_hash_list(self.test_accounts)
+        test_account_class = self._get_lock_dir_provider()
+        makedirs = os.makedirs
+        created = []
+
+        def makedirs_then_released(path, **kwargs):
+            makedirs(path, **kwargs)
+            created.append(path)
+            if len(created) == 1:
+                # Another worker releases its last account before the claim
+                os.rmdir(path)
+
+        with mock.patch('os.makedirs', side_effect=makedirs_then_released):
+            res = test_account_class._get_free_hash(hash_list)
+        self.assertEqual(hash_list[0], res)
+        self.assertEqual(2, len(created))
+        self.assertEqual([hash_list[0]],
+                         os.listdir(test_account_class.accounts_dir))
+
+    def test_remove_hash_last_account(self):
+        hash_list = self._get_hash_list(self.test_accounts)
+        test_account_class = self._get_lock_dir_provider()
+        self._claim(test_account_class, hash_list[2])
         test_account_class.remove_hash(hash_list[2])
-        hash_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                 hash_list[2])
-        lock_path = self.fixed_params['accounts_lock_dir']
-        remove_mock.mock.assert_called_once_with(hash_path)
-        rmdir_mock.mock.assert_called_once_with(lock_path)
-
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_remove_hash_not_last_account(self, lock_mock):
+        self.assertFalse(os.path.exists(test_account_class.accounts_dir))
+
+    def test_remove_hash_not_last_account(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Pretend the pseudo-lock is there
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isfile', return_value=True))
-        # Pretend the lock dir is empty
-        self.useFixture(fixtures.MockPatch('os.listdir', return_value=[
-            hash_list[1], hash_list[4]]))
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
-        remove_mock = self.useFixture(fixtures.MockPatch('os.remove'))
-        rmdir_mock = self.useFixture(fixtures.MockPatch('os.rmdir'))
+        test_account_class = self._get_lock_dir_provider()
+        self._claim(test_account_class, hash_list[1], hash_list[2],
+                    hash_list[4])
         test_account_class.remove_hash(hash_list[2])
-        hash_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                 hash_list[2])
-        remove_mock.mock.assert_called_once_with(hash_path)
-        rmdir_mock.mock.assert_not_called()
+        self.assertEqual(sorted([hash_list[1], hash_list[4]]),
+                         sorted(os.listdir(test_account_class.accounts_dir)))
+
+    def test_remove_hash_not_allocated(self):
+        test_account_class = self._get_lock_dir_provider()
+        self._claim(test_account_class)
+        test_account_class.remove_hash('12345')
+        self.assertTrue(os.path.isdir(test_account_class.accounts_dir))
 
     def test_is_multi_user(self):
         test_accounts_class = preprov_creds.PreProvisionedCredentialProvider(
@@ -323,6 +363,20 @@ class TestPreProvisionedCredentials(base.TestCase):
         for i in admin_hashes:
             self.assertNotIn(i, args)
 
+    def test__get_match_hash_list_computed_once(self):
+        test_accounts_class = preprov_creds.PreProvisionedCredentialProvider(
+            **self.fixed_params)
+        hashes = test_accounts_class._get_match_hash_list(['role2', 'role4'])
+        self.assertEqual(
+            sorted(set(test_accounts_class.hash_dict['roles']['role2']) &
+                   set(test_accounts_class.hash_dict['roles']['role4'])),
+            sorted(hashes))
+        with mock.patch.object(test_accounts_class,
+                               '_build_match_hash_list') as build_mock:
+            self.assertIs(hashes, test_accounts_class._get_match_hash_list(
+                ['role4', 'role2']))
+        build_mock.assert_not_called()
+
     def test_networks_returned_with_creds(self):
         test_accounts = [
             {'username': 'test_user13', 'tenant_name': 'test_tenant13',
@@ -13,11 +13,16 @@
 #    under the License.
 
 import copy
+import hashlib
+import io
+import tempfile
+from unittest import mock
 
 import fixtures
 import jsonschema
 from oslo_serialization import jsonutils as json
 
+from tempest.lib.common import api_metrics
 from tempest.lib.common import http
 from tempest.lib.common import rest_client
 from tempest.lib import exceptions
@@ -629,6 +634,65 @@ class TestRateLimiting(BaseRestClientTestClass):
         self.assertFalse(self.rest_client.is_absolute_limit(resp, resp_body))
 
 
+class TestApiMetrics(BaseRestClientTestClass):
+
+    url = 'http://fake/v2.1/servers/{0}'.format('a' * 32)
+
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestApiMetrics, self).setUp()
+        self.rest_client.service = 'compute'
+        api_metrics.enable_api_metrics()
+        self.addCleanup(api_metrics.disable_api_metrics)
+        api_metrics.reset_metrics()
+        self.addCleanup(api_metrics.reset_metrics)
+        self.key = ('compute', 'PUT', '/v2.1/servers/{id}')
+
+    def test_raw_request(self):
+        self.rest_client.raw_request(self.url, 'PUT', body='{"a": "\u00e9"}')
+        metrics = api_metrics.get_metrics()[self.key]
+        self.assertEqual(1, metrics['calls'])
+        self.assertEqual(1, sum(metrics['buckets']))
+        self.assertEqual({'200': 1}, metrics['statuses'])
+        self.assertEqual(11, metrics['bytes_out'])
+
+    def test_raw_request_buffer_and_file_bodies(self):
+        self.rest_client.raw_request(self.url, 'PUT',
+                                     body=memoryview(b'0123456789'))
+        with tempfile.TemporaryFile() as body_file:
+            body_file.write(b'0123')
+            body_file.flush()
+            self.rest_client.raw_request(
+                self.url, 'PUT', body=http.FileBody(body_file, 1))
+        self.assertEqual(13, api_metrics.get_metrics()[self.key]['bytes_out'])
+
+    def test_raw_request_error(self):
+        self.patchobject(http.ClosingHttp, 'request',
+                         side_effect=ConnectionResetError)
+        self.assertRaises(ConnectionResetError, self.rest_client.raw_request,
+                          self.url, 'PUT')
+        metrics = api_metrics.get_metrics()[self.key]
+        self.assertEqual(1, metrics['calls'])
+        self.assertEqual({'ConnectionResetError': 1}, metrics['errors'])
+        self.assertEqual({}, metrics['statuses'])
+
+    def test_disabled(self):
+        api_metrics.disable_api_metrics()
+        self.rest_client.raw_request(self.url, 'PUT')
+        self.assertEqual({}, api_metrics.get_metrics())
+
+    def test_retries(self):
+        self.patch('time.sleep')
+        limited = fake_http.fake_http_response(
+            {'retry-after': '1', 'content-location': self.url}, status=413)
+        ok = fake_http.fake_http_response(
+            {'content-location': self.url}, status=200)
+        self.patchobject(self.rest_client, '_request',
+                         side_effect=[(limited, '{}'), (ok, '{}')])
+        self.rest_client.request('PUT', 'servers/%s' % ('a' * 32))
+        self.assertEqual(1, api_metrics.get_metrics()[self.key]['retries'])
+
+
 class TestProperties(BaseRestClientTestClass):
 
     def setUp(self):
@@ -672,6 +736,39 @@ class TestProperties(BaseRestClientTestClass):
         self.assertEqual(expected, self.rest_client.filters)
 
 
+class TestHttpObj(base.TestCase):
+
+    def _client(self, **kwargs):
+        return rest_client.RestClient(
+            fake_auth_provider.FakeAuthProvider(), None, None, **kwargs)
+
+    def test_created_on_first_use(self):
+        with mock.patch.object(http, 'ClosingHttp') as closing_http:
+            client = self._client(http_timeout=5)
+            closing_http.assert_not_called()
+            self.assertIs(closing_http.return_value, client.http_obj)
+            self.assertIs(closing_http.return_value, client.http_obj)
+        closing_http.assert_called_once_with(
+            disable_ssl_certificate_validation=False, ca_certs=None,
+            timeout=5, follow_redirects=True)
+
+    def test_proxy(self):
+        client = self._client(proxy_url='http://fake_proxy:3128')
+        self.assertIsInstance(client.http_obj, http.ClosingProxyHttp)
+
+    def test_set(self):
+        client = self._client()
+        fake_http_obj = mock.Mock()
+        client.http_obj = fake_http_obj
+        self.assertIs(fake_http_obj, client.http_obj)
+
+    def test_http_pool_key(self):
+        self.assertEqual(self._client().http_pool_key(),
+                         self._client().http_pool_key())
+        self.assertNotEqual(self._client().http_pool_key(),
+                            self._client(ca_certs='/fake').http_pool_key())
+
+
 class TestExpectedSuccess(BaseRestClientTestClass):
 
     def setUp(self):
@@ -757,6 +854,99 @@ class TestResponseBodyData(base.TestCase):
                          str(actual))
 
 
+class FakeRawResponse(io.BytesIO):
+    """A urllib3 response read with preload_content=False"""
+
+    released = False
+
+    def release_conn(self):
+        self.released = True
+
+
+class TestResponseBodyStream(base.TestCase):
+
+    data = b'0123456789' * 10
+
+    def setUp(self):
+        super(TestResponseBodyStream, self).setUp()
+        self.raw = FakeRawResponse(self.data)
+        self.body = rest_client.ResponseBodyStream({'status': '200'},
+                                                   self.raw, chunk_size=32)
+
+    def test_iter(self):
+        self.assertEqual([32, 32, 32, 4], [len(chunk) for chunk in self.body])
+        self.assertEqual(100, self.body.size)
+        self.assertEqual(hashlib.md5(self.data).hexdigest(),
+                         self.body.md5.hexdigest())
+        self.assertEqual(hashlib.sha256(self.data).hexdigest(),
+                         self.body.sha256.hexdigest())
+        # The whole body was read, the connection can be reused
+        self.assertTrue(self.body.closed)
+        self.assertTrue(self.raw.released)
+        self.assertFalse(self.raw.closed)
+
+    def test_read(self):
+        self.assertEqual(self.data[:10], self.body.read(10))
+        self.assertEqual(self.data[10:], self.body.read())
+        self.assertEqual(b'', self.body.read())
+        self.assertEqual(hashlib.sha256(self.data).hexdigest(),
+                         self.body.sha256.hexdigest())
+        self.assertTrue(self.raw.released)
+
+    def test_consume(self):
+        self.assertEqual(100, self.body.consume())
+        self.assertTrue(self.raw.released)
+
+    def test_close_partly_read(self):
+        with self.body:
+            self.body.read(10)
+        self.assertTrue(self.body.closed)
+        self.assertTrue(self.raw.released)
+        # The rest of the body is not read, the connection is closed
+        self.assertTrue(self.raw.closed)
+        self.assertEqual(10, self.body.size)
+
+
+class TestRestClientStream(BaseRestClientTestClass):
+
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientStream, self).setUp()
+        self.request = self.patchobject(http.ClosingHttp, 'request')
+
+    def _respond(self, status, data):
+        raw = FakeRawResponse(data)
+        self.request.return_value = (fake_http.fake_http_response(
+            {'content-type': 'text/plain'}, status=status), raw)
+        return raw
+
+    def test_get_stream(self):
+        raw = self._respond(200, b'data')
+        resp, body = self.rest_client.get(self.url, stream=True)
+        self.assertIsInstance(body, rest_client.ResponseBodyStream)
+        self.assertIs(resp, body.response)
+        self.assertEqual(b'data', b''.join(body))
+        self.assertTrue(raw.released)
+        self.assertTrue(self.request.call_args[1]['stream'])
+
+    def test_get_stream_no_content(self):
+        self._respond(204, b'')
+        _, body = self.rest_client.get(self.url, stream=True)
+        self.assertEqual(b'', body)
+
+    def test_get_stream_error(self):
+        raw = self._respond(404, b'not found')
+        self.assertRaises(exceptions.NotFound, self.rest_client.get,
+                          self.url, stream=True)
+        # Error bodies are read for the error checks
+        self.assertTrue(raw.released)
+
+    def test_get_not_streamed(self):
+        self.patchobject(http.ClosingHttp, 'request', self.fake_http.request)
+        _, body = self.rest_client.get(self.url)
+        self.assertNotIsInstance(body, rest_client.ResponseBodyStream)
+
+
 class TestResponseBodyList(base.TestCase):
 
     def test_str(self):
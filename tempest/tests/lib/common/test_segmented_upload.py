@@ -0,0 +1,214 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import hashlib
+import io
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from oslo_serialization import jsonutils as json
+
+from tempest.lib.common import http
+from tempest.lib.common import segmented_upload
+from tempest.lib import exceptions
+from tempest.tests import base
+
+DATA = b'0123456789'
+
+
+class FakeObjectClient(object):
+    """Stores the objects uploaded, by container and name"""
+
+    def __init__(self, delay=0, fail=None):
+        self.delay = delay
+        self.fail = fail
+        self.objects = {}
+        self.params = {}
+        self.headers = {}
+        self.running = 0
+        self.max_running = 0
+        self.deleted = []
+        self._lock = threading.Lock()
+
+    def create_object(self, container, object_name, data, params=None,
+                      metadata=None):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(self.delay)
+            if self.fail and object_name.endswith(self.fail):
+                raise exceptions.ServerFault()
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            if isinstance(data, http.FileBody):
+                data = b''.join(data)
+            data = bytes(data)
+            etag = hashlib.md5(data).hexdigest()
+            if metadata and metadata.get('Etag', etag) != etag:
+                raise exceptions.UnprocessableEntity()
+            with self._lock:
+                self.objects[(container, object_name)] = data
+                self.params[(container, object_name)] = params
+                self.headers[(container, object_name)] = metadata
+            return {'status': '201', 'etag': etag}, b''
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def delete_object(self, container, object_name, params=None):
+        self.deleted.append((container, object_name, params))
+        return {'status': '204'}, b''
+
+    def segments(self, container='container'):
+        return sorted(name for (cont, name) in self.objects
+                      if cont == container and name != 'object')
+
+
+class TestSegmentedUploader(base.TestCase):
+
+    def setUp(self):
+        super(TestSegmentedUploader, self).setUp()
+        self.object_client = FakeObjectClient()
+        self.container_client = mock.Mock()
+        self.bulk_client = mock.Mock()
+        self.uploader = segmented_upload.SegmentedUploader(
+            self.object_client, self.container_client, self.bulk_client,
+            segment_size=3, max_workers=2)
+
+    def test_single_segment(self):
+        _, segments = self.uploader.upload('container', 'object', b'012')
+        self.assertEqual([], segments)
+        self.assertEqual({('container', 'object'): b'012'},
+                         self.object_client.objects)
+
+    def test_slo(self):
+        resp, segments = self.uploader.upload(
+            'container', 'object', DATA, metadata={'X-Object-Meta-A': 'b'})
+        self.assertEqual('201', resp['status'])
+        names = self.object_client.segments()
+        self.assertEqual(4, len(names))
+        self.assertTrue(names[0].startswith('object/slo/'))
+        self.assertEqual(DATA, b''.join(
+            self.object_client.objects[('container', name)]
+            for name in names))
+        self.assertEqual(
+            [{'path': '/container/%s' % name,
+              'etag': hashlib.md5(
+                  self.object_client.objects[('container', name)]
+              ).hexdigest(),
+              'size_bytes': size}
+             for name, size in zip(names, [3, 3, 3, 1])],
+            segments)
+        manifest = ('container', 'object')
+        self.assertEqual(segments,
+                         json.loads(self.object_client.objects[manifest]))
+        self.assertEqual({'multipart-manifest': 'put'},
+                         self.object_client.params[manifest])
+        self.assertEqual({'X-Object-Meta-A': 'b'},
+                         self.object_client.headers[manifest])
+        self.container_client.update_container.assert_not_called()
+
+    def test_dlo(self):
+        _, segments = self.uploader.upload(
+            'container', 'object', io.BytesIO(DATA),
+            manifest=segmented_upload.DLO, segment_container='segments')
+        names = self.object_client.segments('segments')
+        self.assertEqual(4, len(segments))
+        self.assertEqual(DATA, b''.join(
+            self.object_client.objects[('segments', name)]
+            for name in names))
+        manifest = ('container', 'object')
+        self.assertEqual(b'', self.object_client.objects[manifest])
+        prefix = self.object_client.headers[manifest]['X-Object-Manifest']
+        self.assertTrue(prefix.startswith('segments/object/dlo/'))
+        self.assertTrue(names[0].startswith(prefix.split('/', 1)[1]))
+        self.container_client.update_container.assert_called_once_with(
+            'segments')
+
+    def test_file(self):
+        with tempfile.TemporaryFile() as data:
+            data.write(b'--' + DATA)
+            data.seek(2)
+            read = self.patchobject(data, 'read')
+            _, segments = self.uploader.upload('container', 'object', data)
+        # The file is not read, its regions are sent
+        read.assert_not_called()
+        self.assertEqual([3, 3, 3, 1],
+                         [segment['size_bytes'] for segment in segments])
+        self.assertEqual(DATA, b''.join(
+            self.object_client.objects[('container', name)]
+            for name in self.object_client.segments()))
+        self.assertEqual(hashlib.md5(b'012').hexdigest(), segments[0]['etag'])
+
+    def test_unknown_manifest(self):
+        self.assertRaises(exceptions.InvalidParam, self.uploader.upload,
+                          'container', 'object', DATA, manifest='zip')
+
+    def test_bounded_concurrency(self):
+        self.object_client.delay = 0.02
+        uploader = segmented_upload.SegmentedUploader(
+            self.object_client, segment_size=1, max_workers=3)
+        uploader.upload('container', 'object', DATA)
+        self.assertEqual(10, len(self.object_client.segments()))
+        self.assertLessEqual(self.object_client.max_running, 3)
+        self.assertGreater(self.object_client.max_running, 1)
+
+    def test_failed_segment(self):
+        self.object_client.fail = '00000002'
+        self.assertRaises(exceptions.ServerFault, self.uploader.upload,
+                          'container', 'object', DATA)
+        self.assertNotIn(('container', 'object'), self.object_client.objects)
+        # All the segments of the upload are deleted, in one request
+        self.bulk_client.delete_bulk_data.assert_called_once()
+        paths = self.bulk_client.delete_bulk_data.call_args[1][
+            'data'].split('\n')
+        self.assertTrue(paths[2].endswith('/00000002'))
+        self.assertTrue(set('/container/%s' % name for name in
+                            self.object_client.segments()) <= set(paths))
+
+    def test_failed_segment_without_bulk_client(self):
+        self.object_client.fail = '00000002'
+        uploader = segmented_upload.SegmentedUploader(
+            self.object_client, segment_size=3, max_workers=2)
+        self.assertRaises(exceptions.ServerFault, uploader.upload,
+                          'container', 'object', DATA)
+        deleted = [name for _, name, _ in self.object_client.deleted]
+        self.assertTrue(set(self.object_client.segments()) <= set(deleted))
+        self.assertIn('00000002', [name[-8:] for name in deleted])
+
+    def test_delete_slo(self):
+        self.object_client.list_object_metadata = mock.Mock(
+            return_value=({'x-static-large-object': 'True'}, b''))
+        self.uploader.delete('container', 'object')
+        self.assertEqual(
+            [('container', 'object', {'multipart-manifest': 'delete'})],
+            self.object_client.deleted)
+        self.bulk_client.delete_bulk_data.assert_not_called()
+
+    def test_delete_dlo(self):
+        self.object_client.list_object_metadata = mock.Mock(
+            return_value=({'x-object-manifest': 'segments/object/dlo/1/'},
+                          b''))
+        self.container_client.list_container_objects.return_value = (
+            {}, ['object/dlo/1/00000000', 'object/dlo/1/00000001'])
+        self.uploader.delete('container', 'object')
+        self.assertEqual([('container', 'object', None)],
+                         self.object_client.deleted)
+        self.container_client.list_container_objects.assert_called_once_with(
+            'segments', params={'prefix': 'object/dlo/1/'})
+        self.bulk_client.delete_bulk_data.assert_called_once_with(
+            data='/segments/object/dlo/1/00000000\n'
+                 '/segments/object/dlo/1/00000001',
+            headers={'Content-Type': 'text/plain'})
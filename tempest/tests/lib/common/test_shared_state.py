@@ -0,0 +1,89 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import threading
+from unittest import mock
+
+import fixtures
+
+from tempest.lib.common import shared_state
+from tempest.tests import base
+
+
+class TestCounters(base.TestCase):
+
+    def test_count(self):
+        counters = shared_state.Counters('hits', 'misses')
+        counters.count('hits')
+        counters.count('hits', 2)
+        self.assertEqual({'hits': 3, 'misses': 0}, counters.get())
+        counters.reset()
+        self.assertEqual({'hits': 0, 'misses': 0}, counters.get())
+
+    def test_unknown_counter(self):
+        counters = shared_state.Counters('hits')
+        self.assertRaises(KeyError, counters.count, 'misses')
+
+
+class TestLockedJson(base.TestCase):
+
+    def setUp(self):
+        super(TestLockedJson, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'state.json')
+
+    def test_locked_json(self):
+        with shared_state.locked_json(self.path, dict) as data:
+            self.assertEqual({}, data)
+            data['key'] = 'value'
+        self.assertEqual({'key': 'value'}, shared_state.load_json(self.path))
+        self.assertTrue(os.path.exists(self.path + '.lock'))
+
+    def test_not_stored_on_error(self):
+        def update():
+            with shared_state.locked_json(self.path, dict) as data:
+                data['key'] = 'value'
+                raise ValueError()
+        self.assertRaises(ValueError, update)
+        self.assertIsNone(shared_state.load_json(self.path))
+
+    def test_concurrent_updates(self):
+        def increment():
+            for _ in range(20):
+                with shared_state.locked_json(
+                        self.path, lambda: {'count': 0}) as data:
+                    data['count'] += 1
+        threads = [threading.Thread(target=increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual({'count': 80}, shared_state.load_json(self.path))
+
+    def test_unreadable_file(self):
+        with open(self.path, 'w') as json_file:
+            json_file.write('{')
+        self.assertIsNone(shared_state.load_json(self.path))
+        with shared_state.locked_json(self.path, list) as data:
+            self.assertEqual([], data)
+
+
+class TestIsAlive(base.TestCase):
+
+    def test_is_alive(self):
+        self.assertTrue(shared_state.is_alive(os.getpid()))
+        self.assertFalse(shared_state.is_alive(999999999))
+
+    def test_process_of_another_user(self):
+        with mock.patch('os.kill', side_effect=PermissionError):
+            self.assertFalse(shared_state.is_alive(1))
@@ -0,0 +1,105 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import stat
+from unittest import mock
+
+import fixtures
+
+from tempest.lib.common import token_cache
+from tempest.lib import exceptions as lib_exc
+from tempest.tests import base
+
+
+class TestTokenCache(base.TestCase):
+
+    def setUp(self):
+        super(TestTokenCache, self).setUp()
+        self.cache_dir = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'tokens')
+        token_cache.enable_token_cache(self.cache_dir)
+        self.addCleanup(token_cache.disable_token_cache)
+        token_cache.reset_stats()
+        self.addCleanup(token_cache.reset_stats)
+        self.fetch = mock.Mock(side_effect=[('token1', {'n': 1}),
+                                            ('token2', {'n': 2})])
+        self.is_expired = mock.Mock(return_value=False)
+
+    def test_enable(self):
+        self.assertTrue(token_cache.is_enabled())
+        mode = stat.S_IMODE(os.stat(self.cache_dir).st_mode)
+        self.assertEqual(0o700, mode)
+        token_cache.disable_token_cache()
+        self.assertFalse(token_cache.is_enabled())
+
+    def test_enable_existing_dir(self):
+        os.chmod(self.cache_dir, 0o755)
+        token_cache.enable_token_cache(self.cache_dir)
+        mode = stat.S_IMODE(os.stat(self.cache_dir).st_mode)
+        self.assertEqual(0o700, mode)
+
+    def test_enable_dir_of_another_user(self):
+        token_cache.disable_token_cache()
+        with mock.patch('os.getuid', return_value=os.getuid() + 1):
+            self.assertRaises(lib_exc.InvalidConfiguration,
+                              token_cache.enable_token_cache, self.cache_dir)
+        self.assertFalse(token_cache.is_enabled())
+
+    def test_cache_key(self):
+        key = token_cache.cache_key('v3', 'http://auth', {'password': 'p'})
+        self.assertEqual(key, token_cache.cache_key(
+            'v3', 'http://auth', {'password': 'p'}))
+        self.assertNotEqual(key, token_cache.cache_key(
+            'v3', 'http://auth', {'password': 'q'}))
+        self.assertEqual(64, len(key))
+
+    def test_get_auth_shared(self):
+        key = token_cache.cache_key('creds')
+        self.assertEqual(('token1', {'n': 1}), token_cache.get_auth(
+            key, self.fetch, self.is_expired))
+        self.assertEqual(('token1', {'n': 1}), token_cache.get_auth(
+            key, self.fetch, self.is_expired))
+        self.fetch.assert_called_once_with()
+        self.is_expired.assert_called_once_with(('token1', {'n': 1}))
+        self.assertEqual({'hits': 1, 'misses': 1}, token_cache.get_stats())
+
+    def test_get_auth_different_keys(self):
+        token_cache.get_auth(token_cache.cache_key('creds1'), self.fetch,
+                             self.is_expired)
+        self.assertEqual(('token2', {'n': 2}), token_cache.get_auth(
+            token_cache.cache_key('creds2'), self.fetch, self.is_expired))
+
+    def test_get_auth_expired(self):
+        key = token_cache.cache_key('creds')
+        token_cache.get_auth(key, self.fetch, self.is_expired)
+        self.is_expired.return_value = True
+        self.assertEqual(('token2', {'n': 2}), token_cache.get_auth(
+            key, self.fetch, self.is_expired))
+        self.is_expired.return_value = False
+        self.assertEqual(('token2', {'n': 2}), token_cache.get_auth(
+            key, self.fetch, self.is_expired))
+        self.assertEqual(2, self.fetch.call_count)
+
+    def test_get_auth_force(self):
+        key = token_cache.cache_key('creds')
+        token_cache.get_auth(key, self.fetch, self.is_expired)
+        self.assertEqual(('token2', {'n': 2}), token_cache.get_auth(
+            key, self.fetch, self.is_expired, force=True))
+        self.is_expired.assert_not_called()
+
+    def test_get_auth_corrupted_file(self):
+        key = token_cache.cache_key('creds')
+        with open(os.path.join(self.cache_dir, key), 'w') as f:
+            f.write('not json')
+        self.assertEqual(('token1', {'n': 1}), token_cache.get_auth(
+            key, self.fetch, self.is_expired))
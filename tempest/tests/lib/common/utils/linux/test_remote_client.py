@@ -36,6 +36,16 @@ class TestRemoteClient(base.TestCase):
         mock_ssh_exec_command.assert_called_once_with(
             'set -eu -o pipefail; PATH=$PATH:/sbin; ls')
 
+    @mock.patch.object(ssh.Client, 'exec_commands',
+                       return_value=['a', 'b'])
+    def test_exec_commands(self, mock_ssh_exec_commands):
+        client = remote_client.RemoteClient('192.168.1.10', 'username')
+        self.assertEqual(['a', 'b'], client.exec_commands(['ls', 'pwd'],
+                                                          concurrent=True))
+        mock_ssh_exec_commands.assert_called_once_with(
+            ['set -eu -o pipefail; PATH=$PATH:/sbin; ls',
+             'set -eu -o pipefail; PATH=$PATH:/sbin; pwd'], concurrent=True)
+
     @mock.patch.object(ssh.Client, 'test_connection_auth')
     def test_validate_authentication(self, mock_test_connection_auth):
         client = remote_client.RemoteClient('192.168.1.10', 'username')
@@ -62,6 +62,16 @@ class TestTestUtils(base.TestCase):
         self.assertEqual('TestTestUtils:tearDownClass',
                          tearDownClass(self.__class__))
 
+    def test_find_test_caller_set(self):
+        caller = test_utils.set_test_caller('FakeTest:test_fake')
+        try:
+            self.assertEqual('FakeTest:test_fake',
+                             test_utils.find_test_caller())
+        finally:
+            test_utils.reset_test_caller(caller)
+        self.assertEqual('TestTestUtils:test_find_test_caller_set',
+                         test_utils.find_test_caller())
+
     def test_call_and_ignore_notfound_exc_when_notfound_raised(self):
         def raise_not_found():
             raise exceptions.NotFound()
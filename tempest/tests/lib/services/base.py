@@ -75,3 +75,27 @@ class BaseServiceTest(base.TestCase):
             fixture.mock.assert_called_once_with(**mock_args)
         elif mock_args is not None:
             fixture.mock.assert_called_once_with(mock_args)
+
+    def check_service_client_pagination(self, function, function2mock, key,
+                                        pages, urls, **kwargs):
+        """Mock the pages of a listing for unit testing an iter_* function.
+
+        :param function: The service client iter_* function to call.
+        :param function2mock: The REST call to mock inside the service client
+               function.
+        :param key: The key of the resources in the pages.
+        :param pages: The response bodies of the pages of the listing.
+        :param urls: The expected urls requested for the pages.
+        :param kwargs: kwargs that are passed to function.
+        """
+        fixture = self.useFixture(fixtures.MockPatch(
+            function2mock,
+            side_effect=[self.create_response(page) for page in pages]))
+        resources = function(**kwargs)
+        # The pages are only requested as the resources are consumed
+        fixture.mock.assert_not_called()
+        self.assertEqual(
+            [resource for page in pages for resource in page[key]],
+            list(resources))
+        self.assertEqual(urls, [call[0][0]
+                                for call in fixture.mock.call_args_list])
@@ -69,6 +69,14 @@ class TestServerGroupsClient(base.BaseServiceTest):
     def test_list_server_groups_byte_body(self):
         self._test_list_server_groups(bytes_body=True)
 
+    def test_list_server_groups_all_projects(self):
+        expected = {"server_groups": [self.server_group]}
+        self.check_service_client_function(
+            self.client.list_server_groups,
+            'tempest.lib.common.rest_client.RestClient.get',
+            expected, mock_args=['os-server-groups?all_projects=True'],
+            all_projects=True)
+
     def _test_show_server_group(self, bytes_body=False):
         expected = {"server_group": self.server_group}
         self.check_service_client_function(
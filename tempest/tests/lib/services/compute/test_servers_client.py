@@ -220,6 +220,20 @@ class TestServersClient(base.BaseServiceTest):
             self.FAKE_SERVERS,
             bytes_body)
 
+    def test_iter_servers(self):
+        server = self.FAKE_SERVERS['servers'][0]
+        self.check_service_client_pagination(
+            self.client.iter_servers,
+            'tempest.lib.common.rest_client.RestClient.get',
+            'servers',
+            [{'servers': [server],
+              'servers_links': [{'rel': 'next',
+                                 'href': 'http://os.co/v2/servers?limit=1&'
+                                         'marker=%s' % server['id']}]},
+             {'servers': []}],
+            ['servers?limit=1', 'servers?limit=1&marker=%s' % server['id']],
+            limit=1)
+
     def test_show_server_with_str_body(self):
         self._test_show_server()
 
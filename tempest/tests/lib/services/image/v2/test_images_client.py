@@ -14,9 +14,11 @@
 
 import io
 
+from tempest.lib.common import rest_client
 from tempest.lib.common.utils import data_utils
 from tempest.lib.services.image.v2 import images_client
 from tempest.tests.lib import fake_auth_provider
+from tempest.tests.lib import fake_http
 from tempest.tests.lib.services import base
 
 
@@ -239,6 +241,18 @@ class TestImagesClient(base.BaseServiceTest):
             headers={'Content-Type': 'application/octet-stream'},
             status=200)
 
+    def test_show_image_file_stream(self):
+        resp = fake_http.fake_http_response({}, status=200)
+        body = rest_client.ResponseBodyStream(resp, io.BytesIO(b'data'))
+        get = self.patchobject(self.client, 'get', return_value=(resp, body))
+        image_file = self.client.show_image_file(
+            self.FAKE_CREATE_UPDATE_SHOW_IMAGE["id"], stream=True)
+        get.assert_called_once_with(
+            'images/%s/file' % self.FAKE_CREATE_UPDATE_SHOW_IMAGE["id"],
+            stream=True)
+        self.assertIs(body, image_file)
+        self.assertIs(resp, image_file.response)
+
     def test_add_image_tag(self):
         self.check_service_client_function(
             self.client.add_image_tag,
@@ -263,6 +277,20 @@ class TestImagesClient(base.BaseServiceTest):
     def test_show_image_with_bytes_body(self):
         self._test_show_image(bytes_body=True)
 
+    def test_iter_images(self):
+        self.check_service_client_pagination(
+            self.client.iter_images,
+            'tempest.lib.common.rest_client.RestClient.get',
+            'images',
+            [{'images': [{'id': 'i1'}, {'id': 'i2'}],
+              'next': '/v2/images?marker=i2&visibility=public'},
+             {'images': [{'id': 'i3'}],
+              # The same page again must not be requested forever
+              'next': '/v2/images?marker=i2&visibility=public'}],
+            ['images?visibility=public',
+             'images?visibility=public&marker=i2'],
+            params={'visibility': 'public'})
+
     def test_list_images_with_str_body(self):
         self._test_list_images()
 
@@ -240,6 +240,22 @@ class TestPortsClient(base.BaseServiceTest):
             status=204,
             port_id=self.FAKE_PORT_ID)
 
+    def test_iter_ports(self):
+        self.check_service_client_pagination(
+            self.ports_client.iter_ports,
+            "tempest.lib.common.rest_client.RestClient.get",
+            'ports',
+            [{'ports': [{'id': 'p1'}, {'id': 'p2'}],
+              'ports_links': [{'rel': 'next',
+                               'href': 'http://neutron/v2.0/ports?limit=2&'
+                                       'marker=p2'}]},
+             {'ports': [{'id': 'p3'}],
+              'ports_links': [{'rel': 'previous',
+                               'href': 'http://neutron/v2.0/ports?limit=2&'
+                                       'marker=p3&page_reverse=True'}]}],
+            ['v2.0/ports?limit=2', 'v2.0/ports?limit=2&marker=p2'],
+            limit=2)
+
     def test_list_ports_with_str_body(self):
         self._test_list_ports()
 
@@ -13,13 +13,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-
+import tempfile
 from unittest import mock
 
 from tempest.lib import exceptions
 from tempest.lib.services.object_storage import object_client
 from tempest.tests import base
 from tempest.tests.lib import fake_auth_provider
+from tempest.tests.lib import fake_http
 
 
 class TestObjectClient(base.TestCase):
@@ -31,6 +32,18 @@ class TestObjectClient(base.TestCase):
         self.object_client = object_client.ObjectClient(self.fake_auth,
                                                         'swift', 'region1')
 
+    def test_get_object_stream(self):
+        resp = fake_http.fake_http_response({}, status=200)
+        body = object()
+        get = self.patchobject(self.object_client, 'get',
+                               return_value=(resp, body))
+        self.assertEqual((resp, body), self.object_client.get_object(
+            'container', 'object', metadata={'Range': 'bytes=0-9'},
+            stream=True))
+        get.assert_called_once_with('container/object',
+                                    headers={'Range': 'bytes=0-9'},
+                                    stream=True)
+
     @mock.patch('tempest.lib.services.object_storage.object_client.'
                 'ObjectClient._create_connection')
     def test_create_object_continue_no_data(self, mock_poc):
@@ -47,6 +60,24 @@ class TestObjectClient(base.TestCase):
         self._validate_create_object_continue('hello', mock_poc,
                                               initial_status=201)
 
+    @mock.patch('tempest.lib.services.object_storage.object_client.'
+                'ObjectClient._create_connection')
+    def test_create_object_continue_file(self, mock_poc):
+        mock_resp_cls = mock.Mock()
+        mock_resp_cls._read_status.return_value = ("1", 100, "OK")
+        mock_poc.return_value.response_class.return_value = mock_resp_cls
+        mock_poc.return_value.getresponse.return_value.status = 201
+        with tempfile.TemporaryFile() as data:
+            data.write(b'0123456789')
+            data.seek(2)
+            self.object_client.create_object_continue('container1',
+                                                      'object1', data)
+        mock_poc.return_value.putheader.assert_any_call('content-length', 8)
+        # Sent from the file, not read into a single string
+        mock_poc.return_value.send.assert_not_called()
+        mock_poc.return_value.sock.sendall.assert_called_once_with(
+            b'23456789')
+
     def _validate_create_object_continue(self, req_data,
                                          mock_poc, initial_status=100):
 
@@ -160,6 +160,20 @@ class TestClientsFactory(base.TestCase):
         klass_mock.assert_called_once_with(auth_provider=auth_provider,
                                            **params)
 
+    def test__get_partial_class_later_kwargs_not_kept(self):
+        self._setup_fake_module(class_names=[])
+        auth_provider = fake_auth_provider.FakeAuthProvider()
+        params = {'k1': 'v1', 'k2': 'v2'}
+        factory = clients.ClientsFactory(
+            'fake_path', [], auth_provider, **params)
+        klass_mock = mock.Mock()
+        partial = factory._get_partial_class(klass_mock, auth_provider, params)
+        partial(k2='v4')
+        partial()
+        self.assertEqual({'k1': 'v1', 'k2': 'v2'}, params)
+        klass_mock.assert_called_with(auth_provider=auth_provider,
+                                      k1='v1', k2='v2')
+
     def test__get_partial_class_with_alias(self):
         expected_fake_client = 'not_really_a_client'
         client_alias = 'fake_client'
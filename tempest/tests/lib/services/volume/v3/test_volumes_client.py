@@ -49,6 +49,19 @@ class TestVolumesClient(base.BaseServiceTest):
                                                    'volume',
                                                    'regionOne')
 
+    def test_iter_volumes(self):
+        self.check_service_client_pagination(
+            self.client.iter_volumes,
+            'tempest.lib.common.rest_client.RestClient.get',
+            'volumes',
+            [{'volumes': [{'id': 'v1', 'links': [], 'name': 'v1'}],
+              'volumes_links': [{'rel': 'next',
+                                 'href': 'http://cinder/v3/volumes?'
+                                         'all_tenants=1&marker=v1'}]},
+             {'volumes': [{'id': 'v2', 'links': [], 'name': 'v2'}]}],
+            ['volumes?all_tenants=1', 'volumes?all_tenants=1&marker=v1'],
+            params={'all_tenants': 1})
+
     def _test_retype_volume(self, bytes_body=False):
         kwargs = {
             "new_type": "dedup-tier-replication",
@@ -15,11 +15,13 @@
 
 import copy
 import datetime
+from unittest import mock
 
 import fixtures
 import testtools
 
 from tempest.lib import auth
+from tempest.lib.common import token_cache
 from tempest.lib import exceptions
 from tempest.lib.services.identity.v2 import token_client as v2_client
 from tempest.lib.services.identity.v3 import token_client as v3_client
@@ -528,6 +530,126 @@ class TestKeystoneV2AuthProvider(BaseAuthTestsSetUp):
             self.assertEqual(self.auth_provider.is_expired(auth_data),
                              should_be_expired)
 
+    def _enable_token_cache(self):
+        token_cache.enable_token_cache(
+            self.useFixture(fixtures.TempDir()).path)
+        self.addCleanup(token_cache.disable_token_cache)
+        # The fake tokens expired long ago
+        self.patchobject(self._auth_provider_class, 'is_expired',
+                         return_value=False)
+        return self.patchobject(self._auth_provider_class, '_get_auth',
+                                side_effect=[('token1', self.auth_data),
+                                             ('token2', self.auth_data)])
+
+    def test_token_cache_shared(self):
+        self.auth_data = self.auth_provider.auth_data[1]
+        get_auth = self._enable_token_cache()
+        providers = [self._auth(type(self.credentials)(),
+                                fake_identity.FAKE_AUTH_URL)
+                     for _ in range(2)]
+        self.assertEqual('token1', providers[0].get_token())
+        self.assertEqual('token1', providers[1].get_token())
+        get_auth.assert_called_once_with()
+        # The credentials are filled in from the cached auth data
+        self.assertEqual(self.auth_provider.credentials.user_id,
+                         providers[1].credentials.user_id)
+
+    def test_token_cache_set_auth(self):
+        self.auth_data = self.auth_provider.auth_data[1]
+        self._enable_token_cache()
+        providers = [self._auth(type(self.credentials)(),
+                                fake_identity.FAKE_AUTH_URL)
+                     for _ in range(2)]
+        self.assertEqual('token1', providers[0].get_token())
+        # Forcing new auth replaces the shared token
+        providers[0].set_auth()
+        self.assertEqual('token2', providers[0].get_token())
+        self.assertEqual('token2', providers[1].get_token())
+
+    def test_token_cache_other_identity(self):
+        self.auth_data = self.auth_provider.auth_data[1]
+        get_auth = self._enable_token_cache()
+        self.assertEqual('token1', self._auth(
+            type(self.credentials)(),
+            fake_identity.FAKE_AUTH_URL).get_token())
+        self.assertEqual('token2', self._auth(
+            type(self.credentials)(),
+            'http://other_auth_url').get_token())
+        self.assertEqual(2, get_auth.call_count)
+
+    def test_catalog_index_built_once(self):
+        self.filters = {
+            'service': 'compute',
+            'endpoint_type': 'publicURL',
+            'region': 'FakeRegion'
+        }
+        auth_data = self.auth_provider.auth_data
+        self.auth_provider.base_url(self.filters, auth_data)
+        with mock.patch.object(
+                self.auth_provider, '_build_catalog_index') as build:
+            self.auth_provider.base_url(self.filters, auth_data)
+            self.auth_provider.base_url(
+                dict(self.filters, region='OtherRegion'), auth_data)
+        build.assert_not_called()
+        # A different catalog is indexed again
+        auth_data = self.auth_provider.auth_data
+        with mock.patch.object(
+                self.auth_provider, '_build_catalog_index',
+                wraps=self.auth_provider._build_catalog_index) as build:
+            self.auth_provider.base_url(self.filters, auth_data)
+        build.assert_called_once_with(auth_data[1])
+
+    def _mock_base_url(self):
+        self.useFixture(fixtures.MockPatchObject(
+            self.auth_provider, 'is_expired', return_value=False))
+        return self.useFixture(fixtures.MockPatchObject(
+            self.auth_provider, 'base_url',
+            wraps=self.auth_provider.base_url)).mock
+
+    def _request(self, filters):
+        return self.auth_provider.auth_request('GET', 'fakeurl',
+                                               filters=filters)
+
+    def test_base_url_memoized(self):
+        filters = {
+            'service': 'compute',
+            'endpoint_type': 'publicURL',
+            'region': 'FakeRegion'
+        }
+        base_url = self._mock_base_url()
+        first = self._request(filters)
+        self.assertEqual(first, self._request(dict(filters)))
+        self.assertEqual(1, base_url.call_count)
+        self._request(dict(filters, endpoint_type='internalURL'))
+        self.assertEqual(2, base_url.call_count)
+
+    def test_base_url_memo_invalidated(self):
+        filters = {'service': 'compute', 'region': 'FakeRegion'}
+        base_url = self._mock_base_url()
+        self._request(filters)
+        self.auth_provider.set_auth()
+        self._request(filters)
+        self.assertEqual(2, base_url.call_count)
+        self.auth_provider.clear_auth()
+        self._request(filters)
+        self.assertEqual(3, base_url.call_count)
+        self.auth_provider.set_alt_auth_data('body', None)
+        self.auth_provider.reset_alt_auth_data()
+        self._request(filters)
+        self.assertEqual(4, base_url.call_count)
+
+    def test_base_url_alt_auth_not_memoized(self):
+        filters = {'service': 'compute', 'region': 'FakeRegion'}
+        base_url = self._mock_base_url()
+        alt_auth_data = ('alt_token',
+                         copy.deepcopy(self.auth_provider.auth_data[1]))
+        for _ in range(2):
+            self.auth_provider.set_alt_auth_data('headers', alt_auth_data)
+            self._request(filters)
+        alt_calls = [call for call in base_url.call_args_list
+                     if call[1]['auth_data'] is alt_auth_data]
+        self.assertEqual(2, len(alt_calls))
+
     def test_set_scope_all_valid(self):
         for scope in self.auth_provider.SCOPES:
             self.auth_provider.scope = scope
@@ -307,3 +307,195 @@ class TestSshClient(base.TestCase):
         std_out_mock.read.assert_called_once_with()
         std_err_mock.read.assert_called_once_with()
         self.assertFalse(select_mock.called)
+
+    @mock.patch('select.POLLIN', SELECT_POLLIN, create=True)
+    def test_exec_commands(self):
+        chan_mock, poll_mock, _, client_mock = (
+            self._set_mocks_for_select([1, 0, 0]))
+        chan_mock.recv_exit_status.side_effect = [0, 0, 1]
+        chan_mock.recv.side_effect = [b'a', b'', b'', b'']
+        chan_mock.recv_stderr.return_value = b''
+
+        client = ssh.Client('localhost', 'root', timeout=2)
+        self.assertEqual(['a'], client.exec_commands(['one']))
+        exc = self.assertRaises(exceptions.SSHExecCommandFailed,
+                                client.exec_commands,
+                                ['two', 'three', 'four'])
+        self.assertIn("'three'", str(exc))
+
+        # The commands after the failed one are not run
+        self.assertEqual([mock.call('one'), mock.call('two'),
+                          mock.call('three')],
+                         chan_mock.exec_command.mock_calls)
+        # One connection per call, the cache is not enabled
+        self.assertEqual(2, client_mock.close.call_count)
+
+    @mock.patch('select.POLLIN', SELECT_POLLIN, create=True)
+    def test_exec_commands_concurrent(self):
+        _, poll_mock, _, client_mock = self._set_mocks_for_select([1, 0, 0])
+        channels = [mock.MagicMock(), mock.MagicMock()]
+        client_mock.get_transport().open_session.side_effect = channels
+        for channel, output in zip(channels, [b'a', b'b']):
+            channel.recv.side_effect = [output, b'']
+            channel.recv_stderr.return_value = b''
+            channel.recv_exit_status.return_value = 0
+
+        client = ssh.Client('localhost', 'root', timeout=2)
+        self.assertEqual(['a', 'b'],
+                         client.exec_commands(['one', 'two'],
+                                              concurrent=True))
+        for channel, cmd in zip(channels, ['one', 'two']):
+            channel.exec_command.assert_called_once_with(cmd)
+            channel.close.assert_called_once_with()
+        client_mock.close.assert_called_once_with()
+
+
+class TestSshConnectionCache(base.TestCase):
+
+    def setUp(self):
+        super(TestSshConnectionCache, self).setUp()
+        ssh.enable_connection_cache(idle_timeout=30)
+        self.addCleanup(ssh.disable_connection_cache)
+        ssh.reset_connection_stats()
+        self.addCleanup(ssh.reset_connection_stats)
+        self.connections = []
+        self.get_connection = self.patch(
+            'tempest.lib.common.ssh.Client._get_ssh_connection',
+            side_effect=self._connection)
+        self.patch('tempest.lib.common.ssh.Client._read_output',
+                   return_value=('out', '', 0))
+        self.time = self.patch('time.time', return_value=100.0)
+
+    def _connection(self):
+        connection = mock.MagicMock()
+        connection.get_transport().is_active.return_value = True
+        self.connections.append(connection)
+        return connection
+
+    def test_connection_reused(self):
+        client = ssh.Client('localhost', 'root')
+        client.test_connection_auth()
+        self.assertEqual('out', client.exec_command('one'))
+        # Another client to the same server, with the same credentials
+        ssh.Client('localhost', 'root').exec_command('two')
+        self.assertEqual(1, len(self.connections))
+        self.connections[0].close.assert_not_called()
+        self.assertEqual(2, self.connections[0].get_transport()
+                         .open_session.call_count)
+        self.assertEqual({'commands': 2, 'connections': 1, 'reused': 1,
+                          'reconnects': 0, 'expired': 0},
+                         ssh.get_connection_stats())
+
+        ssh.close_cached_connections()
+        self.connections[0].close.assert_called_once_with()
+
+    def test_connection_auth_not_cached(self):
+        client = ssh.Client('localhost', 'root')
+        client.exec_command('one')
+        # The server rebooted, the cached connection still looks active
+        client.test_connection_auth()
+        self.assertEqual(2, len(self.connections))
+        self.connections[0].close.assert_called_once_with()
+        # The new connection is used by the following commands
+        client.exec_command('two')
+        self.assertEqual(2, len(self.connections))
+        self.connections[1].get_transport().open_session.assert_called_once()
+        self.connections[1].close.assert_not_called()
+
+    def test_connection_auth_failure_with_cached_connection(self):
+        client = ssh.Client('localhost', 'root')
+        client.exec_command('one')
+        self.get_connection.side_effect = exceptions.SSHTimeout(
+            host='localhost', user='root', password=None)
+        self.assertRaises(exceptions.SSHTimeout, client.test_connection_auth)
+
+    def test_connection_not_shared(self):
+        ssh.Client('localhost', 'root').exec_command('one')
+        ssh.Client('localhost', 'other').exec_command('two')
+        ssh.Client('localhost', 'root', reuse_connection=False).exec_command(
+            'three')
+        self.assertEqual(3, len(self.connections))
+        self.connections[2].close.assert_called_once_with()
+
+    def test_connection_expired(self):
+        client = ssh.Client('localhost', 'root')
+        client.exec_command('one')
+        self.time.return_value = 131.0
+        client.exec_command('two')
+        self.assertEqual(2, len(self.connections))
+        self.connections[0].close.assert_called_once_with()
+        self.assertEqual(1, ssh.get_connection_stats()['expired'])
+
+    def test_connection_inactive(self):
+        client = ssh.Client('localhost', 'root')
+        client.exec_command('one')
+        self.connections[0].get_transport().is_active.return_value = False
+        client.exec_command('two')
+        self.assertEqual(2, len(self.connections))
+        self.connections[0].close.assert_called_once_with()
+        self.assertEqual(1, ssh.get_connection_stats()['reconnects'])
+
+    def test_connection_broken(self):
+        client = ssh.Client('localhost', 'root')
+        client.exec_command('one')
+        # The server closed the connection, e.g. it rebooted
+        self.connections[0].get_transport().open_session.side_effect = (
+            EOFError)
+        self.assertEqual('out', client.exec_command('two'))
+        self.assertEqual(2, len(self.connections))
+        self.connections[0].close.assert_called_once_with()
+        self.connections[1].close.assert_not_called()
+        self.assertEqual(1, ssh.get_connection_stats()['reconnects'])
+
+    def test_connection_broken_after_reconnect(self):
+        client = ssh.Client('localhost', 'root')
+        client.exec_command('one')
+        self.connections[0].get_transport().open_session.side_effect = (
+            EOFError)
+
+        def broken_connection():
+            connection = self._connection()
+            connection.get_transport().open_session.side_effect = EOFError
+            return connection
+
+        self.get_connection.side_effect = broken_connection
+        self.assertRaises(EOFError, client.exec_command, 'two')
+        # The new connection is not left in use
+        self.assertEqual(2, len(self.connections))
+        self.connections[1].close.assert_called_once_with()
+        self.assertEqual({}, ssh._connections)
+        self.assertEqual({}, ssh._in_use)
+
+    def test_connection_closed_after_error(self):
+        client = ssh.Client('localhost', 'root')
+        self.patch('tempest.lib.common.ssh.Client._read_output',
+                   side_effect=exceptions.TimeoutException)
+        self.assertRaises(exceptions.TimeoutException, client.exec_command,
+                          'one')
+        self.connections[0].close.assert_called_once_with()
+        self.assertEqual({}, ssh._connections)
+
+    def test_connection_error_with_other_commands_running(self):
+        client = ssh.Client('localhost', 'root')
+        # A command of another thread is running over the connection
+        running = client._acquire_connection()
+        self.patch('tempest.lib.common.ssh.Client._read_output',
+                   side_effect=exceptions.TimeoutException)
+        self.assertRaises(exceptions.TimeoutException, client.exec_command,
+                          'one')
+        # Dropped from the cache, closed once the other command is done
+        self.assertEqual({}, ssh._connections)
+        running.close.assert_not_called()
+        client._release_connection(running)
+        running.close.assert_called_once_with()
+        self.assertEqual({}, ssh._in_use)
+
+    def test_idle_connections_closed_on_release(self):
+        ssh.Client('localhost', 'root').exec_command('one')
+        self.time.return_value = 131.0
+        ssh.Client('localhost', 'other').exec_command('two')
+        self.connections[0].close.assert_called_once_with()
+        self.connections[1].close.assert_not_called()
+        self.assertEqual(1, len(ssh._connections))
+        self.assertEqual(1, len(ssh._key_locks))
+        self.assertEqual(1, ssh.get_connection_stats()['expired'])
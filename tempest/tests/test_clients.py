@@ -0,0 +1,89 @@
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from oslo_config import cfg
+
+from tempest import clients
+from tempest import config
+from tempest.lib.common import rest_client
+from tempest.lib.services.compute import servers_client
+from tempest.tests import base
+from tempest.tests import fake_config
+from tempest.tests.lib import fake_credentials
+from tempest.tests.lib.services import registry_fixture
+
+
+class TestManager(base.TestCase):
+
+    def setUp(self):
+        super(TestManager, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.useFixture(registry_fixture.RegistryFixture())
+        # Loading the configuration would register the tempest service
+        # clients again, on top of the ones of the registry fixture
+        self.patchobject(config.CONF, '_config', fake_config.FakePrivate())
+        self.creds = fake_credentials.FakeKeystoneV3Credentials()
+
+    def test_clients_created_on_access(self):
+        with mock.patch.object(servers_client.ServersClient, '__init__',
+                               return_value=None) as init:
+            manager = clients.Manager(self.creds)
+            init.assert_not_called()
+            client = manager.servers_client
+            init.assert_called_once()
+        self.assertIsInstance(client, servers_client.ServersClient)
+        self.assertIs(client, manager.servers_client)
+        self.assertNotIn('servers_client', manager._client_factories)
+
+    def test_client_attributes(self):
+        manager = clients.Manager(self.creds)
+        self.assertTrue(hasattr(manager, 'networks_client'))
+        self.assertIn('networks_client', dir(manager))
+        self.assertFalse(hasattr(manager, 'not_a_client'))
+
+    def test_client_parameters(self):
+        cfg.CONF.set_default('v2_admin_endpoint_type', 'adminURL',
+                             'identity')
+        cfg.CONF.set_default('v2_public_endpoint_type', 'publicURL',
+                             'identity')
+        manager = clients.Manager(self.creds)
+        # Both clients come from the same factory, with different parameters
+        self.assertEqual('publicURL',
+                         manager.identity_public_client.endpoint_type)
+        self.assertEqual('adminURL', manager.identity_client.endpoint_type)
+
+    def test_http_pool_shared(self):
+        manager = clients.Manager(self.creds)
+        self.assertIs(manager.servers_client.http_obj,
+                      manager.networks_client.http_obj)
+        other = clients.Manager(self.creds)
+        self.assertIsNot(manager.servers_client.http_obj,
+                         other.servers_client.http_obj)
+
+    def test_http_pool_not_shared_with_other_settings(self):
+        manager = clients.Manager(self.creds)
+        with mock.patch.object(rest_client.RestClient, 'http_pool_key',
+                               return_value='other'):
+            client = manager.networks_client
+        self.assertIsNot(manager.servers_client.http_obj, client.http_obj)
+
+    def test_client_set_explicitly(self):
+        manager = clients.Manager(self.creds)
+        fake_client = mock.Mock()
+        manager.servers_client = fake_client
+        self.assertIs(fake_client, manager.servers_client)
+        self.assertNotIn('servers_client', manager._client_factories)
@@ -22,6 +22,8 @@ import testtools
 
 from tempest import clients
 from tempest import config
+from tempest.lib.common import poller
+from tempest.lib.common.utils import test_utils
 from tempest.lib.common import validation_resources as vr
 from tempest.lib import exceptions as lib_exc
 from tempest.lib.services.compute import base_compute_client
@@ -241,6 +243,21 @@ class TestTempestBaseTestClass(base.TestCase):
 
         self.parent_test = ParentTest
 
+    def test_process_setup_once(self):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        self.patchobject(test, '_process_setup_done', False)
+        configure = self.patchobject(poller, 'configure')
+
+        class OtherTest(self.parent_test):
+            pass
+
+        suite = unittest.TestSuite((self.parent_test(), OtherTest()))
+        log = []
+        suite.run(LoggingTestResult(log))
+        self.assertFalse(log)
+        # Once for the worker process, not for each test class
+        configure.assert_called_once()
+
     def test_resource_cleanup(self):
         cfg.CONF.set_default('neutron', False, 'service_available')
         exp_args = (1, 2,)
@@ -748,6 +765,77 @@ class TestTempestBaseTestClassFixtures(base.TestCase):
         self.assertIn(expected_exc, str(found_exc))
 
 
+class TestTempestBaseTestClassCaller(base.TestCase):
+
+    def setUp(self):
+        super(TestTempestBaseTestClassCaller, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.patchobject(config, 'TempestConfigPrivate',
+                         fake_config.FakePrivate)
+        # Requests log the caller found without looking at the stack
+        self.patchobject(test_utils.inspect, 'currentframe',
+                         side_effect=AssertionError('Stack walked'))
+        callers = []
+        self.callers = callers
+
+        def log_caller():
+            callers.append(test_utils.find_test_caller())
+
+        class TestWithCaller(test.BaseTestCase):
+
+            credentials = []
+
+            @classmethod
+            def resource_setup(cls):
+                super(TestWithCaller, cls).resource_setup()
+                log_caller()
+
+            @classmethod
+            def resource_cleanup(cls):
+                log_caller()
+                super(TestWithCaller, cls).resource_cleanup()
+
+            def setUp(_self):
+                super(TestWithCaller, _self).setUp()
+                log_caller()
+                _self.addCleanup(log_caller)
+
+            def tearDown(_self):
+                log_caller()
+                super(TestWithCaller, _self).tearDown()
+
+            def test_fake(_self):
+                log_caller()
+
+        self.test = TestWithCaller('test_fake')
+
+    def test_caller_names(self):
+        suite = unittest.TestSuite((self.test,))
+        log = []
+        suite.run(LoggingTestResult(log))
+        self.assertEqual([], log)
+        self.assertEqual(['TestWithCaller:setUpClass',
+                          'TestWithCaller:setUp',
+                          'TestWithCaller:test_fake',
+                          'TestWithCaller:tearDown',
+                          'TestWithCaller:_run_cleanups',
+                          'TestWithCaller:tearDownClass'], self.callers)
+        self.assertIsNone(test_utils._test_caller.get())
+        # The instance is left as it was
+        self.assertNotIn('setUp', vars(self.test))
+        self.assertNotIn('test_fake', vars(self.test))
+
+    def test_instance_attributes_restored(self):
+        # Test runners may set the test method on the instance, e.g. pytest
+        test_fake = self.test.test_fake
+        self.test.test_fake = test_fake
+        suite = unittest.TestSuite((self.test,))
+        suite.run(LoggingTestResult([]))
+        self.assertIn('TestWithCaller:test_fake', self.callers)
+        self.assertIs(test_fake, vars(self.test)['test_fake'])
+        del self.test.test_fake
+
+
 class TestAPIMicroversionTest1(test.BaseTestCase):
 
     @classmethod
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the time and memory taken to create a tempest.clients.Manager,
+building all the service clients with their own connection pool as before,
+and building them lazily, with only a few clients used.
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+
+from tempest import clients
+from tempest import config
+from tempest.tests import fake_config
+from tempest.tests.lib import fake_credentials
+from tempest.tests.lib.services import registry_fixture
+
+USED_CLIENTS = ['servers_client', 'flavors_client', 'networks_client',
+                'subnets_client', 'ports_client']
+
+
+def _eager(credentials):
+    # What Manager.__init__ used to do: every client and its pool up front
+    manager = clients.Manager(credentials)
+    for name, factory in list(manager._client_factories.items()):
+        client = factory()
+        client.http_obj
+        setattr(manager, name, client)
+    return manager
+
+
+def _lazy(credentials):
+    return clients.Manager(credentials)
+
+
+def _lazy_used(credentials):
+    manager = clients.Manager(credentials)
+    for name in USED_CLIENTS:
+        getattr(manager, name).http_obj
+    return manager
+
+
+def _memory(build, credentials):
+    gc.collect()
+    tracemalloc.start()
+    manager = build(credentials)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del manager
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--managers', type=int, default=50,
+                        help='Number of managers created per measurement')
+    args = parser.parse_args()
+
+    fake_config.ConfigFixture().setUp()
+    registry_fixture.RegistryFixture().setUp()
+    config.CONF._config = fake_config.FakePrivate()
+    credentials = fake_credentials.FakeKeystoneV3Credentials()
+
+    results = []
+    for name, build in [('all clients built up front (before)', _eager),
+                        ('lazy, no client used', _lazy),
+                        ('lazy, %d clients used' % len(USED_CLIENTS),
+                         _lazy_used)]:
+        elapsed = timeit.timeit(lambda: build(credentials),
+                                number=args.managers)
+        results.append((name, elapsed, _memory(build, credentials)))
+
+    baseline = results[0][1]
+    print('%d managers, %d service clients per manager' % (
+        args.managers, len(clients.Manager(credentials)._client_factories)))
+    for name, elapsed, size in results:
+        print('%-45s %10.1f us/call  x%.1f  %8.1f KiB' % (
+            name, elapsed / args.managers * 1e6, baseline / elapsed,
+            size / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the cost per call of decorating a request with the Keystone v3 auth
+provider, resolving the base URL out of the catalog for each request as
+before, and with the base URLs memoized per token and filters.
+"""
+
+import argparse
+import timeit
+
+from tempest.lib import auth
+
+FILTERS = {
+    'service': 'compute',
+    'region': 'Region0',
+    'endpoint_type': 'publicURL',
+    'api_version': 'v2.1',
+}
+
+SERVICE_TYPES = ['compute', 'network', 'volumev3', 'image', 'object-store',
+                 'identity', 'placement', 'orchestration', 'dns',
+                 'load-balancer', 'key-manager', 'metric']
+
+
+def _auth_data(regions):
+    catalog = []
+    for service_type in SERVICE_TYPES:
+        endpoints = []
+        for region in range(regions):
+            for interface in ('public', 'internal', 'admin'):
+                endpoints.append({
+                    'region': 'Region%s' % region,
+                    'interface': interface,
+                    'url': 'http://%s-%s.example.com:8774/v2.1' % (
+                        interface, region)})
+        catalog.append({'type': service_type, 'name': service_type,
+                        'endpoints': endpoints})
+    body = {'catalog': catalog,
+            'expires_at': '2099-01-01T00:00:00.000000Z',
+            'project': {'id': 'fake-project'}}
+    return 'fake-token', body
+
+
+def _provider(auth_data):
+    credentials = auth.KeystoneV3Credentials(
+        username='fake-user', password='fake-password',
+        project_name='fake-project', user_domain_name='Default',
+        project_domain_name='Default')
+    provider = auth.KeystoneV3AuthProvider(credentials,
+                                           'http://localhost/identity/v3')
+    provider.cache = auth_data
+    return provider
+
+
+def _unmemoized(provider, auth_data):
+    # What _decorate_request used to do to find the base URL
+    return provider.base_url(filters=FILTERS, auth_data=auth_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=20000,
+                        help='Number of requests per measurement')
+    parser.add_argument('--regions', type=int, default=3,
+                        help='Number of regions in the catalog')
+    args = parser.parse_args()
+
+    FILTERS['region'] = 'Region%s' % (args.regions - 1)
+    provider = _provider(_auth_data(args.regions))
+
+    auth_data = provider.get_auth()
+    results = []
+    results.append(('base_url per request (before)',
+                    timeit.timeit(lambda: _unmemoized(provider, auth_data),
+                                  number=args.calls)))
+    results.append(('memoized base_url',
+                    timeit.timeit(
+                        lambda: provider._get_base_url(FILTERS, auth_data),
+                        number=args.calls)))
+    results.append(('auth_request, including get_auth',
+                    timeit.timeit(
+                        lambda: provider.auth_request('GET', 'servers',
+                                                      filters=FILTERS),
+                        number=args.calls)))
+
+    baseline = results[0][1]
+    print('%d calls, %d services and %d regions in the catalog' % (
+        args.calls, len(SERVICE_TYPES), args.regions))
+    for name, elapsed in results:
+        print('%-45s %10.1f us/call  x%.1f' % (
+            name, elapsed / args.calls * 1e6, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
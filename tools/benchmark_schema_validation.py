@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the cost per call of validating a compute server response against
+its JSON schema, building a new validator for each call as
+`jsonschema.validate` does, using the cached validators, and with sampling.
+"""
+
+import argparse
+import timeit
+
+import jsonschema
+
+from tempest.lib.api_schema.response.compute.v2_1 import servers
+from tempest.lib.common import jsonschema_validator
+from tempest.lib.common import rest_client
+
+SERVER = {
+    'id': '9e0ef2e2-4e0c-4b93-9a1d-7e8d5b6f2f3a',
+    'name': 'tempest-server',
+    'status': 'ACTIVE',
+    'image': {'id': 'f8a5e8d2-6c1b-4a58-a7e6-3b1b0e5f2b4c',
+              'links': [{'href': 'http://localhost/images/f8a5e8d2',
+                         'rel': 'bookmark'}]},
+    'flavor': {'id': '42',
+               'links': [{'href': 'http://localhost/flavors/42',
+                          'rel': 'bookmark'}]},
+    'user_id': 'fake-user',
+    'tenant_id': 'fake-project',
+    'created': '2026-01-01T10:00:00Z',
+    'updated': '2026-01-01T10:00:05Z',
+    'progress': 0,
+    'metadata': {'key': 'value'},
+    'links': [{'href': 'http://localhost/servers/9e0ef2e2', 'rel': 'self'},
+              {'href': 'http://localhost/servers/9e0ef2e2',
+               'rel': 'bookmark'}],
+    'addresses': {'private': [
+        {'addr': '10.1.0.5', 'version': 4,
+         'OS-EXT-IPS:type': 'fixed',
+         'OS-EXT-IPS-MAC:mac_addr': 'fa:16:3e:11:22:33'}]},
+    'hostId': 'fake-host-id',
+    'OS-DCF:diskConfig': 'MANUAL',
+    'accessIPv4': '',
+    'accessIPv6': '',
+    'key_name': None,
+    'security_groups': [{'name': 'default'}],
+    'OS-SRV-USG:launched_at': '2026-01-01T10:00:05.000000',
+    'OS-SRV-USG:terminated_at': None,
+    'OS-EXT-AZ:availability_zone': 'nova',
+    'OS-EXT-STS:task_state': None,
+    'OS-EXT-STS:vm_state': 'active',
+    'OS-EXT-STS:power_state': 1,
+    'os-extended-volumes:volumes_attached': [],
+    'config_drive': '',
+}
+
+
+class _Response(dict):
+    status = 200
+
+
+def _uncached(body):
+    # What validate_response used to do for each response
+    jsonschema.validate(body, servers.list_servers_detail['response_body'],
+                        cls=jsonschema_validator.JSONSCHEMA_VALIDATOR,
+                        format_checker=jsonschema_validator.FORMAT_CHECKER)
+
+
+def _validate_response(resp, body):
+    rest_client.RestClient.validate_response(servers.list_servers_detail,
+                                             resp, body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=2000,
+                        help='Number of validations per measurement')
+    parser.add_argument('--servers', type=int, default=10,
+                        help='Number of servers in the response body')
+    parser.add_argument('--sample-rate', type=int, default=10,
+                        help='Sample rate used for the sampling measurement')
+    args = parser.parse_args()
+
+    body = {'servers': [SERVER] * args.servers}
+    resp = _Response()
+
+    results = []
+    results.append(('jsonschema.validate (before)',
+                    timeit.timeit(lambda: _uncached(body),
+                                  number=args.calls)))
+    jsonschema_validator.set_sample_rate(1)
+    results.append(('validate_response, cached validator',
+                    timeit.timeit(lambda: _validate_response(resp, body),
+                                  number=args.calls)))
+    jsonschema_validator.set_sample_rate(args.sample_rate)
+    results.append(('validate_response, sample rate %d' % args.sample_rate,
+                    timeit.timeit(lambda: _validate_response(resp, body),
+                                  number=args.calls)))
+    jsonschema_validator.set_sample_rate(1)
+
+    baseline = results[0][1]
+    print('%d calls, %d servers per response' % (args.calls, args.servers))
+    for name, elapsed in results:
+        print('%-45s %10.1f us/call  x%.1f' % (
+            name, elapsed / args.calls * 1e6, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the throughput of the upload of a large object to a local
+Swift-compatible stand-in, with a single PUT as before and in segments
+uploaded by the SegmentedUploader with a growing number of workers. The
+stand-in adds a latency to each request and limits the bandwidth of each
+connection, like an object server would.
+"""
+
+import argparse
+import hashlib
+from http import server
+import threading
+import time
+from urllib import parse as urlparse
+
+from oslo_serialization import jsonutils as json
+
+from tempest.lib.common import segmented_upload
+from tempest.lib.services.object_storage import object_client
+from tempest.tests.lib import fake_auth_provider
+
+MIB = 1024 * 1024
+
+
+class StandInHandler(server.BaseHTTPRequestHandler):
+    """PUT of objects and SLO manifests, kept in memory"""
+
+    protocol_version = 'HTTP/1.1'
+    objects = {}
+    latency = 0
+    bandwidth = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_PUT(self):
+        time.sleep(self.latency)
+        url = urlparse.urlsplit(self.path)
+        length = int(self.headers.get('Content-Length', 0))
+        data = bytearray()
+        while len(data) < length:
+            chunk = self.rfile.read(min(MIB, length - len(data)))
+            data += chunk
+            if self.bandwidth:
+                time.sleep(len(chunk) / self.bandwidth)
+        data = bytes(data)
+        if 'multipart-manifest=put' in url.query:
+            for segment in json.loads(data):
+                stored = self.objects.get(segment['path'])
+                if (stored is None or hashlib.md5(stored).hexdigest() !=
+                        segment['etag']):
+                    return self._reply(400)
+        etag = hashlib.md5(data).hexdigest()
+        if self.headers.get('Etag', etag) != etag:
+            return self._reply(422)
+        # /v1/<account>/<container>/<object>, by /<container>/<object>
+        self.objects['/' + url.path.split('/', 3)[3]] = data
+        self._reply(201, {'Etag': etag})
+
+
+class StandInAuthProvider(fake_auth_provider.FakeAuthProvider):
+
+    def auth_request(self, method, url, headers=None, body=None, filters=None):
+        return '%s/%s' % (self.fake_base_url, url), headers, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=64,
+                        help='Size of the object in MiB')
+    parser.add_argument('--segment-size', type=int, default=4,
+                        help='Size of the segments in MiB')
+    parser.add_argument('--latency', type=float, default=20,
+                        help='Latency of each request in ms')
+    parser.add_argument('--bandwidth', type=float, default=50,
+                        help='Bandwidth of each connection in MiB/s, 0 for '
+                             'no limit')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Numbers of workers uploading the segments')
+    args = parser.parse_args()
+
+    StandInHandler.latency = args.latency / 1e3
+    StandInHandler.bandwidth = args.bandwidth * MIB
+    httpd = server.ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base_url = 'http://127.0.0.1:%d/v1/AUTH_bench' % httpd.server_port
+    client = object_client.ObjectClient(
+        StandInAuthProvider(fake_base_url=base_url), 'object-store',
+        'RegionOne')
+
+    data = b'x' * (args.size * MIB)
+    print('%d MiB object, %d MiB segments, %.0f ms latency, %s per '
+          'connection' % (args.size, args.segment_size, args.latency,
+                          '%.0f MiB/s' % args.bandwidth if args.bandwidth
+                          else 'no bandwidth limit'))
+    runs = [('single PUT (before)', None)]
+    runs += [('SLO, %d worker(s)' % workers, workers)
+             for workers in args.workers]
+    baseline = None
+    try:
+        for name, workers in runs:
+            start = time.perf_counter()
+            if workers is None:
+                client.create_object('bench', 'object', data)
+            else:
+                segmented_upload.SegmentedUploader(
+                    client, segment_size=args.segment_size * MIB,
+                    max_workers=workers).upload('bench', 'object', data)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print('%-25s %8.1f ms  %8.1f MiB/s  x%.1f' % (
+                name, elapsed * 1e3, args.size / elapsed, baseline / elapsed))
+    finally:
+        httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
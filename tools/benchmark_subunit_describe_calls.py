@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+# Copyright 2026 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the time and peak memory taken by subunit-describe-calls to parse the
+API calls of a generated subunit v2 stream, describing each call as before,
+and summarizing the calls as the stream is read with --summary.
+"""
+
+import argparse
+import datetime
+import io
+import time
+import tracemalloc
+
+import subunit
+
+from tempest.cmd import subunit_describe_calls
+from tempest.lib.common.utils import data_utils
+
+START = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+CALL = (
+    '2026-01-01 00:00:00,000 1234 INFO     [tempest.lib.common.rest_client] '
+    'Request (ServersTestJSON:test_%(test)d): 200 GET '
+    'http://10.0.0.1:8774/v2.1/servers/%(id)s 0.%(ms)03ds\n'
+    '2026-01-01 00:00:00,000 1234 DEBUG    [tempest.lib.common.rest_client] '
+    'Request - Headers: {"Content-Type": "application/json", '
+    '"X-Auth-Token": "<omitted>"}\n'
+    '        Body: None\n'
+    '    Response - Headers: {"status": "200", "content-length": "1500"}\n'
+    '        Body: %(body)s\n')
+
+
+def _stream(tests, calls):
+    body = '{"server": {"name": "%s"}}' % ('x' * 1400)
+    stream = io.BytesIO()
+    result = subunit.StreamResultToBytes(stream)
+    for test in range(tests):
+        test_id = 'tempest.api.compute.ServersTestJSON.test_%d' % test
+        result.status(test_id=test_id, test_status='inprogress',
+                      timestamp=START)
+        logs = ''.join(CALL % {'test': test, 'id': data_utils.rand_uuid(),
+                               'ms': call % 1000, 'body': body}
+                       for call in range(calls))
+        result.status(test_id=test_id, test_status='success',
+                      file_name='pythonlogging',
+                      file_bytes=logs.encode('utf-8'),
+                      mime_type='text/plain; charset=utf8', eof=True,
+                      timestamp=START)
+    return stream.getvalue()
+
+
+def _describe(data):
+    subunit_describe_calls.parse(io.BytesIO(data), 'pythonlogging', None)
+
+
+def _summarize(data):
+    subunit_describe_calls.summary(
+        [subunit_describe_calls.call_stats(io.BytesIO(data))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tests', type=int, default=500,
+                        help='Number of tests in the stream')
+    parser.add_argument('--calls', type=int, default=40,
+                        help='Number of API calls logged by each test')
+    args = parser.parse_args()
+
+    data = _stream(args.tests, args.calls)
+    print('%d tests, %d calls, %.1f MiB stream' % (
+        args.tests, args.tests * args.calls, len(data) / 1024.0 / 1024.0))
+    results = []
+    for name, parse in [('describe each call (before)', _describe),
+                        ('--summary', _summarize)]:
+        start = time.perf_counter()
+        parse(data)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        parse(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append((name, elapsed, peak))
+
+    baseline = results[0][1]
+    for name, elapsed, peak in results:
+        print('%-45s %10.1f ms  x%.1f  %8.1f MiB peak' % (
+            name, elapsed * 1e3, baseline / elapsed,
+            peak / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+    main()